@@ -1,6 +1,7 @@
 # Copyright (c) 2022 Kyle Schouviller (https://github.com/kyle0654)
 
 import asyncio
+import sys
 from logging import Logger
 
 import torch
@@ -28,6 +29,8 @@ from invokeai.app.services.image_files.image_files_disk import DiskImageFileStor
 from invokeai.app.services.image_moves.image_moves_default import ImageMoveService
 from invokeai.app.services.image_records.image_records_sqlite import SqliteImageRecordStorage
 from invokeai.app.services.images.images_default import ImageService
+from invokeai.app.services.invocation_cache.invocation_cache_base import InvocationCacheBase
+from invokeai.app.services.invocation_cache.invocation_cache_disk import DiskInvocationCache
 from invokeai.app.services.invocation_cache.invocation_cache_memory import MemoryInvocationCache
 from invokeai.app.services.invocation_services import InvocationServices
 from invokeai.app.services.invocation_stats.invocation_stats_default import InvocationStatsService
@@ -42,9 +45,12 @@ from invokeai.app.services.model_relationships.model_relationships_default impor
 from invokeai.app.services.names.names_default import SimpleNameService
 from invokeai.app.services.object_serializer.object_serializer_disk import ObjectSerializerDisk
 from invokeai.app.services.object_serializer.object_serializer_forward_cache import ObjectSerializerForwardCache
+from invokeai.app.services.object_serializer.object_serializer_safetensors import ObjectSerializerSafetensors
+from invokeai.app.services.session_processor.session_object_pinner import SessionObjectPinner
 from invokeai.app.services.session_processor.session_processor_default import (
     DefaultSessionProcessor,
     DefaultSessionRunner,
+    SessionProcessorWorker,
 )
 from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
 from invokeai.app.services.shared.sqlite.sqlite_util import init_db
@@ -65,6 +71,7 @@ from invokeai.backend.stable_diffusion.diffusion.conditioning_data import (
     SDXLConditioningInfo,
     ZImageConditioningInfo,
 )
+from invokeai.backend.util.devices import TorchDevice
 from invokeai.backend.util.logging import InvokeAILogger
 from invokeai.version.invokeai_version import __version__
 
@@ -107,7 +114,12 @@ class ApiDependencies:
         if output_folder is None:
             raise ValueError("Output folder is not set")
 
-        image_files = DiskImageFileStorage(f"{output_folder}/images")
+        image_files = DiskImageFileStorage(
+            f"{output_folder}/images",
+            write_workers=config.image_write_workers,
+            write_queue_size=config.image_write_queue_size,
+            max_cache_bytes=int(config.image_cache_max_ram_gb * 2**30),
+        )
 
         model_images_folder = config.models_path
         style_presets_folder = config.style_presets_path
@@ -128,43 +140,92 @@ class ApiDependencies:
         board_images = BoardImagesService()
         board_records = SqliteBoardRecordStorage(db=db)
         boards = BoardService()
-        events = FastAPIEventService(event_handler_id, loop=loop)
+        events = FastAPIEventService(event_handler_id, loop=loop, max_queue_size=config.max_event_queue_size)
         bulk_download = BulkDownloadService()
         image_records = SqliteImageRecordStorage(db=db)
         image_moves = ImageMoveService(db=db, image_files=image_files, config=configuration, logger=logger)
         images = ImageService()
-        invocation_cache = MemoryInvocationCache(max_cache_size=config.node_cache_size)
-        tensors = ObjectSerializerForwardCache(
-            ObjectSerializerDisk[torch.Tensor](
-                output_folder / "tensors",
-                safe_globals=[torch.Tensor],
-                ephemeral=True,
-            ),
-        )
-        conditioning = ObjectSerializerForwardCache(
-            ObjectSerializerDisk[ConditioningFieldData](
-                output_folder / "conditioning",
-                safe_globals=[
-                    ConditioningFieldData,
-                    BasicConditioningInfo,
-                    SDXLConditioningInfo,
-                    FLUXConditioningInfo,
-                    SD3ConditioningInfo,
-                    CogView4ConditioningInfo,
-                    ZImageConditioningInfo,
-                    QwenImageConditioningInfo,
-                    AnimaConditioningInfo,
-                ],
-                ephemeral=True,
-            ),
-        )
+        invocation_cache: InvocationCacheBase
+        if config.node_cache_backend == "disk":
+            invocation_cache = DiskInvocationCache(
+                config.node_cache_path,
+                logger=logger,
+                max_cache_size=config.node_cache_size,
+                max_cache_bytes=int(config.node_cache_max_disk_gb * 2**30),
+            )
+        else:
+            invocation_cache = MemoryInvocationCache(
+                max_cache_size=config.node_cache_size,
+                max_cache_bytes=int(config.node_cache_max_ram_gb * 2**30) if config.node_cache_max_ram_gb else 0,
+            )
+        conditioning_safe_globals: list[type] = [
+            ConditioningFieldData,
+            BasicConditioningInfo,
+            SDXLConditioningInfo,
+            FLUXConditioningInfo,
+            SD3ConditioningInfo,
+            CogView4ConditioningInfo,
+            ZImageConditioningInfo,
+            QwenImageConditioningInfo,
+            AnimaConditioningInfo,
+        ]
+        object_cache_max_bytes = int(config.object_cache_max_ram_gb * 2**30)
+        if config.tensor_storage_format == "safetensors":
+            # Memory-mapped files cannot be deleted on Windows while they are in use
+            use_mmap = sys.platform != "win32"
+            tensors = ObjectSerializerForwardCache(
+                ObjectSerializerSafetensors[torch.Tensor](
+                    output_folder / "tensors",
+                    safe_globals=[torch.Tensor],
+                    ephemeral=True,
+                    mmap=use_mmap,
+                ),
+                max_cache_size=None,
+                max_cache_bytes=object_cache_max_bytes,
+            )
+            conditioning = ObjectSerializerForwardCache(
+                ObjectSerializerSafetensors[ConditioningFieldData](
+                    output_folder / "conditioning",
+                    safe_globals=conditioning_safe_globals,
+                    ephemeral=True,
+                    mmap=use_mmap,
+                ),
+                max_cache_size=None,
+                max_cache_bytes=object_cache_max_bytes,
+            )
+        else:
+            tensors = ObjectSerializerForwardCache(
+                ObjectSerializerDisk[torch.Tensor](
+                    output_folder / "tensors",
+                    safe_globals=[torch.Tensor],
+                    ephemeral=True,
+                ),
+                max_cache_size=None,
+                max_cache_bytes=object_cache_max_bytes,
+            )
+            conditioning = ObjectSerializerForwardCache(
+                ObjectSerializerDisk[ConditioningFieldData](
+                    output_folder / "conditioning",
+                    safe_globals=conditioning_safe_globals,
+                    ephemeral=True,
+                ),
+                max_cache_size=None,
+                max_cache_bytes=object_cache_max_bytes,
+            )
         download_queue_service = DownloadQueueService(app_config=configuration, event_bus=events)
         model_record_service = ModelRecordServiceSQL(db=db, logger=logger)
+        worker_devices = [
+            TorchDevice.choose_torch_device() if device == "auto" else TorchDevice.normalize(device)
+            for device in configuration.worker_devices or []
+        ]
         model_manager = ModelManagerService.build_model_manager(
             app_config=configuration,
             model_record_service=model_record_service,
             download_queue=download_queue_service,
             events=events,
+            execution_device=worker_devices[0] if worker_devices else None,
+            ram_cache_count=max(len(worker_devices), 1),
+            vram_cache_count=worker_devices.count(worker_devices[0]) if worker_devices else 1,
         )
         external_generation = ExternalGenerationService(
             providers={
@@ -181,7 +242,37 @@ class ApiDependencies:
         model_relationship_records = SqliteModelRelationshipRecordStorage(db=db)
         names = SimpleNameService()
         performance_statistics = InvocationStatsService()
-        session_processor = DefaultSessionProcessor(session_runner=DefaultSessionRunner())
+        object_pinner = SessionObjectPinner(tensors=tensors, conditioning=conditioning)
+
+        def build_session_runner() -> DefaultSessionRunner:
+            return DefaultSessionRunner(
+                on_after_run_node_callbacks=[object_pinner.on_after_run_node],
+                on_node_error_callbacks=[object_pinner.on_node_error],
+                on_after_run_session_callbacks=[object_pinner.on_after_run_session],
+            )
+
+        # One worker per configured device. The first worker uses the app's model manager, and the others get their
+        # own model caches. The model caches split the RAM between them, and each device's VRAM between the workers on
+        # it. Workers sharing a device are told apart by their index.
+        session_processor_workers = [
+            SessionProcessorWorker(
+                session_runner=build_session_runner(),
+                worker_id=str(device) if worker_devices.count(device) == 1 else f"{device}/{index}",
+                device=device,
+                model_manager=model_manager.build_worker_model_manager(
+                    configuration,
+                    device,
+                    ram_cache_count=len(worker_devices),
+                    vram_cache_count=worker_devices.count(device),
+                )
+                if index > 0
+                else None,
+            )
+            for index, device in enumerate(worker_devices)
+        ]
+        session_processor = DefaultSessionProcessor(
+            workers=session_processor_workers or [SessionProcessorWorker(session_runner=build_session_runner())]
+        )
         session_queue = SqliteSessionQueue(db=db)
         urls = LocalUrlService()
         workflow_records = SqliteWorkflowRecordsStorage(db=db)
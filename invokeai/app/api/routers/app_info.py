@@ -22,6 +22,7 @@ from invokeai.app.services.config.config_default import (
     load_and_migrate_config,
     load_external_api_keys,
 )
+from invokeai.app.services.events.events_common import EventBusStatus
 from invokeai.app.services.external_generation.external_generation_common import ExternalProviderStatus
 from invokeai.app.services.invocation_cache.invocation_cache_common import InvocationCacheStatus
 from invokeai.app.services.model_records.model_records_base import UnknownModelException
@@ -397,3 +398,13 @@ async def disable_invocation_cache() -> None:
 async def get_invocation_cache_status() -> InvocationCacheStatus:
     """Clears the invocation cache"""
     return ApiDependencies.invoker.services.invocation_cache.get_status()
+
+
+@app_router.get(
+    "/event_bus/status",
+    operation_id="get_event_bus_status",
+    responses={200: {"model": EventBusStatus}},
+)
+async def get_event_bus_status() -> EventBusStatus:
+    """Gets the metrics of the queue of events waiting to be sent to the UI"""
+    return ApiDependencies.invoker.services.events.get_status()
@@ -1,6 +1,9 @@
+import hashlib
 import io
 import json
+import os
 import traceback
+from email.utils import formatdate, parsedate_to_datetime
 from typing import ClassVar, Optional
 
 from fastapi import BackgroundTasks, Body, HTTPException, Path, Query, Request, Response, UploadFile
@@ -8,6 +11,7 @@ from fastapi.responses import FileResponse
 from fastapi.routing import APIRouter
 from PIL import Image
 from pydantic import BaseModel, Field, model_validator
+from starlette.concurrency import run_in_threadpool
 
 from invokeai.app.api.auth_dependencies import CurrentUserOrDefault
 from invokeai.app.api.dependencies import ApiDependencies
@@ -48,6 +52,50 @@ images_router = APIRouter(prefix="/v1/images", tags=["images"])
 IMAGE_MAX_AGE = 31536000
 
 
+def _is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Checks a request's conditional headers. If-None-Match takes precedence over If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _get_image_file_response(
+    request: Request, image_name: str, thumbnail: bool, media_type: str, filename: Optional[str] = None
+) -> Response:
+    """Streams an image file from disk, with an ETag and Last-Modified validator and support for Range requests.
+
+    Responds with 304 Not Modified when the client's cached copy is current.
+    """
+    # Getting the path may wait for the image to be written, and stat touches the disk - keep both off the event loop
+    path = await run_in_threadpool(ApiDependencies.invoker.services.images.get_path, image_name, thumbnail)
+    stat_result = await run_in_threadpool(os.stat, path)
+    etag_base = f"{image_name}-{stat_result.st_mtime_ns}-{stat_result.st_size}"
+    etag = f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+    headers = {
+        "Cache-Control": f"max-age={IMAGE_MAX_AGE}",
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+    if _is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers=headers,
+        filename=filename,
+        stat_result=stat_result,
+        content_disposition_type="inline",
+    )
+
+
 class ResizeToDimensions(BaseModel):
     width: int = Field(..., gt=0)
     height: int = Field(..., gt=0)
@@ -352,6 +400,7 @@ async def get_image_workflow(
     },
 )
 async def get_image_full(
+    request: Request,
     image_name: str = Path(description="The name of full-resolution image file to get"),
 ) -> Response:
     """Gets a full-resolution image file.
@@ -364,13 +413,9 @@ async def get_image_full(
     assert_image_move_maintenance_inactive()
 
     try:
-        path = ApiDependencies.invoker.services.images.get_path(image_name)
-        with open(path, "rb") as f:
-            content = f.read()
-        response = Response(content, media_type="image/png")
-        response.headers["Cache-Control"] = f"max-age={IMAGE_MAX_AGE}"
-        response.headers["Content-Disposition"] = f'inline; filename="{image_name}"'
-        return response
+        return await _get_image_file_response(
+            request, image_name, thumbnail=False, media_type="image/png", filename=image_name
+        )
     except Exception:
         raise HTTPException(status_code=404)
 
@@ -388,6 +433,7 @@ async def get_image_full(
     },
 )
 async def get_image_thumbnail(
+    request: Request,
     image_name: str = Path(description="The name of thumbnail image file to get"),
 ) -> Response:
     """Gets a thumbnail image file.
@@ -400,12 +446,7 @@ async def get_image_thumbnail(
     assert_image_move_maintenance_inactive()
 
     try:
-        path = ApiDependencies.invoker.services.images.get_path(image_name, thumbnail=True)
-        with open(path, "rb") as f:
-            content = f.read()
-        response = Response(content, media_type="image/webp")
-        response.headers["Cache-Control"] = f"max-age={IMAGE_MAX_AGE}"
-        return response
+        return await _get_image_file_response(request, image_name, thumbnail=True, media_type="image/webp")
     except Exception:
         raise HTTPException(status_code=404)
 
@@ -11,6 +11,7 @@ from invokeai.app.services.auth.token_service import verify_token
 from invokeai.app.services.config.config_default import get_config
 from invokeai.app.services.events.events_common import (
     BatchEnqueuedEvent,
+    BatchEnqueueProgressEvent,
     BulkDownloadCompleteEvent,
     BulkDownloadErrorEvent,
     BulkDownloadEventBase,
@@ -74,6 +75,7 @@ QUEUE_EVENTS = {
     InvocationErrorEvent,
     QueueItemStatusChangedEvent,
     BatchEnqueuedEvent,
+    BatchEnqueueProgressEvent,
     QueueItemsRetriedEvent,
     QueueItemsCanceledEvent,
     QueueClearedEvent,
@@ -310,6 +312,7 @@ class SocketIO:
         self,
         event_name: str,
         event_data: QueueItemsRetriedEvent | QueueItemsCanceledEvent,
+        payload: dict[str, Any],
         item_ids_field: str,
         item_ids_by_user_field: str,
     ) -> None:
@@ -327,31 +330,28 @@ class SocketIO:
         - The admin room gets the full event: all item ids, all owners.
         - The rest of the queue room gets a sanitized companion carrying no item ids and no
           owners — just the queue_id its badge-count refetch needs.
+
+        The scoped and sanitized payloads are derived from the full event's payload, so the event
+        is serialized once however many owners it has.
         """
         item_ids_by_user: dict[str, list[int]] = getattr(event_data, item_ids_by_user_field)
         admin_sids = self._admin_sids()
         for user_id in event_data.user_ids:
             user_room = f"user:{user_id}"
             owner_item_ids = item_ids_by_user.get(user_id, [])
-            owner_event_data = event_data.model_copy(
-                update={
-                    item_ids_field: owner_item_ids,
-                    "user_ids": [user_id],
-                    item_ids_by_user_field: {user_id: owner_item_ids},
-                }
-            )
-            await self._sio.emit(
-                event=event_name,
-                data=owner_event_data.model_dump(mode="json"),
-                room=user_room,
-                skip_sid=admin_sids,
-            )
-        await self._sio.emit(event=event_name, data=event_data.model_dump(mode="json"), room="admin")
+            owner_payload = {
+                **payload,
+                item_ids_field: owner_item_ids,
+                "user_ids": [user_id],
+                item_ids_by_user_field: {user_id: owner_item_ids},
+            }
+            await self._sio.emit(event=event_name, data=owner_payload, room=user_room, skip_sid=admin_sids)
+        await self._sio.emit(event=event_name, data=payload, room="admin")
 
-        sanitized = event_data.model_copy(update={item_ids_field: [], "user_ids": [], item_ids_by_user_field: {}})
+        sanitized_payload = {**payload, item_ids_field: [], "user_ids": [], item_ids_by_user_field: {}}
         await self._sio.emit(
             event=event_name,
-            data=sanitized.model_dump(mode="json"),
+            data=sanitized_payload,
             room=event_data.queue_id,
             skip_sid=self._owner_and_admin_sids(event_data.user_ids),
         )
@@ -360,6 +360,14 @@ class SocketIO:
             f"sanitized to queue {event_data.queue_id}"
         )
 
+    @staticmethod
+    def _attach_binary_progress_image(event_data: InvocationProgressEvent, payload: dict[str, Any]) -> dict[str, Any]:
+        """Attaches a progress event's image to its payload as binary data, if it is not sent as a data URL."""
+        if event_data.image is not None and event_data.image.binary_data is not None:
+            # socket.io sends bytes as a binary attachment, without base64-encoding them
+            payload["image"]["data"] = event_data.image.binary_data
+        return payload
+
     async def _handle_queue_event(self, event: FastAPIEvent[QueueEventBase]):
         """Handle queue events with user isolation.
 
@@ -387,6 +395,8 @@ class SocketIO:
         """
         try:
             event_name, event_data = event
+            # Serialize the event once. Every room that receives the full event shares the payload.
+            payload = event_data.model_dump(mode="json")
 
             # Import here to avoid circular dependency
             from invokeai.app.services.events.events_common import InvocationEventBase, QueueItemEventBase
@@ -401,7 +411,9 @@ class SocketIO:
                     # image previews) and are high-frequency. No admin UI consumes other users'
                     # progress, so emit to the owner only. This also keeps other users' progress
                     # from hijacking an admin's progress bar and image previews.
-                    await self._sio.emit(event=event_name, data=event_data.model_dump(mode="json"), room=user_room)
+                    await self._sio.emit(
+                        event=event_name, data=self._attach_binary_progress_image(event_data, payload), room=user_room
+                    )
                     logger.debug(f"Emitted invocation progress event to user room {user_room}")
                 else:
                     # started/complete/error also feed admins' gallery cache updates, so admins
@@ -409,9 +421,7 @@ class SocketIO:
                     # SINGLE call so an admin owner receives exactly one copy (see the
                     # RecallParametersUpdatedEvent note below on python-socketio's recipient
                     # dedup across a room list).
-                    await self._sio.emit(
-                        event=event_name, data=event_data.model_dump(mode="json"), room=[user_room, "admin"]
-                    )
+                    await self._sio.emit(event=event_name, data=payload, room=[user_room, "admin"])
                     logger.debug(
                         f"Emitted private invocation event {event_name} to user room {user_room} and admin room"
                     )
@@ -423,9 +433,7 @@ class SocketIO:
                 # Single emit to the union of rooms — python-socketio dedups recipients across a
                 # room list, so an admin owner (or the single-user "system" user, which is in both
                 # rooms) receives exactly one copy instead of running the frontend handler twice.
-                await self._sio.emit(
-                    event=event_name, data=event_data.model_dump(mode="json"), room=[user_room, "admin"]
-                )
+                await self._sio.emit(event=event_name, data=payload, room=[user_room, "admin"])
 
                 sanitized = event_data.model_copy(
                     update={
@@ -467,9 +475,7 @@ class SocketIO:
             # carry user_id) stay private to owner + admins.
             elif isinstance(event_data, QueueItemEventBase) and hasattr(event_data, "user_id"):
                 user_room = f"user:{event_data.user_id}"
-                await self._sio.emit(
-                    event=event_name, data=event_data.model_dump(mode="json"), room=[user_room, "admin"]
-                )
+                await self._sio.emit(event=event_name, data=payload, room=[user_room, "admin"])
 
                 logger.debug(f"Emitted private queue item event {event_name} to user room {user_room} and admin room")
 
@@ -486,18 +492,14 @@ class SocketIO:
             # twice.
             elif isinstance(event_data, RecallParametersUpdatedEvent):
                 user_room = f"user:{event_data.user_id}"
-                await self._sio.emit(
-                    event=event_name, data=event_data.model_dump(mode="json"), room=[user_room, "admin"]
-                )
+                await self._sio.emit(event=event_name, data=payload, room=[user_room, "admin"])
                 logger.debug(f"Emitted private recall_parameters_updated event to user room {user_room} and admin room")
 
-            # BatchEnqueuedEvent: full to owner+admin, sanitized to everyone else in the queue
-            # room so their badge total and queue list pick up the new items.
-            elif isinstance(event_data, BatchEnqueuedEvent):
+            # BatchEnqueuedEvent and BatchEnqueueProgressEvent: full to owner+admin, sanitized to
+            # everyone else in the queue room so their badge total and queue list pick up the new items.
+            elif isinstance(event_data, (BatchEnqueuedEvent, BatchEnqueueProgressEvent)):
                 user_room = f"user:{event_data.user_id}"
-                await self._sio.emit(
-                    event=event_name, data=event_data.model_dump(mode="json"), room=[user_room, "admin"]
-                )
+                await self._sio.emit(event=event_name, data=payload, room=[user_room, "admin"])
 
                 sanitized = event_data.model_copy(
                     update={"user_id": "redacted", "batch_id": "redacted", "origin": None}
@@ -509,7 +511,7 @@ class SocketIO:
                     skip_sid=self._owner_and_admin_sids(event_data.user_id),
                 )
                 logger.debug(
-                    f"Emitted batch_enqueued: full to {user_room}+admin, sanitized to queue {event_data.queue_id}"
+                    f"Emitted {event_name}: full to {user_room}+admin, sanitized to queue {event_data.queue_id}"
                 )
 
             # QueueItemsRetriedEvent: retried items are re-enqueued, raising the queue's global
@@ -519,7 +521,7 @@ class SocketIO:
             # its per-item invalidation when retried_item_ids is empty).
             elif isinstance(event_data, QueueItemsRetriedEvent):
                 await self._emit_bulk_queue_item_event(
-                    event_name, event_data, "retried_item_ids", "retried_item_ids_by_user"
+                    event_name, event_data, payload, "retried_item_ids", "retried_item_ids_by_user"
                 )
 
             # QueueItemsCanceledEvent: a bulk cancel/delete (e.g. cancel-all-except-current) emits
@@ -527,7 +529,7 @@ class SocketIO:
             # items were removed from the queue.
             elif isinstance(event_data, QueueItemsCanceledEvent):
                 await self._emit_bulk_queue_item_event(
-                    event_name, event_data, "canceled_item_ids", "canceled_item_ids_by_user"
+                    event_name, event_data, payload, "canceled_item_ids", "canceled_item_ids_by_user"
                 )
 
             # QueueClearedEvent: an unscoped clear (user_id=None — admin or single-user mode)
@@ -538,15 +540,11 @@ class SocketIO:
             # the clear as their own.
             elif isinstance(event_data, QueueClearedEvent):
                 if event_data.user_id is None:
-                    await self._sio.emit(
-                        event=event_name, data=event_data.model_dump(mode="json"), room=event_data.queue_id
-                    )
+                    await self._sio.emit(event=event_name, data=payload, room=event_data.queue_id)
                     logger.debug(f"Emitted unscoped queue_cleared to all subscribers in queue {event_data.queue_id}")
                 else:
                     user_room = f"user:{event_data.user_id}"
-                    await self._sio.emit(
-                        event=event_name, data=event_data.model_dump(mode="json"), room=[user_room, "admin"]
-                    )
+                    await self._sio.emit(event=event_name, data=payload, room=[user_room, "admin"])
                     sanitized = event_data.model_copy(update={"user_id": "redacted"})
                     await self._sio.emit(
                         event=event_name,
@@ -570,15 +568,13 @@ class SocketIO:
                     owner_user_ids = [*owner_user_ids, single_user_id]
                 if owner_user_ids:
                     rooms = [f"user:{user_id}" for user_id in owner_user_ids] + ["admin"]
-                    await self._sio.emit(event=event_name, data=event_data.model_dump(mode="json"), room=rooms)
+                    await self._sio.emit(event=event_name, data=payload, room=rooms)
                     logger.warning(
                         f"Queue event {event_name} carries user identity but has no explicit routing; "
                         f"emitted to owner + admin rooms only. Add a routing branch for it in _handle_queue_event."
                     )
                 else:
-                    await self._sio.emit(
-                        event=event_name, data=event_data.model_dump(mode="json"), room=event_data.queue_id
-                    )
+                    await self._sio.emit(event=event_name, data=payload, room=event_data.queue_id)
                     logger.debug(
                         f"Emitted general queue event {event_name} to all subscribers in queue {event_data.queue_id}"
                     )
@@ -613,8 +609,9 @@ class SocketIO:
         # bulk_download_id room for backward compatibility.
         if hasattr(event_data, "user_id") and event_data.user_id != "system":
             user_room = f"user:{event_data.user_id}"
-            await self._sio.emit(event=event_name, data=event_data.model_dump(mode="json"), room=user_room)
-            await self._sio.emit(event=event_name, data=event_data.model_dump(mode="json"), room="admin")
+            payload = event_data.model_dump(mode="json")
+            await self._sio.emit(event=event_name, data=payload, room=user_room)
+            await self._sio.emit(event=event_name, data=payload, room="admin")
         else:
             await self._sio.emit(
                 event=event_name, data=event_data.model_dump(mode="json"), room=event_data.bulk_download_id
@@ -5,6 +5,7 @@ from __future__ import annotations
 import inspect
 import re
 import sys
+import time
 import types
 import typing
 import warnings
@@ -84,10 +85,13 @@ class Bottleneck(str, Enum, metaclass=MetaEnum):
     The bottleneck of an invocation.
     - `Network`: The invocation's execution is network-bound.
     - `GPU`: The invocation's execution is GPU-bound.
+    - `CPU`: The invocation's execution is CPU-bound, and does not use the compute device. If `cpu_node_threads` is set,
+      it may run at the same time as other nodes of the same session.
     """
 
     Network = "network"
     GPU = "gpu"
+    CPU = "cpu"
 
 
 class UIConfigBase(BaseModel):
@@ -238,11 +242,14 @@ class BaseInvocation(ABC, BaseModel):
         output: BaseInvocationOutput
         if self.use_cache:
             key = services.invocation_cache.create_key(self)
-            cached_value = services.invocation_cache.get(key)
+            cached_value = services.invocation_cache.get(key, invocation_type=self.get_type())
             if cached_value is None:
                 services.logger.debug(f'Invocation cache miss for type "{self.get_type()}": {self.id}')
+                start_time = time.perf_counter()
                 output = self.invoke(context)
-                services.invocation_cache.save(key, output)
+                services.invocation_cache.save(
+                    key, output, invocation_type=self.get_type(), compute_time=time.perf_counter() - start_time
+                )
                 return output
             else:
                 services.logger.debug(f'Invocation cache hit for type "{self.get_type()}": {self.id}')
@@ -654,7 +661,7 @@ def invocation(
     :param Optional[str] version: Adds a version to the invocation. Must be a valid semver string. Defaults to None.
     :param Optional[bool] use_cache: Whether or not to use the invocation cache. Defaults to True. The user may override this in the workflow editor.
     :param Classification classification: The classification of the invocation. Defaults to FeatureClassification.Stable. Use Beta or Prototype if the invocation is unstable.
-    :param Bottleneck bottleneck: The bottleneck of the invocation. Defaults to Bottleneck.GPU. Use Network if the invocation is network-bound.
+    :param Bottleneck bottleneck: The bottleneck of the invocation. Defaults to Bottleneck.GPU. Use Network if the invocation is network-bound, or CPU if it does not use the compute device.
     """
 
     def wrapper(cls: Type[TBaseInvocation]) -> Type[TBaseInvocation]:
@@ -1,3 +1,4 @@
+import time
 from typing import TYPE_CHECKING, Any, ClassVar, Literal
 
 from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput, invocation
@@ -115,11 +116,14 @@ class BaseExternalImageGenerationInvocation(BaseInvocation, WithMetadata, WithBo
             return super().invoke_internal(context, services)
 
         key = services.invocation_cache.create_key(self)
-        cached_value = services.invocation_cache.get(key)
+        cached_value = services.invocation_cache.get(key, invocation_type=self.get_type())
         if cached_value is None:
             services.logger.debug(f'Invocation cache miss for type "{self.get_type()}": {self.id}')
+            start_time = time.perf_counter()
             output = self.invoke(context)
-            services.invocation_cache.save(key, output)
+            services.invocation_cache.save(
+                key, output, invocation_type=self.get_type(), compute_time=time.perf_counter() - start_time
+            )
             return output
 
         services.logger.debug(f'Invocation cache hit for type "{self.get_type()}": {self.id}, duplicating images')
@@ -10,6 +10,7 @@ from PIL import Image, ImageChops, ImageFilter, ImageOps
 
 from invokeai.app.invocations.baseinvocation import (
     BaseInvocation,
+    Bottleneck,
     Classification,
     invocation,
 )
@@ -110,6 +111,7 @@ class BlankImageInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "crop"],
     category="image",
     version="1.2.2",
+    bottleneck=Bottleneck.CPU,
 )
 class ImageCropInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Crops an image to a specified box. The box can be outside of the image."""
@@ -181,6 +183,7 @@ class CenterPadCropInvocation(BaseInvocation):
     tags=["image", "paste"],
     category="image",
     version="1.2.2",
+    bottleneck=Bottleneck.CPU,
 )
 class ImagePasteInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Pastes an image into another image."""
@@ -330,6 +333,7 @@ class ImageConvertInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "blur"],
     category="image",
     version="1.2.2",
+    bottleneck=Bottleneck.CPU,
 )
 class ImageBlurInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Blurs an image"""
@@ -503,6 +507,7 @@ PIL_RESAMPLING_MAP = {
     tags=["image", "resize"],
     category="image",
     version="1.2.2",
+    bottleneck=Bottleneck.CPU,
 )
 class ImageResizeInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Resizes an image to specific dimensions"""
@@ -533,6 +538,7 @@ class ImageResizeInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "scale"],
     category="image",
     version="1.2.2",
+    bottleneck=Bottleneck.CPU,
 )
 class ImageScaleInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Scales an image by a factor"""
@@ -686,6 +692,7 @@ class DecodeInvisibleWatermarkInvocation(BaseInvocation):
     tags=["image", "mask", "inpaint"],
     category="mask",
     version="1.2.2",
+    bottleneck=Bottleneck.CPU,
 )
 class MaskEdgeInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Applies an edge mask to an image"""
@@ -749,6 +756,7 @@ class MaskCombineInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "color"],
     category="image",
     version="2.0.0",
+    bottleneck=Bottleneck.CPU,
 )
 class ColorCorrectInvocation(BaseInvocation, WithMetadata, WithBoard):
     """
@@ -1214,6 +1222,7 @@ class SaveImageToFileInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "combine"],
     category="canvas",
     version="1.0.1",
+    bottleneck=Bottleneck.CPU,
 )
 class CanvasPasteBackInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Combines two images by using the mask provided. Intended for use on the Unified Canvas."""
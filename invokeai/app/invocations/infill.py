@@ -3,7 +3,7 @@ from typing import Literal, get_args
 
 from PIL import Image
 
-from invokeai.app.invocations.baseinvocation import BaseInvocation, invocation
+from invokeai.app.invocations.baseinvocation import BaseInvocation, Bottleneck, invocation
 from invokeai.app.invocations.fields import ColorField, ImageField, InputField, WithBoard, WithMetadata
 from invokeai.app.invocations.image import PIL_RESAMPLING_MAP, PIL_RESAMPLING_MODES
 from invokeai.app.invocations.primitives import ImageOutput
@@ -65,7 +65,14 @@ class InfillImageProcessorInvocation(BaseInvocation, WithMetadata, WithBoard):
         return ImageOutput.build(infilled_image_dto)
 
 
-@invocation("infill_rgba", title="Solid Color Infill", tags=["image", "inpaint"], category="inpaint", version="1.2.2")
+@invocation(
+    "infill_rgba",
+    title="Solid Color Infill",
+    tags=["image", "inpaint"],
+    category="inpaint",
+    version="1.2.2",
+    bottleneck=Bottleneck.CPU,
+)
 class InfillColorInvocation(InfillImageProcessorInvocation):
     """Infills transparent areas of an image with a solid color"""
 
@@ -81,7 +88,14 @@ class InfillColorInvocation(InfillImageProcessorInvocation):
         return infilled
 
 
-@invocation("infill_tile", title="Tile Infill", tags=["image", "inpaint"], category="inpaint", version="1.2.3")
+@invocation(
+    "infill_tile",
+    title="Tile Infill",
+    tags=["image", "inpaint"],
+    category="inpaint",
+    version="1.2.3",
+    bottleneck=Bottleneck.CPU,
+)
 class InfillTileInvocation(InfillImageProcessorInvocation):
     """Infills transparent areas of an image with tiles of the image"""
 
@@ -99,7 +113,12 @@ class InfillTileInvocation(InfillImageProcessorInvocation):
 
 
 @invocation(
-    "infill_patchmatch", title="PatchMatch Infill", tags=["image", "inpaint"], category="inpaint", version="1.2.2"
+    "infill_patchmatch",
+    title="PatchMatch Infill",
+    tags=["image", "inpaint"],
+    category="inpaint",
+    version="1.2.2",
+    bottleneck=Bottleneck.CPU,
 )
 class InfillPatchMatchInvocation(InfillImageProcessorInvocation):
     """Infills transparent areas of an image using the PatchMatch algorithm"""
@@ -143,7 +162,14 @@ class LaMaInfillInvocation(InfillImageProcessorInvocation):
             return lama(image)
 
 
-@invocation("infill_cv2", title="CV2 Infill", tags=["image", "inpaint"], category="inpaint", version="1.2.2")
+@invocation(
+    "infill_cv2",
+    title="CV2 Infill",
+    tags=["image", "inpaint"],
+    category="inpaint",
+    version="1.2.2",
+    bottleneck=Bottleneck.CPU,
+)
 class CV2InfillInvocation(InfillImageProcessorInvocation):
     """Infills transparent areas of an image using OpenCV Inpainting"""
 
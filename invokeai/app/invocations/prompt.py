@@ -5,7 +5,7 @@ import numpy as np
 from dynamicprompts.generators import CombinatorialPromptGenerator, RandomPromptGenerator
 from pydantic import field_validator
 
-from invokeai.app.invocations.baseinvocation import BaseInvocation, invocation
+from invokeai.app.invocations.baseinvocation import BaseInvocation, Bottleneck, invocation
 from invokeai.app.invocations.fields import InputField, UIComponent
 from invokeai.app.invocations.primitives import StringCollectionOutput
 from invokeai.app.services.shared.invocation_context import InvocationContext
@@ -19,6 +19,7 @@ from invokeai.app.util.dynamicprompts import find_missing_wildcards
     category="prompt",
     version="1.0.1",
     use_cache=False,
+    bottleneck=Bottleneck.CPU,
 )
 class DynamicPromptInvocation(BaseInvocation):
     """Parses a prompt using adieyal/dynamicprompts' random or combinatorial generator"""
@@ -54,6 +55,7 @@ class DynamicPromptInvocation(BaseInvocation):
     tags=["prompt", "file"],
     category="prompt",
     version="1.0.2",
+    bottleneck=Bottleneck.CPU,
 )
 class PromptsFromFileInvocation(BaseInvocation):
     """Loads prompts from a text file"""
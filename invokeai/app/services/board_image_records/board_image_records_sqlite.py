@@ -52,7 +52,7 @@ class SqliteBoardImageRecordStorage(BoardImageRecordStorageBase):
         offset: int = 0,
         limit: int = 10,
     ) -> OffsetPaginatedResults[ImageRecord]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             cursor.execute(
                 """--sql
                 SELECT images.*
@@ -81,7 +81,7 @@ class SqliteBoardImageRecordStorage(BoardImageRecordStorageBase):
         categories: list[ImageCategory] | None,
         is_intermediate: bool | None,
     ) -> list[str]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             params: list[str | bool] = []
 
             # Base query is a join between images and board_images
@@ -137,7 +137,7 @@ class SqliteBoardImageRecordStorage(BoardImageRecordStorageBase):
         self,
         image_name: str,
     ) -> Optional[str]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             cursor.execute(
                 """--sql
                     SELECT board_id
@@ -152,7 +152,7 @@ class SqliteBoardImageRecordStorage(BoardImageRecordStorageBase):
         return cast(str, result[0])
 
     def get_image_count_for_board(self, board_id: str) -> int:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             # Convert the enum values to unique list of strings
             category_strings = [c.value for c in set(IMAGE_CATEGORIES)]
             # Create the correct length of placeholders
@@ -171,7 +171,7 @@ class SqliteBoardImageRecordStorage(BoardImageRecordStorageBase):
         return count
 
     def get_asset_count_for_board(self, board_id: str) -> int:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             # Convert the enum values to unique list of strings
             category_strings = [c.value for c in set(ASSETS_CATEGORIES)]
             # Create the correct length of placeholders
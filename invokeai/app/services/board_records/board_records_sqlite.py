@@ -58,7 +58,7 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
         self,
         board_id: str,
     ) -> BoardRecord:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             try:
                 cursor.execute(
                     """--sql
@@ -141,7 +141,7 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
         limit: int = 10,
         include_archived: bool = False,
     ) -> OffsetPaginatedResults[BoardRecord]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             # Build base query - admins see all boards, regular users see owned, shared, or public boards
             if is_admin:
                 base_query = """
@@ -231,7 +231,7 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
         direction: SQLiteDirection,
         include_archived: bool = False,
     ) -> list[BoardRecord]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             # Build query - admins see all boards, regular users see owned, shared, or public boards
             if is_admin:
                 if order_by == BoardRecordOrderBy.Name:
@@ -32,6 +32,10 @@ LOG_FORMAT = Literal["plain", "color", "syslog", "legacy"]
 LOG_LEVEL = Literal["debug", "info", "warning", "error", "critical"]
 SESSION_QUEUE_MODE = Literal["FIFO", "round_robin"]
 IMAGE_SUBFOLDER_STRATEGY = Literal["flat", "date", "type", "hash"]
+NODE_CACHE_BACKEND = Literal["memory", "disk"]
+TENSOR_STORAGE_FORMAT = Literal["torch", "safetensors"]
+PROGRESS_IMAGE_TRANSPORT = Literal["data_url", "binary"]
+MODEL_CACHE_EVICTION_POLICY = Literal["lru", "greedy_dual", "lookahead"]
 CONFIG_SCHEMA_VERSION = "4.0.3"
 # Path prefixes owned by real routes/mounts. A `base_url` starting with one of these would collide
 # with routing and silently brick the server, so it is rejected during validation.
@@ -103,31 +107,49 @@ class InvokeAIAppConfig(BaseSettings):
         max_cache_vram_gb: The amount of VRAM to use for model caching in GB. If unset, the limit will be configured based on the available VRAM and the device_working_mem_gb. In most cases, it is recommended to leave this unset.
         log_memory_usage: If True, a memory snapshot will be captured before and after every model cache operation, and the result will be logged (at debug level). There is a time cost to capturing the memory snapshots, so it is recommended to only enable this feature if you are actively inspecting the model cache's behaviour.
         model_cache_keep_alive_min: How long to keep models in cache after last use, in minutes. A value of 0 (the default) means models are kept in cache indefinitely. If no model generations occur within the timeout period, the model cache is cleared using the same logic as the 'Clear Model Cache' button.
+        model_cache_eviction_policy: The policy that chooses which models are dropped from the RAM cache, and offloaded from VRAM, first. 'lru' drops the least recently used model. 'greedy_dual' keeps models that are slow to load for their size, based on measured load times. 'lookahead' keeps the models that the running and queued sessions will use, and orders the other models like 'lru'.
         device_working_mem_gb: The amount of working memory to keep available on the compute device (in GB). Has no effect if running on CPU. If you are experiencing OOM errors, try increasing this value.
         enable_partial_loading: Enable partial loading of models. This enables models to run with reduced VRAM requirements (at the cost of slower speed) by streaming the model from RAM to VRAM as its used. In some edge cases, partial loading can cause models to run more slowly if they were previously being fully loaded into VRAM.
+        pipelined_weight_upload: Upload the weights of partially loaded models to VRAM in the background, one layer at a time in execution order, so that a model starts running on the layers that are already loaded instead of waiting for all of its weights. Only applies to CUDA with `enable_partial_loading`. Experimental.
+        prefetch_models: Load the models that the current and next queue items will use into the RAM cache in the background, while the cache has room for them. Models are only dropped from the cache to make room if they are not about to be used. Requires `queue_prefetch_depth` to be at least 1.
         keep_ram_copy_of_weights: Whether to keep a full RAM copy of a model's weights when the model is loaded in VRAM. Keeping a RAM copy increases average RAM usage, but speeds up model switching and LoRA patching (assuming there is sufficient RAM). Set this to False if RAM pressure is consistently high.
+        mmap_safetensors: Load the weights of safetensors models by memory-mapping the model files instead of copying them into private memory. Weights in RAM are then shared, through the OS page cache, with other processes that load the same files, and only weights that were converted or modified count towards the RAM cache size. Useful when running several InvokeAI processes on one host. Not all model types support this.
         ram: DEPRECATED: This setting is no longer used. It has been replaced by `max_cache_ram_gb`, but most users will not need to use this config since automatic cache size limits should work well in most cases. This config setting will be removed once the new model cache behavior is stable.
         vram: DEPRECATED: This setting is no longer used. It has been replaced by `max_cache_vram_gb`, but most users will not need to use this config since automatic cache size limits should work well in most cases. This config setting will be removed once the new model cache behavior is stable.
         lazy_offload: DEPRECATED: This setting is no longer used. Lazy-offloading is enabled by default. This config setting will be removed once the new model cache behavior is stable.
         pytorch_cuda_alloc_conf: Configure the Torch CUDA memory allocator. This will impact peak reserved VRAM usage and performance. Setting to "backend:cudaMallocAsync" works well on many systems. The optimal configuration is highly dependent on the system configuration (device type, VRAM, CUDA driver version, etc.), so must be tuned experimentally.
         device: Preferred execution device. `auto` will choose the device depending on the hardware platform and the installed torch capabilities.<br>Valid values: `auto`, `cpu`, `cuda`, `mps`, `cuda:N` (where N is a device number)
+        worker_devices: Run several queue items at once, with one session processor worker per listed device, e.g. `["cuda:0", "cuda:1"]`. A device may be listed more than once to run several queue items on it at a time, e.g. `["cpu", "cpu"]`. Each worker has its own model cache. The model cache's RAM is split evenly between the workers, and each device's VRAM between the workers on it. If unset, a single worker runs on `device`.
         precision: Floating point precision. `float16` will consume half the memory of `float32` but produce slightly lower-quality images. The `auto` setting will guess the proper precision based on your video card and operating system.<br>Valid values: `auto`, `float16`, `bfloat16`, `float32`
         sequential_guidance: Whether to calculate guidance in serial instead of in parallel, lowering memory requirements.
         attention_type: Attention type.<br>Valid values: `auto`, `normal`, `xformers`, `sliced`, `torch-sdp`
         attention_slice_size: Slice size, valid when attention_type=="sliced".<br>Valid values: `auto`, `balanced`, `max`, `1`, `2`, `3`, `4`, `5`, `6`, `7`, `8`
         force_tiled_decode: Whether to enable tiled VAE decode (reduces memory consumption with some performance penalty).
+        tensor_storage_format: Storage format for intermediate tensors and conditioning passed between nodes. 'torch' pickles objects with `torch.save`. 'safetensors' stores them without pickle and memory-maps them on load, so nodes only read the data they use.<br>Valid values: `torch`, `safetensors`
+        object_cache_max_ram_gb: The maximum amount of RAM to use for keeping intermediate tensors and conditioning in memory between nodes, in GB. Tensors and conditioning each have a cache of this size. Objects that are still needed by pending nodes are kept in memory in preference to others.
         pil_compress_level: The compress_level setting of PIL.Image.save(), used for PNG encoding. All settings are lossless. 0 = no compression, 1 = fastest with slightly larger filesize, 9 = slowest with smallest filesize. 1 is typically the best setting.
+        image_write_workers: The number of background threads that encode and write images to disk. Nodes can continue running while their images are written. Set to 0 to write images on the session processor thread.
+        image_write_queue_size: The maximum number of images waiting to be written to disk. When the queue is full, saving an image waits for a write to finish.
+        image_cache_max_ram_gb: The maximum amount of RAM to use for caching decoded images in GB. Images that are read repeatedly, such as control images used by several nodes, are only decoded once.
         max_queue_size: Maximum number of items in the session queue.
         session_queue_mode: Session queue mode. Use 'FIFO' for traditional first-in-first-out, or 'round_robin' to serve each user's jobs in turn. In single-user mode, FIFO is always used regardless of this setting.<br>Valid values: `FIFO`, `round_robin`
         clear_queue_on_startup: Empties session queue on startup. If true, disables `max_queue_history`.
         max_queue_history: Keep the last N completed, failed, and canceled queue items. Older items are deleted on startup. Set to 0 to prune all terminal items. Ignored if `clear_queue_on_startup` is true.
+        queue_prefetch_depth: The number of pending queue items to prepare while the current item is processed, so the next item can start without delay. Prepared items stay in the queue and can still be canceled. Set to 0 to disable.
+        resume_interrupted_sessions: Record each node of a queue item as it completes, so that a queue item interrupted by a crash or restart resumes from its completed nodes on startup instead of being canceled. Nodes whose outputs are intermediate tensors or conditioning are run again if a node that uses them has not completed.
+        cpu_node_threads: The number of threads each session processor worker uses to run CPU-bound nodes, such as infill and image resizing, while the session's other nodes run. Set to 0 to run every node in turn.
         allow_nodes: List of nodes to allow. Omit to allow all.
         deny_nodes: List of nodes to deny. Omit to deny none.
         node_cache_size: How many cached nodes to keep in memory.
+        node_cache_max_ram_gb: The maximum amount of RAM to use for the node cache in GB. If set, the in-memory node cache is bounded by the size of the cached outputs instead of their count, and evicts outputs that are large and quick to recompute first. `node_cache_size` of 0 still disables the cache.
+        node_cache_backend: Storage for the node cache. 'memory' keeps cached outputs in memory until the server stops. 'disk' persists cached outputs, and the tensors and conditioning they reference, so they survive restarts.<br>Valid values: `memory`, `disk`
+        node_cache_dir: Path to the node cache directory. Only used when `node_cache_backend` is 'disk'.
+        node_cache_max_disk_gb: The maximum amount of disk space to use for the node cache in GB. Only used when `node_cache_backend` is 'disk'.
         hashing_algorithm: Model hashing algorthim for model installs. 'blake3_multi' is best for SSDs. 'blake3_single' is best for spinning disk HDDs. 'random' disables hashing, instead assigning a UUID to models. Useful when using a memory db to reduce model installation time, or if you don't care about storing stable hashes for models. Alternatively, any other hashlib algorithm is accepted, though these are not nearly as performant as blake3.<br>Valid values: `blake3_multi`, `blake3_single`, `random`, `md5`, `sha1`, `sha224`, `sha256`, `sha384`, `sha512`, `blake2b`, `blake2s`, `sha3_224`, `sha3_256`, `sha3_384`, `sha3_512`, `shake_128`, `shake_256`
         remote_api_tokens: List of regular expression and token pairs used when downloading models from URLs. The download URL is tested against the regex, and if it matches, the token is provided in as a Bearer token.
         scan_models_on_startup: Scan the models directory on startup, registering orphaned models. This is typically only used in conjunction with `use_memory_db` for testing purposes.
         unsafe_disable_picklescan: UNSAFE. Disable the picklescan security check during model installation. Recommended only for development and testing purposes. This will allow arbitrary code execution during model installation, so should never be used in production.
+        model_probe_cache: Cache the results of identifying models, keyed by the path, size and modification time of their files, so that models that have not changed are not read and hashed again when they are installed or scanned. Models whose weights have the same keys and shapes as a model that was identified before are checked against its model type first.
         allow_unknown_models: Allow installation of models that we are unable to identify. If enabled, models will be marked as `unknown` in the database, and will not have any metadata associated with them. If disabled, unknown models will be rejected during installation.
         multiuser: Enable multiuser support. When disabled, the application runs in single-user mode using a default system account with administrator privileges. When enabled, requires user authentication and authorization.
         strict_password_checking: Enforce strict password requirements. When True, passwords must contain uppercase, lowercase, and numbers. When False (default), any password is accepted but its strength (weak/moderate/strong) is reported to the user.
@@ -141,6 +163,9 @@ class InvokeAIAppConfig(BaseSettings):
         external_seedream_base_url: Base URL override for Seedream image generation.
         base_url: Public base path when running behind a reverse proxy under a sub-path, e.g. `/invoke`. Set only when the proxy PRESERVES the sub-path (the backend receives `/invoke/api/...`). Leave unset when the proxy strips the sub-path or when serving at the domain root.
         forwarded_allow_ips: Comma-separated list of IPs (or `*`) allowed to set X-Forwarded-* headers. Set to the reverse proxy's IP. Only used when `base_url` is set.
+        progress_events_per_second: The maximum number of progress events to send to the UI per second for each queue item. Progress events in between are dropped before their preview images are encoded, unless their message changes. Set to 0 to send every progress event.
+        max_event_queue_size: The maximum number of events waiting to be sent to the UI. When the queue is full, progress events are dropped and generation waits for room to queue other events.
+        progress_image_transport: How progress images are sent to the UI. 'data_url' embeds each image in its progress event as a base64 data URL. 'binary' sends the JPEG bytes as a binary socket.io attachment in the image's `data` field and leaves `dataURL` empty, which avoids base64-encoding the image. The UI must support the chosen transport.<br>Valid values: `data_url`, `binary`
     """
 
     _root: Optional[Path] = PrivateAttr(default=None)
@@ -164,6 +189,9 @@ class InvokeAIAppConfig(BaseSettings):
     ssl_keyfile:         Optional[Path] = Field(default=None,               description="SSL key file for HTTPS. See https://www.uvicorn.dev/settings/#https.")
     base_url:             Optional[str] = Field(default=None,               description="Public base path when running behind a reverse proxy under a sub-path, e.g. `/invoke`. Required when the proxy PRESERVES the sub-path (the backend receives `/invoke/api/...`); optional when the proxy strips it (set it anyway so openapi/docs URLs are correct). Leave unset when serving at the domain root. Normalized to a single leading slash with no trailing slash.")
     forwarded_allow_ips:            str = Field(default="127.0.0.1",        description="Comma-separated list of IPs (or `*`) allowed to set X-Forwarded-* headers. Set to the reverse proxy's IP. Only used when `base_url` is set.")
+    progress_events_per_second:   float = Field(default=10, ge=0,          description="The maximum number of progress events to send to the UI per second for each queue item. Progress events in between are dropped before their preview images are encoded, unless their message changes. Set to 0 to send every progress event.")
+    max_event_queue_size:           int = Field(default=10000, ge=1,        description="The maximum number of events waiting to be sent to the UI. When the queue is full, progress events are dropped and generation waits for room to queue other events.")
+    progress_image_transport: PROGRESS_IMAGE_TRANSPORT = Field(default="data_url", description="How progress images are sent to the UI. 'data_url' embeds each image in its progress event as a base64 data URL. 'binary' sends the JPEG bytes as a binary socket.io attachment in the image's `data` field and leaves `dataURL` empty, which avoids base64-encoding the image. The UI must support the chosen transport.")
 
     # MISC FEATURES
     log_tokenization:              bool = Field(default=False,              description="Enable logging of parsed prompt tokens.")
@@ -201,9 +229,13 @@ class InvokeAIAppConfig(BaseSettings):
     max_cache_vram_gb:  Optional[float] = Field(default=None, ge=0,         description="The amount of VRAM to use for model caching in GB. If unset, the limit will be configured based on the available VRAM and the device_working_mem_gb. In most cases, it is recommended to leave this unset.")
     log_memory_usage:              bool = Field(default=False,              description="If True, a memory snapshot will be captured before and after every model cache operation, and the result will be logged (at debug level). There is a time cost to capturing the memory snapshots, so it is recommended to only enable this feature if you are actively inspecting the model cache's behaviour.")
     model_cache_keep_alive_min:   float = Field(default=0, ge=0,            description="How long to keep models in cache after last use, in minutes. A value of 0 (the default) means models are kept in cache indefinitely. If no model generations occur within the timeout period, the model cache is cleared using the same logic as the 'Clear Model Cache' button.")
+    model_cache_eviction_policy: MODEL_CACHE_EVICTION_POLICY = Field(default="lookahead", description="The policy that chooses which models are dropped from the RAM cache, and offloaded from VRAM, first. 'lru' drops the least recently used model. 'greedy_dual' keeps models that are slow to load for their size, based on measured load times. 'lookahead' keeps the models that the running and queued sessions will use, and orders the other models like 'lru'.")
     device_working_mem_gb:        float = Field(default=3,                  description="The amount of working memory to keep available on the compute device (in GB). Has no effect if running on CPU. If you are experiencing OOM errors, try increasing this value.")
     enable_partial_loading:        bool = Field(default=True,               description="Enable partial loading of models. This enables models to run with reduced VRAM requirements (at the cost of slower speed) by streaming the model from RAM to VRAM as its used. In some edge cases, partial loading can cause models to run more slowly if they were previously being fully loaded into VRAM.")
+    pipelined_weight_upload:       bool = Field(default=False,              description="Upload the weights of partially loaded models to VRAM in the background, one layer at a time in execution order, so that a model starts running on the layers that are already loaded instead of waiting for all of its weights. Only applies to CUDA with `enable_partial_loading`. Experimental.")
+    prefetch_models:               bool = Field(default=True,               description="Load the models that the current and next queue items will use into the RAM cache in the background, while the cache has room for them. Models are only dropped from the cache to make room if they are not about to be used. Requires `queue_prefetch_depth` to be at least 1.")
     keep_ram_copy_of_weights:      bool = Field(default=True,               description="Whether to keep a full RAM copy of a model's weights when the model is loaded in VRAM. Keeping a RAM copy increases average RAM usage, but speeds up model switching and LoRA patching (assuming there is sufficient RAM). Set this to False if RAM pressure is consistently high.")
+    mmap_safetensors:              bool = Field(default=False,              description="Load the weights of safetensors models by memory-mapping the model files instead of copying them into private memory. Weights in RAM are then shared, through the OS page cache, with other processes that load the same files, and only weights that were converted or modified count towards the RAM cache size. Useful when running several InvokeAI processes on one host. Not all model types support this.")
     # Deprecated CACHE configs
     ram:                Optional[float] = Field(default=None, gt=0,         description="DEPRECATED: This setting is no longer used. It has been replaced by `max_cache_ram_gb`, but most users will not need to use this config since automatic cache size limits should work well in most cases. This config setting will be removed once the new model cache behavior is stable.")
     vram:               Optional[float] = Field(default=None, ge=0,         description="DEPRECATED: This setting is no longer used. It has been replaced by `max_cache_vram_gb`, but most users will not need to use this config since automatic cache size limits should work well in most cases. This config setting will be removed once the new model cache behavior is stable.")
@@ -214,6 +246,7 @@ class InvokeAIAppConfig(BaseSettings):
 
     # DEVICE
     device:                      str = Field(default="auto",                description="Preferred execution device. `auto` will choose the device depending on the hardware platform and the installed torch capabilities.<br>Valid values: `auto`, `cpu`, `cuda`, `mps`, `cuda:N` (where N is a device number)", pattern=r"^(auto|cpu|mps|cuda(:\d+)?)$")
+    worker_devices: Optional[list[str]] = Field(default=None,               description="Run several queue items at once, with one session processor worker per listed device, e.g. `[\"cuda:0\", \"cuda:1\"]`. A device may be listed more than once to run several queue items on it at a time, e.g. `[\"cpu\", \"cpu\"]`. Each worker has its own model cache. The model cache's RAM is split evenly between the workers, and each device's VRAM between the workers on it. If unset, a single worker runs on `device`.")
     precision:                PRECISION = Field(default="auto",             description="Floating point precision. `float16` will consume half the memory of `float32` but produce slightly lower-quality images. The `auto` setting will guess the proper precision based on your video card and operating system.")
 
     # GENERATION
@@ -221,22 +254,35 @@ class InvokeAIAppConfig(BaseSettings):
     attention_type:      ATTENTION_TYPE = Field(default="auto",             description="Attention type.")
     attention_slice_size: ATTENTION_SLICE_SIZE = Field(default="auto",      description='Slice size, valid when attention_type=="sliced".')
     force_tiled_decode:            bool = Field(default=False,              description="Whether to enable tiled VAE decode (reduces memory consumption with some performance penalty).")
+    tensor_storage_format: TENSOR_STORAGE_FORMAT = Field(default="torch",   description="Storage format for intermediate tensors and conditioning passed between nodes. 'torch' pickles objects with `torch.save`. 'safetensors' stores them without pickle and memory-maps them on load, so nodes only read the data they use.")
+    object_cache_max_ram_gb:      float = Field(default=2, gt=0,            description="The maximum amount of RAM to use for keeping intermediate tensors and conditioning in memory between nodes, in GB. Tensors and conditioning each have a cache of this size. Objects that are still needed by pending nodes are kept in memory in preference to others.")
     pil_compress_level:             int = Field(default=1,                  description="The compress_level setting of PIL.Image.save(), used for PNG encoding. All settings are lossless. 0 = no compression, 1 = fastest with slightly larger filesize, 9 = slowest with smallest filesize. 1 is typically the best setting.")
+    image_write_workers:            int = Field(default=1, ge=0,            description="The number of background threads that encode and write images to disk. Nodes can continue running while their images are written. Set to 0 to write images on the session processor thread.")
+    image_write_queue_size:         int = Field(default=8, gt=0,            description="The maximum number of images waiting to be written to disk. When the queue is full, saving an image waits for a write to finish.")
+    image_cache_max_ram_gb:       float = Field(default=0.5, ge=0,          description="The maximum amount of RAM to use for caching decoded images in GB. Images that are read repeatedly, such as control images used by several nodes, are only decoded once.")
     max_queue_size:                 int = Field(default=10000, gt=0,        description="Maximum number of items in the session queue.")
     session_queue_mode: SESSION_QUEUE_MODE = Field(default="round_robin",   description="Session queue mode. Use 'FIFO' for traditional first-in-first-out, or 'round_robin' to serve each user's jobs in turn. In single-user mode, FIFO is always used regardless of this setting.")
     clear_queue_on_startup:        bool = Field(default=False,              description="Empties session queue on startup. If true, disables `max_queue_history`.")
     max_queue_history:      Optional[int] = Field(default=None, ge=0,        description="Keep the last N completed, failed, and canceled queue items. Older items are deleted on startup. Set to 0 to prune all terminal items. Ignored if `clear_queue_on_startup` is true.")
+    queue_prefetch_depth:           int = Field(default=1, ge=0,            description="The number of pending queue items to prepare while the current item is processed, so the next item can start without delay. Prepared items stay in the queue and can still be canceled. Set to 0 to disable.")
+    resume_interrupted_sessions:   bool = Field(default=True,               description="Record each node of a queue item as it completes, so that a queue item interrupted by a crash or restart resumes from its completed nodes on startup instead of being canceled. Nodes whose outputs are intermediate tensors or conditioning are run again if a node that uses them has not completed.")
+    cpu_node_threads:               int = Field(default=0, ge=0,            description="The number of threads each session processor worker uses to run CPU-bound nodes, such as infill and image resizing, while the session's other nodes run. Set to 0 to run every node in turn.")
 
     # NODES
     allow_nodes:    Optional[list[str]] = Field(default=None,               description="List of nodes to allow. Omit to allow all.")
     deny_nodes:     Optional[list[str]] = Field(default=None,               description="List of nodes to deny. Omit to deny none.")
     node_cache_size:                int = Field(default=512,                description="How many cached nodes to keep in memory.")
+    node_cache_max_ram_gb: Optional[float] = Field(default=None, gt=0,    description="The maximum amount of RAM to use for the node cache in GB. If set, the in-memory node cache is bounded by the size of the cached outputs instead of their count, and evicts outputs that are large and quick to recompute first. `node_cache_size` of 0 still disables the cache.")
+    node_cache_backend: NODE_CACHE_BACKEND = Field(default="memory",        description="Storage for the node cache. 'memory' keeps cached outputs in memory until the server stops. 'disk' persists cached outputs, and the tensors and conditioning they reference, so they survive restarts.")
+    node_cache_dir:                Path = Field(default=Path("node_cache"), description="Path to the node cache directory. Only used when `node_cache_backend` is 'disk'.")
+    node_cache_max_disk_gb:       float = Field(default=10, gt=0,           description="The maximum amount of disk space to use for the node cache in GB. Only used when `node_cache_backend` is 'disk'.")
 
     # MODEL INSTALL
     hashing_algorithm: HASHING_ALGORITHMS = Field(default="blake3_single",  description="Model hashing algorthim for model installs. 'blake3_multi' is best for SSDs. 'blake3_single' is best for spinning disk HDDs. 'random' disables hashing, instead assigning a UUID to models. Useful when using a memory db to reduce model installation time, or if you don't care about storing stable hashes for models. Alternatively, any other hashlib algorithm is accepted, though these are not nearly as performant as blake3.")
     remote_api_tokens: Optional[list[URLRegexTokenPair]] = Field(default=None, description="List of regular expression and token pairs used when downloading models from URLs. The download URL is tested against the regex, and if it matches, the token is provided in as a Bearer token.")
     scan_models_on_startup:        bool = Field(default=False,              description="Scan the models directory on startup, registering orphaned models. This is typically only used in conjunction with `use_memory_db` for testing purposes.")
     unsafe_disable_picklescan:     bool = Field(default=False,              description="UNSAFE. Disable the picklescan security check during model installation. Recommended only for development and testing purposes. This will allow arbitrary code execution during model installation, so should never be used in production.")
+    model_probe_cache:             bool = Field(default=True,               description="Cache the results of identifying models, keyed by the path, size and modification time of their files, so that models that have not changed are not read and hashed again when they are installed or scanned. Models whose weights have the same keys and shapes as a model that was identified before are checked against its model type first.")
     allow_unknown_models:          bool = Field(default=True,              description="Allow installation of models that we are unable to identify. If enabled, models will be marked as `unknown` in the database, and will not have any metadata associated with them. If disabled, unknown models will be rejected during installation.")
 
     # MULTIUSER
@@ -422,6 +468,11 @@ class InvokeAIAppConfig(BaseSettings):
         assert custom_nodes_path is not None
         return custom_nodes_path
 
+    @property
+    def node_cache_path(self) -> Path:
+        """Path to the node cache directory, resolved to an absolute path.."""
+        return self._resolve(self.node_cache_dir)
+
     @property
     def profiles_path(self) -> Path:
         """Path to the graph profiles directory, resolved to an absolute path.."""
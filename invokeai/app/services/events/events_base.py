@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Optional
 
 from invokeai.app.services.events.events_common import (
     BatchEnqueuedEvent,
+    BatchEnqueueProgressEvent,
     BulkDownloadCompleteEvent,
     BulkDownloadErrorEvent,
     BulkDownloadStartedEvent,
@@ -15,6 +16,7 @@ from invokeai.app.services.events.events_common import (
     DownloadProgressEvent,
     DownloadStartedEvent,
     EventBase,
+    EventBusStatus,
     InvocationCompleteEvent,
     InvocationErrorEvent,
     InvocationProgressEvent,
@@ -44,6 +46,7 @@ if TYPE_CHECKING:
     from invokeai.app.services.model_install.model_install_common import ModelInstallJob
     from invokeai.app.services.session_processor.session_processor_common import ProgressImage
     from invokeai.app.services.session_queue.session_queue_common import (
+        Batch,
         BatchStatus,
         EnqueueBatchResult,
         RetryItemsResult,
@@ -60,6 +63,10 @@ class EventServiceBase:
     def dispatch(self, event: "EventBase") -> None:
         pass
 
+    def get_status(self) -> EventBusStatus:
+        """Gets the metrics of the event queue"""
+        return EventBusStatus()
+
     # region: Invocation
 
     def emit_invocation_started(self, queue_item: "SessionQueueItem", invocation: "BaseInvocation") -> None:
@@ -108,6 +115,12 @@ class EventServiceBase:
         """Emitted when a batch is enqueued"""
         self.dispatch(BatchEnqueuedEvent.build(enqueue_result, user_id))
 
+    def emit_batch_enqueue_progress(
+        self, queue_id: str, batch: "Batch", enqueued: int, requested: int, priority: int, user_id: str = "system"
+    ) -> None:
+        """Emitted while a large batch is being enqueued, after each chunk of its queue items is inserted"""
+        self.dispatch(BatchEnqueueProgressEvent.build(queue_id, batch, enqueued, requested, priority, user_id))
+
     def emit_queue_items_retried(
         self, retry_result: "RetryItemsResult", user_ids: list[str], retried_item_ids_by_user: dict[str, list[int]]
     ) -> None:
@@ -8,6 +8,7 @@ from invokeai.app.services.model_install.model_install_common import ModelInstal
 from invokeai.app.services.session_processor.session_processor_common import ProgressImage
 from invokeai.app.services.session_queue.session_queue_common import (
     QUEUE_ITEM_STATUS,
+    Batch,
     BatchStatus,
     EnqueueBatchResult,
     RetryItemsResult,
@@ -92,6 +93,9 @@ class QueueItemEventBase(QueueEventBase):
     origin: str | None = Field(default=None, description="The origin of the queue item")
     destination: str | None = Field(default=None, description="The destination of the queue item")
     user_id: str = Field(default="system", description="The ID of the user who created the queue item")
+    worker_id: str | None = Field(
+        default=None, description="The ID of the session processor worker running the queue item, if any"
+    )
 
 
 class InvocationEventBase(QueueItemEventBase):
@@ -119,6 +123,7 @@ class InvocationStartedEvent(InvocationEventBase):
             origin=queue_item.origin,
             destination=queue_item.destination,
             user_id=queue_item.user_id,
+            worker_id=queue_item.worker_id,
             session_id=queue_item.session_id,
             invocation=invocation,
             invocation_source_id=queue_item.session.prepared_source_mapping[invocation.id],
@@ -155,6 +160,7 @@ class InvocationProgressEvent(InvocationEventBase):
             origin=queue_item.origin,
             destination=queue_item.destination,
             user_id=queue_item.user_id,
+            worker_id=queue_item.worker_id,
             session_id=queue_item.session_id,
             invocation=invocation,
             invocation_source_id=queue_item.session.prepared_source_mapping[invocation.id],
@@ -183,6 +189,7 @@ class InvocationCompleteEvent(InvocationEventBase):
             origin=queue_item.origin,
             destination=queue_item.destination,
             user_id=queue_item.user_id,
+            worker_id=queue_item.worker_id,
             session_id=queue_item.session_id,
             invocation=invocation,
             invocation_source_id=queue_item.session.prepared_source_mapping[invocation.id],
@@ -216,6 +223,7 @@ class InvocationErrorEvent(InvocationEventBase):
             origin=queue_item.origin,
             destination=queue_item.destination,
             user_id=queue_item.user_id,
+            worker_id=queue_item.worker_id,
             session_id=queue_item.session_id,
             invocation=invocation,
             invocation_source_id=queue_item.session.prepared_source_mapping[invocation.id],
@@ -258,6 +266,7 @@ class QueueItemStatusChangedEvent(QueueItemEventBase):
             origin=queue_item.origin,
             destination=queue_item.destination,
             user_id=queue_item.user_id,
+            worker_id=queue_item.worker_id,
             session_id=queue_item.session_id,
             status=queue_item.status,
             status_sequence=queue_item.status_sequence,
@@ -301,6 +310,34 @@ class BatchEnqueuedEvent(QueueEventBase):
         )
 
 
+@payload_schema.register
+class BatchEnqueueProgressEvent(QueueEventBase):
+    """Event model for batch_enqueue_progress"""
+
+    __event_name__ = "batch_enqueue_progress"
+
+    batch_id: str = Field(description="The ID of the batch")
+    enqueued: int = Field(description="The number of invocations enqueued so far")
+    requested: int = Field(description="The number of invocations requested to be enqueued")
+    priority: int = Field(description="The priority of the batch")
+    origin: str | None = Field(default=None, description="The origin of the batch")
+    user_id: str = Field(default="system", description="The ID of the user who is enqueueing the batch")
+
+    @classmethod
+    def build(
+        cls, queue_id: str, batch: Batch, enqueued: int, requested: int, priority: int, user_id: str = "system"
+    ) -> "BatchEnqueueProgressEvent":
+        return cls(
+            queue_id=queue_id,
+            batch_id=batch.batch_id,
+            origin=batch.origin,
+            enqueued=enqueued,
+            requested=requested,
+            priority=priority,
+            user_id=user_id,
+        )
+
+
 @payload_schema.register
 class QueueItemsRetriedEvent(QueueEventBase):
     """Event model for queue_items_retried"""
@@ -806,3 +843,21 @@ class RecallParametersUpdatedEvent(QueueEventBase):
     @classmethod
     def build(cls, queue_id: str, user_id: str, parameters: dict[str, Any]) -> "RecallParametersUpdatedEvent":
         return cls(queue_id=queue_id, user_id=user_id, parameters=parameters)
+
+
+class EventBusStatus(BaseModel):
+    """Metrics of the queue between the threads that emit events and the event loop that dispatches them."""
+
+    queue_depth: int = Field(default=0, description="The number of events waiting to be dispatched")
+    peak_queue_depth: int = Field(default=0, description="The highest number of events that waited to be dispatched")
+    max_queue_size: int = Field(default=0, description="The number of queued events at which the queue is full")
+    dispatched: int = Field(default=0, description="The number of events dispatched")
+    merged: int = Field(default=0, description="The number of progress events that replaced a queued progress event")
+    dropped: int = Field(default=0, description="The number of progress events dropped because the queue was full")
+    blocked: int = Field(default=0, description="The number of times an emitting thread waited for a full queue")
+    average_latency: float = Field(
+        default=0.0, description="The average time from queueing an event to dispatching it, in seconds"
+    )
+    max_latency: float = Field(
+        default=0.0, description="The longest time from queueing an event to dispatching it, in seconds"
+    )
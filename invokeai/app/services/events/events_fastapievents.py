@@ -1,19 +1,74 @@
 import asyncio
+import logging
 import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Hashable, Optional
 
 from fastapi_events.dispatcher import dispatch
 
 from invokeai.app.services.events.events_base import EventServiceBase
-from invokeai.app.services.events.events_common import EventBase
+from invokeai.app.services.events.events_common import (
+    BatchEnqueueProgressEvent,
+    DownloadProgressEvent,
+    EventBase,
+    EventBusStatus,
+    InvocationProgressEvent,
+    ModelInstallDownloadProgressEvent,
+)
+
+# How long a thread emitting an event waits for room in a full queue before queueing the event anyway
+BACK_PRESSURE_TIMEOUT_SECONDS = 5.0
+
+
+def get_merge_key(event: EventBase) -> Optional[Hashable]:
+    """Gets the key under which a queued event is replaced by a later event, or None if every event must be delivered.
+
+    Progress events only report the latest state of an invocation, download, install or enqueue. A queued progress
+    event is replaced by a later progress event of the same thing, keeping its place in the queue, and progress events
+    are dropped when the queue is full. All other events are delivered.
+    """
+    if isinstance(event, InvocationProgressEvent):
+        return (event.__event_name__, event.item_id, event.invocation.id)
+    if isinstance(event, DownloadProgressEvent):
+        return (event.__event_name__, event.source)
+    if isinstance(event, ModelInstallDownloadProgressEvent):
+        return (event.__event_name__, event.id)
+    if isinstance(event, BatchEnqueueProgressEvent):
+        return (event.__event_name__, event.batch_id)
+    return None
+
+
+@dataclass
+class _QueuedEvent:
+    event: EventBase
+    queued_at: float
+    merge_key: Optional[Hashable]
 
 
 class FastAPIEventService(EventServiceBase):
-    def __init__(self, event_handler_id: int, loop: asyncio.AbstractEventLoop) -> None:
+    def __init__(self, event_handler_id: int, loop: asyncio.AbstractEventLoop, max_queue_size: int = 10_000) -> None:
         self.event_handler_id = event_handler_id
-        self._queue = asyncio.Queue[EventBase | None]()
         self._stop_event = threading.Event()
         self._loop = loop
 
+        # Events are queued by the threads that emit them and dispatched from the event loop. The queue is bounded:
+        # when it is full, progress events are dropped and other events make the emitting thread wait for room.
+        self._max_queue_size = max_queue_size
+        self._queue: deque[_QueuedEvent] = deque()
+        self._queued_by_merge_key: dict[Hashable, _QueuedEvent] = {}
+        self._queue_changed = threading.Condition()
+        self._events_queued = asyncio.Event()
+
+        self._peak_queue_depth = 0
+        self._dispatched = 0
+        self._merged = 0
+        self._dropped = 0
+        self._blocked = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
         # We need to store a reference to the task so it doesn't get GC'd
         # See: https://docs.python.org/3/library/asyncio-task.html#creating-tasks
         self._background_tasks: set[asyncio.Task[None]] = set()
@@ -25,30 +80,108 @@ class FastAPIEventService(EventServiceBase):
 
     def stop(self, *args, **kwargs):
         self._stop_event.set()
-        self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        with self._queue_changed:
+            self._queue_changed.notify_all()
+        self._loop.call_soon_threadsafe(self._events_queued.set)
 
     def dispatch(self, event: EventBase) -> None:
         if self._loop.is_closed():
             # The event loop was closed during shutdown. Events can no longer be dispatched;
             # silently drop this one so the generation thread can wind down cleanly.
             return
-        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        merge_key = get_merge_key(event)
+        with self._queue_changed:
+            if merge_key is not None:
+                queued = self._queued_by_merge_key.get(merge_key)
+                if queued is not None:
+                    queued.event = event
+                    self._merged += 1
+                    return
+                if len(self._queue) >= self._max_queue_size:
+                    self._dropped += 1
+                    return
+            else:
+                self._wait_for_room()
+            queued = _QueuedEvent(event=event, queued_at=time.perf_counter(), merge_key=merge_key)
+            self._queue.append(queued)
+            if merge_key is not None:
+                self._queued_by_merge_key[merge_key] = queued
+            self._peak_queue_depth = max(self._peak_queue_depth, len(self._queue))
+        self._loop.call_soon_threadsafe(self._events_queued.set)
+
+    def get_status(self) -> EventBusStatus:
+        with self._queue_changed:
+            return EventBusStatus(
+                queue_depth=len(self._queue),
+                peak_queue_depth=self._peak_queue_depth,
+                max_queue_size=self._max_queue_size,
+                dispatched=self._dispatched,
+                merged=self._merged,
+                dropped=self._dropped,
+                blocked=self._blocked,
+                average_latency=self._total_latency / self._dispatched if self._dispatched else 0.0,
+                max_latency=self._max_latency,
+            )
+
+    def _wait_for_room(self) -> None:
+        """Waits until the queue has room. Must be called with the queue lock held.
+
+        Only threads other than the event loop's wait, as the event loop empties the queue. The wait is bounded, so a
+        stalled event loop cannot hang the session processor; the event is queued anyway when it times out.
+        """
+        if len(self._queue) < self._max_queue_size or self._stop_event.is_set() or self._is_event_loop_thread():
+            return
+        self._blocked += 1
+        has_room = self._queue_changed.wait_for(
+            lambda: len(self._queue) < self._max_queue_size or self._stop_event.is_set(),
+            timeout=BACK_PRESSURE_TIMEOUT_SECONDS,
+        )
+        if not has_room:
+            logging.getLogger("InvokeAI").warning(
+                f"Event queue has been full for {BACK_PRESSURE_TIMEOUT_SECONDS}s, queueing the event anyway"
+            )
+
+    def _is_event_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _get_next_event(self) -> Optional[_QueuedEvent]:
+        with self._queue_changed:
+            if not self._queue:
+                return None
+            queued = self._queue.popleft()
+            if queued.merge_key is not None:
+                del self._queued_by_merge_key[queued.merge_key]
+            self._queue_changed.notify_all()
+            return queued
+
+    def _record_dispatch(self, queued: _QueuedEvent) -> None:
+        latency = time.perf_counter() - queued.queued_at
+        with self._queue_changed:
+            self._dispatched += 1
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
 
     async def _dispatch_from_queue(self, stop_event: threading.Event):
         """Get events on from the queue and dispatch them, from the correct thread"""
         while not stop_event.is_set():
             try:
-                event = await self._queue.get()
-                if not event:  # Probably stopping
-                    continue
-                # Leave the payloads as live pydantic models
-                dispatch(event, middleware_id=self.event_handler_id, payload_schema_dump=False)
+                await self._events_queued.wait()
+                self._events_queued.clear()
+                while (queued := self._get_next_event()) is not None:
+                    event = queued.event
+                    try:
+                        # Leave the payloads as live pydantic models
+                        dispatch(event, middleware_id=self.event_handler_id, payload_schema_dump=False)
+                    except Exception:
+                        logging.getLogger("InvokeAI").error(
+                            f"Error dispatching event {getattr(event, '__event_name__', event)}", exc_info=True
+                        )
+                    self._record_dispatch(queued)
+                    # Let the event handlers run before dispatching the next event
+                    await asyncio.sleep(0)
 
             except asyncio.CancelledError as e:
                 raise e  # Raise a proper error
-            except Exception:
-                import logging
-
-                logging.getLogger("InvokeAI").error(
-                    f"Error dispatching event {getattr(event, '__event_name__', event)}", exc_info=True
-                )
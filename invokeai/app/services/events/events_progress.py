@@ -0,0 +1,46 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class ProgressEventChannel:
+    """Limits how often a queue item's progress events are emitted.
+
+    Nodes signal progress on every denoising step, often with a preview image that must be encoded and sent to the UI.
+    The channel lets through at most `max_per_second` progress events, dropping the events in between. Each dropped
+    event is superseded by a later one, so the UI still shows recent progress. An event whose message differs from the
+    last emitted one is always let through, so that a new stage, e.g. "Running VAE decoder", is never dropped. The
+    final event of a stage, with a percentage of 1, is always let through too, so that the UI ends on completed progress.
+
+    Check `accept()` before building a progress event, so that the preview images of dropped events are never encoded.
+    """
+
+    def __init__(self, max_per_second: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Args:
+            max_per_second: The maximum number of progress events to emit per second. 0 emits every progress event.
+            clock: Returns the current time in seconds.
+        """
+        self._min_interval = 1 / max_per_second if max_per_second > 0 else 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_emitted: Optional[tuple[float, str]] = None
+        self._dropped = 0
+
+    @property
+    def dropped(self) -> int:
+        """The number of progress events dropped so far."""
+        return self._dropped
+
+    def accept(self, message: str, percentage: Optional[float] = None) -> bool:
+        """Whether a progress event with the given message and percentage should be emitted now."""
+        now = self._clock()
+        is_final = percentage is not None and percentage >= 1
+        with self._lock:
+            if self._last_emitted is not None and not is_final:
+                last_time, last_message = self._last_emitted
+                if message == last_message and now - last_time < self._min_interval:
+                    self._dropped += 1
+                    return False
+            self._last_emitted = (now, message)
+            return True
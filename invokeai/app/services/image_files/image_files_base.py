@@ -4,13 +4,20 @@ from typing import Optional
 
 from PIL.Image import Image as PILImageType
 
+from invokeai.app.services.image_files.image_files_common import ImageCacheStats
+
 
 class ImageFileStorageBase(ABC):
     """Low-level service responsible for storing and retrieving image files."""
 
     @abstractmethod
-    def get(self, image_name: str, image_subfolder: str = "") -> PILImageType:
-        """Retrieves an image as PIL Image."""
+    def get(self, image_name: str, image_subfolder: str = "", mode: Optional[str] = None) -> PILImageType:
+        """Retrieves an image as PIL Image, optionally converted to the given color mode.
+
+        The returned image may be shared with other callers and must not be modified.
+
+        :raises ValueError: if the image cannot be converted to the given mode
+        """
         pass
 
     @abstractmethod
@@ -35,6 +42,11 @@ class ImageFileStorageBase(ABC):
         """Evicts any cached image objects for the provided paths."""
         pass
 
+    @abstractmethod
+    def get_cache_stats(self) -> ImageCacheStats:
+        """Gets statistics for the cache of decoded images."""
+        pass
+
     # TODO: We need to validate paths before starlette makes the FileResponse, else we get a
     # 500 internal server error. I don't like having this method on the service.
     @abstractmethod
@@ -56,6 +68,14 @@ class ImageFileStorageBase(ABC):
         """Saves an image and a 256x256 WEBP thumbnail. Returns a tuple of the image name, thumbnail name, and created timestamp."""
         pass
 
+    @abstractmethod
+    def wait_for_write(self, image_name: str, image_subfolder: str = "") -> None:
+        """Waits until an image accepted by `save` has been written to disk.
+
+        :raises ImageFileSaveException: if the image could not be written
+        """
+        pass
+
     @abstractmethod
     def delete(self, image_name: str, image_subfolder: str = "") -> None:
         """Deletes an image and its thumbnail (if one exists)."""
@@ -1,3 +1,6 @@
+from dataclasses import dataclass
+
+
 # TODO: Should these excpetions subclass existing python exceptions?
 class ImageFileNotFoundException(Exception):
     """Raised when an image file is not found in storage."""
@@ -18,3 +21,14 @@ class ImageFileDeleteException(Exception):
 
     def __init__(self, message="Image file not deleted"):
         super().__init__(message)
+
+
+@dataclass
+class ImageCacheStats:
+    """Statistics for the decoded image cache."""
+
+    hits: int
+    misses: int
+    images_cached: int
+    cache_size_bytes: int
+    max_cache_size_bytes: int
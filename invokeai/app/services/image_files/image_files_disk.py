@@ -1,8 +1,12 @@
 # Copyright (c) 2022 Kyle Schouviller (https://github.com/kyle0654) and the InvokeAI Team
 import io
+import threading
 import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
 from pathlib import Path
-from queue import Queue
 from typing import Optional, Union
 
 from PIL import Image, PngImagePlugin
@@ -10,6 +14,7 @@ from PIL.Image import Image as PILImageType
 
 from invokeai.app.services.image_files.image_files_base import ImageFileStorageBase
 from invokeai.app.services.image_files.image_files_common import (
+    ImageCacheStats,
     ImageFileDeleteException,
     ImageFileNotFoundException,
     ImageFileSaveException,
@@ -58,13 +63,65 @@ def _should_use_png_rle(image: PILImageType) -> bool:
         sample.close()
 
 
+def _get_image_size(image: PILImageType) -> int:
+    """Gets the number of bytes used by the decoded pixel data of an image."""
+    if image.mode in ("I", "F") or image.mode.startswith("I;32"):
+        bytes_per_band = 4
+    elif image.mode.startswith("I;16"):
+        bytes_per_band = 2
+    else:
+        bytes_per_band = 1
+    return image.width * image.height * len(image.getbands()) * bytes_per_band
+
+
+@dataclass
+class _PendingImageWrite:
+    """An image that has been accepted by `save`, but may not have been written to disk yet."""
+
+    image: PILImageType
+    future: Future[None]
+
+
 class DiskImageFileStorage(ImageFileStorageBase):
-    """Stores images on disk"""
+    """Stores images on disk
 
-    def __init__(self, output_folder: Union[str, Path]):
-        self.__cache: dict[Path, PILImageType] = {}
-        self.__cache_ids = Queue[Path]()
-        self.__max_cache_size = 10  # TODO: get this from config
+    If `write_workers` is greater than 0, images are written behind: `save` returns as soon as the image is queued, and
+    a pool of background threads encodes and writes the PNG and its thumbnail. Until then, `get` serves a copy of the
+    image from memory, and `get_path`, `validate_path` and `delete` wait for the write to finish, so callers never see
+    a missing or partially-written file. At most `write_queue_size` images may be waiting to be written - `save` blocks
+    when the queue is full. If a background write fails, `get` and `wait_for_write` raise for that image until it is
+    saved again or deleted, and the next `flush` raises.
+
+    Decoded images are kept in a LRU cache of up to `max_cache_bytes`, keyed by path and color mode, so an image that
+    is read many times - for example, a control image used by several nodes - is decoded and converted only once.
+    """
+
+    def __init__(
+        self,
+        output_folder: Union[str, Path],
+        write_workers: int = 0,
+        write_queue_size: int = 8,
+        max_cache_bytes: int = 512 * 2**20,
+    ):
+        self.__cache: OrderedDict[tuple[Path, Optional[str]], PILImageType] = OrderedDict()
+        self.__cache_sizes: dict[tuple[Path, Optional[str]], int] = {}
+        self.__cache_bytes = 0
+        self.__max_cache_bytes = max_cache_bytes
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        self.__cache_lock = threading.Lock()
+
+        self.__pending_writes: dict[Path, _PendingImageWrite] = {}
+        self.__pending_writes_lock = threading.Lock()
+        # Errors of failed background writes, by image path, and the image paths that `flush` has not yet raised for
+        self.__failed_writes: dict[Path, Exception] = {}
+        self.__unflushed_failed_writes: set[Path] = set()
+        self.__write_slots = threading.BoundedSemaphore(max(write_queue_size, 1))
+        self.__write_executor = (
+            ThreadPoolExecutor(max_workers=write_workers, thread_name_prefix="image-writer")
+            if write_workers > 0
+            else None
+        )
 
         self.__output_folder = output_folder if isinstance(output_folder, Path) else Path(output_folder)
         self.__thumbnails_folder = self.__output_folder / "thumbnails"
@@ -74,6 +131,31 @@ class DiskImageFileStorage(ImageFileStorageBase):
     def start(self, invoker: Invoker) -> None:
         self.__invoker = invoker
 
+    def stop(self, invoker: Invoker) -> None:
+        if self.__write_executor is not None:
+            self.__write_executor.shutdown(wait=True, cancel_futures=False)
+
+    def flush(self) -> None:
+        """Waits until all images accepted by `save` have been written to disk.
+
+        :raises ImageFileSaveException: if any background write failed since the last flush
+        """
+        with self.__pending_writes_lock:
+            pending_writes = list(self.__pending_writes.values())
+        for pending_write in pending_writes:
+            with suppress(Exception):
+                pending_write.future.result()
+        with self.__pending_writes_lock:
+            failed_paths = sorted(self.__unflushed_failed_writes)
+            self.__unflushed_failed_writes.clear()
+        if failed_paths:
+            raise ImageFileSaveException(f"Failed to write image files: {', '.join(p.name for p in failed_paths)}")
+
+    def wait_for_write(self, image_name: str, image_subfolder: str = "") -> None:
+        image_path = self.__resolve_path(image_name, image_subfolder=image_subfolder)
+        self.__wait_for_write(image_path)
+        self.__raise_if_write_failed(image_path)
+
     @property
     def image_root(self) -> Path:
         return self.__output_folder.resolve()
@@ -83,20 +165,40 @@ class DiskImageFileStorage(ImageFileStorageBase):
         return self.__thumbnails_folder.resolve()
 
     def evict_cache_paths(self, paths: list[Path]) -> None:
-        for path in paths:
-            self.__cache.pop(path.resolve(), None)
+        self.__evict_cache({path.resolve() for path in paths})
+
+    def get_cache_stats(self) -> ImageCacheStats:
+        with self.__cache_lock:
+            return ImageCacheStats(
+                hits=self.__cache_hits,
+                misses=self.__cache_misses,
+                images_cached=len(self.__cache),
+                cache_size_bytes=self.__cache_bytes,
+                max_cache_size_bytes=self.__max_cache_bytes,
+            )
 
-    def get(self, image_name: str, image_subfolder: str = "") -> PILImageType:
+    def get(self, image_name: str, image_subfolder: str = "", mode: Optional[str] = None) -> PILImageType:
         try:
-            image_path = self.get_path(image_name, image_subfolder=image_subfolder)
-
-            cache_item = self.__get_cache(image_path)
-            if cache_item:
-                return cache_item
-
-            image = Image.open(image_path)
-            self.__set_cache(image_path, image)
-            return image
+            image_path = self.__resolve_path(image_name, image_subfolder=image_subfolder)
+
+            with self.__pending_writes_lock:
+                pending_write = self.__pending_writes.get(image_path)
+            self.__raise_if_write_failed(image_path)
+            # The writer thread is still encoding the staged image, so readers get their own copy
+            image = pending_write.image.copy() if pending_write is not None else self.__get_cache((image_path, None))
+            if image is None:
+                image = Image.open(image_path)
+                image.load()
+                self.__set_cache((image_path, None), image)
+
+            if mode is None or mode == image.mode:
+                return image
+
+            converted_image = self.__get_cache((image_path, mode))
+            if converted_image is None:
+                converted_image = image.convert(mode)
+                self.__set_cache((image_path, mode), converted_image)
+            return converted_image
         except FileNotFoundError as e:
             raise ImageFileNotFoundException from e
 
@@ -112,69 +214,146 @@ class DiskImageFileStorage(ImageFileStorageBase):
     ) -> None:
         try:
             self.__validate_storage_folders()
-            image_path = self.get_path(image_name, image_subfolder=image_subfolder)
-
-            # Ensure subfolder directories exist
-            image_path.parent.mkdir(parents=True, exist_ok=True)
-
-            pnginfo = PngImagePlugin.PngInfo()
-            info_dict = {}
-
-            if metadata is not None:
-                info_dict["invokeai_metadata"] = metadata
-                pnginfo.add_text("invokeai_metadata", metadata)
-            if workflow is not None:
-                info_dict["invokeai_workflow"] = workflow
-                pnginfo.add_text("invokeai_workflow", workflow)
-            if graph is not None:
-                info_dict["invokeai_graph"] = graph
-                pnginfo.add_text("invokeai_graph", graph)
-
-            # When saving the image, the image object's info field is not populated. We need to set it
-            image.info = info_dict
-            compress_level = self.__invoker.services.configuration.pil_compress_level
-            save_options = {"compress_level": compress_level}
-            if compress_level == 1 and _should_use_png_rle(image):
-                save_options["compress_type"] = zlib.Z_RLE
-            image.save(
-                image_path,
-                "PNG",
-                pnginfo=pnginfo,
-                **save_options,
-            )
-
-            thumbnail_path = self.get_path(image_name, thumbnail=True, image_subfolder=image_subfolder)
-
-            # Ensure thumbnail subfolder directories exist
-            thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
-
-            thumbnail_image = make_thumbnail(image, thumbnail_size)
-            thumbnail_image.save(thumbnail_path)
-
-            self.__set_cache(image_path, image)
-            self.__set_cache(thumbnail_path, thumbnail_image)
+            image_path = self.__resolve_path(image_name, image_subfolder=image_subfolder)
+            thumbnail_path = self.__resolve_path(image_name, thumbnail=True, image_subfolder=image_subfolder)
+            # An earlier write to the same file must not land after this one
+            self.__wait_for_write(image_path)
+            self.__clear_failed_write(image_path, thumbnail_path)
+
+            if self.__write_executor is None:
+                self.__write(image, image_path, thumbnail_path, metadata, workflow, graph, thumbnail_size)
+                return
+
+            # The caller may keep using the image while it is being written, so the writer gets its own copy
+            staged_image = image.copy()
+            staged_image.info = self.__get_info_dict(metadata, workflow, graph)
+            # Block until there is room in the write queue
+            self.__write_slots.acquire()
+            try:
+                with self.__pending_writes_lock:
+                    future = self.__write_executor.submit(
+                        self.__write_behind,
+                        staged_image,
+                        image_path,
+                        thumbnail_path,
+                        metadata,
+                        workflow,
+                        graph,
+                        thumbnail_size,
+                    )
+                    pending_write = _PendingImageWrite(image=staged_image, future=future)
+                    self.__pending_writes[image_path] = pending_write
+                    self.__pending_writes[thumbnail_path] = pending_write
+            except Exception:
+                self.__write_slots.release()
+                raise
         except Exception as e:
             raise ImageFileSaveException from e
 
+    def __write_behind(
+        self,
+        image: PILImageType,
+        image_path: Path,
+        thumbnail_path: Path,
+        metadata: Optional[str],
+        workflow: Optional[str],
+        graph: Optional[str],
+        thumbnail_size: int,
+    ) -> None:
+        try:
+            self.__write(image, image_path, thumbnail_path, metadata, workflow, graph, thumbnail_size)
+        except Exception as e:
+            self.__invoker.services.logger.error(f"Failed to write image file {image_path.name}: {e}")
+            # Do not leave a partially-written file behind
+            for path in (image_path, thumbnail_path):
+                with suppress(OSError):
+                    path.unlink(missing_ok=True)
+            with self.__pending_writes_lock:
+                self.__failed_writes[image_path] = e
+                self.__failed_writes[thumbnail_path] = e
+                self.__unflushed_failed_writes.add(image_path)
+            raise
+        finally:
+            with self.__pending_writes_lock:
+                self.__pending_writes.pop(image_path, None)
+                self.__pending_writes.pop(thumbnail_path, None)
+            self.__write_slots.release()
+
+    def __write(
+        self,
+        image: PILImageType,
+        image_path: Path,
+        thumbnail_path: Path,
+        metadata: Optional[str],
+        workflow: Optional[str],
+        graph: Optional[str],
+        thumbnail_size: int,
+    ) -> None:
+        # Ensure subfolder directories exist
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+
+        pnginfo = PngImagePlugin.PngInfo()
+        info_dict = self.__get_info_dict(metadata, workflow, graph)
+        for key, value in info_dict.items():
+            pnginfo.add_text(key, value)
+
+        # When saving the image, the image object's info field is not populated. We need to set it
+        image.info = info_dict
+        compress_level = self.__invoker.services.configuration.pil_compress_level
+        save_options = {"compress_level": compress_level}
+        if compress_level == 1 and _should_use_png_rle(image):
+            save_options["compress_type"] = zlib.Z_RLE
+        image.save(
+            image_path,
+            "PNG",
+            pnginfo=pnginfo,
+            **save_options,
+        )
+
+        # Ensure thumbnail subfolder directories exist
+        thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
+
+        thumbnail_image = make_thumbnail(image, thumbnail_size)
+        thumbnail_image.save(thumbnail_path)
+
+        # Images from earlier writes to the same path are stale
+        self.__evict_cache({image_path})
+        self.__set_cache((image_path, None), image)
+
+    @staticmethod
+    def __get_info_dict(metadata: Optional[str], workflow: Optional[str], graph: Optional[str]) -> dict[str, str]:
+        info_dict: dict[str, str] = {}
+        if metadata is not None:
+            info_dict["invokeai_metadata"] = metadata
+        if workflow is not None:
+            info_dict["invokeai_workflow"] = workflow
+        if graph is not None:
+            info_dict["invokeai_graph"] = graph
+        return info_dict
+
     def delete(self, image_name: str, image_subfolder: str = "") -> None:
         try:
             image_path = self.get_path(image_name, image_subfolder=image_subfolder)
 
             if image_path.exists():
                 image_path.unlink()
-            if image_path in self.__cache:
-                del self.__cache[image_path]
+            self.__evict_cache({image_path})
 
             thumbnail_path = self.get_path(image_name, True, image_subfolder=image_subfolder)
 
             if thumbnail_path.exists():
                 thumbnail_path.unlink()
-            if thumbnail_path in self.__cache:
-                del self.__cache[thumbnail_path]
+            self.__clear_failed_write(image_path, thumbnail_path)
         except Exception as e:
             raise ImageFileDeleteException from e
 
     def get_path(self, image_name: str, thumbnail: bool = False, image_subfolder: str = "") -> Path:
+        path = self.__resolve_path(image_name, thumbnail=thumbnail, image_subfolder=image_subfolder)
+        # Callers read the file as soon as they have its path, so it must be on disk
+        self.__wait_for_write(path)
+        return path
+
+    def __resolve_path(self, image_name: str, thumbnail: bool = False, image_subfolder: str = "") -> Path:
         base_folder = self.__thumbnails_folder if thumbnail else self.__output_folder
         filename = get_thumbnail_name(image_name) if thumbnail else image_name
 
@@ -218,18 +397,17 @@ class DiskImageFileStorage(ImageFileStorageBase):
     def validate_path(self, path: Union[str, Path]) -> bool:
         """Validates the path given for an image or thumbnail."""
         path = path if isinstance(path, Path) else Path(path)
+        self.__wait_for_write(path.resolve())
         return path.exists()
 
     def get_workflow(self, image_name: str, image_subfolder: str = "") -> str | None:
-        image = self.get(image_name, image_subfolder=image_subfolder)
-        workflow = image.info.get("invokeai_workflow", None)
+        workflow = self.__get_info(image_name, image_subfolder).get("invokeai_workflow", None)
         if isinstance(workflow, str):
             return workflow
         return None
 
     def get_graph(self, image_name: str, image_subfolder: str = "") -> str | None:
-        image = self.get(image_name, image_subfolder=image_subfolder)
-        graph = image.info.get("invokeai_graph", None)
+        graph = self.__get_info(image_name, image_subfolder).get("invokeai_graph", None)
         if isinstance(graph, str):
             return graph
         return None
@@ -240,14 +418,71 @@ class DiskImageFileStorage(ImageFileStorageBase):
         for folder in folders:
             folder.mkdir(parents=True, exist_ok=True)
 
-    def __get_cache(self, image_name: Path) -> Optional[PILImageType]:
-        return None if image_name not in self.__cache else self.__cache[image_name]
-
-    def __set_cache(self, image_name: Path, image: PILImageType):
-        if image_name not in self.__cache:
-            self.__cache[image_name] = image
-            self.__cache_ids.put(image_name)  # TODO: this should refresh position for LRU cache
-            if len(self.__cache) > self.__max_cache_size:
-                cache_id = self.__cache_ids.get()
-                if cache_id in self.__cache:
-                    del self.__cache[cache_id]
+    def __wait_for_write(self, path: Path) -> None:
+        """Waits for a pending write to the given path, if there is one. Write errors have already been logged."""
+        with self.__pending_writes_lock:
+            pending_write = self.__pending_writes.get(path)
+        if pending_write is not None:
+            with suppress(Exception):
+                pending_write.future.result()
+
+    def __raise_if_write_failed(self, path: Path) -> None:
+        with self.__pending_writes_lock:
+            error = self.__failed_writes.get(path)
+        if error is not None:
+            raise ImageFileSaveException(f"Failed to write image file {path.name}: {error}") from error
+
+    def __clear_failed_write(self, image_path: Path, thumbnail_path: Path) -> None:
+        with self.__pending_writes_lock:
+            self.__failed_writes.pop(image_path, None)
+            self.__failed_writes.pop(thumbnail_path, None)
+            self.__unflushed_failed_writes.discard(image_path)
+
+    def __get_info(self, image_name: str, image_subfolder: str) -> dict:
+        """Gets an image's PNG text chunks. Images that are not already in memory are not decoded."""
+        try:
+            image_path = self.__resolve_path(image_name, image_subfolder=image_subfolder)
+            with self.__pending_writes_lock:
+                pending_write = self.__pending_writes.get(image_path)
+            if pending_write is not None:
+                return dict(pending_write.image.info)
+            with self.__cache_lock:
+                cached_image = self.__cache.get((image_path, None))
+            if cached_image is not None:
+                return cached_image.info
+            # PIL reads the text chunks that precede the image data on open
+            with Image.open(image_path) as image:
+                return dict(image.info)
+        except FileNotFoundError as e:
+            raise ImageFileNotFoundException from e
+
+    def __get_cache(self, key: tuple[Path, Optional[str]]) -> Optional[PILImageType]:
+        with self.__cache_lock:
+            image = self.__cache.get(key)
+            if image is None:
+                self.__cache_misses += 1
+                return None
+            self.__cache_hits += 1
+            self.__cache.move_to_end(key)
+            return image
+
+    def __set_cache(self, key: tuple[Path, Optional[str]], image: PILImageType) -> None:
+        size = _get_image_size(image)
+        if size > self.__max_cache_bytes:
+            return
+        with self.__cache_lock:
+            if key in self.__cache:
+                self.__cache_bytes -= self.__cache_sizes[key]
+            self.__cache[key] = image
+            self.__cache_sizes[key] = size
+            self.__cache_bytes += size
+            while self.__cache_bytes > self.__max_cache_bytes:
+                evicted_key, _ = self.__cache.popitem(last=False)
+                self.__cache_bytes -= self.__cache_sizes.pop(evicted_key)
+
+    def __evict_cache(self, paths: set[Path]) -> None:
+        """Evicts the cached images for the given paths, in all color modes."""
+        with self.__cache_lock:
+            for key in [key for key in self.__cache if key[0] in paths]:
+                del self.__cache[key]
+                self.__cache_bytes -= self.__cache_sizes.pop(key)
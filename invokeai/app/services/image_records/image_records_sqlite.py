@@ -28,7 +28,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         self._db = db
 
     def get(self, image_name: str) -> ImageRecord:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             try:
                 cursor.execute(
                     f"""--sql
@@ -48,7 +48,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         return deserialize_image_record(dict(result))
 
     def get_user_id(self, image_name: str) -> Optional[str]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             cursor.execute(
                 """--sql
                 SELECT user_id FROM images
@@ -62,7 +62,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
             return cast(Optional[str], dict(result).get("user_id"))
 
     def get_metadata(self, image_name: str) -> Optional[MetadataField]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             try:
                 cursor.execute(
                     """--sql
@@ -152,7 +152,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         user_id: Optional[str] = None,
         is_admin: bool = False,
     ) -> OffsetPaginatedResults[ImageRecord]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             # Manually build two queries - one for the count, one for the records
             count_query = """--sql
             SELECT COUNT(*)
@@ -292,7 +292,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
                 raise ImageRecordDeleteException from e
 
     def get_intermediates_count(self, user_id: Optional[str] = None) -> int:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             query = "SELECT COUNT(*) FROM images WHERE is_intermediate = TRUE"
             params: list[str] = []
             if user_id is not None:
@@ -397,7 +397,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         return created_at
 
     def get_most_recent_image_for_board(self, board_id: str) -> Optional[ImageRecord]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             cursor.execute(
                 """--sql
                 SELECT images.*
@@ -430,7 +430,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         user_id: Optional[str] = None,
         is_admin: bool = False,
     ) -> ImageNamesResult:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             # Build query conditions (reused for both starred count and image names queries)
             query_conditions = ""
             query_params: list[Union[int, str, bool]] = []
@@ -531,7 +531,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         user_id: Optional[str] = None,
         is_admin: bool = False,
     ) -> list[VirtualSubBoardDTO]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             query_conditions = ""
             query_params: list[Union[int, str, bool]] = []
 
@@ -590,7 +590,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         user_id: Optional[str] = None,
         is_admin: bool = False,
     ) -> ImageNamesResult:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             query_conditions = ""
             query_params: list[Union[int, str, bool]] = []
 
@@ -21,10 +21,12 @@ class ImageServiceABC(ABC):
 
     _on_changed_callbacks: list[Callable[[ImageDTO], None]]
     _on_deleted_callbacks: list[Callable[[str], None]]
+    _on_deleted_many_callbacks: list[Callable[[list[str]], None]]
 
     def __init__(self) -> None:
         self._on_changed_callbacks = []
         self._on_deleted_callbacks = []
+        self._on_deleted_many_callbacks = []
 
     def on_changed(self, on_changed: Callable[[ImageDTO], None]) -> None:
         """Register a callback for when an image is changed"""
@@ -34,13 +36,23 @@ class ImageServiceABC(ABC):
         """Register a callback for when an image is deleted"""
         self._on_deleted_callbacks.append(on_deleted)
 
+    def on_deleted_many(self, on_deleted_many: Callable[[list[str]], None]) -> None:
+        """Register a callback for when images are deleted, called once per batch of deleted images"""
+        self._on_deleted_many_callbacks.append(on_deleted_many)
+
     def _on_changed(self, item: ImageDTO) -> None:
         for callback in self._on_changed_callbacks:
             callback(item)
 
     def _on_deleted(self, item_id: str) -> None:
+        self._on_deleted_many([item_id])
+
+    def _on_deleted_many(self, item_ids: list[str]) -> None:
         for callback in self._on_deleted_callbacks:
-            callback(item_id)
+            for item_id in item_ids:
+                callback(item_id)
+        for many_callback in self._on_deleted_many_callbacks:
+            many_callback(item_ids)
 
     @abstractmethod
     def create(
@@ -70,8 +82,8 @@ class ImageServiceABC(ABC):
         pass
 
     @abstractmethod
-    def get_pil_image(self, image_name: str) -> PILImageType:
-        """Gets an image as a PIL image."""
+    def get_pil_image(self, image_name: str, mode: Optional[str] = None) -> PILImageType:
+        """Gets an image as a PIL image, optionally converted to the given color mode. The image must not be modified."""
         pass
 
     @abstractmethod
@@ -109,6 +121,14 @@ class ImageServiceABC(ABC):
         """Validates an image's path."""
         pass
 
+    @abstractmethod
+    def wait_for_write(self, image_name: str) -> None:
+        """Waits until an image's file has been written, if it is being written in the background.
+
+        :raises ImageFileSaveException: if the image's file could not be written
+        """
+        pass
+
     @abstractmethod
     def get_url(self, image_name: str, thumbnail: bool = False) -> str:
         """Gets an image's or thumbnail's URL."""
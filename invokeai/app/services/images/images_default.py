@@ -128,10 +128,12 @@ class ImageService(ImageServiceABC):
             self.__invoker.services.logger.error("Problem updating image record")
             raise e
 
-    def get_pil_image(self, image_name: str) -> PILImageType:
+    def get_pil_image(self, image_name: str, mode: Optional[str] = None) -> PILImageType:
         try:
             record = self.__invoker.services.image_records.get(image_name)
-            return self.__invoker.services.image_files.get(image_name, image_subfolder=record.image_subfolder)
+            return self.__invoker.services.image_files.get(
+                image_name, image_subfolder=record.image_subfolder, mode=mode
+            )
         except ImageFileNotFoundException:
             self.__invoker.services.logger.error("Failed to get image file")
             raise
@@ -219,6 +221,14 @@ class ImageService(ImageServiceABC):
             self.__invoker.services.logger.error("Problem validating image path")
             raise e
 
+    def wait_for_write(self, image_name: str) -> None:
+        try:
+            record = self.__invoker.services.image_records.get(image_name)
+        except ImageRecordNotFoundException:
+            # The image was deleted, so there is no write to wait for
+            return
+        self.__invoker.services.image_files.wait_for_write(image_name, image_subfolder=record.image_subfolder)
+
     def get_url(self, image_name: str, thumbnail: bool = False) -> str:
         try:
             return self.__invoker.services.urls.get_image_url(image_name, thumbnail)
@@ -305,8 +315,7 @@ class ImageService(ImageServiceABC):
                 except Exception:
                     pass
             self.__invoker.services.image_records.delete_many(image_names)
-            for image_name in image_names:
-                self._on_deleted(image_name)
+            self._on_deleted_many(image_names)
         except ImageRecordDeleteException:
             self.__invoker.services.logger.error("Failed to delete image records")
             raise
@@ -323,7 +332,7 @@ class ImageService(ImageServiceABC):
             count = len(image_name_subfolder_pairs)
             for image_name, image_subfolder in image_name_subfolder_pairs:
                 self.__invoker.services.image_files.delete(image_name, image_subfolder=image_subfolder)
-                self._on_deleted(image_name)
+            self._on_deleted_many([image_name for image_name, _ in image_name_subfolder_pairs])
             return count
         except ImageRecordDeleteException:
             self.__invoker.services.logger.error("Failed to delete image records")
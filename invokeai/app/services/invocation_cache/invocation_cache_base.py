@@ -12,23 +12,43 @@ class InvocationCacheBase(ABC):
     When new invocations are executed, if they are flagged with `use_cache`, they
     will attempt to pull their value from the cache before executing.
 
-    Implementations should register for the `on_deleted` event of the `images` and `latents`
-    services, and delete any cached outputs that reference the deleted image or latent.
+    Implementations should register for the `on_deleted` event of the `images`, `tensors` and `conditioning`
+    services, and delete any cached outputs that reference the deleted object. Outputs should be indexed by the
+    objects they reference (see `get_object_references`), so invalidation does not need to scan the whole cache.
 
-    See the memory implementation for an example.
+    See the memory implementation for an example. The disk implementation persists outputs across restarts.
 
     Implementations should respect the `node_cache_size` configuration value, and skip all
     cache logic if the value is set to 0.
     """
 
     @abstractmethod
-    def get(self, key: Union[int, str]) -> Optional[BaseInvocationOutput]:
-        """Retrieves an invocation output from the cache"""
+    def get(self, key: Union[int, str], invocation_type: Optional[str] = None) -> Optional[BaseInvocationOutput]:
+        """Retrieves an invocation output from the cache.
+
+        Args:
+            key: The cache key, from `create_key`.
+            invocation_type: The type of the invocation, used for per-type statistics.
+        """
         pass
 
     @abstractmethod
-    def save(self, key: Union[int, str], invocation_output: BaseInvocationOutput) -> None:
-        """Stores an invocation output in the cache"""
+    def save(
+        self,
+        key: Union[int, str],
+        invocation_output: BaseInvocationOutput,
+        invocation_type: Optional[str] = None,
+        compute_time: Optional[float] = None,
+    ) -> None:
+        """Stores an invocation output in the cache.
+
+        Args:
+            key: The cache key, from `create_key`.
+            invocation_output: The output to store.
+            invocation_type: The type of the invocation, used for per-type statistics.
+            compute_time: How long the invocation took to run, in seconds. Used to weigh eviction and report the time
+                saved by cache hits.
+        """
         pass
 
     @abstractmethod
@@ -41,9 +61,8 @@ class InvocationCacheBase(ABC):
         """Clears the cache"""
         pass
 
-    @staticmethod
     @abstractmethod
-    def create_key(invocation: BaseInvocation) -> int:
+    def create_key(self, invocation: BaseInvocation) -> Union[int, str]:
         """Gets the key for the invocation's cache item"""
         pass
 
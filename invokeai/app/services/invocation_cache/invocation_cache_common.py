@@ -1,5 +1,16 @@
+from typing import Any, Literal, Optional
+
 from pydantic import BaseModel, Field
 
+from invokeai.app.invocations.fields import DenoiseMaskField, ImageField, LatentsField, TensorField
+
+
+class InvocationCacheTypeStatus(BaseModel):
+    hits: int = Field(default=0, description="The number of cache hits for this invocation type")
+    misses: int = Field(default=0, description="The number of cache misses for this invocation type")
+    hit_ratio: float = Field(default=0.0, description="The ratio of cache hits to cache lookups")
+    time_saved: float = Field(default=0.0, description="The compute time saved by cache hits, in seconds")
+
 
 class InvocationCacheStatus(BaseModel):
     size: int = Field(description="The current size of the invocation cache")
@@ -7,3 +18,58 @@ class InvocationCacheStatus(BaseModel):
     misses: int = Field(description="The number of cache misses")
     enabled: bool = Field(description="Whether the invocation cache is enabled")
     max_size: int = Field(description="The maximum size of the invocation cache")
+    bytes_used: int = Field(default=0, description="The retained size of the cached outputs, in bytes")
+    max_bytes: Optional[int] = Field(default=None, description="The byte budget of the invocation cache, if any")
+    time_saved: float = Field(default=0.0, description="The compute time saved by cache hits, in seconds")
+    invocation_types: dict[str, InvocationCacheTypeStatus] = Field(
+        default_factory=dict, description="Cache statistics for each invocation type"
+    )
+
+
+ObjectKind = Literal["image", "tensor", "conditioning"]
+"""The kind of stored object referenced by an invocation or invocation output."""
+
+# Fields that reference objects held by the images, tensors and conditioning services. Conditioning fields are
+# matched by their `conditioning_name` attribute instead, because each model architecture has its own field class.
+_OBJECT_REFERENCE_FIELDS: dict[type[BaseModel], tuple[tuple[str, ObjectKind], ...]] = {
+    ImageField: (("image_name", "image"),),
+    TensorField: (("tensor_name", "tensor"),),
+    LatentsField: (("latents_name", "tensor"),),
+    DenoiseMaskField: (("mask_name", "tensor"), ("masked_latents_name", "tensor")),
+}
+
+
+def get_object_references(value: Any) -> set[tuple[ObjectKind, str]]:
+    """Gets the names of all images, tensors and conditioning objects referenced by a value.
+
+    The value is walked recursively, so this works for invocations, invocation outputs and any collections of fields
+    they contain.
+
+    Args:
+        value: The value to inspect, typically an invocation or invocation output.
+
+    Returns:
+        A set of (kind, name) tuples.
+    """
+    references: set[tuple[ObjectKind, str]] = set()
+    _collect_object_references(value, references)
+    return references
+
+
+def _collect_object_references(value: Any, references: set[tuple[ObjectKind, str]]) -> None:
+    if isinstance(value, BaseModel):
+        for field_name, kind in _OBJECT_REFERENCE_FIELDS.get(type(value), ()):
+            name = getattr(value, field_name, None)
+            if isinstance(name, str):
+                references.add((kind, name))
+        conditioning_name = getattr(value, "conditioning_name", None)
+        if isinstance(conditioning_name, str):
+            references.add(("conditioning", conditioning_name))
+        for field_name in type(value).model_fields:
+            _collect_object_references(getattr(value, field_name, None), references)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            _collect_object_references(item, references)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_object_references(item, references)
@@ -0,0 +1,396 @@
+import hashlib
+import io
+from collections import defaultdict
+from logging import Logger
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional, Union
+
+import torch
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput, InvocationRegistry
+from invokeai.app.services.invocation_cache.invocation_cache_base import InvocationCacheBase
+from invokeai.app.services.invocation_cache.invocation_cache_common import (
+    InvocationCacheStatus,
+    InvocationCacheTypeStatus,
+    ObjectKind,
+    get_object_references,
+)
+from invokeai.app.services.invoker import Invoker
+from invokeai.app.services.object_serializer.object_serializer_base import ObjectSerializerBase
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.version.invokeai_version import __version__
+
+CREATE_TABLES = """--sql
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT NOT NULL PRIMARY KEY,
+    output_type TEXT NOT NULL,
+    output_json TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    compute_time REAL NOT NULL DEFAULT 0,
+    last_access INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+CREATE TABLE IF NOT EXISTS entry_objects (
+    key TEXT NOT NULL REFERENCES entries(key) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (key, name)
+);
+CREATE INDEX IF NOT EXISTS idx_entry_objects_name ON entry_objects(name);
+CREATE INDEX IF NOT EXISTS idx_entry_objects_digest ON entry_objects(digest);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT NOT NULL PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS image_digests (
+    image_name TEXT NOT NULL PRIMARY KEY,
+    digest TEXT NOT NULL
+);
+"""
+
+
+class DiskInvocationCache(InvocationCacheBase):
+    """
+    A persistent invocation cache, backed by an SQLite index and a content-addressed blob directory.
+
+    Cache keys are SHA-256 digests of the invocation (without its id) in which every referenced image, tensor and
+    conditioning name is replaced by a digest of the referenced object's content. Identical inputs therefore map to
+    the same key across restarts, even though tensor and conditioning names are regenerated each session.
+
+    Tensors and conditioning referenced by a cached output are copied into the blob directory. Those services are
+    ephemeral, so when a cached output is retrieved after a restart, its objects are re-saved to the services and the
+    output is rewritten with the new names.
+
+    Entries are evicted in least-recently-used order when either the entry count (`node_cache_size`) or the byte
+    budget is exceeded. Deleting an image invalidates every entry that references it. Deleting a tensor or
+    conditioning object only forgets the live name - the cached copy in the blob directory is kept.
+
+    :param cache_dir: The folder where the index and blobs are stored
+    :param logger: The logger to use for the index database
+    :param max_cache_size: The maximum number of entries. If 0, the cache is disabled.
+    :param max_cache_bytes: The maximum combined size of the stored outputs and blobs
+    """
+
+    _max_cache_size: int
+    _max_cache_bytes: int
+    _disabled: bool
+    _hits: int
+    _misses: int
+    _invoker: Invoker
+    _lock: Lock
+
+    def __init__(self, cache_dir: Path, logger: Logger, max_cache_size: int = 0, max_cache_bytes: int = 0) -> None:
+        self._max_cache_size = max_cache_size
+        self._max_cache_bytes = max_cache_bytes
+        self._disabled = False
+        self._hits = 0
+        self._misses = 0
+        self._time_saved = 0.0
+        self._type_stats: defaultdict[str, InvocationCacheTypeStatus] = defaultdict(InvocationCacheTypeStatus)
+        self._lock = Lock()
+        self._blobs_dir = cache_dir / "blobs"
+        self._blobs_dir.mkdir(parents=True, exist_ok=True)
+        self._db = SqliteDatabase(db_path=cache_dir / "index.db", logger=logger)
+        with self._db.transaction() as cursor:
+            cursor.executescript(CREATE_TABLES)
+            # A logical clock gives a strict LRU order, which wall-clock timestamps cannot guarantee
+            cursor.execute("SELECT COALESCE(MAX(last_access), 0) FROM entries;")
+            self._clock: int = cursor.fetchone()[0]
+        # Digests of tensor and conditioning objects by their name in this process, and vice-versa. These are not
+        # persisted, because the underlying object serializers are ephemeral.
+        self._digests_by_name: dict[str, str] = {}
+        self._names_by_digest: dict[str, str] = {}
+
+    def start(self, invoker: Invoker) -> None:
+        self._invoker = invoker
+        if self._max_cache_size == 0:
+            return
+        self._invoker.services.images.on_deleted_many(self._delete_by_image_names)
+        self._invoker.services.tensors.on_deleted(self._forget_object_name)
+        self._invoker.services.conditioning.on_deleted(self._forget_object_name)
+
+    def get(self, key: Union[int, str], invocation_type: Optional[str] = None) -> Optional[BaseInvocationOutput]:
+        with self._lock:
+            if self._max_cache_size == 0 or self._disabled:
+                return None
+            result = self._get(str(key))
+            if result is None:
+                self._misses += 1
+                if invocation_type is not None:
+                    self._type_stats[invocation_type].misses += 1
+                return None
+            output, compute_time = result
+            self._hits += 1
+            self._time_saved += compute_time
+            if invocation_type is not None:
+                self._type_stats[invocation_type].hits += 1
+                self._type_stats[invocation_type].time_saved += compute_time
+            return output
+
+    def _get(self, key: str) -> Optional[tuple[BaseInvocationOutput, float]]:
+        with self._db.transaction() as cursor:
+            cursor.execute("SELECT output_type, output_json, compute_time FROM entries WHERE key = ?;", (key,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            cursor.execute("SELECT kind, name, digest FROM entry_objects WHERE key = ?;", (key,))
+            objects = cursor.fetchall()
+            cursor.execute("UPDATE entries SET last_access = ? WHERE key = ?;", (self._tick(), key))
+
+        output_class = InvocationRegistry.get_output_for_type(row["output_type"])
+        if output_class is None:
+            # The node that produced this output is no longer installed
+            self._delete(key)
+            return None
+
+        output_json: str = row["output_json"]
+        try:
+            for obj in objects:
+                if obj["kind"] == "image":
+                    continue
+                live_name = self._get_live_name(obj["kind"], obj["digest"])
+                if live_name != obj["name"]:
+                    output_json = output_json.replace(f'"{obj["name"]}"', f'"{live_name}"')
+            return output_class.model_validate_json(output_json), row["compute_time"]
+        except Exception as e:
+            self._invoker.services.logger.warning(f"Failed to restore cached invocation output {key}: {e}")
+            self._delete(key)
+            return None
+
+    def save(
+        self,
+        key: Union[int, str],
+        invocation_output: BaseInvocationOutput,
+        invocation_type: Optional[str] = None,
+        compute_time: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            if self._max_cache_size == 0 or self._disabled:
+                return
+            key = str(key)
+            with self._db.transaction() as cursor:
+                cursor.execute("SELECT 1 FROM entries WHERE key = ?;", (key,))
+                if cursor.fetchone() is not None:
+                    return
+
+            objects: list[tuple[ObjectKind, str, str]] = []
+            new_blobs: list[tuple[str, int]] = []
+            for kind, name in get_object_references(invocation_output):
+                if kind == "image":
+                    objects.append((kind, name, name))
+                    continue
+                digest, size = self._store_blob(kind, name)
+                objects.append((kind, name, digest))
+                new_blobs.append((digest, size))
+
+            output_json = invocation_output.model_dump_json(warnings=False)
+            with self._db.transaction() as cursor:
+                cursor.execute(
+                    """--sql
+                    INSERT INTO entries (key, output_type, output_json, size, compute_time, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?);
+                    """,
+                    (
+                        key,
+                        invocation_output.get_type(),
+                        output_json,
+                        len(output_json),
+                        compute_time or 0.0,
+                        self._tick(),
+                    ),
+                )
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO entry_objects (key, kind, name, digest) VALUES (?, ?, ?, ?);",
+                    [(key, kind, name, digest) for kind, name, digest in objects],
+                )
+                cursor.executemany("INSERT OR IGNORE INTO blobs (digest, size) VALUES (?, ?);", new_blobs)
+            self._evict()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _evict(self) -> None:
+        """Deletes the least recently used entries until the cache is within its count and byte limits."""
+        while True:
+            with self._db.transaction() as cursor:
+                cursor.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries;")
+                count, entries_size = cursor.fetchone()
+                cursor.execute("SELECT COALESCE(SUM(size), 0) FROM blobs;")
+                blobs_size = cursor.fetchone()[0]
+                over_count = count > self._max_cache_size
+                over_bytes = self._max_cache_bytes > 0 and entries_size + blobs_size > self._max_cache_bytes
+                if count == 0 or not (over_count or over_bytes):
+                    return
+                cursor.execute("SELECT key FROM entries ORDER BY last_access ASC LIMIT 1;")
+                oldest_key = cursor.fetchone()[0]
+            self._delete(oldest_key)
+
+    def _delete(self, key: str) -> None:
+        if self._max_cache_size == 0:
+            return
+        with self._db.transaction() as cursor:
+            cursor.execute("DELETE FROM entries WHERE key = ?;", (key,))
+        self._delete_unreferenced_blobs()
+
+    def delete(self, key: Union[int, str]) -> None:
+        with self._lock:
+            return self._delete(str(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._max_cache_size == 0:
+                return
+            with self._db.transaction() as cursor:
+                cursor.execute("DELETE FROM entries;")
+            self._delete_unreferenced_blobs()
+            self._misses = 0
+            self._hits = 0
+            self._time_saved = 0.0
+            self._type_stats.clear()
+
+    def create_key(self, invocation: BaseInvocation) -> str:
+        invocation_json = invocation.model_dump_json(exclude={"id"}, warnings=False)
+        for kind, name in sorted(get_object_references(invocation)):
+            digest = self._get_object_digest(kind, name)
+            invocation_json = invocation_json.replace(f'"{name}"', f'"{kind}:{digest}"')
+        # Node implementations may change between releases, so cached outputs are only valid for the same version
+        return hashlib.sha256(f"{__version__}:{invocation_json}".encode()).hexdigest()
+
+    def disable(self) -> None:
+        with self._lock:
+            if self._max_cache_size == 0:
+                return
+            self._disabled = True
+
+    def enable(self) -> None:
+        with self._lock:
+            if self._max_cache_size == 0:
+                return
+            self._disabled = False
+
+    def get_status(self) -> InvocationCacheStatus:
+        with self._lock:
+            with self._db.transaction() as cursor:
+                cursor.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries;")
+                size, entries_size = cursor.fetchone()
+                cursor.execute("SELECT COALESCE(SUM(size), 0) FROM blobs;")
+                blobs_size = cursor.fetchone()[0]
+            return InvocationCacheStatus(
+                hits=self._hits,
+                misses=self._misses,
+                enabled=not self._disabled and self._max_cache_size > 0,
+                size=size,
+                max_size=self._max_cache_size,
+                bytes_used=entries_size + blobs_size,
+                max_bytes=self._max_cache_bytes or None,
+                time_saved=self._time_saved,
+                invocation_types={
+                    invocation_type: stats.model_copy(update={"hit_ratio": stats.hits / (stats.hits + stats.misses)})
+                    for invocation_type, stats in self._type_stats.items()
+                },
+            )
+
+    def _get_serializer(self, kind: ObjectKind) -> ObjectSerializerBase[Any]:
+        return self._invoker.services.tensors if kind == "tensor" else self._invoker.services.conditioning
+
+    def _get_blob_path(self, digest: str) -> Path:
+        return self._blobs_dir / digest[:2] / digest
+
+    def _get_object_digest(self, kind: ObjectKind, name: str) -> str:
+        """Gets the content digest of a referenced object, falling back to its name if it cannot be read."""
+        if kind == "image":
+            return self._get_image_digest(name)
+        with self._lock:
+            digest = self._digests_by_name.get(name)
+            if digest is not None:
+                return digest
+            try:
+                digest, _ = self._serialize(self._get_serializer(kind).load(name))
+            except Exception:
+                return name
+            self._remember_object_name(name, digest)
+            return digest
+
+    def _get_image_digest(self, image_name: str) -> str:
+        with self._db.transaction() as cursor:
+            cursor.execute("SELECT digest FROM image_digests WHERE image_name = ?;", (image_name,))
+            row = cursor.fetchone()
+        if row is not None:
+            return row[0]
+        try:
+            with open(self._invoker.services.images.get_path(image_name), "rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+        except Exception:
+            return image_name
+        with self._db.transaction() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO image_digests (image_name, digest) VALUES (?, ?);", (image_name, digest)
+            )
+        return digest
+
+    @staticmethod
+    def _serialize(obj: Any) -> tuple[str, bytes]:
+        buffer = io.BytesIO()
+        torch.save(obj, buffer)  # pyright: ignore [reportUnknownMemberType]
+        data = buffer.getvalue()
+        return hashlib.sha256(data).hexdigest(), data
+
+    def _store_blob(self, kind: ObjectKind, name: str) -> tuple[str, int]:
+        """Copies a tensor or conditioning object into the blob directory, returning its digest and size."""
+        digest, data = self._serialize(self._get_serializer(kind).load(name))
+        blob_path = self._get_blob_path(digest)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = blob_path.with_suffix(".tmp")
+            temp_path.write_bytes(data)
+            temp_path.replace(blob_path)
+        self._remember_object_name(name, digest)
+        return digest, len(data)
+
+    def _get_live_name(self, kind: ObjectKind, digest: str) -> str:
+        """Gets the name of an object in its service, re-saving it from the blob directory if necessary."""
+        live_name = self._names_by_digest.get(digest)
+        if live_name is not None:
+            return live_name
+        obj = torch.load(self._get_blob_path(digest))  # pyright: ignore [reportUnknownMemberType]
+        live_name = self._get_serializer(kind).save(obj)
+        self._remember_object_name(live_name, digest)
+        return live_name
+
+    def _remember_object_name(self, name: str, digest: str) -> None:
+        self._digests_by_name[name] = digest
+        self._names_by_digest[digest] = name
+
+    def _forget_object_name(self, name: str) -> None:
+        with self._lock:
+            digest = self._digests_by_name.pop(name, None)
+            if digest is not None and self._names_by_digest.get(digest) == name:
+                del self._names_by_digest[digest]
+
+    def _delete_unreferenced_blobs(self) -> None:
+        with self._db.transaction() as cursor:
+            cursor.execute("SELECT digest FROM blobs WHERE digest NOT IN (SELECT digest FROM entry_objects);")
+            digests = [row[0] for row in cursor.fetchall()]
+            cursor.executemany("DELETE FROM blobs WHERE digest = ?;", [(digest,) for digest in digests])
+        for digest in digests:
+            self._get_blob_path(digest).unlink(missing_ok=True)
+
+    def _delete_by_image_names(self, image_names: list[str]) -> None:
+        """Deletes all cached outputs that reference any of the given images, in a single transaction."""
+        with self._lock:
+            if self._max_cache_size == 0:
+                return
+            params = [(image_name,) for image_name in image_names]
+            with self._db.transaction() as cursor:
+                cursor.executemany("DELETE FROM image_digests WHERE image_name = ?;", params)
+                cursor.executemany(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entry_objects WHERE name = ?);", params
+                )
+                deleted_count = cursor.rowcount
+            if not deleted_count:
+                return
+            self._delete_unreferenced_blobs()
+            self._invoker.services.logger.debug(f"Deleted {deleted_count} cached invocation outputs")
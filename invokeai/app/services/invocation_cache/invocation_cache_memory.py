@@ -1,79 +1,200 @@
-from collections import OrderedDict
+import heapq
+import sys
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from threading import Lock
-from typing import Optional, Union
+from typing import Any, Iterable, Optional, Union
+
+from pydantic import BaseModel
 
 from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput
 from invokeai.app.services.invocation_cache.invocation_cache_base import InvocationCacheBase
-from invokeai.app.services.invocation_cache.invocation_cache_common import InvocationCacheStatus
+from invokeai.app.services.invocation_cache.invocation_cache_common import (
+    InvocationCacheStatus,
+    InvocationCacheTypeStatus,
+    get_object_references,
+)
 from invokeai.app.services.invoker import Invoker
 
 
 @dataclass(order=True)
 class CachedItem:
     invocation_output: BaseInvocationOutput = field(compare=False)
-    invocation_output_json: str = field(compare=False)
+    object_names: frozenset[str] = field(compare=False)
+    invocation_type: Optional[str] = field(default=None, compare=False)
+    size: int = field(default=0, compare=False)
+    compute_time: float = field(default=0.0, compare=False)
+    priority: float = field(default=0.0, compare=False)
+
+
+def get_retained_size(value: Any) -> int:
+    """Estimates the number of bytes retained by an invocation output, including its nested fields and collections."""
+    seen: set[int] = set()
+    stack = [value]
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, BaseModel):
+            stack.append(obj.__dict__)
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return size
 
 
 class MemoryInvocationCache(InvocationCacheBase):
+    """
+    An in-memory invocation cache.
+
+    By default, the cache holds up to `max_cache_size` outputs and evicts the least recently used output when full.
+
+    If `max_cache_bytes` is set, the cache is instead bounded by the retained size of its outputs. Eviction is then
+    cost-aware, using the GreedyDual-Size policy: each output's priority is its recompute time divided by its size,
+    plus an inflation value that ages out outputs that have not been hit recently. Cheap-to-recompute, large outputs
+    are evicted first.
+    """
+
     _cache: OrderedDict[Union[int, str], CachedItem]
+    _keys_by_object_name: defaultdict[str, set[Union[int, str]]]
     _max_cache_size: int
+    _max_cache_bytes: int
+    _bytes_used: int
     _disabled: bool
     _hits: int
     _misses: int
+    _time_saved: float
     _invoker: Invoker
     _lock: Lock
 
-    def __init__(self, max_cache_size: int = 0) -> None:
+    def __init__(self, max_cache_size: int = 0, max_cache_bytes: int = 0) -> None:
         self._cache = OrderedDict()
+        # Reverse index of the images, tensors and conditioning referenced by each cached output, for invalidation
+        self._keys_by_object_name = defaultdict(set)
         self._max_cache_size = max_cache_size
+        self._max_cache_bytes = max_cache_bytes
+        self._bytes_used = 0
         self._disabled = False
         self._hits = 0
         self._misses = 0
+        self._time_saved = 0.0
+        self._type_stats: defaultdict[str, InvocationCacheTypeStatus] = defaultdict(InvocationCacheTypeStatus)
+        # Min-heap of (priority, sequence, key) for cost-aware eviction. Entries are invalidated lazily.
+        self._priority_heap: list[tuple[float, int, Union[int, str]]] = []
+        self._priority_sequence = 0
+        self._inflation = 0.0
         self._lock = Lock()
 
     def start(self, invoker: Invoker) -> None:
         self._invoker = invoker
         if self._max_cache_size == 0:
             return
-        self._invoker.services.images.on_deleted(self._delete_by_match)
+        self._invoker.services.images.on_deleted_many(self._delete_by_matches)
         self._invoker.services.tensors.on_deleted(self._delete_by_match)
         self._invoker.services.conditioning.on_deleted(self._delete_by_match)
 
-    def get(self, key: Union[int, str]) -> Optional[BaseInvocationOutput]:
+    def get(self, key: Union[int, str], invocation_type: Optional[str] = None) -> Optional[BaseInvocationOutput]:
         with self._lock:
             if self._max_cache_size == 0 or self._disabled:
                 return None
             item = self._cache.get(key, None)
             if item is not None:
                 self._hits += 1
+                self._time_saved += item.compute_time
+                if invocation_type is not None:
+                    self._type_stats[invocation_type].hits += 1
+                    self._type_stats[invocation_type].time_saved += item.compute_time
                 self._cache.move_to_end(key)
+                if self._max_cache_bytes > 0:
+                    self._set_priority(key, item)
                 return item.invocation_output
             self._misses += 1
+            if invocation_type is not None:
+                self._type_stats[invocation_type].misses += 1
             return None
 
-    def save(self, key: Union[int, str], invocation_output: BaseInvocationOutput) -> None:
+    def save(
+        self,
+        key: Union[int, str],
+        invocation_output: BaseInvocationOutput,
+        invocation_type: Optional[str] = None,
+        compute_time: Optional[float] = None,
+    ) -> None:
         with self._lock:
             if self._max_cache_size == 0 or self._disabled or key in self._cache:
                 return
-            # If the cache is full, we need to remove the least used
-            number_to_delete = len(self._cache) + 1 - self._max_cache_size
-            self._delete_oldest_access(number_to_delete)
-            self._cache[key] = CachedItem(
-                invocation_output,
-                invocation_output.model_dump_json(warnings=False, exclude_defaults=True, exclude_unset=True),
-            )
+            object_names = frozenset(name for _, name in get_object_references(invocation_output))
+            item = CachedItem(invocation_output, object_names, invocation_type, compute_time=compute_time or 0.0)
+            if self._max_cache_bytes > 0:
+                item.size = get_retained_size(invocation_output)
+                if item.size > self._max_cache_bytes:
+                    return
+                self._delete_lowest_priority(self._bytes_used + item.size - self._max_cache_bytes)
+                self._set_priority(key, item)
+                self._bytes_used += item.size
+            else:
+                # If the cache is full, we need to remove the least used
+                number_to_delete = len(self._cache) + 1 - self._max_cache_size
+                self._delete_oldest_access(number_to_delete)
+            self._cache[key] = item
+            for name in object_names:
+                self._keys_by_object_name[name].add(key)
+
+    def _set_priority(self, key: Union[int, str], item: CachedItem) -> None:
+        if len(self._priority_heap) > 2 * max(len(self._cache), 1):
+            self._rebuild_priority_heap()
+        item.priority = self._inflation + item.compute_time / max(item.size, 1)
+        self._priority_sequence += 1
+        heapq.heappush(self._priority_heap, (item.priority, self._priority_sequence, key))
+
+    def _rebuild_priority_heap(self) -> None:
+        # Every hit pushes a new heap entry, and stale entries are otherwise only dropped when evicting. Rebuild the
+        # heap from the live items, so that it does not grow without bound while the cache stays under its budget.
+        self._priority_heap = []
+        for key, item in self._cache.items():
+            self._priority_sequence += 1
+            self._priority_heap.append((item.priority, self._priority_sequence, key))
+        heapq.heapify(self._priority_heap)
+
+    def _delete_lowest_priority(self, bytes_to_free: int) -> None:
+        while bytes_to_free > 0 and self._priority_heap:
+            priority, _, key = heapq.heappop(self._priority_heap)
+            item = self._cache.get(key)
+            if item is None or item.priority != priority:
+                # Stale heap entry - the item was deleted or its priority was refreshed by a hit
+                continue
+            self._inflation = priority
+            bytes_to_free -= item.size
+            self._delete(key)
 
     def _delete_oldest_access(self, number_to_delete: int) -> None:
         number_to_delete = min(number_to_delete, len(self._cache))
         for _ in range(number_to_delete):
-            self._cache.popitem(last=False)
+            key, cached_item = self._cache.popitem(last=False)
+            self._bytes_used -= cached_item.size
+            self._unindex(key, cached_item)
+
+    def _unindex(self, key: Union[int, str], cached_item: CachedItem) -> None:
+        for name in cached_item.object_names:
+            keys = self._keys_by_object_name.get(name)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_object_name[name]
 
     def _delete(self, key: Union[int, str]) -> None:
         if self._max_cache_size == 0:
             return
-        if key in self._cache:
-            del self._cache[key]
+        cached_item = self._cache.pop(key, None)
+        if cached_item is not None:
+            self._bytes_used -= cached_item.size
+            self._unindex(key, cached_item)
 
     def delete(self, key: Union[int, str]) -> None:
         with self._lock:
@@ -84,8 +205,14 @@ class MemoryInvocationCache(InvocationCacheBase):
             if self._max_cache_size == 0:
                 return
             self._cache.clear()
+            self._keys_by_object_name.clear()
+            self._priority_heap.clear()
+            self._inflation = 0.0
+            self._bytes_used = 0
             self._misses = 0
             self._hits = 0
+            self._time_saved = 0.0
+            self._type_stats.clear()
 
     @staticmethod
     def create_key(invocation: BaseInvocation) -> int:
@@ -111,20 +238,28 @@ class MemoryInvocationCache(InvocationCacheBase):
                 enabled=not self._disabled and self._max_cache_size > 0,
                 size=len(self._cache),
                 max_size=self._max_cache_size,
+                bytes_used=self._bytes_used,
+                max_bytes=self._max_cache_bytes or None,
+                time_saved=self._time_saved,
+                invocation_types={
+                    invocation_type: stats.model_copy(update={"hit_ratio": stats.hits / (stats.hits + stats.misses)})
+                    for invocation_type, stats in self._type_stats.items()
+                },
             )
 
     def _delete_by_match(self, to_match: str) -> None:
+        self._delete_by_matches([to_match])
+
+    def _delete_by_matches(self, names: Iterable[str]) -> None:
+        """Deletes all cached outputs that reference any of the given image, tensor or conditioning names."""
         with self._lock:
             if self._max_cache_size == 0:
                 return
-            keys_to_delete = set()
-            for key, cached_item in self._cache.items():
-                if to_match in cached_item.invocation_output_json:
-                    keys_to_delete.add(key)
+            keys_to_delete: set[Union[int, str]] = set()
+            for name in names:
+                keys_to_delete.update(self._keys_by_object_name.get(name, ()))
             if not keys_to_delete:
                 return
             for key in keys_to_delete:
                 self._delete(key)
-            self._invoker.services.logger.debug(
-                f"Deleted {len(keys_to_delete)} cached invocation outputs for {to_match}"
-            )
+            self._invoker.services.logger.debug(f"Deleted {len(keys_to_delete)} cached invocation outputs")
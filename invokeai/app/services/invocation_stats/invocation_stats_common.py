@@ -28,6 +28,29 @@ class ModelCacheStatsSummary:
     cache_misses: int
     models_cached: int
     models_cleared: int
+    # The measured model load throughput in GB/s, if any models were loaded from disk.
+    load_throughput_gb_per_second: Optional[float] = None
+
+
+@dataclass
+class ImageCacheStatsSummary:
+    """The stats for the decoded image cache."""
+
+    cache_hits: int
+    cache_misses: int
+    images_cached: int
+    cache_size_gb: float
+    max_cache_size_gb: float
+
+
+@dataclass
+class ModelPrefetchStatsSummary:
+    """The stats for the models loaded ahead of time."""
+
+    models_prefetched: int
+    prefetch_hits: int
+    prefetch_wasted: int
+    prefetch_skipped: int
 
 
 @dataclass
@@ -54,6 +77,8 @@ class InvocationStatsSummary:
     graph_stats: GraphExecutionStatsSummary
     model_cache_stats: ModelCacheStatsSummary
     node_stats: list[NodeExecutionStatsSummary]
+    image_cache_stats: Optional[ImageCacheStatsSummary] = None
+    model_prefetch_stats: Optional[ModelPrefetchStatsSummary] = None
 
     def __str__(self) -> str:
         _str = ""
@@ -80,6 +105,20 @@ class InvocationStatsSummary:
         _str += f"   Models cached: {self.model_cache_stats.models_cached}\n"
         _str += f"   Models cleared from cache: {self.model_cache_stats.models_cleared}\n"
         _str += f"   Cache high water mark: {self.model_cache_stats.high_water_mark_gb:4.2f}/{self.model_cache_stats.cache_size_gb:4.2f}G\n"
+        if self.model_cache_stats.load_throughput_gb_per_second is not None:
+            _str += f"   Model load throughput: {self.model_cache_stats.load_throughput_gb_per_second:4.2f}G/s\n"
+        if self.image_cache_stats is not None:
+            _str += "Image cache statistics:\n"
+            _str += f"   Image cache hits: {self.image_cache_stats.cache_hits}\n"
+            _str += f"   Image cache misses: {self.image_cache_stats.cache_misses}\n"
+            _str += f"   Images cached: {self.image_cache_stats.images_cached}\n"
+            _str += f"   Image cache size: {self.image_cache_stats.cache_size_gb:4.2f}/{self.image_cache_stats.max_cache_size_gb:4.2f}G\n"
+        if self.model_prefetch_stats is not None:
+            _str += "Model prefetch statistics:\n"
+            _str += f"   Models prefetched: {self.model_prefetch_stats.models_prefetched}\n"
+            _str += f"   Prefetched models used: {self.model_prefetch_stats.prefetch_hits}\n"
+            _str += f"   Prefetched models dropped before use: {self.model_prefetch_stats.prefetch_wasted}\n"
+            _str += f"   Models skipped for lack of room: {self.model_prefetch_stats.prefetch_skipped}\n"
 
         return _str
 
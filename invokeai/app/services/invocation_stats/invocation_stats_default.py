@@ -2,7 +2,8 @@ import json
 import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator
+from threading import Lock
+from typing import Generator, Optional
 
 import psutil
 import torch
@@ -14,8 +15,10 @@ from invokeai.app.services.invocation_stats.invocation_stats_common import (
     GESStatsNotFoundError,
     GraphExecutionStats,
     GraphExecutionStatsSummary,
+    ImageCacheStatsSummary,
     InvocationStatsSummary,
     ModelCacheStatsSummary,
+    ModelPrefetchStatsSummary,
     NodeExecutionStats,
     NodeExecutionStatsSummary,
 )
@@ -35,6 +38,8 @@ class InvocationStatsService(InvocationStatsServiceBase):
         self._stats: dict[str, GraphExecutionStats] = {}
         # Maps graph_execution_state_id to model manager CacheStats.
         self._cache_stats: dict[str, CacheStats] = {}
+        # CPU-bound nodes of the same session may collect stats concurrently, on the session runner's CPU node threads
+        self._lock = Lock()
 
     def start(self, invoker: Invoker) -> None:
         self._invoker = invoker
@@ -44,10 +49,13 @@ class InvocationStatsService(InvocationStatsServiceBase):
         # This is to handle case of the model manager not being initialized, which happens
         # during some tests.
         services = self._invoker.services
-        if not self._stats.get(graph_execution_state_id):
-            # First time we're seeing this graph_execution_state_id.
-            self._stats[graph_execution_state_id] = GraphExecutionStats()
-            self._cache_stats[graph_execution_state_id] = CacheStats()
+        with self._lock:
+            if not self._stats.get(graph_execution_state_id):
+                # First time we're seeing this graph_execution_state_id.
+                self._stats[graph_execution_state_id] = GraphExecutionStats()
+                self._cache_stats[graph_execution_state_id] = CacheStats()
+            graph_stats = self._stats[graph_execution_state_id]
+            cache_stats = self._cache_stats[graph_execution_state_id]
 
         # Record state before the invocation.
         start_time = time.time()
@@ -57,7 +65,7 @@ class InvocationStatsService(InvocationStatsServiceBase):
         vram_in_use = torch.cuda.memory_allocated() if torch.cuda.is_available() else 0.0
 
         assert services.model_manager.load is not None
-        services.model_manager.load.ram_cache.stats = self._cache_stats[graph_execution_state_id]
+        services.model_manager.load.ram_cache.stats = cache_stats
 
         try:
             # Let the invocation run.
@@ -74,11 +82,13 @@ class InvocationStatsService(InvocationStatsServiceBase):
                 end_ram_gb=psutil.Process().memory_info().rss / GB,
                 delta_vram_gb=delta_vram_gb,
             )
-            self._stats[graph_execution_state_id].add_node_execution_stats(node_stats)
+            with self._lock:
+                graph_stats.add_node_execution_stats(node_stats)
 
     def reset_stats(self, graph_execution_state_id: str) -> None:
-        self._stats.pop(graph_execution_state_id, None)
-        self._cache_stats.pop(graph_execution_state_id, None)
+        with self._lock:
+            self._stats.pop(graph_execution_state_id, None)
+            self._cache_stats.pop(graph_execution_state_id, None)
 
     def get_stats(self, graph_execution_state_id: str) -> InvocationStatsSummary:
         graph_stats_summary = self._get_graph_summary(graph_execution_state_id)
@@ -93,6 +103,8 @@ class InvocationStatsService(InvocationStatsServiceBase):
             model_cache_stats=model_cache_stats_summary,
             node_stats=node_stats_summaries,
             vram_usage_gb=vram_usage_gb,
+            image_cache_stats=self._get_image_cache_summary(),
+            model_prefetch_stats=self._get_model_prefetch_summary(),
         )
 
     def log_stats(self, graph_execution_state_id: str) -> None:
@@ -120,6 +132,38 @@ class InvocationStatsService(InvocationStatsServiceBase):
             total_usage_gb=sum(list(cache_stats.loaded_model_sizes.values())) / GB,
             models_cached=cache_stats.in_cache,
             models_cleared=cache_stats.cleared,
+            load_throughput_gb_per_second=(
+                cache_stats.load_throughput / GB if cache_stats.load_throughput is not None else None
+            ),
+        )
+
+    def _get_image_cache_summary(self) -> Optional[ImageCacheStatsSummary]:
+        # The image cache is shared by all sessions, so these stats are cumulative.
+        # Some tests run without an image file storage service.
+        image_files = self._invoker.services.image_files
+        if image_files is None:
+            return None
+        cache_stats = image_files.get_cache_stats()
+        return ImageCacheStatsSummary(
+            cache_hits=cache_stats.hits,
+            cache_misses=cache_stats.misses,
+            images_cached=cache_stats.images_cached,
+            cache_size_gb=cache_stats.cache_size_bytes / GB,
+            max_cache_size_gb=cache_stats.max_cache_size_bytes / GB,
+        )
+
+    def _get_model_prefetch_summary(self) -> Optional[ModelPrefetchStatsSummary]:
+        # Models are prefetched for all sessions, so these stats are cumulative.
+        # Some tests run without a model manager.
+        model_manager = self._invoker.services.model_manager
+        if model_manager is None or not self._invoker.services.configuration.prefetch_models:
+            return None
+        prefetch_stats = model_manager.load.get_prefetch_stats()
+        return ModelPrefetchStatsSummary(
+            models_prefetched=prefetch_stats.prefetched,
+            prefetch_hits=prefetch_stats.hits,
+            prefetch_wasted=prefetch_stats.wasted,
+            prefetch_skipped=prefetch_stats.skipped,
         )
 
     def _get_graph_summary(self, graph_execution_state_id: str) -> GraphExecutionStatsSummary:
@@ -51,6 +51,7 @@ from invokeai.backend.model_manager.configs.factory import (
     AnyModelConfig,
     ModelConfigFactory,
 )
+from invokeai.backend.model_manager.configs.probe_cache import ModelProbeCache
 from invokeai.backend.model_manager.configs.unknown import Unknown_Config
 from invokeai.backend.model_manager.metadata import (
     AnyModelRepoMetadata,
@@ -82,6 +83,8 @@ TMPDIR_PREFIX = "tmpinstall_"
 # Marker file used to resume or pause remote model installs across restarts.
 INSTALL_MARKER_FILENAME = ".invokeai_install.json"
 INSTALL_MARKER_VERSION = 1
+# Cache of model identification results, in the models directory.
+PROBE_CACHE_FILE = ".probe_cache.jsonl"
 
 
 class ModelInstallService(ModelInstallServiceBase):
@@ -118,6 +121,9 @@ class ModelInstallService(ModelInstallServiceBase):
         self._download_cache: Dict[int, ModelInstallJob] = {}
         self._running = False
         self._session = session
+        self._probe_cache: Optional[ModelProbeCache] = (
+            ModelProbeCache(app_config.models_path / PROBE_CACHE_FILE) if app_config.model_probe_cache else None
+        )
         self._install_thread: Optional[threading.Thread] = None
         self._next_job_id = 0
 
@@ -1060,6 +1066,7 @@ class ModelInstallService(ModelInstallServiceBase):
             override_fields=deepcopy(fields),
             hash_algo=hash_algo,
             allow_unknown=self.app_config.allow_unknown_models,
+            probe_cache=self._probe_cache,
         )
 
         if result.config is None:
@@ -3,8 +3,9 @@
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Optional, Sequence
 
+from invokeai.app.services.model_load.model_load_common import ModelPrefetchStats
 from invokeai.backend.model_manager.configs.factory import AnyModelConfig
 from invokeai.backend.model_manager.load import LoadedModel, LoadedModelWithoutConfig
 from invokeai.backend.model_manager.load.model_cache.model_cache import ModelCache
@@ -30,6 +31,30 @@ class ModelLoadServiceBase(ABC):
             events so they can be routed to that user's UI (defaults to the system user).
         """
 
+    @abstractmethod
+    def set_upcoming_models(self, models: Sequence[tuple[AnyModelConfig, Optional[SubModelType]]]) -> None:
+        """
+        Tell the RAM cache's eviction policy which models will be loaded soon, so that it can keep them.
+
+        :param models: The models that will be loaded soon, most urgent first, with the submodel to load or None. For
+            main models without a submodel, the submodels that were loaded before are used.
+        """
+
+    @abstractmethod
+    def prefetch_models(self, models: Sequence[tuple[AnyModelConfig, Optional[SubModelType]]]) -> None:
+        """
+        Load models into the RAM cache ahead of time, in the given order, while the cache has room for them.
+
+        Models are only dropped from the cache to make room if they are unlocked and not among the given models.
+
+        :param models: The models that will be loaded soon, most urgent first, with the submodel to load or None. For
+            main models without a submodel, the submodels that were loaded before are prefetched.
+        """
+
+    @abstractmethod
+    def get_prefetch_stats(self) -> ModelPrefetchStats:
+        """Get statistics for the models loaded ahead of time."""
+
     @property
     @abstractmethod
     def ram_cache(self) -> ModelCache:
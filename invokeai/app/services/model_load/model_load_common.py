@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ModelPrefetchStats:
+    """Statistics for models loaded ahead of time by the model prefetcher."""
+
+    prefetched: int  # models loaded ahead of time
+    hits: int  # prefetched models that were used while still in the cache
+    wasted: int  # prefetched models dropped from the cache before they were used
+    skipped: int  # models not prefetched because the cache did not have room for them
@@ -1,8 +1,11 @@
 # Copyright (c) 2024 Lincoln D. Stein and the InvokeAI Team
 """Implementation of model loader service."""
 
+import threading
+import time
+from dataclasses import replace
 from pathlib import Path
-from typing import Callable, Optional, Type
+from typing import Callable, Optional, Sequence, Type
 
 from picklescan.scanner import scan_file_path
 from safetensors.torch import load_file as safetensors_load_file
@@ -11,6 +14,7 @@ from torch import load as torch_load
 from invokeai.app.services.config import InvokeAIAppConfig
 from invokeai.app.services.invoker import Invoker
 from invokeai.app.services.model_load.model_load_base import ModelLoadServiceBase
+from invokeai.app.services.model_load.model_load_common import ModelPrefetchStats
 from invokeai.backend.model_manager.configs.factory import AnyModelConfig
 from invokeai.backend.model_manager.load import (
     LoadedModel,
@@ -18,12 +22,30 @@ from invokeai.backend.model_manager.load import (
     ModelLoaderRegistry,
     ModelLoaderRegistryBase,
 )
-from invokeai.backend.model_manager.load.model_cache.model_cache import ModelCache
+from invokeai.backend.model_manager.load.model_cache.model_cache import (
+    CacheEntrySnapshot,
+    ModelCache,
+    get_model_cache_key,
+)
 from invokeai.backend.model_manager.load.model_loaders.generic_diffusers import GenericDiffusersLoader
-from invokeai.backend.model_manager.taxonomy import AnyModel, SubModelType
+from invokeai.backend.model_manager.taxonomy import AnyModel, ModelType, SubModelType
 from invokeai.backend.util.devices import TorchDevice
 from invokeai.backend.util.logging import InvokeAILogger
 
+# Types of models that are loaded whole, without a submodel. They can be prefetched before they were ever loaded.
+_WHOLE_MODEL_TYPES = {
+    ModelType.VAE,
+    ModelType.LoRA,
+    ModelType.ControlLoRa,
+    ModelType.ControlNet,
+    ModelType.TextualInversion,
+    ModelType.IPAdapter,
+    ModelType.CLIPVision,
+    ModelType.T2IAdapter,
+    ModelType.SpandrelImageToImage,
+    ModelType.FluxRedux,
+}
+
 
 class ModelLoadService(ModelLoadServiceBase):
     """Wrapper around ModelLoaderRegistry."""
@@ -42,6 +64,17 @@ class ModelLoadService(ModelLoadServiceBase):
         self._ram_cache = ram_cache
         self._registry = registry
 
+        # Loads of the same model are serialized, so that a model that is being prefetched is not loaded twice
+        self._load_locks: dict[str, threading.Lock] = {}
+        self._load_locks_lock = threading.Lock()
+        # The submodels loaded for each model, in the order they were first loaded. Used to prefetch main models.
+        self._loaded_submodel_types: dict[str, list[Optional[SubModelType]]] = {}
+        # Cache keys of the prefetched models that have not been used yet
+        self._unused_prefetched: set[str] = set()
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_stats = ModelPrefetchStats(prefetched=0, hits=0, wasted=0, skipped=0)
+        ram_cache.on_cache_models_cleared(self._on_cache_models_cleared)
+
     def start(self, invoker: Invoker) -> None:
         self._invoker = invoker
 
@@ -71,17 +104,113 @@ class ModelLoadService(ModelLoadServiceBase):
             self._invoker.services.events.emit_model_load_started(model_config, submodel_type, user_id or "system")
 
         implementation, model_config, submodel_type = self._registry.get_implementation(model_config, submodel_type)  # type: ignore
-        loaded_model: LoadedModel = implementation(
-            app_config=self._app_config,
-            logger=self._logger,
-            ram_cache=self._ram_cache,
-        ).load_model(model_config, submodel_type)
+        cache_key = get_model_cache_key(model_config.key, submodel_type)
+        with self._get_load_lock(cache_key):
+            self._record_load(model_config.key, submodel_type, cache_key)
+            loaded_model: LoadedModel = implementation(
+                app_config=self._app_config,
+                logger=self._logger,
+                ram_cache=self._ram_cache,
+            ).load_model(model_config, submodel_type)
 
         if hasattr(self, "_invoker"):
             self._invoker.services.events.emit_model_load_complete(model_config, submodel_type, user_id or "system")
 
         return loaded_model
 
+    def set_upcoming_models(self, models: Sequence[tuple[AnyModelConfig, Optional[SubModelType]]]) -> None:
+        self._ram_cache.set_upcoming_models(
+            [
+                get_model_cache_key(model_config.key, submodel_type)
+                for model_config, submodel_type in self._expand_submodels(models)
+            ]
+        )
+
+    def prefetch_models(self, models: Sequence[tuple[AnyModelConfig, Optional[SubModelType]]]) -> None:
+        to_prefetch = self._expand_submodels(models)
+
+        # None of the models that are about to be used may be dropped to make room for another one
+        keep = {get_model_cache_key(model_config.key, submodel_type) for model_config, submodel_type in to_prefetch}
+        for model_config, submodel_type in to_prefetch:
+            if not self._prefetch_model(model_config, submodel_type, keep):
+                # The models are in order of urgency - if this one does not fit, neither should the ones after it
+                break
+
+    def _expand_submodels(
+        self, models: Sequence[tuple[AnyModelConfig, Optional[SubModelType]]]
+    ) -> list[tuple[AnyModelConfig, Optional[SubModelType]]]:
+        """Replaces main models without a submodel with the submodels that were loaded before, in order.
+
+        Models of types that are not loaded whole are dropped if none of their submodels were loaded yet.
+        """
+        expanded: list[tuple[AnyModelConfig, Optional[SubModelType]]] = []
+        for model_config, submodel_type in models:
+            if submodel_type is not None:
+                expanded.append((model_config, submodel_type))
+                continue
+            with self._prefetch_lock:
+                loaded_submodel_types = list(self._loaded_submodel_types.get(model_config.key, []))
+            if loaded_submodel_types:
+                expanded.extend((model_config, loaded_type) for loaded_type in loaded_submodel_types)
+            elif model_config.type in _WHOLE_MODEL_TYPES:
+                expanded.append((model_config, None))
+        return expanded
+
+    def get_prefetch_stats(self) -> ModelPrefetchStats:
+        with self._prefetch_lock:
+            return replace(self._prefetch_stats)
+
+    def _prefetch_model(
+        self, model_config: AnyModelConfig, submodel_type: Optional[SubModelType], keep: set[str]
+    ) -> bool:
+        """Loads a model into the RAM cache if it is not already there. Returns False if the cache has no room for it."""
+        implementation, model_config, submodel_type = self._registry.get_implementation(model_config, submodel_type)  # type: ignore
+        cache_key = get_model_cache_key(model_config.key, submodel_type)
+        with self._get_load_lock(cache_key):
+            if self._ram_cache.contains(cache_key):
+                return True
+            loader = implementation(app_config=self._app_config, logger=self._logger, ram_cache=self._ram_cache)
+            model_path = (self._app_config.models_path / model_config.path).resolve()
+            if not model_path.exists():
+                return True
+            if not self._ram_cache.try_make_room(loader.get_size_fs(model_config, model_path, submodel_type), keep):
+                with self._prefetch_lock:
+                    self._prefetch_stats.skipped += 1
+                return False
+            self._logger.debug(f"Prefetching model {cache_key} ({model_config.name})")
+            # The reservation is only an estimate, so the room made while loading must not drop the kept models either
+            with self._ram_cache.keep_models(keep):
+                loader.load_model(model_config, submodel_type)
+            with self._prefetch_lock:
+                self._prefetch_stats.prefetched += 1
+                self._unused_prefetched.add(cache_key)
+        return True
+
+    def _get_load_lock(self, cache_key: str) -> threading.Lock:
+        with self._load_locks_lock:
+            return self._load_locks.setdefault(cache_key, threading.Lock())
+
+    def _record_load(self, model_key: str, submodel_type: Optional[SubModelType], cache_key: str) -> None:
+        with self._prefetch_lock:
+            loaded_submodel_types = self._loaded_submodel_types.setdefault(model_key, [])
+            if submodel_type not in loaded_submodel_types:
+                loaded_submodel_types.append(submodel_type)
+            if cache_key in self._unused_prefetched:
+                self._unused_prefetched.discard(cache_key)
+                self._prefetch_stats.hits += 1
+
+    def _on_cache_models_cleared(
+        self,
+        models_cleared: int,
+        bytes_requested: int,
+        bytes_freed: int,
+        cache_snapshot: dict[str, CacheEntrySnapshot],
+    ) -> None:
+        with self._prefetch_lock:
+            dropped = {cache_key for cache_key in self._unused_prefetched if cache_key not in cache_snapshot}
+            self._unused_prefetched -= dropped
+            self._prefetch_stats.wasted += len(dropped)
+
     def load_model_from_path(
         self, model_path: Path, loader: Optional[Callable[[Path], AnyModel]] = None
     ) -> LoadedModelWithoutConfig:
@@ -130,6 +259,7 @@ class ModelLoadService(ModelLoadServiceBase):
             else lambda path: safetensors_load_file(path, device="cpu")
         )
         assert loader is not None
+        start_time = time.perf_counter()
         raw_model = loader(model_path)
-        self._ram_cache.put(key=cache_key, model=raw_model)
+        self._ram_cache.put(key=cache_key, model=raw_model, load_seconds=time.perf_counter() - start_time)
         return LoadedModelWithoutConfig(cache_record=self._ram_cache.get(key=cache_key), cache=self._ram_cache)
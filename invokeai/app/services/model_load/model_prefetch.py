@@ -0,0 +1,61 @@
+"""Finds the models that queued sessions will load, so they can be loaded ahead of time."""
+
+from typing import Any, Iterable, Optional
+
+from pydantic import BaseModel
+
+from invokeai.app.invocations.model import ModelIdentifierField
+from invokeai.app.services.model_records import ModelRecordServiceBase, UnknownModelException
+from invokeai.app.services.shared.graph import GraphExecutionState
+from invokeai.backend.model_manager.configs.factory import AnyModelConfig
+from invokeai.backend.model_manager.taxonomy import SubModelType
+
+
+def find_pending_model_identifiers(session: GraphExecutionState) -> list[ModelIdentifierField]:
+    """Finds the models set on the nodes of a session that have not been executed yet.
+
+    Models that reach a node through an edge, e.g. the UNet output of a main model loader, are found on the node that
+    set them. Nodes are visited in the order they were added to the graph.
+    """
+    identifiers: list[ModelIdentifierField] = []
+    for node_id, node in list(session.graph.nodes.items()):
+        prepared = session.source_prepared_mapping.get(node_id)
+        if prepared and prepared <= session.executed:
+            continue
+        _find_model_identifiers(node, identifiers)
+    return identifiers
+
+
+def _find_model_identifiers(value: Any, identifiers: list[ModelIdentifierField]) -> None:
+    if isinstance(value, ModelIdentifierField):
+        identifiers.append(value)
+    elif isinstance(value, BaseModel):
+        for field_value in value.__dict__.values():
+            _find_model_identifiers(field_value, identifiers)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _find_model_identifiers(item, identifiers)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _find_model_identifiers(item, identifiers)
+
+
+def get_upcoming_models(
+    sessions: Iterable[GraphExecutionState], store: ModelRecordServiceBase
+) -> list[tuple[AnyModelConfig, Optional[SubModelType]]]:
+    """Gets the models that the sessions will load, in order, without duplicates.
+
+    Models that are no longer installed are skipped - the session fails when it tries to load them.
+    """
+    models: list[tuple[AnyModelConfig, Optional[SubModelType]]] = []
+    seen: set[tuple[str, Optional[SubModelType]]] = set()
+    for session in sessions:
+        for identifier in find_pending_model_identifiers(session):
+            if (identifier.key, identifier.submodel_type) in seen:
+                continue
+            seen.add((identifier.key, identifier.submodel_type))
+            try:
+                models.append((store.get_model(identifier.key), identifier.submodel_type))
+            except UnknownModelException:
+                continue
+    return models
@@ -16,6 +16,7 @@ from invokeai.app.services.model_load.model_load_base import ModelLoadServiceBas
 from invokeai.app.services.model_load.model_load_default import ModelLoadService
 from invokeai.app.services.model_manager.model_manager_base import ModelManagerServiceBase
 from invokeai.app.services.model_records.model_records_base import ModelRecordServiceBase
+from invokeai.backend.model_manager.load.model_cache.eviction_policy import build_eviction_policy
 from invokeai.backend.model_manager.load.model_cache.model_cache import ModelCache
 from invokeai.backend.model_manager.load.model_loader_registry import ModelLoaderRegistry
 from invokeai.backend.util.devices import TorchDevice
@@ -76,18 +77,61 @@ class ModelManagerService(ModelManagerServiceBase):
         download_queue: DownloadQueueServiceBase,
         events: EventServiceBase,
         execution_device: Optional[torch.device] = None,
+        ram_cache_count: int = 1,
+        vram_cache_count: int = 1,
     ) -> Self:
         """
         Construct the model manager service instance.
 
         For simplicity, use this class method rather than the __init__ constructor.
+
+        `ram_cache_count` and `vram_cache_count` are the number of model caches that share the RAM and the execution
+        device - see `ModelCache`.
+        """
+        loader = cls._build_model_load_service(app_config, execution_device, ram_cache_count, vram_cache_count)
+        installer = ModelInstallService(
+            app_config=app_config,
+            record_store=model_record_service,
+            download_queue=download_queue,
+            event_bus=events,
+        )
+        return cls(store=model_record_service, install=installer, load=loader)
+
+    def build_worker_model_manager(
+        self,
+        app_config: InvokeAIAppConfig,
+        execution_device: torch.device,
+        ram_cache_count: int = 1,
+        vram_cache_count: int = 1,
+    ) -> Self:
+        """
+        Construct a model manager for a session processor worker.
+
+        The worker's model manager shares this manager's model records and installer, but has its own model cache,
+        which loads models onto the worker's execution device. Its share of the model cache settings is given by
+        `ram_cache_count` and `vram_cache_count`, as for `build_model_manager`.
         """
+        return type(self)(
+            store=self._store,
+            install=self._install,
+            load=self._build_model_load_service(app_config, execution_device, ram_cache_count, vram_cache_count),
+        )
+
+    @classmethod
+    def _build_model_load_service(
+        cls,
+        app_config: InvokeAIAppConfig,
+        execution_device: Optional[torch.device] = None,
+        ram_cache_count: int = 1,
+        vram_cache_count: int = 1,
+    ) -> ModelLoadService:
         logger = InvokeAILogger.get_logger(cls.__name__)
         logger.setLevel(app_config.log_level.upper())
 
         ram_cache = ModelCache(
             execution_device_working_mem_gb=app_config.device_working_mem_gb,
             enable_partial_loading=app_config.enable_partial_loading,
+            pipelined_weight_upload=app_config.pipelined_weight_upload,
             keep_ram_copy_of_weights=app_config.keep_ram_copy_of_weights,
             max_ram_cache_size_gb=app_config.max_cache_ram_gb,
             max_vram_cache_size_gb=app_config.max_cache_vram_gb,
@@ -96,16 +140,12 @@ class ModelManagerService(ModelManagerServiceBase):
             log_memory_usage=app_config.log_memory_usage,
             logger=logger,
             keep_alive_minutes=app_config.model_cache_keep_alive_min,
+            eviction_policy=build_eviction_policy(app_config.model_cache_eviction_policy),
+            ram_cache_count=ram_cache_count,
+            vram_cache_count=vram_cache_count,
         )
-        loader = ModelLoadService(
+        return ModelLoadService(
             app_config=app_config,
             ram_cache=ram_cache,
             registry=ModelLoaderRegistry,
         )
-        installer = ModelInstallService(
-            app_config=app_config,
-            record_store=model_record_service,
-            download_queue=download_queue,
-            event_bus=events,
-        )
-        return cls(store=model_record_service, install=installer, load=loader)
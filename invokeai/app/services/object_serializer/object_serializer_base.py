@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Generic, TypeVar
+from typing import Callable, Generic, Iterable, TypeVar
 
 T = TypeVar("T")
 
@@ -35,6 +35,22 @@ class ObjectSerializerBase(ABC, Generic[T]):
         """
         pass
 
+    def pin(self, session_id: str, names: Iterable[str]) -> None:
+        """
+        Sets the objects that a session still needs, replacing any previously pinned by the session. Serializers that
+        keep objects in memory should keep pinned objects and may drop objects as soon as they are unpinned.
+        :param session_id: The id of the session.
+        :param names: The names of the objects the session still needs.
+        """
+        pass
+
+    def unpin(self, session_id: str) -> None:
+        """
+        Releases all objects pinned by a session.
+        :param session_id: The id of the session.
+        """
+        pass
+
     def on_deleted(self, on_deleted: Callable[[str], None]) -> None:
         """Register a callback for when an object is deleted"""
         self._on_deleted_callbacks.append(on_deleted)
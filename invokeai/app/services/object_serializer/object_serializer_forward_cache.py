@@ -1,7 +1,13 @@
-from queue import Queue
-from typing import TYPE_CHECKING, Optional, TypeVar
+import dataclasses
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from typing import TYPE_CHECKING, Any, Iterable, Optional, TypeVar
+
+import torch
 
 from invokeai.app.services.object_serializer.object_serializer_base import ObjectSerializerBase
+from invokeai.backend.util.calc_tensor_size import calc_tensor_size
 
 T = TypeVar("T")
 
@@ -9,18 +15,58 @@ if TYPE_CHECKING:
     from invokeai.app.services.invoker import Invoker
 
 
+def get_object_size(obj: Any) -> int:
+    """Estimates the number of bytes held by an object, counting the data of any tensors it contains."""
+    seen: set[int] = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, torch.Tensor):
+            size += calc_tensor_size(value)
+        elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+            stack.extend(getattr(value, f.name) for f in dataclasses.fields(value))
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        else:
+            size += sys.getsizeof(value)
+    return size
+
+
 class ObjectSerializerForwardCache(ObjectSerializerBase[T]):
     """
     Provides a LRU cache for an instance of `ObjectSerializerBase`.
     Saving an object to the cache always writes through to the underlying storage.
+
+    The cache is bounded by the number of objects (`max_cache_size`), the total size of the objects in bytes
+    (`max_cache_bytes`), or both. A bound of `None` is not enforced.
+
+    Sessions may pin the objects that their pending nodes still need. Unpinned objects are evicted before pinned
+    objects, and objects that a session unpins are dropped from memory immediately, unless another session has pinned
+    them. Dropped objects are still available from the underlying storage.
     """
 
-    def __init__(self, underlying_storage: ObjectSerializerBase[T], max_cache_size: int = 20):
+    def __init__(
+        self,
+        underlying_storage: ObjectSerializerBase[T],
+        max_cache_size: Optional[int] = 20,
+        max_cache_bytes: Optional[int] = None,
+    ):
         super().__init__()
         self._underlying_storage = underlying_storage
-        self._cache: dict[str, T] = {}
-        self._cache_ids = Queue[str]()
+        self._cache: OrderedDict[str, T] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._bytes_used = 0
         self._max_cache_size = max_cache_size
+        self._max_cache_bytes = max_cache_bytes
+        self._pins: dict[str, set[str]] = {}
+        self._pin_counts: defaultdict[str, int] = defaultdict(int)
+        self._lock = threading.RLock()
 
     def start(self, invoker: "Invoker") -> None:
         self._invoker = invoker
@@ -50,16 +96,68 @@ class ObjectSerializerForwardCache(ObjectSerializerBase[T]):
 
     def delete(self, name: str) -> None:
         self._underlying_storage.delete(name)
-        if name in self._cache:
-            del self._cache[name]
+        with self._lock:
+            self._drop(name)
         self._on_deleted(name)
 
+    def pin(self, session_id: str, names: Iterable[str]) -> None:
+        with self._lock:
+            pinned = set(names)
+            previous = self._pins.get(session_id, set())
+            for name in pinned - previous:
+                self._pin_counts[name] += 1
+            self._pins[session_id] = pinned
+            self._release(previous - pinned)
+
+    def unpin(self, session_id: str) -> None:
+        with self._lock:
+            self._release(self._pins.pop(session_id, set()))
+
+    def _release(self, names: set[str]) -> None:
+        """Removes one pin from each of the given names, dropping objects that are no longer pinned by any session."""
+        for name in names:
+            self._pin_counts[name] -= 1
+            if self._pin_counts[name] <= 0:
+                del self._pin_counts[name]
+                self._drop(name)
+
     def _get_cache(self, name: str) -> Optional[T]:
-        return None if name not in self._cache else self._cache[name]
+        with self._lock:
+            if name not in self._cache:
+                return None
+            self._cache.move_to_end(name)
+            return self._cache[name]
 
     def _set_cache(self, name: str, data: T):
-        if name not in self._cache:
+        size = get_object_size(data) if self._max_cache_bytes is not None else 0
+        if self._max_cache_bytes is not None and size > self._max_cache_bytes:
+            # The object would evict everything else and still not fit
+            return
+        with self._lock:
+            if name in self._cache:
+                return
             self._cache[name] = data
-            self._cache_ids.put(name)
-            if self._cache_ids.qsize() > self._max_cache_size:
-                self._cache.pop(self._cache_ids.get())
+            self._sizes[name] = size
+            self._bytes_used += size
+            self._evict()
+
+    def _drop(self, name: str) -> None:
+        if name in self._cache:
+            del self._cache[name]
+            self._bytes_used -= self._sizes.pop(name)
+
+    def _is_over_budget(self) -> bool:
+        if self._max_cache_size is not None and len(self._cache) > self._max_cache_size:
+            return True
+        return self._max_cache_bytes is not None and self._bytes_used > self._max_cache_bytes
+
+    def _evict(self) -> None:
+        """Evicts objects until the cache is within its bounds - unpinned objects first, least recently used first."""
+        if not self._is_over_budget():
+            return
+        for name in [name for name in self._cache if name not in self._pin_counts]:
+            self._drop(name)
+            if not self._is_over_budget():
+                return
+        while self._is_over_budget():
+            self._drop(next(iter(self._cache)))
@@ -0,0 +1,170 @@
+import dataclasses
+import json
+import shutil
+import tempfile
+import typing
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+import torch
+from safetensors.torch import save_file
+
+from invokeai.app.services.object_serializer.object_serializer_base import ObjectSerializerBase
+from invokeai.app.services.object_serializer.object_serializer_common import ObjectNotFoundError
+from invokeai.app.util.misc import uuid_string
+from invokeai.backend.util.safetensors_mmap import load_safetensors_mmap
+
+if TYPE_CHECKING:
+    from invokeai.app.services.invoker import Invoker
+
+
+T = TypeVar("T")
+
+# The key in the safetensors metadata under which the object's structure is stored.
+STRUCTURE_METADATA_KEY = "invokeai_structure"
+
+
+class ObjectSerializerSafetensors(ObjectSerializerBase[T]):
+    """Disk-backed storage for tensors, and dataclasses of tensors, in the safetensors format.
+
+    Unlike `ObjectSerializerDisk`, this does not use pickle. The tensors in an object are stored as safetensors
+    entries, and the structure of the object (nested dataclasses, lists, dicts and primitive values) is stored as JSON
+    in the safetensors metadata. Only the dataclasses given in `safe_globals` can be serialized.
+
+    Objects are loaded with a memory mapping of the file, so tensor data is only read from disk when it is accessed.
+
+    :param output_dir: The folder where the serialized objects will be stored
+    :param safe_globals: The dataclasses that may be serialized
+    :param ephemeral: If True, objects will be stored in a temporary directory inside the given output_dir and cleaned up on exit
+    :param mmap: If True, loaded tensors are backed by a memory mapping of the file instead of being read into memory.
+        On Windows, a mapped file cannot be deleted while it is in use, so this should be disabled there.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        safe_globals: list[type],
+        ephemeral: bool = False,
+        mmap: bool = True,
+    ) -> None:
+        super().__init__()
+        self._ephemeral = ephemeral
+        self._mmap = mmap
+        self._base_output_dir = output_dir
+        self._base_output_dir.mkdir(parents=True, exist_ok=True)
+
+        if self._ephemeral:
+            # Remove dangling tempdirs that might have been left over from an earlier unplanned shutdown.
+            for temp_dir in filter(Path.is_dir, self._base_output_dir.glob("tmp*")):
+                shutil.rmtree(temp_dir)
+
+        # Must specify `ignore_cleanup_errors` to avoid fatal errors during cleanup on Windows
+        self._tempdir = (
+            tempfile.TemporaryDirectory(dir=self._base_output_dir, ignore_cleanup_errors=True) if ephemeral else None
+        )
+        self._output_dir = Path(self._tempdir.name) if self._tempdir else self._base_output_dir
+        self.__obj_class_name: Optional[str] = None
+
+        # Tensors, primitives, lists and dicts are always supported - only dataclasses need to be registered
+        self._dataclasses: dict[str, type] = {
+            cls.__qualname__: cls for cls in safe_globals if dataclasses.is_dataclass(cls)
+        }
+
+    def load(self, name: str) -> T:
+        file_path = self._get_path(name)
+        try:
+            if self._mmap:
+                tensors, metadata = load_safetensors_mmap(file_path)
+            else:
+                tensors, metadata = self._load_file(file_path)
+        except FileNotFoundError as e:
+            raise ObjectNotFoundError(name) from e
+        return self._decode(json.loads(metadata[STRUCTURE_METADATA_KEY]), tensors)
+
+    def save(self, obj: T) -> str:
+        name = self._new_name()
+        tensors: dict[str, torch.Tensor] = {}
+        structure = self._encode(obj, tensors)
+        save_file(tensors, self._get_path(name), metadata={STRUCTURE_METADATA_KEY: json.dumps(structure)})
+        return name
+
+    def delete(self, name: str) -> None:
+        file_path = self._get_path(name)
+        file_path.unlink()
+
+    @staticmethod
+    def _load_file(file_path: Path) -> tuple[dict[str, torch.Tensor], dict[str, str]]:
+        from safetensors import safe_open
+
+        with safe_open(file_path, framework="pt", device="cpu") as f:
+            return {key: f.get_tensor(key) for key in f.keys()}, f.metadata() or {}
+
+    def _encode(self, value: Any, tensors: dict[str, torch.Tensor]) -> Any:
+        """Converts a value to a JSON-serializable structure, moving its tensors into `tensors`."""
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, torch.Tensor):
+            key = str(len(tensors))
+            tensor = value.detach().cpu().contiguous()
+            # safetensors refuses to save tensors that share memory
+            if any(t.untyped_storage().data_ptr() == tensor.untyped_storage().data_ptr() for t in tensors.values()):
+                tensor = tensor.clone()
+            tensors[key] = tensor
+            return {"__tensor__": key}
+        if isinstance(value, (list, tuple)):
+            return {"__list__" if isinstance(value, list) else "__tuple__": [self._encode(v, tensors) for v in value]}
+        if isinstance(value, dict):
+            if not all(isinstance(k, str) for k in value):
+                raise TypeError("Only dicts with string keys can be serialized")
+            return {"__dict__": {k: self._encode(v, tensors) for k, v in value.items()}}
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            cls_name = type(value).__qualname__
+            if self._dataclasses.get(cls_name) is not type(value):
+                raise TypeError(f"{cls_name} is not in the safe globals for this serializer")
+            return {
+                "__dataclass__": cls_name,
+                "fields": {
+                    f.name: self._encode(getattr(value, f.name), tensors) for f in dataclasses.fields(value) if f.init
+                },
+            }
+        raise TypeError(f"Cannot serialize objects of type {type(value).__name__}")
+
+    def _decode(self, structure: Any, tensors: dict[str, torch.Tensor]) -> Any:
+        """Rebuilds a value from the structure created by `_encode`."""
+        if not isinstance(structure, dict):
+            return structure
+        if "__tensor__" in structure:
+            return tensors[structure["__tensor__"]]
+        if "__list__" in structure:
+            return [self._decode(v, tensors) for v in structure["__list__"]]
+        if "__tuple__" in structure:
+            return tuple(self._decode(v, tensors) for v in structure["__tuple__"])
+        if "__dict__" in structure:
+            return {k: self._decode(v, tensors) for k, v in structure["__dict__"].items()}
+        cls = self._dataclasses[structure["__dataclass__"]]
+        return cls(**{k: self._decode(v, tensors) for k, v in structure["fields"].items()})
+
+    @property
+    def _obj_class_name(self) -> str:
+        if not self.__obj_class_name:
+            # `__orig_class__` is not available in the constructor for some technical, undoubtedly very pythonic reason
+            self.__obj_class_name = typing.get_args(self.__orig_class__)[0].__name__  # pyright: ignore [reportUnknownMemberType, reportAttributeAccessIssue]
+        return self.__obj_class_name
+
+    def _get_path(self, name: str) -> Path:
+        return self._output_dir / name
+
+    def _new_name(self) -> str:
+        return f"{self._obj_class_name}_{uuid_string()}"
+
+    def _tempdir_cleanup(self) -> None:
+        """Calls `cleanup` on the temporary directory, if it exists."""
+        if self._tempdir:
+            self._tempdir.cleanup()
+
+    def __del__(self) -> None:
+        # In case the service is not properly stopped, clean up the temporary directory when the class instance is GC'd.
+        self._tempdir_cleanup()
+
+    def stop(self, invoker: "Invoker") -> None:
+        self._tempdir_cleanup()
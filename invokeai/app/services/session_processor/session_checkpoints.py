@@ -0,0 +1,86 @@
+from typing import Callable, Optional
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput, InvocationRegistry
+from invokeai.app.services.invocation_cache.invocation_cache_common import get_object_references
+from invokeai.app.services.session_queue.session_queue_common import SessionQueueItemCheckpoint
+from invokeai.app.services.shared.graph import GraphExecutionState
+
+# A prepared node, identified by its source node ID and iteration path. Prepared node IDs are generated when the nodes
+# are prepared, so they differ between runs of the same session.
+_NodeKey = tuple[str, tuple[int, ...]]
+
+
+class SessionCheckpoints:
+    """The completed nodes of an interrupted queue item's session, used to resume the session without running them again.
+
+    As the resumed session prepares its nodes, each node that has a checkpoint is completed with the checkpointed
+    output instead of being invoked.
+
+    Tensors and conditioning are stored in a temporary directory that does not survive a restart, so outputs that
+    reference them are only reused if every node that consumes them is also reused. Otherwise, the node runs again so
+    that its consumers can load its output.
+
+    Images are written to disk in the background, so an image that a node output before the interruption may never have
+    been written. If `image_exists` is given, outputs that reference a missing image are not reused.
+    """
+
+    def __init__(
+        self,
+        session: GraphExecutionState,
+        checkpoints: list[SessionQueueItemCheckpoint],
+        image_exists: Optional[Callable[[str], bool]] = None,
+    ) -> None:
+        self._outputs: dict[_NodeKey, BaseInvocationOutput] = {}
+        # Later checkpoints of a node replace earlier ones, e.g. if a node ran again after an earlier resume
+        for checkpoint in checkpoints:
+            output = InvocationRegistry.get_output_typeadapter().validate_json(checkpoint.output)
+            self._outputs[(checkpoint.source_node_id, tuple(checkpoint.iteration_path))] = output
+        self._iteration_paths: dict[str, list[tuple[int, ...]]] = {}
+        for source_node_id, iteration_path in self._outputs:
+            self._iteration_paths.setdefault(source_node_id, []).append(iteration_path)
+        self._graph = session.graph.nx_graph_flat()
+        self._image_exists = image_exists
+        self._reusable: dict[_NodeKey, bool] = {}
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+    def get_output(self, session: GraphExecutionState, invocation: BaseInvocation) -> Optional[BaseInvocationOutput]:
+        """Gets the checkpointed output of a prepared node, if it can be reused."""
+        key = (session.prepared_source_mapping[invocation.id], session.get_iteration_path(invocation.id))
+        return self._outputs[key] if self._is_reusable(key) else None
+
+    def _is_reusable(self, key: _NodeKey) -> bool:
+        reusable = self._reusable.get(key)
+        if reusable is None:
+            reusable = self._check_reusable(key)
+            self._reusable[key] = reusable
+        return reusable
+
+    def _check_reusable(self, key: _NodeKey) -> bool:
+        output = self._outputs.get(key)
+        if output is None:
+            return False
+        references = get_object_references(output)
+        if self._image_exists is not None and not all(
+            self._image_exists(name) for kind, name in references if kind == "image"
+        ):
+            return False
+        if not any(kind in ("tensor", "conditioning") for kind, _ in references):
+            return True
+        source_node_id, iteration_path = key
+        return all(
+            self._has_reusable_consumer(consumer_id, iteration_path)
+            for consumer_id in self._graph.successors(source_node_id)
+        )
+
+    def _has_reusable_consumer(self, consumer_id: str, iteration_path: tuple[int, ...]) -> bool:
+        """Whether the consumer of a node in the given iteration is reused.
+
+        The consumer is in the same iteration as the node, or, if it collects the iteration, in one of its outer
+        iterations. Consumers in inner iterations, which the node's output is iterated over, are never matched.
+        """
+        return any(
+            iteration_path[: len(consumer_path)] == consumer_path and self._is_reusable((consumer_id, consumer_path))
+            for consumer_path in self._iteration_paths.get(consumer_id, [])
+        )
@@ -0,0 +1,54 @@
+from typing import Any
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput
+from invokeai.app.services.invocation_cache.invocation_cache_common import get_object_references
+from invokeai.app.services.object_serializer.object_serializer_base import ObjectSerializerBase
+from invokeai.app.services.session_queue.session_queue_common import SessionQueueItem
+
+
+class SessionObjectPinner:
+    """Pins the tensors and conditioning that a session's unexecuted nodes still consume.
+
+    After each node completes, the objects referenced by the session's pending results are pinned in the tensor and
+    conditioning serializers, replacing the session's previous pins. Objects stay in memory until their last consumer
+    has executed, and are released as soon as it has. All pins are released when the session finishes or errors.
+
+    Register the methods as session runner callbacks:
+
+    ```py
+    pinner = SessionObjectPinner(tensors=tensors, conditioning=conditioning)
+    DefaultSessionRunner(
+        on_after_run_node_callbacks=[pinner.on_after_run_node],
+        on_node_error_callbacks=[pinner.on_node_error],
+        on_after_run_session_callbacks=[pinner.on_after_run_session],
+    )
+    ```
+    """
+
+    def __init__(self, tensors: ObjectSerializerBase[Any], conditioning: ObjectSerializerBase[Any]) -> None:
+        self._tensors = tensors
+        self._conditioning = conditioning
+
+    def on_after_run_node(
+        self, invocation: BaseInvocation, queue_item: SessionQueueItem, output: BaseInvocationOutput
+    ) -> None:
+        references = get_object_references(list(queue_item.session.get_pending_results().values()))
+        self._tensors.pin(queue_item.session_id, (name for kind, name in references if kind == "tensor"))
+        self._conditioning.pin(queue_item.session_id, (name for kind, name in references if kind == "conditioning"))
+
+    def on_node_error(
+        self,
+        invocation: BaseInvocation,
+        queue_item: SessionQueueItem,
+        error_type: str,
+        error_message: str,
+        error_traceback: str,
+    ) -> None:
+        self._unpin(queue_item)
+
+    def on_after_run_session(self, queue_item: SessionQueueItem) -> None:
+        self._unpin(queue_item)
+
+    def _unpin(self, queue_item: SessionQueueItem) -> None:
+        self._tensors.unpin(queue_item.session_id)
+        self._conditioning.unpin(queue_item.session_id)
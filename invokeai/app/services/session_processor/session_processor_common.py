@@ -1,5 +1,8 @@
+import io
+from typing import Optional
+
 from PIL.Image import Image as PILImageType
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from invokeai.backend.util.util import image_to_dataURL
 
@@ -20,14 +23,33 @@ class ProgressImage(BaseModel):
 
     width: int = Field(ge=1, description="The effective width of the image in pixels")
     height: int = Field(ge=1, description="The effective height of the image in pixels")
-    dataURL: str = Field(description="The image data as a b64 data URL")
+    dataURL: str = Field(
+        default="", description="The image data as a b64 data URL. Empty if the image is sent as binary data."
+    )
+    _binary_data: Optional[bytes] = PrivateAttr(default=None)
+
+    @property
+    def binary_data(self) -> Optional[bytes]:
+        """The image data as JPEG bytes, if the image is sent as a binary attachment instead of a data URL"""
+        return self._binary_data
 
     @classmethod
-    def build(cls, image: PILImageType, size: tuple[int, int] | None = None) -> "ProgressImage":
-        """Build a ProgressImage from a PIL image"""
-
-        return cls(
-            width=size[0] if size else image.width,
-            height=size[1] if size else image.height,
-            dataURL=image_to_dataURL(image, image_format="JPEG"),
-        )
+    def build(
+        cls, image: PILImageType, size: tuple[int, int] | None = None, as_binary: bool = False
+    ) -> "ProgressImage":
+        """Build a ProgressImage from a PIL image
+
+        If `as_binary` is set, the image is kept as JPEG bytes, to be sent as a binary socket.io attachment, instead of
+        being base64-encoded into a data URL.
+        """
+
+        width = size[0] if size else image.width
+        height = size[1] if size else image.height
+        if not as_binary:
+            return cls(width=width, height=height, dataURL=image_to_dataURL(image, image_format="JPEG"))
+
+        buffered = io.BytesIO()
+        image.save(buffered, format="JPEG")
+        progress_image = cls(width=width, height=height)
+        progress_image._binary_data = buffered.getvalue()
+        return progress_image
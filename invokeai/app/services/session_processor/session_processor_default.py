@@ -1,21 +1,34 @@
+import copy
 import gc
 import traceback
-from contextlib import suppress
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext, suppress
 from threading import BoundedSemaphore, Thread
 from threading import Event as ThreadEvent
-from typing import Optional
+from typing import Callable, Optional
 
-from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput
+import torch
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput, Bottleneck
 from invokeai.app.invocations.call_saved_workflow import CallSavedWorkflowInvocation
 from invokeai.app.services.events.events_common import (
     BatchEnqueuedEvent,
+    BatchEnqueueProgressEvent,
     FastAPIEvent,
     QueueClearedEvent,
+    QueueItemsRetriedEvent,
     QueueItemStatusChangedEvent,
     register_events,
 )
+from invokeai.app.services.events.events_progress import ProgressEventChannel
+from invokeai.app.services.image_files.image_files_common import ImageFileSaveException
+from invokeai.app.services.invocation_cache.invocation_cache_common import get_object_references
 from invokeai.app.services.invocation_stats.invocation_stats_common import GESStatsNotFoundError
 from invokeai.app.services.invoker import Invoker
+from invokeai.app.services.model_load.model_prefetch import get_upcoming_models
+from invokeai.app.services.model_manager.model_manager_base import ModelManagerServiceBase
+from invokeai.app.services.session_processor.session_checkpoints import SessionCheckpoints
 from invokeai.app.services.session_processor.session_processor_base import (
     InvocationServices,
     OnAfterRunNode,
@@ -33,9 +46,10 @@ from invokeai.app.services.session_processor.workflow_call_runtime import (
     WorkflowCallQueueLifecycle,
 )
 from invokeai.app.services.session_queue.session_queue_common import SessionQueueItem, SessionQueueItemNotFoundError
-from invokeai.app.services.shared.graph import NodeInputError
+from invokeai.app.services.shared.graph import GraphExecutionState, NodeInputError
 from invokeai.app.services.shared.invocation_context import InvocationContextData, build_invocation_context
 from invokeai.app.util.profiler import Profiler
+from invokeai.backend.util.devices import TorchDevice
 
 
 class DefaultSessionRunner(SessionRunnerBase):
@@ -65,86 +79,186 @@ class DefaultSessionRunner(SessionRunnerBase):
         self._on_after_run_session_callbacks = on_after_run_session_callbacks or []
         self.workflow_call_coordinator = WorkflowCallCoordinator(self)
         self.workflow_call_queue_lifecycle = WorkflowCallQueueLifecycle(self)
+        # The completed nodes of the queue item being run, if it was interrupted by a restart
+        self._checkpoints: Optional[SessionCheckpoints] = None
+        # Limits how often the progress events of the queue item being run are emitted
+        self._progress_channel: Optional[ProgressEventChannel] = None
+        # The images output by the queue item's nodes. Their files may still be being written in the background.
+        self._output_image_names: set[str] = set()
 
     def start(self, services: InvocationServices, cancel_event: ThreadEvent, profiler: Optional[Profiler] = None):
         self._services = services
         self._cancel_event = cancel_event
         self._profiler = profiler
+        # CPU-bound nodes run on these threads while the session's other nodes run on the worker's thread
+        cpu_node_threads = services.configuration.cpu_node_threads
+        self._cpu_node_executor = (
+            ThreadPoolExecutor(max_workers=cpu_node_threads, thread_name_prefix="session-cpu-node")
+            if cpu_node_threads > 0
+            else None
+        )
 
     def _is_canceled(self) -> bool:
         """Check if the cancel event is set. This is also passed to the invocation context builder and called during
         denoising to check if the session has been canceled."""
         return self._cancel_event.is_set()
 
+    def _get_next_node(self, queue_item: SessionQueueItem) -> Optional[BaseInvocation]:
+        """Gets the session's next ready node. If the node's inputs are invalid, the node errors and None is returned."""
+        try:
+            return queue_item.session.next()
+        # Anything other than a `NodeInputError` is handled as a processor error
+        except NodeInputError as e:
+            error_type = e.__class__.__name__
+            error_message = str(e)
+            error_traceback = traceback.format_exc()
+            self._on_node_error(
+                invocation=e.node,
+                queue_item=queue_item,
+                error_type=error_type,
+                error_message=error_message,
+                error_traceback=error_traceback,
+            )
+            return None
+
+    def _complete_from_checkpoint(self, invocation: BaseInvocation, queue_item: SessionQueueItem) -> bool:
+        """Completes a node with its checkpointed output, if it completed before the queue item was interrupted."""
+        output = self._checkpoints.get_output(queue_item.session, invocation) if self._checkpoints else None
+        if output is None:
+            return False
+        queue_item.session.complete(invocation.id, output)
+        return True
+
+    def _is_session_done(self, queue_item: SessionQueueItem) -> bool:
+        # The session is complete if all invocations have been run or there is an error on the session.
+        # At this time, the queue item may be canceled, but the object itself here won't be updated yet. We must
+        # use the cancel event to check if the session is canceled.
+        return (
+            queue_item.session.is_complete()
+            or self._is_canceled()
+            or queue_item.status in ["failed", "canceled", "completed"]
+        )
+
     def _run_session_loop(self, queue_item: SessionQueueItem) -> None:
         # Loop over invocations until the session is complete or canceled
         while True:
-            try:
-                invocation = queue_item.session.next()
-            # Anything other than a `NodeInputError` is handled as a processor error
-            except NodeInputError as e:
-                error_type = e.__class__.__name__
-                error_message = str(e)
-                error_traceback = traceback.format_exc()
-                self._on_node_error(
-                    invocation=e.node,
-                    queue_item=queue_item,
-                    error_type=error_type,
-                    error_message=error_message,
-                    error_traceback=error_traceback,
-                )
-                break
-
+            invocation = self._get_next_node(queue_item)
             if invocation is None or self._is_canceled():
                 break
 
-            self.run_node(invocation, queue_item)
+            if not self._complete_from_checkpoint(invocation, queue_item):
+                self.run_node(invocation, queue_item)
 
-            # The session is complete if all invocations have been run or there is an error on the session.
-            # At this time, the queue item may be canceled, but the object itself here won't be updated yet. We must
-            # use the cancel event to check if the session is canceled.
-            if (
-                queue_item.session.is_complete()
-                or self._is_canceled()
-                or queue_item.status in ["failed", "canceled", "completed"]
-            ):
+            if self._is_session_done(queue_item):
                 break
 
+    def _run_session_loop_with_cpu_nodes(self, queue_item: SessionQueueItem) -> None:
+        """Runs the session like `_run_session_loop`, except that CPU-bound nodes run on the CPU node threads.
+
+        Other nodes run on this thread, one at a time, while the CPU-bound nodes run. The outputs of the CPU-bound nodes
+        are recorded on this thread in the order the nodes started, once no other node is ready. This way, the order in
+        which the session's nodes are prepared and their outputs recorded does not depend on how long each node takes.
+        """
+        assert self._cpu_node_executor is not None
+        # The CPU node threads do not inherit the worker's execution device, so it is selected for each node
+        device = TorchDevice.get_thread_device()
+        running: deque[tuple[BaseInvocation, Future[Optional[BaseInvocationOutput]]]] = deque()
+        try:
+            while True:
+                invocation = self._get_next_node(queue_item)
+                if self._is_session_done(queue_item):
+                    break
+
+                if invocation is None:
+                    if not running:
+                        break
+                    # No node is ready until a running node completes - record the output of the first one to start
+                    invocation, future = running.popleft()
+                    self._finish_node(invocation, queue_item, future.result)
+                elif not self._complete_from_checkpoint(invocation, queue_item):
+                    if invocation.bottleneck is Bottleneck.CPU:
+                        future = self._cpu_node_executor.submit(
+                            self._invoke_node_on_device, device, invocation, queue_item
+                        )
+                        running.append((invocation, future))
+                        # Start every ready node before waiting on any of them
+                        continue
+                    self.run_node(invocation, queue_item)
+
+                if self._is_session_done(queue_item):
+                    break
+        finally:
+            # The nodes still running use the queue item - wait for them before moving on, but discard their outputs
+            wait([future for _, future in running])
+
     def run(self, queue_item: SessionQueueItem):
         # Exceptions raised outside `run_node` are handled by the processor. There is no need to catch them here.
 
         self._on_before_run_session(queue_item=queue_item)
-        self._run_session_loop(queue_item)
+        if self._cpu_node_executor is None:
+            self._run_session_loop(queue_item)
+        else:
+            self._run_session_loop_with_cpu_nodes(queue_item)
         self._on_after_run_session(queue_item=queue_item)
 
     def run_node(self, invocation: BaseInvocation, queue_item: SessionQueueItem):
+        self._finish_node(invocation, queue_item, lambda: self._invoke_node(invocation, queue_item))
+
+    def _invoke_node_on_device(
+        self, device: Optional[torch.device], invocation: BaseInvocation, queue_item: SessionQueueItem
+    ) -> Optional[BaseInvocationOutput]:
+        """Invokes a node on the given execution device, or on the configured device if None."""
+        with TorchDevice.use_device(device) if device is not None else nullcontext():
+            return self._invoke_node(invocation, queue_item)
+
+    def _invoke_node(self, invocation: BaseInvocation, queue_item: SessionQueueItem) -> Optional[BaseInvocationOutput]:
+        """Invokes a node and returns its output, or None if the node started a workflow call.
+
+        This does not change the session, so that CPU-bound nodes can be invoked on the CPU node threads.
+        """
+        with self._services.performance_statistics.collect_stats(invocation, queue_item.session_id):
+            self._on_before_run_node(invocation, queue_item)
+
+            data = InvocationContextData(
+                invocation=invocation,
+                source_invocation_id=queue_item.session.prepared_source_mapping[invocation.id],
+                queue_item=queue_item,
+                progress_channel=self._progress_channel,
+            )
+            context = build_invocation_context(
+                data=data,
+                services=self._services,
+                is_canceled=self._is_canceled,
+            )
+
+            if isinstance(invocation, CallSavedWorkflowInvocation):
+                workflow_record = invocation.validate_selected_workflow(context)
+                self.workflow_call_coordinator.begin_workflow_call_boundary(invocation, queue_item, workflow_record)
+                return None
+
+            # Invoke the node
+            return invocation.invoke_internal(context=context, services=self._services)
+
+    def _finish_node(
+        self,
+        invocation: BaseInvocation,
+        queue_item: SessionQueueItem,
+        get_output: Callable[[], Optional[BaseInvocationOutput]],
+    ) -> None:
+        """Gets a node's output, by invoking it or waiting for it, and records it in the session."""
         try:
             # Any unhandled exception in this scope is an invocation error & will fail the graph
-            with self._services.performance_statistics.collect_stats(invocation, queue_item.session_id):
-                self._on_before_run_node(invocation, queue_item)
+            output = get_output()
+            if output is None:
+                return
 
-                data = InvocationContextData(
-                    invocation=invocation,
-                    source_invocation_id=queue_item.session.prepared_source_mapping[invocation.id],
-                    queue_item=queue_item,
-                )
-                context = build_invocation_context(
-                    data=data,
-                    services=self._services,
-                    is_canceled=self._is_canceled,
-                )
+            self._output_image_names.update(name for kind, name in get_object_references(output) if kind == "image")
 
-                if isinstance(invocation, CallSavedWorkflowInvocation):
-                    workflow_record = invocation.validate_selected_workflow(context)
-                    self.workflow_call_coordinator.begin_workflow_call_boundary(invocation, queue_item, workflow_record)
-                    return
+            # Save output and history
+            queue_item.session.complete(invocation.id, output)
+            self._save_checkpoint(invocation, queue_item, output)
 
-                # Invoke the node
-                output = invocation.invoke_internal(context=context, services=self._services)
-                # Save output and history
-                queue_item.session.complete(invocation.id, output)
-
-                self._on_after_run_node(invocation, queue_item, output)
+            self._on_after_run_node(invocation, queue_item, output)
 
         except CanceledException:
             # A CanceledException is raised during the denoising step callback if the cancel event is set. We don't need
@@ -166,9 +280,58 @@ class DefaultSessionRunner(SessionRunnerBase):
                 error_traceback=error_traceback,
             )
 
+    def _save_checkpoint(
+        self, invocation: BaseInvocation, queue_item: SessionQueueItem, output: BaseInvocationOutput
+    ) -> None:
+        """Records a completed node, so that the queue item can resume from it if it is interrupted."""
+        if not self._services.configuration.resume_interrupted_sessions:
+            return
+        try:
+            self._services.session_queue.add_checkpoint(
+                item_id=queue_item.item_id,
+                node_id=invocation.id,
+                source_node_id=queue_item.session.prepared_source_mapping[invocation.id],
+                iteration_path=queue_item.session.get_iteration_path(invocation.id),
+                output=output.model_dump_json(warnings=False),
+            )
+        except Exception as e:
+            # Checkpoints are only needed if the queue item is interrupted - the session can continue without them
+            self._services.logger.warning(
+                f"Failed to checkpoint node {invocation.id} of queue item {queue_item.item_id}: {e}"
+            )
+
+    def _load_checkpoints(self, queue_item: SessionQueueItem) -> Optional[SessionCheckpoints]:
+        """Loads the nodes the queue item completed before it was interrupted, if any."""
+        if not self._services.configuration.resume_interrupted_sessions:
+            return None
+        checkpoints = self._services.session_queue.get_checkpoints(queue_item.item_id)
+        if not checkpoints:
+            return None
+        self._services.logger.info(
+            f"Resuming queue item {queue_item.item_id} from {len(checkpoints)} checkpointed nodes"
+        )
+        return SessionCheckpoints(queue_item.session, checkpoints, image_exists=self._image_file_exists)
+
+    def _wait_for_image_writes(self, image_names: set[str]) -> None:
+        """Waits until the files of the given images have been written.
+
+        :raises ImageFileSaveException: if any of the files could not be written
+        """
+        for image_name in sorted(image_names):
+            self._services.images.wait_for_write(image_name)
+
+    def _image_file_exists(self, image_name: str) -> bool:
+        """Whether an image's file was written, e.g. before a crash interrupted its background write."""
+        try:
+            return self._services.images.validate_path(self._services.images.get_path(image_name))
+        except Exception:
+            return False
+
     def _on_before_run_session(self, queue_item: SessionQueueItem) -> None:
         """Called before a session is run.
 
+        - Load the queue item's checkpoints, if it was interrupted by a restart.
+        - Open the queue item's progress event channel.
         - Start the profiler if profiling is enabled.
         - Run any callbacks registered for this event.
         """
@@ -177,6 +340,9 @@ class DefaultSessionRunner(SessionRunnerBase):
             f"On before run session: queue item {queue_item.item_id}, session {queue_item.session_id}"
         )
 
+        self._checkpoints = self._load_checkpoints(queue_item)
+        self._progress_channel = ProgressEventChannel(self._services.configuration.progress_events_per_second)
+
         # If profiling is enabled, start the profiler
         if self._profiler is not None:
             self._profiler.start(profile_id=queue_item.session_id)
@@ -188,8 +354,10 @@ class DefaultSessionRunner(SessionRunnerBase):
         """Called after a session is run.
 
         - Stop the profiler if profiling is enabled.
+        - Release the queue item's checkpoints and progress event channel.
         - Update the queue item's session object in the database.
-        - If not already canceled or failed, complete the queue item.
+        - If not already canceled or failed, wait for the output images to be written and complete the queue item.
+          If an image could not be written, fail the queue item instead.
         - Log and reset performance statistics.
         - Run any callbacks registered for this event.
         """
@@ -198,6 +366,10 @@ class DefaultSessionRunner(SessionRunnerBase):
             f"On after run session: queue item {queue_item.item_id}, session {queue_item.session_id}"
         )
 
+        self._checkpoints = None
+        self._progress_channel = None
+        output_image_names, self._output_image_names = self._output_image_names, set()
+
         # If we are profiling, stop the profiler and dump the profile & stats
         if self._profiler is not None:
             profile_path = self._profiler.stop()
@@ -215,7 +387,15 @@ class DefaultSessionRunner(SessionRunnerBase):
             # The queue item may have been canceled or failed while the session was running. We should only complete it
             # if it is not already canceled or failed.
             if queue_item.status not in ["canceled", "failed"] and queue_item.session.is_complete():
-                queue_item = self._services.session_queue.complete_queue_item(queue_item.item_id)
+                try:
+                    self._wait_for_image_writes(output_image_names)
+                except ImageFileSaveException as e:
+                    self._services.logger.error(f"Error while writing images of queue item {queue_item.item_id}: {e}")
+                    queue_item = self._services.session_queue.fail_queue_item(
+                        queue_item.item_id, e.__class__.__name__, str(e), traceback.format_exc()
+                    )
+                else:
+                    queue_item = self._services.session_queue.complete_queue_item(queue_item.item_id)
 
             # We'll get a GESStatsNotFoundError if we try to log stats for an untracked graph, but in the processor
             # we don't care about that - suppress the error.
@@ -318,6 +498,36 @@ class DefaultSessionRunner(SessionRunnerBase):
             )
 
 
+class SessionProcessorWorker:
+    """A session processor worker, which runs one queue item at a time on its own thread.
+
+    Each worker has its own session runner and cancel event. A worker with a `device` runs its invocations on that
+    device instead of the configured one, and a worker with a `model_manager` loads models into that manager's cache
+    instead of the app's model cache.
+    """
+
+    def __init__(
+        self,
+        session_runner: SessionRunnerBase,
+        worker_id: Optional[str] = None,
+        device: Optional[torch.device] = None,
+        model_manager: Optional[ModelManagerServiceBase] = None,
+    ) -> None:
+        """
+        Args:
+            session_runner: The session runner used by this worker. Each worker needs its own runner.
+            worker_id: Identifies the worker on the queue items it dequeues, and in their events.
+            device: The execution device for the worker's invocations. Omit to use the configured device.
+            model_manager: The model manager for the worker's invocations. Omit to use the app's model manager.
+        """
+        self.session_runner = session_runner
+        self.worker_id = worker_id
+        self.device = device
+        self.model_manager = model_manager
+        self.cancel_event = ThreadEvent()
+        self.queue_item: Optional[SessionQueueItem] = None
+
+
 class DefaultSessionProcessor(SessionProcessorBase):
     def __init__(
         self,
@@ -325,56 +535,93 @@ class DefaultSessionProcessor(SessionProcessorBase):
         on_non_fatal_processor_error_callbacks: Optional[list[OnNonFatalProcessorError]] = None,
         thread_limit: int = 1,
         polling_interval: int = 1,
+        workers: Optional[list[SessionProcessorWorker]] = None,
     ) -> None:
+        """
+        Args:
+            session_runner: The session runner for the single worker, used if `workers` is omitted.
+            on_non_fatal_processor_error_callbacks: Callbacks to run when a non-fatal processor error occurs.
+            thread_limit: The maximum number of processor threads. Raised to the number of workers if lower.
+            polling_interval: How often to check the queue for new items, in seconds.
+            workers: The workers that run queue items concurrently. Omit to run a single worker.
+        """
         super().__init__()
 
-        self.session_runner = session_runner if session_runner else DefaultSessionRunner()
+        self._workers = workers or [
+            SessionProcessorWorker(session_runner=session_runner if session_runner else DefaultSessionRunner())
+        ]
+        self.session_runner = self._workers[0].session_runner
         self.workflow_call_queue_lifecycle = self.session_runner.workflow_call_queue_lifecycle
         self._on_non_fatal_processor_error_callbacks = on_non_fatal_processor_error_callbacks or []
-        self._thread_limit = thread_limit
+        self._thread_limit = max(thread_limit, len(self._workers))
         self._polling_interval = polling_interval
 
     def start(self, invoker: Invoker) -> None:
         self._invoker: Invoker = invoker
-        self._queue_item: Optional[SessionQueueItem] = None
         self._invocation: Optional[BaseInvocation] = None
 
         self._resume_event = ThreadEvent()
         self._stop_event = ThreadEvent()
         self._poll_now_event = ThreadEvent()
-        self._cancel_event = ThreadEvent()
+        self._resume_event.set()
 
         register_events(QueueClearedEvent, self._on_queue_cleared)
         register_events(BatchEnqueuedEvent, self._on_batch_enqueued)
+        # Large batches are enqueued in chunks - start on the first chunk rather than waiting for the whole batch
+        register_events(BatchEnqueueProgressEvent, self._on_batch_enqueued)
         register_events(QueueItemStatusChangedEvent, self._on_queue_item_status_changed)
+        register_events(QueueItemsRetriedEvent, self._on_queue_items_retried)
 
         self._thread_semaphore = BoundedSemaphore(self._thread_limit)
 
-        # If profiling is enabled, create a profiler. The same profiler will be used for all sessions. Internally,
-        # the profiler will create a new profile for each session.
-        self._profiler = (
-            Profiler(
-                logger=self._invoker.services.logger,
-                output_dir=self._invoker.services.configuration.profiles_path,
-                prefix=self._invoker.services.configuration.profile_prefix,
-            )
-            if self._invoker.services.configuration.profile_graphs
+        # While a queue item runs, the next items are prepared in the background so that they can start without delay.
+        self._prefetch_depth = self._invoker.services.configuration.queue_prefetch_depth
+        self._prefetch_executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-prefetch")
+            if self._prefetch_depth > 0
             else None
         )
+        self._prefetch_future: Optional[Future[None]] = None
+
+        self._threads: list[Thread] = []
+        for worker in self._workers:
+            services = invoker.services
+            if worker.model_manager is not None:
+                worker_load = worker.model_manager.load
+                if hasattr(worker_load, "start"):
+                    worker_load.start(invoker)
+                # The worker's invocations get the same services as everything else, except for the model manager
+                services = copy.copy(invoker.services)
+                services.model_manager = worker.model_manager
+
+            # If profiling is enabled, create a profiler for the worker. The same profiler will be used for all of the
+            # worker's sessions. Internally, the profiler will create a new profile for each session.
+            profiler = (
+                Profiler(
+                    logger=self._invoker.services.logger,
+                    output_dir=self._invoker.services.configuration.profiles_path,
+                    prefix=self._invoker.services.configuration.profile_prefix,
+                )
+                if self._invoker.services.configuration.profile_graphs
+                else None
+            )
 
-        self.session_runner.start(services=invoker.services, cancel_event=self._cancel_event, profiler=self._profiler)
-        self._thread = Thread(
-            name="session_processor",
-            target=self._process,
-            daemon=True,
-            kwargs={
-                "stop_event": self._stop_event,
-                "poll_now_event": self._poll_now_event,
-                "resume_event": self._resume_event,
-                "cancel_event": self._cancel_event,
-            },
-        )
-        self._thread.start()
+            worker.session_runner.start(services=services, cancel_event=worker.cancel_event, profiler=profiler)
+            thread = Thread(
+                name="session_processor" if worker.worker_id is None else f"session_processor_{worker.worker_id}",
+                target=self._process,
+                daemon=True,
+                kwargs={
+                    "worker": worker,
+                    "stop_event": self._stop_event,
+                    "poll_now_event": self._poll_now_event,
+                    "resume_event": self._resume_event,
+                },
+            )
+            self._threads.append(thread)
+
+        for thread in self._threads:
+            thread.start()
 
     def stop(self, *args, **kwargs) -> None:
         self._stop_event.set()
@@ -382,36 +629,96 @@ class DefaultSessionProcessor(SessionProcessorBase):
         # the next step boundary instead of running to completion. Without this, the generation
         # thread may still be executing CUDA operations when Python teardown begins, which can
         # cause a C++ std::terminate() crash ("terminate called without an active exception").
-        self._cancel_event.set()
-        # Wake the thread if it is sleeping in poll_now_event.wait() or blocked in resume_event.wait() (paused).
+        for worker in self._workers:
+            worker.cancel_event.set()
+        # Wake the threads if they are sleeping in poll_now_event.wait() or blocked in resume_event.wait() (paused).
         self._poll_now_event.set()
         self._resume_event.set()
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+        for worker in self._workers:
+            # Shutdown the workers' model caches to cancel any pending timers. The app's model cache is shut down by
+            # the model manager service.
+            if worker.model_manager is not None and hasattr(worker.model_manager.load, "ram_cache"):
+                worker.model_manager.load.ram_cache.shutdown()
 
     def _poll_now(self) -> None:
         self._poll_now_event.set()
 
+    def _start_prefetch(self) -> None:
+        """Prepares the next pending queue items in the background, unless that is disabled or already underway."""
+        if self._prefetch_executor is None:
+            return
+        if self._prefetch_future is not None and not self._prefetch_future.done():
+            return
+        with suppress(RuntimeError):
+            # The executor refuses new work once the processor is stopping
+            self._prefetch_future = self._prefetch_executor.submit(self._prefetch)
+
+    def _prefetch(self) -> None:
+        try:
+            upcoming_sessions = self._invoker.services.session_queue.prefetch(self._prefetch_depth)
+        except Exception as e:
+            # Prefetching is only an optimization - the items are prepared again when they are dequeued
+            self._invoker.services.logger.warning(f"Failed to prefetch queue items: {e}")
+            return
+        configuration = self._invoker.services.configuration
+        if configuration.prefetch_models or configuration.model_cache_eviction_policy == "lookahead":
+            self._prefetch_models(upcoming_sessions)
+
+    def _prefetch_models(self, upcoming_sessions: list[GraphExecutionState]) -> None:
+        """Tells the model cache which models the running sessions' remaining nodes, then the upcoming sessions, will
+        use, and loads them into the model cache if model prefetching is enabled.
+
+        Models are not prefetched when workers have their own model managers, as it is not known which worker will run
+        an upcoming item.
+        """
+        if any(worker.model_manager is not None for worker in self._workers):
+            return
+        running_sessions = [worker.queue_item.session for worker in self._workers if worker.queue_item is not None]
+        model_manager = self._invoker.services.model_manager
+        try:
+            models = get_upcoming_models([*running_sessions, *upcoming_sessions], model_manager.store)
+            model_manager.load.set_upcoming_models(models)
+            if self._invoker.services.configuration.prefetch_models:
+                model_manager.load.prefetch_models(models)
+        except Exception as e:
+            # Models that were not prefetched are loaded when they are used
+            self._invoker.services.logger.warning(f"Failed to prefetch models: {e}")
+
     async def _on_queue_cleared(self, event: FastAPIEvent[QueueClearedEvent]) -> None:
-        if self._queue_item and self._queue_item.queue_id == event[1].queue_id:
-            self._cancel_event.set()
-            self._poll_now()
+        for worker in self._workers:
+            if worker.queue_item and worker.queue_item.queue_id == event[1].queue_id:
+                worker.cancel_event.set()
+                self._poll_now()
+
+    async def _on_batch_enqueued(self, event: FastAPIEvent[BatchEnqueuedEvent | BatchEnqueueProgressEvent]) -> None:
+        self._poll_now()
 
-    async def _on_batch_enqueued(self, event: FastAPIEvent[BatchEnqueuedEvent]) -> None:
+    async def _on_queue_items_retried(self, event: FastAPIEvent[QueueItemsRetriedEvent]) -> None:
         self._poll_now()
 
     async def _on_queue_item_status_changed(self, event: FastAPIEvent[QueueItemStatusChangedEvent]) -> None:
-        # Make sure the cancel event is for the currently processing queue item
-        if self._queue_item and self._queue_item.item_id != event[1].item_id:
+        if event[1].status == "pending":
+            # A queue item was added or resumed - e.g. a child workflow call, or its parent when the child finishes
+            self._poll_now()
+            return
+        if event[1].status not in ["completed", "failed", "canceled"]:
             return
-        if self._queue_item and event[1].status in ["completed", "failed", "canceled"]:
+        for worker in self._workers:
+            # Make sure the cancel event is for the queue item this worker is processing
+            if worker.queue_item is None or worker.queue_item.item_id != event[1].item_id:
+                continue
             # When the queue item is canceled via HTTP, the queue item status is set to `"canceled"` and this event is
-            # emitted. We need to respond to this event and stop graph execution. This is done by setting the cancel
-            # event, which the session runner checks between invocations. If set, the session runner loop is broken.
+            # emitted. We need to respond to this event and stop graph execution. This is done by setting the worker's
+            # cancel event, which its session runner checks between invocations. If set, the session runner loop is
+            # broken.
             #
             # Long-running nodes that cannot be interrupted easily present a challenge. `denoise_latents` is one such
             # node, but it gets a step callback, called on each step of denoising. This callback checks if the queue item
             # is canceled, and if it is, raises a `CanceledException` to stop execution immediately.
             if event[1].status == "canceled":
-                self._cancel_event.set()
+                worker.cancel_event.set()
             self._poll_now()
 
     def resume(self) -> SessionProcessorStatus:
@@ -427,7 +734,7 @@ class DefaultSessionProcessor(SessionProcessorBase):
     def get_status(self) -> SessionProcessorStatus:
         return SessionProcessorStatus(
             is_started=self._resume_event.is_set(),
-            is_processing=self._queue_item is not None,
+            is_processing=any(worker.queue_item is not None for worker in self._workers),
         )
 
     def _is_image_move_maintenance_active(self) -> bool:
@@ -436,17 +743,15 @@ class DefaultSessionProcessor(SessionProcessorBase):
 
     def _process(
         self,
+        worker: SessionProcessorWorker,
         stop_event: ThreadEvent,
         poll_now_event: ThreadEvent,
         resume_event: ThreadEvent,
-        cancel_event: ThreadEvent,
     ):
         try:
-            # Any unhandled exception in this block is a fatal processor error and will stop the processor.
+            # Any unhandled exception in this block is a fatal processor error and will stop the worker.
             self._thread_semaphore.acquire()
-            stop_event.clear()
-            resume_event.set()
-            cancel_event.clear()
+            worker.cancel_event.clear()
 
             while not stop_event.is_set():
                 poll_now_event.clear()
@@ -461,9 +766,9 @@ class DefaultSessionProcessor(SessionProcessorBase):
                         continue
 
                     # Get the next session to process
-                    self._queue_item = self._invoker.services.session_queue.dequeue()
+                    worker.queue_item = self._invoker.services.session_queue.dequeue(worker_id=worker.worker_id)
 
-                    if self._queue_item is None:
+                    if worker.queue_item is None:
                         # The queue was empty, wait for next polling interval or event to try again
                         self._invoker.services.logger.debug("Waiting for next polling interval or event")
                         poll_now_event.wait(self._polling_interval)
@@ -475,20 +780,23 @@ class DefaultSessionProcessor(SessionProcessorBase):
                     # allocation is well worth it.
                     gc.collect()
 
+                    worker_info = f" on worker {worker.worker_id}" if worker.worker_id is not None else ""
                     self._invoker.services.logger.info(
-                        f"Executing queue item {self._queue_item.item_id}, session {self._queue_item.session_id}"
+                        f"Executing queue item {worker.queue_item.item_id}, session {worker.queue_item.session_id}{worker_info}"
                     )
-                    cancel_event.clear()
+                    worker.cancel_event.clear()
+                    self._start_prefetch()
 
                     # Run the graph
-                    self.workflow_call_queue_lifecycle.run_queue_item(self._queue_item)
+                    with TorchDevice.use_device(worker.device) if worker.device is not None else nullcontext():
+                        worker.session_runner.workflow_call_queue_lifecycle.run_queue_item(worker.queue_item)
 
                 except Exception as e:
                     error_type = e.__class__.__name__
                     error_message = str(e)
                     error_traceback = traceback.format_exc()
                     self._on_non_fatal_processor_error(
-                        queue_item=self._queue_item,
+                        queue_item=worker.queue_item,
                         error_type=error_type,
                         error_message=error_message,
                         error_traceback=error_traceback,
@@ -505,9 +813,7 @@ class DefaultSessionProcessor(SessionProcessorBase):
             self._invoker.services.logger.error(error_traceback)
             pass
         finally:
-            stop_event.clear()
-            poll_now_event.clear()
-            self._queue_item = None
+            worker.queue_item = None
             self._thread_semaphore.release()
 
     def _on_non_fatal_processor_error(
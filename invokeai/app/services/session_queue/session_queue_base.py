@@ -21,6 +21,7 @@ from invokeai.app.services.session_queue.session_queue_common import (
     RetryItemsResult,
     SessionQueueCountsByDestination,
     SessionQueueItem,
+    SessionQueueItemCheckpoint,
     SessionQueueStatus,
 )
 from invokeai.app.services.shared.graph import GraphExecutionState
@@ -32,8 +33,16 @@ class SessionQueueBase(ABC):
     """Base class for session queue"""
 
     @abstractmethod
-    def dequeue(self) -> Optional[SessionQueueItem]:
-        """Dequeues the next session queue item."""
+    def dequeue(self, worker_id: Optional[str] = None) -> Optional[SessionQueueItem]:
+        """Dequeues the next session queue item. The item is claimed atomically, so concurrent calls never dequeue the
+        same item. If given, `worker_id` is recorded on the item to identify the session processor worker running it."""
+        pass
+
+    @abstractmethod
+    def prefetch(self, count: int) -> list[GraphExecutionState]:
+        """Prepares up to `count` of the next pending session queue items, so that they can be dequeued without delay.
+        The items are not dequeued - they stay pending, in the same order, and can still be canceled.
+        Returns the sessions of the prepared items, in queue order. They must not be modified."""
         pass
 
     @abstractmethod
@@ -228,6 +237,21 @@ class SessionQueueBase(ABC):
         """Sets the session for a session queue item. Use this to update the session state."""
         pass
 
+    @abstractmethod
+    def add_checkpoint(
+        self, item_id: int, node_id: str, source_node_id: str, iteration_path: tuple[int, ...], output: str
+    ) -> None:
+        """Records that a node of a queue item's session completed with the given output, serialized as JSON.
+
+        Unlike `set_queue_item_session`, this only writes the completed node, so its cost does not grow with the
+        session. A queue item that is interrupted by a restart resumes from its checkpoints."""
+        pass
+
+    @abstractmethod
+    def get_checkpoints(self, item_id: int) -> list[SessionQueueItemCheckpoint]:
+        """Gets the checkpoints of a queue item, oldest first."""
+        pass
+
     @abstractmethod
     def enqueue_workflow_call_child(
         self,
@@ -1,7 +1,7 @@
 import datetime
 import json
 from itertools import chain, product
-from typing import Generator, Literal, Optional, TypeAlias, Union
+from typing import Generator, Iterable, Literal, Optional, TypeAlias, Union
 
 from pydantic import (
     AliasChoices,
@@ -196,6 +196,9 @@ GraphExecutionStateValidator = TypeAdapter(GraphExecutionState)
 
 def get_session(queue_item_dict: dict) -> GraphExecutionState:
     session_raw = queue_item_dict.get("session", "{}")
+    if isinstance(session_raw, GraphExecutionState):
+        # Already parsed, e.g. by `SessionQueueBase.prefetch`
+        return session_raw
     session = GraphExecutionStateValidator.validate_json(session_raw, strict=False)
     return session
 
@@ -278,6 +281,9 @@ class SessionQueueItem(BaseModel):
     workflow_call_depth: Optional[int] = Field(
         default=None, description="The 1-based workflow-call depth for this queue item when it is a child execution."
     )
+    worker_id: Optional[str] = Field(
+        default=None, description="The ID of the session processor worker that dequeued this queue item, if any."
+    )
     session: GraphExecutionState = Field(description="The fully-populated session to be executed")
     workflow: Optional[WorkflowWithoutID] = Field(
         default=None, description="The workflow associated with this queue item"
@@ -309,6 +315,18 @@ class SessionQueueItem(BaseModel):
     )
 
 
+class SessionQueueItemCheckpoint(BaseModel):
+    """A completed node of a queue item's session, recorded so that the session can resume after a restart."""
+
+    node_id: str = Field(description="The ID of the prepared node that completed")
+    source_node_id: str = Field(description="The ID of the node in the session's graph that the node was prepared from")
+    iteration_path: tuple[int, ...] = Field(
+        description="The indices of the iterations the node belongs to, outermost first"
+    )
+    output: str = Field(description="The output of the node, serialized as JSON")
+    created_at: Union[datetime.datetime, str] = Field(description="When the node completed")
+
+
 # endregion Queue Items
 
 # region Query Results
@@ -472,23 +490,6 @@ def create_session_nfv_tuples(batch: Batch, maximum: int) -> Generator[tuple[str
 
     # TODO: Should this be a class method on Batch?
 
-    data: list[list[tuple[dict]]] = []
-    batch_data_collection = batch.data if batch.data is not None else []
-
-    for batch_datum_list in batch_data_collection:
-        node_field_values_to_zip: list[list[dict]] = []
-        # Expand each BatchDatum into a list of dicts - one for each item in the BatchDatum
-        for batch_datum in batch_datum_list:
-            node_field_values = [
-                # Note: A tuple here is slightly faster than a dict, but we need the object in dict form to be inserted
-                # in the session_queue table anyways. So, overall creating NFVs as dicts is faster.
-                {"node_path": batch_datum.node_path, "field_name": batch_datum.field_name, "value": item}
-                for item in batch_datum.items
-            ]
-            node_field_values_to_zip.append(node_field_values)
-        # Zip the dicts together to create a list of dicts for each permutation
-        data.append(list(zip(*node_field_values_to_zip, strict=True)))  # type: ignore [arg-type]
-
     # We serialize the graph and session once, then mutate the graph dict in place for each session.
     #
     # This sounds scary, but it's actually fine.
@@ -533,6 +534,51 @@ def create_session_nfv_tuples(batch: Batch, maximum: int) -> Generator[tuple[str
     session_dict = GraphExecutionState(graph=Graph()).model_dump(warnings=False, exclude_none=True)
 
     # Now we can create a generator that yields the session_id, session_json, and field_values_json for each session.
+    for flat_node_field_values in _get_node_field_values(batch, maximum):
+        # Need a fresh ID for each session
+        session_id = uuid_string()
+
+        # Mutate the session dict in place
+        session_dict["id"] = session_id
+
+        # Substitute the values into the graph
+        for nfv in flat_node_field_values:
+            graph_as_dict["nodes"][nfv["node_path"]][nfv["field_name"]] = nfv["value"]
+
+        # Mutate the session dict in place
+        session_dict["graph"] = graph_as_dict
+
+        # Serialize the session and field values
+        # Note the use of pydantic's to_jsonable_python to handle serialization of any python object, including sets.
+        session_json = json.dumps(session_dict, default=to_jsonable_python)
+        field_values_json = json.dumps(flat_node_field_values, default=to_jsonable_python)
+
+        # Yield the session_id, session_json, and field_values_json
+        yield (session_id, session_json, field_values_json)
+
+
+def _get_node_field_values(batch: Batch, maximum: int) -> Generator[list[dict], None, None]:
+    """
+    Given a batch and a maximum number of sessions to create, generate the list of node-field-value dicts to substitute
+    into the batch's graph for each session. See `create_session_nfv_tuples()` for an explanation of the permutations.
+    """
+    data: list[list[tuple[dict]]] = []
+    batch_data_collection = batch.data if batch.data is not None else []
+
+    for batch_datum_list in batch_data_collection:
+        node_field_values_to_zip: list[list[dict]] = []
+        # Expand each BatchDatum into a list of dicts - one for each item in the BatchDatum
+        for batch_datum in batch_datum_list:
+            node_field_values = [
+                # Note: A tuple here is slightly faster than a dict, but we need the object in dict form to be inserted
+                # in the session_queue table anyways. So, overall creating NFVs as dicts is faster.
+                {"node_path": batch_datum.node_path, "field_name": batch_datum.field_name, "value": item}
+                for item in batch_datum.items
+            ]
+            node_field_values_to_zip.append(node_field_values)
+        # Zip the dicts together to create a list of dicts for each permutation
+        data.append(list(zip(*node_field_values_to_zip, strict=True)))  # type: ignore [arg-type]
+
     count = 0
 
     # Each batch may have multiple runs, so we need to generate the same number of sessions for each run. The total is
@@ -545,31 +591,54 @@ def create_session_nfv_tuples(batch: Batch, maximum: int) -> Generator[tuple[str
 
             # Flatten the list of lists of dicts into a single list of dicts
             # TODO(psyche): Is the a more efficient way to do this?
-            flat_node_field_values = list(chain.from_iterable(d))
+            yield list(chain.from_iterable(d))
 
-            # Need a fresh ID for each session
-            session_id = uuid_string()
+            # Increment the count so we know when to stop
+            count += 1
 
-            # Mutate the session dict in place
-            session_dict["id"] = session_id
 
-            # Substitute the values into the graph
-            for nfv in flat_node_field_values:
-                graph_as_dict["nodes"][nfv["node_path"]][nfv["field_name"]] = nfv["value"]
+def create_batch_template(batch: Batch) -> tuple[str, str | None]:
+    """
+    Serializes the session and workflow that are shared by every session in the batch.
 
-            # Mutate the session dict in place
-            session_dict["graph"] = graph_as_dict
+    The session's graph has the batch's own values in the fields that the batch substitutes. These are overwritten by
+    each queue item's field values when the session is materialized with `materialize_session()`.
 
-            # Serialize the session and field values
-            # Note the use of pydantic's to_jsonable_python to handle serialization of any python object, including sets.
-            session_json = json.dumps(session_dict, default=to_jsonable_python)
-            field_values_json = json.dumps(flat_node_field_values, default=to_jsonable_python)
+    Returns:
+        A tuple of the session template (as stringified JSON) and the workflow (optional, as stringified JSON).
+    """
+    session_dict = GraphExecutionState(graph=Graph()).model_dump(warnings=False, exclude_none=True)
+    session_dict["graph"] = batch.graph.model_dump(warnings=False, exclude_none=True)
+    session_json = json.dumps(session_dict, default=to_jsonable_python)
+    workflow_json = json.dumps(batch.workflow, default=to_jsonable_python) if batch.workflow else None
+    return session_json, workflow_json
 
-            # Yield the session_id, session_json, and field_values_json
-            yield (session_id, session_json, field_values_json)
 
-            # Increment the count so we know when to stop
-            count += 1
+def create_session_field_values(batch: Batch, maximum: int) -> Generator[tuple[str, str], None, None]:
+    """
+    Given a batch and a maximum number of sessions to create, generate a tuple of session_id and field_values_json for
+    each session. Together with the batch template from `create_batch_template()`, this is enough to materialize each
+    session, without serializing the whole session for each of them.
+    """
+    for flat_node_field_values in _get_node_field_values(batch, maximum):
+        yield (uuid_string(), json.dumps(flat_node_field_values, default=to_jsonable_python))
+
+
+def materialize_session(session_template: str, session_id: str, field_values: str | None) -> GraphExecutionState:
+    """
+    Builds a queue item's session from its batch's session template and its own field values.
+
+    Args:
+        session_template: The batch's session template (as stringified JSON), from `create_batch_template()`
+        session_id: The ID of the queue item's session
+        field_values: The queue item's field values (optional, as stringified JSON)
+    """
+    session_dict = json.loads(session_template)
+    session_dict["id"] = session_id
+    nodes = session_dict["graph"]["nodes"]
+    for nfv in json.loads(field_values) if field_values is not None else []:
+        nodes[nfv["node_path"]][nfv["field_name"]] = nfv["value"]
+    return GraphExecutionStateValidator.validate_python(session_dict, strict=False)
 
 
 def calc_session_count(batch: Batch) -> int:
@@ -590,14 +659,19 @@ def calc_session_count(batch: Batch) -> int:
     return session_count
 
 
+FROM_BATCH_TEMPLATE = ""
+"""Stored in a queue item's `session` or `workflow` column when the value is stored once for the whole batch, in the
+`session_queue_batch_templates` table. The session is materialized from the template and the item's field values."""
+
+
 ValueToInsertTuple: TypeAlias = tuple[
     str,  # queue_id
-    str,  # session (as stringified JSON)
+    str,  # session (as stringified JSON, or FROM_BATCH_TEMPLATE)
     str,  # session_id
     str,  # batch_id
     str | None,  # field_values (optional, as stringified JSON)
     int,  # priority
-    str | None,  # workflow (optional, as stringified JSON)
+    str | None,  # workflow (optional, as stringified JSON, or FROM_BATCH_TEMPLATE)
     str | None,  # origin (optional)
     str | None,  # destination (optional)
     int | None,  # retried_from_item_id (optional, this is always None for new items)
@@ -610,28 +684,62 @@ ValueToInsertTuple: TypeAlias = tuple[
 
 
 def prepare_values_to_insert(
-    queue_id: str, batch: Batch, priority: int, max_new_queue_items: int, user_id: str = "system"
+    queue_id: str,
+    batch: Batch,
+    priority: int,
+    max_new_queue_items: int,
+    user_id: str = "system",
+    use_batch_template: bool = True,
 ) -> list[ValueToInsertTuple]:
     """
     Given a batch, prepare the values to insert into the session queue table. The list of tuples can be used with an
     `executemany` statement to insert multiple rows at once.
 
+    See `iter_values_to_insert()` for the arguments and the values in each tuple.
+    """
+    return list(
+        iter_values_to_insert(
+            queue_id=queue_id,
+            batch=batch,
+            priority=priority,
+            max_new_queue_items=max_new_queue_items,
+            user_id=user_id,
+            use_batch_template=use_batch_template,
+        )
+    )
+
+
+def iter_values_to_insert(
+    queue_id: str,
+    batch: Batch,
+    priority: int,
+    max_new_queue_items: int,
+    user_id: str = "system",
+    use_batch_template: bool = True,
+) -> Generator[ValueToInsertTuple, None, None]:
+    """
+    Given a batch, generate the values to insert into the session queue table, one tuple per session. Sessions are
+    only created as they are consumed, so very large batches can be inserted in chunks without holding every row in
+    memory at once.
+
     Args:
         queue_id: The ID of the queue to insert the items into
         batch: The batch to prepare the values for
         priority: The priority of the queue items
         max_new_queue_items: The maximum number of queue items to insert
         user_id: The user ID who is creating these queue items
+        use_batch_template: Whether the rows refer to the batch template for their session and workflow, instead of
+            storing them in full. The template must be inserted alongside the rows - see `create_batch_template()`.
 
     Returns:
-        A list of tuples to insert into the session queue table. Each tuple contains the following values:
+        A generator of tuples to insert into the session queue table. Each tuple contains the following values:
         - queue_id
-        - session (as stringified JSON)
+        - session (as stringified JSON, or FROM_BATCH_TEMPLATE)
         - session_id
         - batch_id
         - field_values (optional, as stringified JSON)
         - priority
-        - workflow (optional, as stringified JSON)
+        - workflow (optional, as stringified JSON, or FROM_BATCH_TEMPLATE)
         - origin (optional)
         - destination (optional)
         - retried_from_item_id (optional, this is always None for new items)
@@ -644,31 +752,35 @@ def prepare_values_to_insert(
     #
     # So, despite the inferior DX with normal tuples, we use one here for performance reasons.
 
-    values_to_insert: list[ValueToInsertTuple] = []
-
-    # pydantic's to_jsonable_python handles serialization of any python object, including sets, which json.dumps does
-    # not support by default. Apparently there are sets somewhere in the graph.
-
-    # The same workflow is used for all sessions in the batch - serialize it once
-    workflow_json = json.dumps(batch.workflow, default=to_jsonable_python) if batch.workflow else None
-
-    for session_id, session_json, field_values_json in create_session_nfv_tuples(batch, max_new_queue_items):
-        values_to_insert.append(
-            (
-                queue_id,
-                session_json,
-                session_id,
-                batch.batch_id,
-                field_values_json,
-                priority,
-                workflow_json,
-                batch.origin,
-                batch.destination,
-                None,
-                user_id,
-            )
+    if use_batch_template:
+        # The same session and workflow are used for all sessions in the batch - they are stored once, in the template
+        workflow = FROM_BATCH_TEMPLATE if batch.workflow else None
+        session_tuples: Iterable[tuple[str, str, str]] = (
+            (session_id, FROM_BATCH_TEMPLATE, field_values_json)
+            for session_id, field_values_json in create_session_field_values(batch, max_new_queue_items)
+        )
+    else:
+        # pydantic's to_jsonable_python handles serialization of any python object, including sets, which json.dumps
+        # does not support by default. Apparently there are sets somewhere in the graph.
+
+        # The same workflow is used for all sessions in the batch - serialize it once
+        workflow = json.dumps(batch.workflow, default=to_jsonable_python) if batch.workflow else None
+        session_tuples = create_session_nfv_tuples(batch, max_new_queue_items)
+
+    for session_id, session_json, field_values_json in session_tuples:
+        yield (
+            queue_id,
+            session_json,
+            session_id,
+            batch.batch_id,
+            field_values_json,
+            priority,
+            workflow,
+            batch.origin,
+            batch.destination,
+            None,
+            user_id,
         )
-    return values_to_insert
 
 
 # endregion Util
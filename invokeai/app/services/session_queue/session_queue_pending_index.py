@@ -0,0 +1,154 @@
+import heapq
+import threading
+from typing import Iterable, Optional
+
+# Users who have never been served sort before every `started_at` timestamp.
+NEVER_SERVED = ""
+
+
+class PendingItemIndex:
+    """An in-memory index of the pending queue items, used to pick the next item to dequeue without querying the table.
+
+    It mirrors the ordering of the dequeue queries:
+    - FIFO: highest priority first, then oldest (lowest item_id) first.
+    - Round-robin: the user who was least recently served first, then the oldest of the users' best items. Each user's
+        best item is their highest priority, oldest item.
+
+    Items are kept in heaps, so picking the next item is O(log n). Removed items are left in the heaps and skipped when
+    they reach the top.
+
+    The index is only a hint. The queue still claims each item with a conditional update of the table, and skips items
+    that are no longer pending. The index starts out unloaded. When the table changes in ways the queue does not track
+    item by item, it calls `invalidate()`, and the index is loaded from the table again with `load()`. Until then,
+    `is_loaded` is False, even if items were added in the meantime.
+
+    Last-served times are `started_at` timestamps in the table's format, so that they can be compared with the
+    timestamps loaded from the table.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # item_id -> (priority, user_id)
+        self._items: dict[int, tuple[int, str]] = {}
+        # (-priority, item_id) of all items, for FIFO
+        self._fifo: list[tuple[int, int]] = []
+        # user_id -> (-priority, item_id) of the user's items, for round-robin
+        self._user_items: dict[str, list[tuple[int, int]]] = {}
+        # user_id -> the started_at of the user's most recently started item
+        self._last_served: dict[str, str] = {}
+        # (last_served, best item_id, user_id) of the users with items, for round-robin
+        self._users: list[tuple[str, int, str]] = []
+        # user_id -> the user's current entry in `_users` - any other entries for the user are stale
+        self._user_entries: dict[str, tuple[str, int, str]] = {}
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the pending items were loaded from the table since the index was created or last invalidated."""
+        return self._loaded
+
+    def load(self, items: Iterable[tuple[int, str, int]], last_served: Iterable[tuple[str, str]]) -> None:
+        """Adds pending items, as (item_id, user_id, priority), and users' last-served times, as (user_id, started_at).
+
+        Items that are already indexed are kept, as are later last-served times, so that changes made while the items
+        were being read from the table are not lost.
+        """
+        with self._lock:
+            for user_id, started_at in last_served:
+                if started_at > self._last_served.get(user_id, NEVER_SERVED):
+                    self._last_served[user_id] = started_at
+            for item_id, user_id, priority in items:
+                self._add(item_id, user_id, priority)
+            self._loaded = True
+
+    def invalidate(self) -> None:
+        """Drops all items, so that they are loaded again. Last-served times are kept."""
+        with self._lock:
+            self._items.clear()
+            self._fifo.clear()
+            self._user_items.clear()
+            self._users.clear()
+            self._user_entries.clear()
+            self._loaded = False
+
+    def add(self, item_id: int, user_id: str, priority: int) -> None:
+        with self._lock:
+            self._add(item_id, user_id, priority)
+
+    def remove(self, item_id: int) -> None:
+        with self._lock:
+            item = self._items.pop(item_id, None)
+            if item is not None:
+                # If the item was the user's best item, the user's place in line is now set by their next best item
+                self._push_user(item[1])
+
+    def pop(self, round_robin: bool, served_at: str) -> Optional[int]:
+        """Removes and returns the next item to dequeue, recording that its user was served at `served_at`."""
+        with self._lock:
+            item_id = self._pop_round_robin() if round_robin else self._pop_fifo()
+            if item_id is None:
+                return None
+            _, user_id = self._items.pop(item_id)
+            self._last_served[user_id] = max(served_at, self._last_served.get(user_id, NEVER_SERVED))
+            self._push_user(user_id)
+            return item_id
+
+    def _add(self, item_id: int, user_id: str, priority: int) -> None:
+        if item_id in self._items:
+            return
+        self._items[item_id] = (priority, user_id)
+        entry = (-priority, item_id)
+        heapq.heappush(self._fifo, entry)
+        heapq.heappush(self._user_items.setdefault(user_id, []), entry)
+        # The item may be the user's new best item
+        self._push_user(user_id)
+
+    def _is_current(self, entry: tuple[int, int]) -> bool:
+        """Whether a heap entry is for an item that is still pending, with the same priority."""
+        item = self._items.get(entry[1])
+        return item is not None and item[0] == -entry[0]
+
+    def _pop_fifo(self) -> Optional[int]:
+        while self._fifo:
+            entry = heapq.heappop(self._fifo)
+            if self._is_current(entry):
+                return entry[1]
+        return None
+
+    def _get_best_item_id(self, user_id: str) -> Optional[int]:
+        user_items = self._user_items.get(user_id)
+        while user_items and not self._is_current(user_items[0]):
+            heapq.heappop(user_items)
+        if not user_items:
+            self._user_items.pop(user_id, None)
+            return None
+        return user_items[0][1]
+
+    def _push_user(self, user_id: str) -> None:
+        """Updates the user's entry in `_users`, after their best item or last-served time changed."""
+        best_item_id = self._get_best_item_id(user_id)
+        if best_item_id is None:
+            self._user_entries.pop(user_id, None)
+            return
+        entry = (self._last_served.get(user_id, NEVER_SERVED), best_item_id, user_id)
+        if self._user_entries.get(user_id) != entry:
+            self._user_entries[user_id] = entry
+            heapq.heappush(self._users, entry)
+
+    def _pop_round_robin(self) -> Optional[int]:
+        while self._users:
+            entry = heapq.heappop(self._users)
+            _, best_item_id, user_id = entry
+            if self._user_entries.get(user_id) != entry:
+                continue
+            del self._user_entries[user_id]
+            if self._get_best_item_id(user_id) != best_item_id:
+                # The entry is out of date - put the user back in line with their current best item
+                self._push_user(user_id)
+                continue
+            heapq.heappop(self._user_items[user_id])
+            return best_item_id
+        return None
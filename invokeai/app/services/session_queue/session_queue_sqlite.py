@@ -1,7 +1,11 @@
 import asyncio
 import json
 import sqlite3
-from collections.abc import Sequence
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timezone
+from itertools import chain, islice
 from typing import Any, Optional, Union, cast
 
 from pydantic_core import to_jsonable_python
@@ -10,6 +14,7 @@ from invokeai.app.services.invoker import Invoker
 from invokeai.app.services.session_queue.session_queue_base import SessionQueueBase
 from invokeai.app.services.session_queue.session_queue_common import (
     DEFAULT_QUEUE_ID,
+    FROM_BATCH_TEMPLATE,
     QUEUE_ITEM_STATUS,
     Batch,
     BatchStatus,
@@ -29,13 +34,18 @@ from invokeai.app.services.session_queue.session_queue_common import (
     RetryItemsResult,
     SessionQueueCountsByDestination,
     SessionQueueItem,
+    SessionQueueItemCheckpoint,
     SessionQueueItemNotFoundError,
     SessionQueueStatus,
     TooManySessionsError,
     ValueToInsertTuple,
     calc_session_count,
-    prepare_values_to_insert,
+    create_batch_template,
+    get_session,
+    iter_values_to_insert,
+    materialize_session,
 )
+from invokeai.app.services.session_queue.session_queue_pending_index import PendingItemIndex
 from invokeai.app.services.shared.graph import GraphExecutionState
 from invokeai.app.services.shared.pagination import CursorPaginatedResults
 from invokeai.app.services.shared.sqlite.sqlite_common import SQLiteDirection
@@ -52,6 +62,9 @@ from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
 # to total history (which is unbounded by default). MAX() ignores NULL started_at values, so users
 # with only pending items fall back to the epoch via COALESCE and are served first.
 #
+# The only parameter is the number of items to return. `prefetch` uses the query to find the next few items, while
+# `dequeue` uses the in-memory pending item index, which orders items the same way.
+#
 # Kept as a module constant so the scaling test can EXPLAIN QUERY PLAN the exact production SQL.
 ROUND_ROBIN_DEQUEUE_QUERY = """--sql
     WITH user_next_item AS (
@@ -83,11 +96,11 @@ ROUND_ROBIN_DEQUEUE_QUERY = """--sql
             '1970-01-01'
         ) ASC,
         sq.item_id ASC
-    LIMIT 1
+    LIMIT ?
     """
 
 # FIFO dequeue (single-user mode, or round_robin explicitly disabled): strict priority then
-# insertion order.
+# insertion order. Used like ROUND_ROBIN_DEQUEUE_QUERY.
 FIFO_DEQUEUE_QUERY = """--sql
     SELECT
         sq.*,
@@ -99,10 +112,61 @@ FIFO_DEQUEUE_QUERY = """--sql
     ORDER BY
         sq.priority DESC,
         sq.item_id ASC
-    LIMIT 1
+    LIMIT ?
     """
 
 
+# The number of queue items to insert per transaction when enqueueing a batch. Each row binds 11 parameters, which keeps
+# each statement well within SQLite's limit on the number of parameters.
+ENQUEUE_CHUNK_SIZE = 500
+
+# The number of batch templates to keep in memory. Queue items are mostly read in batch order, so only a few batches are
+# read at any time.
+BATCH_TEMPLATE_CACHE_SIZE = 16
+
+
+def _get_timestamp() -> str:
+    """Gets the current time in the format of the table's timestamps, i.e. `STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')`."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def _materialize_values(values: ValueToInsertTuple, batch_template: tuple[str, Optional[str]]) -> ValueToInsertTuple:
+    """Replaces the references to a batch template in a queue item's values with the template's session and workflow."""
+    (
+        queue_id,
+        session,
+        session_id,
+        batch_id,
+        field_values,
+        priority,
+        workflow,
+        origin,
+        destination,
+        retried_from,
+        user,
+    ) = values
+    session_template, template_workflow = batch_template
+    if session == FROM_BATCH_TEMPLATE:
+        session = materialize_session(session_template, session_id, field_values).model_dump_json(
+            warnings=False, exclude_none=True
+        )
+    if workflow == FROM_BATCH_TEMPLATE:
+        workflow = template_workflow
+    return (
+        queue_id,
+        session,
+        session_id,
+        batch_id,
+        field_values,
+        priority,
+        workflow,
+        origin,
+        destination,
+        retried_from,
+        user,
+    )
+
+
 class SqliteSessionQueue(SessionQueueBase):
     __invoker: Invoker
 
@@ -126,26 +190,86 @@ class SqliteSessionQueue(SessionQueueBase):
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
         self._db = db
+        # Sessions of pending queue items that have already been parsed, keyed by item_id, with the raw session JSON
+        # they were parsed from. Each is used at most once, and only if the queue item's session is unchanged.
+        self._parsed_sessions: dict[int, tuple[str, GraphExecutionState]] = {}
+        self._parsed_sessions_lock = threading.Lock()
+        # The session template and workflow of recently read batches, keyed by batch_id
+        self._batch_templates: OrderedDict[str, tuple[str, Optional[str]]] = OrderedDict()
+        self._batch_templates_lock = threading.Lock()
+        # The pending queue items, in dequeue order. It is loaded from the table on the first dequeue, and kept up to
+        # date as items are enqueued, claimed, canceled and deleted.
+        self._pending_index = PendingItemIndex()
 
     def _set_in_progress_to_canceled(self) -> None:
         """
         Sets all in_progress or waiting queue items to canceled. Run on app startup, not associated with any queue.
         This is necessary because the invoker may have been killed while processing a queue item or while a parent
         queue item was suspended waiting on a child workflow execution.
+
+        If `resume_interrupted_sessions` is enabled, in_progress queue items that are not part of a workflow call chain
+        are set back to pending instead, so that they resume from their checkpoints - but only if they checkpointed a
+        node since they were last started. An item that made no progress is canceled, so that an item that crashes the
+        app is not run again on every startup.
         """
         with self._db.transaction() as cursor:
+            # Checkpoints of finished queue items are deleted as they finish, but items canceled in bulk keep theirs
             cursor.execute(
                 """--sql
-                SELECT item_id
-                FROM session_queue
-                WHERE status = 'in_progress'
-                   OR status = 'waiting';
+                DELETE FROM session_queue_checkpoints
+                WHERE item_id IN (
+                    SELECT item_id
+                    FROM session_queue
+                    WHERE status = 'completed'
+                       OR status = 'failed'
+                       OR status = 'canceled'
+                );
                 """
             )
-            interrupted_item_ids = [row[0] for row in cast(list[sqlite3.Row], cursor.fetchall())]
+            cursor.execute(
+                """--sql
+                SELECT
+                    sq.item_id,
+                    sq.status,
+                    EXISTS (
+                        SELECT 1
+                        FROM session_queue_checkpoints sqc
+                        WHERE sqc.item_id = sq.item_id
+                          AND sqc.created_at >= sq.started_at
+                    ) AS has_progress
+                FROM session_queue sq
+                WHERE sq.status = 'in_progress'
+                   OR sq.status = 'waiting';
+                """
+            )
+            interrupted_items = cast(list[sqlite3.Row], cursor.fetchall())
+        resume = self.__invoker.services.configuration.resume_interrupted_sessions
+        item_ids_to_resume: list[int] = []
         item_ids_to_cancel: set[int] = set()
-        for item_id in interrupted_item_ids:
-            item_ids_to_cancel.update(self._get_workflow_call_chain_item_ids(item_id))
+        for item_id, status, has_progress in interrupted_items:
+            chain_item_ids = self._get_workflow_call_chain_item_ids(item_id)
+            if resume and status == "in_progress" and has_progress and chain_item_ids == [item_id]:
+                item_ids_to_resume.append(item_id)
+            else:
+                item_ids_to_cancel.update(chain_item_ids)
+        if item_ids_to_resume:
+            with self._db.transaction() as cursor:
+                placeholders = ",".join("?" for _ in item_ids_to_resume)
+                cursor.execute(
+                    f"""--sql
+                    UPDATE session_queue
+                    SET status = 'pending',
+                        status_sequence = COALESCE(status_sequence, 0) + 1,
+                        worker_id = NULL
+                    WHERE item_id IN ({placeholders});
+                    """,
+                    tuple(item_ids_to_resume),
+                )
+            # The resumed items are pending again - they are indexed when the index is next loaded from the table
+            self._pending_index.invalidate()
+            self.__invoker.services.logger.info(
+                f"Resuming {len(item_ids_to_resume)} interrupted queue items from their checkpoints"
+            )
         if not item_ids_to_cancel:
             return
         with self._db.transaction() as cursor:
@@ -208,6 +332,7 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 (queue_id, queue_id, keep),
             )
+            self._delete_unused_batch_templates(cursor)
         return count
 
     def _get_current_queue_size(self, queue_id: str) -> int:
@@ -257,62 +382,281 @@ class SqliteSessionQueue(SessionQueueBase):
             calc_session_count,
             batch=batch,
         )
-        values_to_insert = await asyncio.to_thread(
-            prepare_values_to_insert,
+        # The batch's session and workflow are stored once, in the batch template, and the queue items only store their
+        # field values. If the batch ID is reused, the batch may already have a different template, which belongs to its
+        # existing queue items - the new queue items then store their session and workflow in full. Which template the
+        # batch has is decided by the insert in each chunk's transaction.
+        batch_template = await asyncio.to_thread(create_batch_template, batch)
+        values_to_insert = iter_values_to_insert(
             queue_id=queue_id,
             batch=batch,
             priority=priority,
             max_new_queue_items=max_new_queue_items,
             user_id=user_id,
+            use_batch_template=True,
         )
-        enqueued_count = len(values_to_insert)
 
-        with self._db.transaction() as cursor:
-            cursor.executemany(
-                """--sql
-                    INSERT INTO session_queue (queue_id, session, session_id, batch_id, field_values, priority, workflow, origin, destination, retried_from_item_id, user_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                values_to_insert,
+        # Sessions are created and inserted in chunks, each in its own short transaction, so that enqueueing a very large
+        # batch neither holds every row in memory nor blocks other users of the database until it is done. The first
+        # chunks may be dequeued while the rest of the batch is still being inserted.
+        item_ids: list[int] = []
+        while True:
+            chunk = await asyncio.to_thread(list, islice(values_to_insert, ENQUEUE_CHUNK_SIZE))
+            if not chunk:
+                break
+            item_ids.extend(await asyncio.to_thread(self._insert_queue_items, chunk, batch.batch_id, batch_template))
+            if len(chunk) < ENQUEUE_CHUNK_SIZE:
+                break
+            self.__invoker.services.events.emit_batch_enqueue_progress(
+                queue_id=queue_id,
+                batch=batch,
+                enqueued=len(item_ids),
+                requested=requested_count,
+                priority=priority,
+                user_id=user_id,
             )
-            cursor.execute(
-                """--sql
-                    SELECT item_id
-                    FROM session_queue
-                    WHERE batch_id = ?
-                    ORDER BY item_id DESC;
-                    """,
-                (batch.batch_id,),
-            )
-            item_ids = [row[0] for row in cursor.fetchall()]
+
         enqueue_result = EnqueueBatchResult(
             queue_id=queue_id,
             requested=requested_count,
-            enqueued=enqueued_count,
+            enqueued=len(item_ids),
             batch=batch,
             priority=priority,
-            item_ids=item_ids,
+            item_ids=sorted(item_ids, reverse=True),
         )
         self.__invoker.services.events.emit_batch_enqueued(enqueue_result, user_id=user_id)
         return enqueue_result
 
-    def dequeue(self) -> Optional[SessionQueueItem]:
+    def _insert_queue_items(
+        self,
+        values_to_insert: list[ValueToInsertTuple],
+        batch_id: str,
+        batch_template: tuple[str, Optional[str]],
+    ) -> list[int]:
+        """Inserts queue items, and the batch template they refer to. Returns the IDs of the new queue items."""
+        with self._db.transaction() as cursor:
+            # The template is inserted with every chunk, in case the batch's earlier queue items were deleted, and their
+            # template with them, while the batch was being enqueued. If the batch ID has a different template, e.g.
+            # from a concurrent enqueue of the same batch ID, this chunk's queue items store their session and workflow
+            # in full instead.
+            if not self._insert_batch_template(cursor, batch_id, batch_template):
+                values_to_insert = [_materialize_values(values, batch_template) for values in values_to_insert]
+            # `executemany` discards the rows returned by RETURNING, so the rows are inserted with a single statement
+            placeholders = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"] * len(values_to_insert))
+            cursor.execute(
+                f"""--sql
+                INSERT INTO session_queue (queue_id, session, session_id, batch_id, field_values, priority, workflow, origin, destination, retried_from_item_id, user_id)
+                VALUES {placeholders}
+                RETURNING item_id, user_id, priority
+                """,
+                list(chain.from_iterable(values_to_insert)),
+            )
+            rows = cast(list[sqlite3.Row], cursor.fetchall())
+        for item_id, user_id, priority in rows:
+            self._pending_index.add(item_id, user_id, priority)
+        return [row[0] for row in rows]
+
+    def _use_round_robin(self) -> bool:
         config = self.__invoker.services.configuration
-        use_round_robin = config.multiuser and config.session_queue_mode == "round_robin"
+        return config.multiuser and config.session_queue_mode == "round_robin"
+
+    def _get_dequeue_query(self) -> str:
+        return ROUND_ROBIN_DEQUEUE_QUERY if self._use_round_robin() else FIFO_DEQUEUE_QUERY
+
+    def _load_pending_index(self) -> None:
+        """Loads the pending queue items, and when their users were last served, from the table into the index."""
+        with self._db.transaction(read_only=True) as cursor:
+            cursor.execute(
+                """--sql
+                SELECT item_id, user_id, priority
+                FROM session_queue
+                WHERE status = 'pending'
+                """
+            )
+            items = [(row[0], row[1], row[2]) for row in cast(list[sqlite3.Row], cursor.fetchall())]
+            # Each user's last served time is an indexed seek on idx_session_queue_user_started_at
+            cursor.execute(
+                """--sql
+                SELECT
+                    pending.user_id,
+                    (
+                        SELECT MAX(served.started_at)
+                        FROM session_queue served
+                        WHERE served.user_id = pending.user_id
+                    )
+                FROM (SELECT DISTINCT user_id FROM session_queue WHERE status = 'pending') pending
+                """
+            )
+            last_served = [(row[0], row[1]) for row in cast(list[sqlite3.Row], cursor.fetchall()) if row[1] is not None]
+        self._pending_index.load(items, last_served)
 
-        query = ROUND_ROBIN_DEQUEUE_QUERY if use_round_robin else FIFO_DEQUEUE_QUERY
+    def _remove_from_pending_index(self, item_ids: Iterable[int]) -> None:
+        item_ids = list(item_ids)
+        for item_id in item_ids:
+            self._pending_index.remove(item_id)
+        # Items that are no longer pending will not be dequeued, so their parsed sessions will not be used
+        with self._parsed_sessions_lock:
+            for item_id in item_ids:
+                self._parsed_sessions.pop(item_id, None)
+
+    def dequeue(self, worker_id: Optional[str] = None) -> Optional[SessionQueueItem]:
+        # The index is loaded from the table on the first dequeue and after changes that are not tracked item by item,
+        # even if items were enqueued in the meantime. It is also reloaded when the queue has run dry, in case items
+        # were added to the table by other means.
+        if not self._pending_index.is_loaded or len(self._pending_index) == 0:
+            self._load_pending_index()
+        round_robin = self._use_round_robin()
+        while True:
+            item_id = self._pending_index.pop(round_robin=round_robin, served_at=_get_timestamp())
+            if item_id is None:
+                return None
+            with self._db.transaction() as cursor:
+                # Only claim the item if it is still pending - it may have been canceled or claimed by other means since
+                # it was indexed. In that case, try the next item.
+                cursor.execute(
+                    """--sql
+                    UPDATE session_queue
+                    SET status = 'in_progress', status_sequence = COALESCE(status_sequence, 0) + 1, worker_id = ?
+                    WHERE item_id = ? AND status = 'pending'
+                    """,
+                    (worker_id, item_id),
+                )
+                claimed = cursor.rowcount == 1
+            if claimed:
+                break
+        return self._emit_queue_item_status_changed(item_id, take_parsed_session=True)
+
+    def prefetch(self, count: int) -> list[GraphExecutionState]:
+        if count < 1:
+            return []
+        with self._db.transaction() as cursor:
+            cursor.execute(self._get_dequeue_query(), (count,))
+            results = cast(list[sqlite3.Row], cursor.fetchall())
 
+        with self._parsed_sessions_lock:
+            previous = dict(self._parsed_sessions)
+        upcoming: dict[int, tuple[str, GraphExecutionState]] = {}
+        for result in results:
+            entry = previous.get(result["item_id"])
+            if entry is None or entry[0] != result["session"]:
+                entry = (result["session"], get_session(self._resolve_batch_template(dict(result))))
+            upcoming[result["item_id"]] = entry
+
+        with self._parsed_sessions_lock:
+            # Sessions of items that are no longer next in line are dropped. Sessions that were taken by `dequeue`
+            # while we were parsing must not be added back, else they could be handed out twice.
+            self._parsed_sessions = {
+                item_id: entry
+                for item_id, entry in upcoming.items()
+                if previous.get(item_id) is not entry or self._parsed_sessions.get(item_id) is entry
+            }
+        return [session for _, session in upcoming.values()]
+
+    def _queue_item_from_row(self, row: sqlite3.Row, take_parsed_session: bool = False) -> SessionQueueItem:
+        """Builds a queue item from a database row.
+
+        With `take_parsed_session`, the item's already-parsed session is used and removed, if there is one. Only the
+        dequeued item may take it - other readers get their own copy, so that the session is never shared.
+        """
+        queue_item_dict = dict(row)
+        if take_parsed_session:
+            with self._parsed_sessions_lock:
+                entry = self._parsed_sessions.pop(queue_item_dict["item_id"], None)
+            if entry is not None and entry[0] == queue_item_dict["session"]:
+                queue_item_dict["session"] = entry[1]
+        return SessionQueueItem.queue_item_from_dict(self._resolve_batch_template(queue_item_dict))
+
+    def _resolve_batch_template(self, queue_item_dict: dict[str, Any]) -> dict[str, Any]:
+        """Replaces a queue item's session and workflow with its batch's, if they are stored in the batch template."""
+        uses_session_template = queue_item_dict["session"] == FROM_BATCH_TEMPLATE
+        uses_workflow_template = queue_item_dict.get("workflow") == FROM_BATCH_TEMPLATE
+        if not uses_session_template and not uses_workflow_template:
+            return queue_item_dict
+        session_template, workflow = self._get_batch_template(queue_item_dict["batch_id"])
+        if uses_session_template:
+            queue_item_dict["session"] = materialize_session(
+                session_template, queue_item_dict["session_id"], queue_item_dict.get("field_values")
+            )
+        if uses_workflow_template:
+            queue_item_dict["workflow"] = workflow
+        return queue_item_dict
+
+    def _get_batch_template(self, batch_id: str) -> tuple[str, Optional[str]]:
+        """Gets the session template and workflow of a batch. Templates never change, so recently used ones are cached."""
+        with self._batch_templates_lock:
+            template = self._batch_templates.get(batch_id)
+            if template is not None:
+                self._batch_templates.move_to_end(batch_id)
+                return template
         with self._db.transaction() as cursor:
-            cursor.execute(query)
+            cursor.execute(
+                """--sql
+                SELECT session, workflow
+                FROM session_queue_batch_templates
+                WHERE batch_id = ?
+                """,
+                (batch_id,),
+            )
             result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         if result is None:
-            return None
-        queue_item = SessionQueueItem.queue_item_from_dict(dict(result))
-        queue_item = self._set_queue_item_status(item_id=queue_item.item_id, status="in_progress")
-        return queue_item
+            raise SessionQueueItemNotFoundError(f"No batch template for batch {batch_id}")
+        template = (result["session"], result["workflow"])
+        with self._batch_templates_lock:
+            self._batch_templates[batch_id] = template
+            while len(self._batch_templates) > BATCH_TEMPLATE_CACHE_SIZE:
+                self._batch_templates.popitem(last=False)
+        return template
+
+    def _insert_batch_template(
+        self, cursor: sqlite3.Cursor, batch_id: str, batch_template: tuple[str, Optional[str]]
+    ) -> bool:
+        """Inserts a batch's template, unless the batch already has one. Returns whether the batch's template is the
+        given one, i.e. whether queue items inserted in the same transaction may refer to it.
+
+        The insert decides which template the batch has, so that concurrent enqueues of the same batch ID cannot both
+        believe they own it.
+        """
+        cursor.execute(
+            """--sql
+            INSERT INTO session_queue_batch_templates (batch_id, session, workflow)
+            VALUES (?, ?, ?)
+            ON CONFLICT (batch_id) DO NOTHING
+            """,
+            (batch_id, *batch_template),
+        )
+        if cursor.rowcount == 1:
+            return True
+        cursor.execute(
+            """--sql
+            SELECT session, workflow
+            FROM session_queue_batch_templates
+            WHERE batch_id = ?
+            """,
+            (batch_id,),
+        )
+        existing = cast(Union[sqlite3.Row, None], cursor.fetchone())
+        # An identical template, e.g. from enqueueing the same batch twice, materializes the same sessions
+        return existing is not None and (existing["session"], existing["workflow"]) == batch_template
+
+    def _delete_unused_batch_templates(self, cursor: sqlite3.Cursor) -> None:
+        """Deletes the templates of batches that no longer have any queue items. Must be called after deleting items."""
+        cursor.execute(
+            """--sql
+            DELETE
+            FROM session_queue_batch_templates
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM session_queue sq
+                WHERE sq.batch_id = session_queue_batch_templates.batch_id
+            )
+            """
+        )
+        # A batch ID may be reused once its template is deleted, so the cached templates are no longer reliable
+        with self._batch_templates_lock:
+            self._batch_templates.clear()
 
     def get_next(self, queue_id: str) -> Optional[SessionQueueItem]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             cursor.execute(
                 """--sql
                 SELECT
@@ -334,10 +678,10 @@ class SqliteSessionQueue(SessionQueueBase):
             result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         if result is None:
             return None
-        return SessionQueueItem.queue_item_from_dict(dict(result))
+        return SessionQueueItem.queue_item_from_dict(self._resolve_batch_template(dict(result)))
 
     def get_current(self, queue_id: str) -> Optional[SessionQueueItem]:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             cursor.execute(
                 """--sql
                 SELECT
@@ -356,7 +700,28 @@ class SqliteSessionQueue(SessionQueueBase):
             result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         if result is None:
             return None
-        return SessionQueueItem.queue_item_from_dict(dict(result))
+        return SessionQueueItem.queue_item_from_dict(self._resolve_batch_template(dict(result)))
+
+    def _get_in_progress_items(self, queue_id: str) -> list[SessionQueueItem]:
+        """Gets all in-progress queue items. There is one for each session processor worker that is running an item."""
+        with self._db.transaction(read_only=True) as cursor:
+            cursor.execute(
+                """--sql
+                SELECT
+                    sq.*,
+                    u.display_name as user_display_name,
+                    u.email as user_email
+                FROM session_queue sq
+                LEFT JOIN users u ON sq.user_id = u.user_id
+                WHERE
+                    sq.queue_id = ?
+                    AND sq.status = 'in_progress'
+                ORDER BY sq.item_id ASC
+                """,
+                (queue_id,),
+            )
+            results = cast(list[sqlite3.Row], cursor.fetchall())
+        return [SessionQueueItem.queue_item_from_dict(self._resolve_batch_template(dict(result))) for result in results]
 
     def _set_queue_item_status(
         self,
@@ -388,11 +753,34 @@ class SqliteSessionQueue(SessionQueueBase):
                 UPDATE session_queue
                 SET status = ?, status_sequence = COALESCE(status_sequence, 0) + 1, error_type = ?, error_message = ?, error_traceback = ?
                 WHERE item_id = ?
+                RETURNING user_id, priority
                 """,
                 (status, error_type, error_message, error_traceback, item_id),
             )
+            updated = cast(list[sqlite3.Row], cursor.fetchall())
+        if not updated:
+            raise SessionQueueItemNotFoundError(f"No queue item with id {item_id}")
+        user_id, priority = updated[0]
+        if status == "pending":
+            self._pending_index.add(item_id, user_id, priority)
+        else:
+            self._remove_from_pending_index([item_id])
+        if status in ("completed", "failed", "canceled"):
+            # The queue item will not resume, so its checkpoints are no longer needed
+            with self._db.transaction() as cursor:
+                cursor.execute(
+                    """--sql
+                    DELETE FROM session_queue_checkpoints
+                    WHERE item_id = ?
+                    """,
+                    (item_id,),
+                )
 
-        queue_item = self.get_queue_item(item_id)
+        return self._emit_queue_item_status_changed(item_id)
+
+    def _emit_queue_item_status_changed(self, item_id: int, take_parsed_session: bool = False) -> SessionQueueItem:
+        """Emits a queue item status changed event for the queue item's current status, and returns the queue item."""
+        queue_item = self._get_queue_item(item_id, take_parsed_session)
         batch_status = self.get_batch_status(queue_id=queue_item.queue_id, batch_id=queue_item.batch_id)
         # The QueueItemStatusChangedEvent ships to user:{queue_item.user_id} and admin rooms.
         # acting_user_id ensures the embedded current-item identifiers are redacted when the
@@ -452,9 +840,13 @@ class SqliteSessionQueue(SessionQueueBase):
         return deduped_chain_item_ids
 
     def _get_current_workflow_call_chain_item_ids(self, queue_id: str) -> set[int]:
-        current_queue_item = self.get_current(queue_id)
-        if current_queue_item is not None:
-            return set(self._get_workflow_call_chain_item_ids(current_queue_item.item_id))
+        current_queue_items = self._get_in_progress_items(queue_id)
+        if current_queue_items:
+            return {
+                chain_item_id
+                for current_queue_item in current_queue_items
+                for chain_item_id in self._get_workflow_call_chain_item_ids(current_queue_item.item_id)
+            }
 
         with self._db.transaction() as cursor:
             cursor.execute(
@@ -477,7 +869,7 @@ class SqliteSessionQueue(SessionQueueBase):
         return set(self._get_workflow_call_chain_item_ids(cast(int, row[0])))
 
     def is_empty(self, queue_id: str) -> IsEmptyResult:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             cursor.execute(
                 """--sql
                 SELECT count(*)
@@ -490,7 +882,7 @@ class SqliteSessionQueue(SessionQueueBase):
         return IsEmptyResult(is_empty=is_empty)
 
     def is_full(self, queue_id: str) -> IsFullResult:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             cursor.execute(
                 """--sql
                 SELECT count(*)
@@ -530,6 +922,8 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 tuple(params),
             )
+            self._delete_unused_batch_templates(cursor)
+        self._pending_index.invalidate()
         self.__invoker.services.events.emit_queue_cleared(queue_id, user_id)
         return ClearResult(deleted=count)
 
@@ -546,6 +940,8 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 tuple(item_ids),
             )
+            self._delete_unused_batch_templates(cursor)
+        self._remove_from_pending_index(item_ids)
 
     def prune(self, queue_id: str, user_id: Optional[str] = None) -> PruneResult:
         with self._db.transaction() as cursor:
@@ -582,6 +978,7 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 tuple(params),
             )
+            self._delete_unused_batch_templates(cursor)
         return PruneResult(deleted=count)
 
     def cancel_queue_item(self, item_id: int) -> SessionQueueItem:
@@ -661,7 +1058,7 @@ class SqliteSessionQueue(SessionQueueBase):
         self, queue_id: str, batch_ids: list[str], user_id: Optional[str] = None
     ) -> CancelByBatchIDsResult:
         with self._db.transaction() as cursor:
-            current_queue_item = self.get_current(queue_id)
+            current_queue_items = self._get_in_progress_items(queue_id)
             placeholders = ", ".join(["?" for _ in batch_ids])
 
             # Build WHERE clause with optional user_id filter
@@ -673,7 +1070,7 @@ class SqliteSessionQueue(SessionQueueBase):
                   AND status != 'canceled'
                   AND status != 'completed'
                   AND status != 'failed'
-                  -- We will cancel the current item separately below - skip it here
+                  -- We will cancel the current items separately below - skip them here
                   AND status != 'in_progress'
                   {user_filter}
                 """
@@ -693,12 +1090,14 @@ class SqliteSessionQueue(SessionQueueBase):
                 tuple(params),
             )
 
-        # Handle current item separately - check ownership if user_id is provided. This emits a
-        # per-item queue_item_status_changed, so the bulk event below need not include it.
-        if current_queue_item is not None and current_queue_item.batch_id in batch_ids:
-            if user_id is None or current_queue_item.user_id == user_id:
-                self._set_queue_item_status(current_queue_item.item_id, "canceled")
+        # Handle current items separately - check ownership if user_id is provided. This emits a
+        # per-item queue_item_status_changed, so the bulk event below need not include them.
+        for current_queue_item in current_queue_items:
+            if current_queue_item.batch_id in batch_ids:
+                if user_id is None or current_queue_item.user_id == user_id:
+                    self._set_queue_item_status(current_queue_item.item_id, "canceled")
 
+        self._remove_from_pending_index(chain.from_iterable(canceled_item_ids_by_user.values()))
         self._emit_queue_items_canceled(queue_id, canceled_item_ids_by_user)
         return CancelByBatchIDsResult(canceled=count)
 
@@ -706,7 +1105,7 @@ class SqliteSessionQueue(SessionQueueBase):
         self, queue_id: str, destination: str, user_id: Optional[str] = None
     ) -> CancelByDestinationResult:
         with self._db.transaction() as cursor:
-            current_queue_item = self.get_current(queue_id)
+            current_queue_items = self._get_in_progress_items(queue_id)
 
             # Build WHERE clause with optional user_id filter
             user_filter = "AND user_id = ?" if user_id is not None else ""
@@ -717,7 +1116,7 @@ class SqliteSessionQueue(SessionQueueBase):
                   AND status != 'canceled'
                   AND status != 'completed'
                   AND status != 'failed'
-                  -- We will cancel the current item separately below - skip it here
+                  -- We will cancel the current items separately below - skip them here
                   AND status != 'in_progress'
                   {user_filter}
                 """
@@ -737,12 +1136,14 @@ class SqliteSessionQueue(SessionQueueBase):
                 tuple(params),
             )
 
-        # Handle current item separately - check ownership if user_id is provided. This emits a
-        # per-item queue_item_status_changed, so the bulk event below need not include it.
-        if current_queue_item is not None and current_queue_item.destination == destination:
-            if user_id is None or current_queue_item.user_id == user_id:
-                self._set_queue_item_status(current_queue_item.item_id, "canceled")
+        # Handle current items separately - check ownership if user_id is provided. This emits a
+        # per-item queue_item_status_changed, so the bulk event below need not include them.
+        for current_queue_item in current_queue_items:
+            if current_queue_item.destination == destination:
+                if user_id is None or current_queue_item.user_id == user_id:
+                    self._set_queue_item_status(current_queue_item.item_id, "canceled")
 
+        self._remove_from_pending_index(chain.from_iterable(canceled_item_ids_by_user.values()))
         self._emit_queue_items_canceled(queue_id, canceled_item_ids_by_user)
         return CancelByDestinationResult(canceled=count)
 
@@ -750,18 +1151,17 @@ class SqliteSessionQueue(SessionQueueBase):
         self, queue_id: str, destination: str, user_id: Optional[str] = None
     ) -> DeleteByDestinationResult:
         with self._db.transaction() as cursor:
-            current_queue_item = self.get_current(queue_id)
-
-            # Handle current item separately - check ownership if user_id is provided. Its cancel
+            # Handle current items separately - check ownership if user_id is provided. Their cancel
             # emits a per-item queue_item_status_changed, so the bulk event below must not signal
-            # it a second time. Its row still matches the destination WHERE (the cancel only flips
-            # its status), so it is excluded from the collected ids — but not from the DELETE or
+            # them a second time. Their rows still match the destination WHERE (the cancel only flips
+            # their status), so they are excluded from the collected ids — but not from the DELETE or
             # the returned count.
-            canceled_current_item_id: Optional[int] = None
-            if current_queue_item is not None and current_queue_item.destination == destination:
-                if user_id is None or current_queue_item.user_id == user_id:
-                    self.cancel_queue_item(current_queue_item.item_id)
-                    canceled_current_item_id = current_queue_item.item_id
+            canceled_current_items: list[SessionQueueItem] = []
+            for current_queue_item in self._get_in_progress_items(queue_id):
+                if current_queue_item.destination == destination:
+                    if user_id is None or current_queue_item.user_id == user_id:
+                        self.cancel_queue_item(current_queue_item.item_id)
+                        canceled_current_items.append(current_queue_item)
 
             # Build WHERE clause with optional user_id filter
             user_filter = "AND user_id = ?" if user_id is not None else ""
@@ -777,12 +1177,12 @@ class SqliteSessionQueue(SessionQueueBase):
 
             deleted_item_ids_by_user = self._collect_item_ids_by_user(cursor, where, params)
             count = sum(len(item_ids) for item_ids in deleted_item_ids_by_user.values())
-            if canceled_current_item_id is not None and current_queue_item is not None:
-                owner_item_ids = deleted_item_ids_by_user.get(current_queue_item.user_id)
-                if owner_item_ids is not None and canceled_current_item_id in owner_item_ids:
-                    owner_item_ids.remove(canceled_current_item_id)
+            for canceled_current_item in canceled_current_items:
+                owner_item_ids = deleted_item_ids_by_user.get(canceled_current_item.user_id)
+                if owner_item_ids is not None and canceled_current_item.item_id in owner_item_ids:
+                    owner_item_ids.remove(canceled_current_item.item_id)
                     if not owner_item_ids:
-                        del deleted_item_ids_by_user[current_queue_item.user_id]
+                        del deleted_item_ids_by_user[canceled_current_item.user_id]
             cursor.execute(
                 f"""--sql
                 DELETE FROM session_queue
@@ -790,6 +1190,8 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 tuple(params),
             )
+            self._delete_unused_batch_templates(cursor)
+        self._remove_from_pending_index(chain.from_iterable(deleted_item_ids_by_user.values()))
         self._emit_queue_items_canceled(queue_id, deleted_item_ids_by_user)
         return DeleteByDestinationResult(deleted=count)
 
@@ -824,19 +1226,21 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 tuple(params),
             )
+            self._delete_unused_batch_templates(cursor)
+        self._remove_from_pending_index(chain.from_iterable(deleted_item_ids_by_user.values()))
         self._emit_queue_items_canceled(queue_id, deleted_item_ids_by_user)
         return DeleteAllExceptCurrentResult(deleted=count)
 
     def cancel_by_queue_id(self, queue_id: str) -> CancelByQueueIDResult:
         with self._db.transaction() as cursor:
-            current_queue_item = self.get_current(queue_id)
+            current_queue_items = self._get_in_progress_items(queue_id)
             where = """--sql
                 WHERE
                   queue_id is ?
                   AND status != 'canceled'
                   AND status != 'completed'
                   AND status != 'failed'
-                  -- We will cancel the current item separately below - skip it here
+                  -- We will cancel the current items separately below - skip them here
                   AND status != 'in_progress'
                 """
             params = [queue_id]
@@ -852,10 +1256,11 @@ class SqliteSessionQueue(SessionQueueBase):
                 tuple(params),
             )
 
-        # The current item's cancel emits its own queue_item_status_changed; the bulk event
+        # Each current item's cancel emits its own queue_item_status_changed; the bulk event
         # below covers the silently-updated rows.
-        if current_queue_item is not None and current_queue_item.queue_id == queue_id:
+        for current_queue_item in current_queue_items:
             self._set_queue_item_status(current_queue_item.item_id, "canceled")
+        self._remove_from_pending_index(chain.from_iterable(canceled_item_ids_by_user.values()))
         self._emit_queue_items_canceled(queue_id, canceled_item_ids_by_user)
         return CancelByQueueIDResult(canceled=count)
 
@@ -891,11 +1296,15 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 tuple(params),
             )
+        self._remove_from_pending_index(chain.from_iterable(canceled_item_ids_by_user.values()))
         self._emit_queue_items_canceled(queue_id, canceled_item_ids_by_user)
         return CancelAllExceptCurrentResult(canceled=count)
 
     def get_queue_item(self, item_id: int) -> SessionQueueItem:
-        with self._db.transaction() as cursor:
+        return self._get_queue_item(item_id)
+
+    def _get_queue_item(self, item_id: int, take_parsed_session: bool = False) -> SessionQueueItem:
+        with self._db.transaction(read_only=True) as cursor:
             cursor.execute(
                 """--sql
                 SELECT
@@ -911,7 +1320,7 @@ class SqliteSessionQueue(SessionQueueBase):
             result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         if result is None:
             raise SessionQueueItemNotFoundError(f"No queue item with id {item_id}")
-        return SessionQueueItem.queue_item_from_dict(dict(result))
+        return self._queue_item_from_row(result, take_parsed_session)
 
     def set_queue_item_session(self, item_id: int, session: GraphExecutionState) -> SessionQueueItem:
         with self._db.transaction() as cursor:
@@ -929,6 +1338,41 @@ class SqliteSessionQueue(SessionQueueBase):
             )
         return self.get_queue_item(item_id)
 
+    def add_checkpoint(
+        self, item_id: int, node_id: str, source_node_id: str, iteration_path: tuple[int, ...], output: str
+    ) -> None:
+        with self._db.transaction() as cursor:
+            cursor.execute(
+                """--sql
+                INSERT INTO session_queue_checkpoints (item_id, node_id, source_node_id, iteration_path, output)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (item_id, node_id, source_node_id, json.dumps(list(iteration_path)), output),
+            )
+
+    def get_checkpoints(self, item_id: int) -> list[SessionQueueItemCheckpoint]:
+        with self._db.transaction(read_only=True) as cursor:
+            cursor.execute(
+                """--sql
+                SELECT node_id, source_node_id, iteration_path, output, created_at
+                FROM session_queue_checkpoints
+                WHERE item_id = ?
+                ORDER BY checkpoint_id ASC
+                """,
+                (item_id,),
+            )
+            rows = cast(list[sqlite3.Row], cursor.fetchall())
+        return [
+            SessionQueueItemCheckpoint(
+                node_id=row[0],
+                source_node_id=row[1],
+                iteration_path=tuple(json.loads(row[2])),
+                output=row[3],
+                created_at=row[4],
+            )
+            for row in rows
+        ]
+
     def enqueue_workflow_call_child(
         self,
         parent_queue_item: SessionQueueItem,
@@ -1002,6 +1446,7 @@ class SqliteSessionQueue(SessionQueueBase):
             )
             item_id = cursor.lastrowid
 
+        self._pending_index.add(item_id, parent_queue_item.user_id, parent_queue_item.priority)
         queue_item = self.get_queue_item(item_id)
         batch_status = self.get_batch_status(queue_id=queue_item.queue_id, batch_id=queue_item.batch_id)
         queue_status = self.get_queue_status(
@@ -1050,7 +1495,7 @@ class SqliteSessionQueue(SessionQueueBase):
         status: Optional[QUEUE_ITEM_STATUS] = None,
         destination: Optional[str] = None,
     ) -> CursorPaginatedResults[SessionQueueItem]:
-        with self._db.transaction() as cursor_:
+        with self._db.transaction(read_only=True) as cursor_:
             item_id = cursor
             query = """--sql
                 SELECT *
@@ -1086,7 +1531,9 @@ class SqliteSessionQueue(SessionQueueBase):
             params.append(limit + 1)
             cursor_.execute(query, params)
             results = cast(list[sqlite3.Row], cursor_.fetchall())
-        items = [SessionQueueItem.queue_item_from_dict(dict(result)) for result in results]
+        items = [
+            SessionQueueItem.queue_item_from_dict(self._resolve_batch_template(dict(result))) for result in results
+        ]
         has_more = False
         if len(items) > limit:
             # remove the extra item
@@ -1100,7 +1547,7 @@ class SqliteSessionQueue(SessionQueueBase):
         destination: Optional[str] = None,
     ) -> list[SessionQueueItem]:
         """Gets all queue items that match the given parameters"""
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             query = """--sql
                 SELECT
                     sq.*,
@@ -1126,7 +1573,9 @@ class SqliteSessionQueue(SessionQueueBase):
                 """
             cursor.execute(query, params)
             results = cast(list[sqlite3.Row], cursor.fetchall())
-        items = [SessionQueueItem.queue_item_from_dict(dict(result)) for result in results]
+        items = [
+            SessionQueueItem.queue_item_from_dict(self._resolve_batch_template(dict(result))) for result in results
+        ]
         return items
 
     def get_queue_item_ids(
@@ -1135,7 +1584,7 @@ class SqliteSessionQueue(SessionQueueBase):
         order_dir: SQLiteDirection = SQLiteDirection.Descending,
         user_id: Optional[str] = None,
     ) -> ItemIdsResult:
-        with self._db.transaction() as cursor_:
+        with self._db.transaction(read_only=True) as cursor_:
             query = """--sql
                 SELECT item_id
                 FROM session_queue
@@ -1162,7 +1611,7 @@ class SqliteSessionQueue(SessionQueueBase):
         acting_user_id: Optional[str] = None,
         is_admin: bool = False,
     ) -> SessionQueueStatus:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             # Aggregate counts are always global (across all users). This lets a non-admin's
             # badge show "own / total" — their share of the whole queue — and lets the queue
             # list surface (redacted) entries belonging to other users.
@@ -1234,7 +1683,7 @@ class SqliteSessionQueue(SessionQueueBase):
         )
 
     def get_batch_status(self, queue_id: str, batch_id: str, user_id: Optional[str] = None) -> BatchStatus:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             query = """--sql
                 SELECT status, count(*), origin, destination
                 FROM session_queue
@@ -1269,7 +1718,7 @@ class SqliteSessionQueue(SessionQueueBase):
     def get_counts_by_destination(
         self, queue_id: str, destination: str, user_id: Optional[str] = None
     ) -> SessionQueueCountsByDestination:
-        with self._db.transaction() as cursor:
+        with self._db.transaction(read_only=True) as cursor:
             query = """--sql
                 SELECT status, count(*)
                 FROM session_queue
@@ -1381,6 +1830,9 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 values_to_insert,
             )
+        # The new queue items' IDs are not known, so they are loaded from the table on the next dequeue
+        if values_to_insert:
+            self._pending_index.invalidate()
 
         retry_result = RetryItemsResult(
             queue_id=queue_id,
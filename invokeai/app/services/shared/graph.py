@@ -4,6 +4,7 @@ import copy
 import itertools
 from collections import deque
 from dataclasses import dataclass
+from enum import Enum
 from typing import Any, Deque, Iterable, Literal, Optional, Type, TypeVar, Union, get_args, get_origin
 
 import networkx as nx
@@ -189,7 +190,7 @@ class _IfBranchScheduler:
 
     def _expand_with_ancestors(self, node_ids: set[str]) -> set[str]:
         expanded = set(node_ids)
-        source_graph = self._state.graph.nx_graph_flat()
+        source_graph = self._state.graph.nx_graph_view()
         for node_id in list(expanded):
             expanded.update(nx.ancestors(source_graph, node_id))
         return expanded
@@ -304,6 +305,7 @@ class _IfBranchScheduler:
         self._state._remove_from_ready_queues(exec_node_id)
         self._state._set_prepared_exec_state(exec_node_id, "skipped")
         self._state.executed.add(exec_node_id)
+        self._state._on_node_executed(exec_node_id)
 
         registry = self._state._prepared_registry()
         source_node_id = registry.get_source_node_id(exec_node_id)
@@ -312,6 +314,7 @@ class _IfBranchScheduler:
             if source_node_id not in self._state.executed:
                 self._state.executed.add(source_node_id)
                 self._state.executed_history.append(source_node_id)
+                self._state._on_node_executed(source_node_id)
 
     def try_resolve_if_node(self, exec_node_id: str) -> None:
         if exec_node_id in self._state._resolved_if_exec_branches:
@@ -345,6 +348,7 @@ class _ExecutionMaterializer:
 
     def __init__(self, state: "GraphExecutionState") -> None:
         self._state = state
+        self._prepared_prefix: tuple[list[str], int] = ([], 0)
 
     def _get_iterator_iteration_count(self, node_id: str, iteration_node_map: list[tuple[str, str]]) -> int:
         input_collection_edge = next(iter(self._state.graph._get_input_edges(node_id, COLLECTION_FIELD)))
@@ -525,15 +529,14 @@ class _ExecutionMaterializer:
 
     def _get_parent_iteration_mappings(self, next_node_id: str, graph: nx.DiGraph) -> list[list[tuple[str, str]]]:
         parent_node_ids = [source_id for source_id, _ in graph.in_edges(next_node_id)]
-        iterator_graph = self.iterator_graph(graph)
-        iterator_nodes = self.get_node_iterators(next_node_id, iterator_graph)
+        iterator_nodes = self.get_node_iterators(next_node_id)
         if not iterator_nodes:
             return self._get_parent_iteration_mappings_without_iterators(parent_node_ids)
 
         iterator_nodes_prepared = [list(self._state.source_prepared_mapping[node_id]) for node_id in iterator_nodes]
         iterator_node_prepared_combinations = list(itertools.product(*iterator_nodes_prepared))
 
-        execution_graph = self._state.execution_graph.nx_graph_flat()
+        execution_graph = self._state.execution_graph.nx_graph_view()
         prepared_parent_mappings = [
             [
                 (node_id, self.get_iteration_node(node_id, graph, execution_graph, prepared_iterators))
@@ -572,19 +575,9 @@ class _ExecutionMaterializer:
 
         return new_nodes
 
-    def iterator_graph(self, base: Optional[nx.DiGraph] = None) -> nx.DiGraph:
-        """Gets a DiGraph with edges to collectors removed so an ancestor search produces all active iterators for any node"""
-        g = base.copy() if base is not None else self._state.graph.nx_graph_flat()
-        collectors = (
-            n for n in self._state.graph.nodes if isinstance(self._state.graph.get_node(n), CollectInvocation)
-        )
-        for c in collectors:
-            g.remove_edges_from(list(g.in_edges(c)))
-        return g
-
-    def get_node_iterators(self, node_id: str, it_graph: Optional[nx.DiGraph] = None) -> list[str]:
-        g = it_graph or self.iterator_graph()
-        return [n for n in nx.ancestors(g, node_id) if isinstance(self._state.graph.get_node(n), IterateInvocation)]
+    def get_node_iterators(self, node_id: str) -> list[str]:
+        """Gets the iterators a node is run for, ignoring iterators whose iterations are collected on the way"""
+        return list(self._state.graph._get_index().active_iterators(node_id))
 
     def _get_prepared_nodes_for_source(self, source_node_id: str) -> set[str]:
         return {
@@ -666,23 +659,36 @@ class _ExecutionMaterializer:
 
         return self._find_prepared_node_matching_iterators(prepared_nodes, parent_iterators, execution_graph)
 
-    def prepare(self, base_g: Optional[nx.DiGraph] = None) -> Optional[str]:
-        g = base_g or self._state.graph.nx_graph_flat()
+    def _get_unprepared_nodes(self) -> list[str]:
+        """Gets the source nodes in topological order, skipping the leading nodes that are already prepared.
+
+        Prepared nodes stay prepared, so the skipped prefix only grows until the source graph changes.
+        """
+        order = self._state.graph._get_index().topological_order()
+        if self._prepared_prefix[0] is not order:
+            self._prepared_prefix = (order, 0)
+
+        start = self._prepared_prefix[1]
+        while start < len(order) and order[start] in self._state.source_prepared_mapping:
+            start += 1
+        self._prepared_prefix = (order, start)
+        return order[start:]
+
+    def _is_node_preparable(self, node_id: str, g: nx.DiGraph) -> bool:
+        index = self._state.graph._get_index()
+        return (
+            node_id not in self._state.source_prepared_mapping
+            and (
+                not isinstance(self._state.graph.get_node(node_id), IterateInvocation)
+                or all(source_id in self._state.executed for source_id, _ in g.in_edges(node_id))
+            )
+            and all(ancestor_id in self._state.executed for ancestor_id in index.iterator_ancestors(node_id))
+        )
+
+    def prepare(self) -> Optional[str]:
+        g = self._state.graph.nx_graph_view()
         next_node_id = next(
-            (
-                node_id
-                for node_id in nx.topological_sort(g)
-                if node_id not in self._state.source_prepared_mapping
-                and (
-                    not isinstance(self._state.graph.get_node(node_id), IterateInvocation)
-                    or all(source_id in self._state.executed for source_id, _ in g.in_edges(node_id))
-                )
-                and not any(
-                    isinstance(self._state.graph.get_node(ancestor_id), IterateInvocation)
-                    and ancestor_id not in self._state.executed
-                    for ancestor_id in nx.ancestors(g, node_id)
-                )
-            ),
+            (node_id for node_id in self._get_unprepared_nodes() if self._is_node_preparable(node_id, g)),
             None,
         )
 
@@ -743,6 +749,7 @@ class _ExecutionScheduler:
         self._state._set_prepared_exec_state(exec_node_id, "executed")
         self._state.executed.add(exec_node_id)
         self._state.results[exec_node_id] = output
+        self._state._on_node_executed(exec_node_id)
 
     def _mark_source_node_complete(self, exec_node_id: str) -> None:
         registry = self._state._prepared_registry()
@@ -751,6 +758,7 @@ class _ExecutionScheduler:
         if all(node_id in self._state.executed for node_id in prepared_nodes):
             self._state.executed.add(source_node_id)
             self._state.executed_history.append(source_node_id)
+            self._state._on_node_executed(source_node_id)
 
     def _decrement_child_indegree(self, child_exec_node_id: str, parent_exec_node_id: str) -> None:
         if child_exec_node_id not in self._state.indegree:
@@ -852,17 +860,7 @@ class _ExecutionRuntime:
         return self._state._prepared_registry().get_source_node_id(exec_node_id)
 
     def _get_ordered_iterator_sources(self, source_node_id: str) -> list[str]:
-        iterator_graph = self._state._iterator_graph(self._state.graph.nx_graph())
-        iterator_sources = [
-            node_id
-            for node_id in nx.ancestors(iterator_graph, source_node_id)
-            if isinstance(self._state.graph.get_node(node_id), IterateInvocation)
-        ]
-
-        topo = list(nx.topological_sort(iterator_graph))
-        topo_index = {node_id: i for i, node_id in enumerate(topo)}
-        iterator_sources.sort(key=lambda node_id: topo_index.get(node_id, 0))
-        return iterator_sources
+        return self._state._get_node_iterators(source_node_id)
 
     def _get_iterator_exec_id(
         self, iterator_source_id: str, exec_node_id: str, execution_graph: nx.DiGraph
@@ -874,7 +872,7 @@ class _ExecutionRuntime:
 
     def _build_iteration_path(self, exec_node_id: str, source_node_id: str) -> tuple[int, ...]:
         iterator_sources = self._get_ordered_iterator_sources(source_node_id)
-        execution_graph = self._state.execution_graph.nx_graph()
+        execution_graph = self._state.execution_graph.nx_graph_view()
         path: list[int] = []
         for iterator_source_id in iterator_sources:
             iterator_exec_id = self._get_iterator_exec_id(iterator_source_id, exec_node_id, execution_graph)
@@ -1110,13 +1108,51 @@ def are_connections_compatible(
 T = TypeVar("T")
 
 
+# Values of these types cannot be changed, so they are shared between nodes instead of being copied
+_IMMUTABLE_TYPES = (NoneType, bool, int, float, complex, str, bytes, Enum)
+
+
 def copydeep(obj: T) -> T:
-    """Deep-copies an object. If it is a pydantic model, use the model's copy method."""
+    """Copies a value passed from one node to another, so that neither node can change the other's value.
+
+    Immutable values are shared rather than copied. Lists, tuples, dicts and pydantic models are copied one level at a
+    time, sharing their immutable values, so a collection of image references costs a new list and a shallow copy of
+    each reference instead of a full deep copy. Values of any other type are deep-copied.
+    """
+    return _copy_value(obj)
+
+
+def _copy_value(obj: Any) -> Any:
+    if isinstance(obj, _IMMUTABLE_TYPES):
+        return obj
+    # Subclasses of the builtin containers may hold other state, so only the exact types are copied one level at a time
+    obj_type = type(obj)
+    if obj_type is list:
+        return [_copy_value(v) for v in obj]
+    if obj_type is tuple:
+        return tuple(_copy_value(v) for v in obj)
+    if obj_type is dict:
+        return {k: _copy_value(v) for k, v in obj.items()}
     if isinstance(obj, BaseModel):
-        return obj.model_copy(deep=True)
+        return _copy_model(obj)
     return copy.deepcopy(obj)
 
 
+def _copy_model(model: BaseModel) -> BaseModel:
+    if model.__pydantic_private__ or model.__pydantic_extra__:
+        return model.model_copy(deep=True)
+
+    values = {k: _copy_value(v) for k, v in model.__dict__.items()}
+    # A frozen model whose values are all shared cannot be changed either
+    if model.model_config.get("frozen") and all(values[k] is v for k, v in model.__dict__.items()):
+        return model
+
+    # Like `model_copy(deep=True)`, set the copied values directly, so they are not validated again or marked as set
+    copied = model.model_copy()
+    copied.__dict__.update(values)
+    return copied
+
+
 class NodeAlreadyInGraphError(ValueError):
     pass
 
@@ -1285,6 +1321,110 @@ class AnyInvocationOutput(BaseInvocationOutput):
         return {"oneOf": oneOf}
 
 
+class _GraphIndex:
+    """The layout of a graph's nodes and edges, kept up to date by the graph's methods as they change it.
+
+    Edge lookups and cycle checks use this instead of scanning every edge or building a new NetworkX graph. Orderings
+    derived from the layout are computed on first use and dropped whenever the layout changes. If the graph's `nodes` or
+    `edges` are changed directly, the graph builds a new index the next time it needs one.
+    """
+
+    def __init__(self, nodes: dict[str, BaseInvocation], edges: list[Edge]) -> None:
+        self._nodes = nodes
+        self._edges = edges
+        self.nx_graph = nx.DiGraph()
+        self.nx_graph.add_nodes_from(nodes)
+        self.input_edges: dict[str, list[Edge]] = {}
+        self.output_edges: dict[str, list[Edge]] = {}
+        for edge in edges:
+            self._link_edge(edge)
+        self._changed()
+
+    def is_current(self, nodes: dict[str, BaseInvocation], edges: list[Edge]) -> bool:
+        """Whether the index matches the given nodes and edges, i.e. they were only changed through the graph's methods."""
+        return nodes is self._nodes and edges is self._edges and self._sizes == (len(nodes), len(edges))
+
+    def _changed(self) -> None:
+        self._sizes = (len(self._nodes), len(self._edges))
+        self._topological_order: Optional[list[str]] = None
+        self._iterators: Optional[tuple[dict[str, list[str]], dict[str, list[str]]]] = None
+
+    def _link_edge(self, edge: Edge) -> None:
+        self.output_edges.setdefault(edge.source.node_id, []).append(edge)
+        self.input_edges.setdefault(edge.destination.node_id, []).append(edge)
+        self.nx_graph.add_edge(edge.source.node_id, edge.destination.node_id)
+
+    def add_node(self, node_id: str) -> None:
+        self.nx_graph.add_node(node_id)
+        self._changed()
+
+    def remove_node(self, node_id: str) -> None:
+        if self.nx_graph.has_node(node_id):
+            self.nx_graph.remove_node(node_id)
+        self.input_edges.pop(node_id, None)
+        self.output_edges.pop(node_id, None)
+        self._changed()
+
+    def add_edge(self, edge: Edge) -> None:
+        self._link_edge(edge)
+        self._changed()
+
+    def remove_edge(self, edge: Edge) -> None:
+        source_id, destination_id = edge.source.node_id, edge.destination.node_id
+        self.output_edges[source_id].remove(edge)
+        self.input_edges[destination_id].remove(edge)
+        # Several edges may connect the same two nodes, e.g. to different fields
+        if not any(e.destination.node_id == destination_id for e in self.output_edges[source_id]):
+            self.nx_graph.remove_edge(source_id, destination_id)
+        self._changed()
+
+    def has_edge(self, edge: Edge) -> bool:
+        return edge in self.output_edges.get(edge.source.node_id, [])
+
+    def topological_order(self) -> list[str]:
+        if self._topological_order is None:
+            self._topological_order = list(nx.topological_sort(self.nx_graph))
+        return self._topological_order
+
+    def iterator_ancestors(self, node_id: str) -> list[str]:
+        """Gets the iterators that are ancestors of a node, in topological order."""
+        return self._get_iterators()[0][node_id]
+
+    def active_iterators(self, node_id: str) -> list[str]:
+        """Gets the iterators that a node is run for, in topological order.
+
+        These are the node's iterator ancestors, except for those whose iterations a collector collects on the way.
+        """
+        return self._get_iterators()[1][node_id]
+
+    def _get_iterators(self) -> tuple[dict[str, list[str]], dict[str, list[str]]]:
+        if self._iterators is None:
+            self._iterators = self._index_iterators()
+        return self._iterators
+
+    def _index_iterators(self) -> tuple[dict[str, list[str]], dict[str, list[str]]]:
+        # A node's iterators are its parents' iterators, plus any parents that are iterators. No iterators are active in
+        # a collector, because a collector's input edges are not followed when searching for active iterators.
+        order = self.topological_order()
+        ancestors: dict[str, set[str]] = {}
+        active: dict[str, set[str]] = {}
+        for node_id in order:
+            is_collector = isinstance(self._nodes.get(node_id), CollectInvocation)
+            ancestors[node_id] = set()
+            active[node_id] = set()
+            for parent_id in self.nx_graph.predecessors(node_id):
+                parent_iterator = {parent_id} if isinstance(self._nodes.get(parent_id), IterateInvocation) else set()
+                ancestors[node_id].update(ancestors[parent_id], parent_iterator)
+                if not is_collector:
+                    active[node_id].update(active[parent_id], parent_iterator)
+
+        position = {node_id: i for i, node_id in enumerate(order)}
+        return (
+            {node_id: sorted(s, key=position.__getitem__) for node_id, s in ancestors.items()},
+            {node_id: sorted(s, key=position.__getitem__) for node_id, s in active.items()},
+        )
+
+
 class Graph(BaseModel):
     """A validated invocation graph made of nodes and typed edges."""
 
@@ -1295,6 +1435,12 @@ class Graph(BaseModel):
         description="The connections between nodes and their fields in this graph",
         default_factory=list,
     )
+    _index: Optional[_GraphIndex] = PrivateAttr(default=None)
+
+    def _get_index(self) -> _GraphIndex:
+        if self._index is None or not self._index.is_current(self.nodes, self.edges):
+            self._index = _GraphIndex(self.nodes, self.edges)
+        return self._index
 
     def add_node(self, node: BaseInvocation) -> None:
         """Adds a node to a graph
@@ -1305,7 +1451,9 @@ class Graph(BaseModel):
         if node.id in self.nodes:
             raise NodeAlreadyInGraphError()
 
+        index = self._get_index()
         self.nodes[node.id] = node
+        index.add_node(node.id)
 
     def delete_node(self, node_id: str) -> None:
         """Deletes a node from a graph"""
@@ -1321,7 +1469,9 @@ class Graph(BaseModel):
             for edge in output_edges:
                 self.delete_edge(edge)
 
+            index = self._get_index()
             del self.nodes[node_id]
+            index.remove_node(node_id)
 
         except NodeNotFoundError:
             pass  # Ignore, not doesn't exist (should this throw?)
@@ -1333,18 +1483,23 @@ class Graph(BaseModel):
         """
 
         self._validate_edge(edge)
-        if edge not in self.edges:
+        index = self._get_index()
+        if not index.has_edge(edge):
             self.edges.append(edge)
+            index.add_edge(edge)
         else:
             raise InvalidEdgeError()
 
     def delete_edge(self, edge: Edge) -> None:
         """Deletes an edge from a graph"""
 
+        index = self._get_index()
         try:
             self.edges.remove(edge)
         except ValueError:
             pass
+        else:
+            index.remove_edge(edge)
 
     def _validate_unique_node_ids(self) -> None:
         node_ids = [n.id for n in self.nodes.values()]
@@ -1383,8 +1538,7 @@ class Graph(BaseModel):
                 )
 
     def _validate_graph_is_acyclic(self) -> None:
-        graph = self.nx_graph_flat()
-        if not nx.is_directed_acyclic_graph(graph):
+        if not nx.is_directed_acyclic_graph(self._get_index().nx_graph):
             raise CyclicalGraphError("Graph contains cycles")
 
     def _validate_edge_type_compatibility(self) -> None:
@@ -1479,9 +1633,10 @@ class Graph(BaseModel):
             raise InvalidEdgeError(f"Edge already exists ({edge})")
 
     def _validate_edge_would_not_create_cycle(self, edge: Edge) -> None:
-        graph = self.nx_graph_flat()
-        graph.add_edge(edge.source.node_id, edge.destination.node_id)
-        if not nx.is_directed_acyclic_graph(graph):
+        # The graph is acyclic, so the edge only creates a cycle if its destination already leads to its source
+        graph = self._get_index().nx_graph
+        source_id, destination_id = edge.source.node_id, edge.destination.node_id
+        if source_id == destination_id or nx.has_path(graph, destination_id, source_id):
             raise InvalidEdgeError(f"Edge creates a cycle in the graph ({edge})")
 
     def _validate_edge_field_compatibility(
@@ -1564,8 +1719,10 @@ class Graph(BaseModel):
             raise NodeAlreadyInGraphError(f"Node with id {new_node.id} already exists in graph")
 
         # Set the new node in the graph
+        index = self._get_index()
         self.nodes[new_node.id] = new_node
         if new_node.id != node.id:
+            index.add_node(new_node.id)
             input_edges = self._get_input_edges(node_id)
             output_edges = self._get_output_edges(node_id)
 
@@ -1592,7 +1749,7 @@ class Graph(BaseModel):
     def _get_input_edges(self, node_id: str, field: Optional[str] = None) -> list[Edge]:
         """Gets all input edges for a node. If field is provided, only edges to that field are returned."""
 
-        edges = [e for e in self.edges if e.destination.node_id == node_id]
+        edges = list(self._get_index().input_edges.get(node_id, []))
 
         if field is None:
             return edges
@@ -1603,7 +1760,7 @@ class Graph(BaseModel):
 
     def _get_output_edges(self, node_id: str, field: Optional[str] = None) -> list[Edge]:
         """Gets all output edges for a node. If field is provided, only edges from that field are returned."""
-        edges = [e for e in self.edges if e.source.node_id == node_id]
+        edges = list(self._get_index().output_edges.get(node_id, []))
 
         if field is None:
             return edges
@@ -1878,22 +2035,24 @@ class Graph(BaseModel):
 
     def nx_graph(self) -> nx.DiGraph:
         """Returns a NetworkX DiGraph representing the layout of this graph"""
-        # TODO: Cache this?
-        g = nx.DiGraph()
-        g.add_nodes_from(list(self.nodes.keys()))
-        g.add_edges_from({(e.source.node_id, e.destination.node_id) for e in self.edges})
-        return g
+        return self._get_index().nx_graph.copy()
+
+    def nx_graph_view(self) -> nx.DiGraph:
+        """Returns a read-only NetworkX DiGraph representing the layout of this graph, without copying it.
+
+        The view follows changes made through the graph's methods. Use `nx_graph()` for a graph that can be modified.
+        """
+        return self._get_index().nx_graph.copy(as_view=True)
 
     def nx_graph_flat(self, nx_graph: Optional[nx.DiGraph] = None) -> nx.DiGraph:
         """Returns a flattened NetworkX DiGraph, including all subgraphs (but not with iterations expanded)"""
-        g = nx_graph or nx.DiGraph()
-
-        # Add all nodes from this graph except graph/iteration nodes
-        g.add_nodes_from([n.id for n in self.nodes.values()])
+        if not nx_graph:
+            return self.nx_graph()
 
-        unique_edges = {(e.source.node_id, e.destination.node_id) for e in self.edges}
-        g.add_edges_from(unique_edges)
-        return g
+        layout = self._get_index().nx_graph
+        nx_graph.add_nodes_from(layout.nodes)
+        nx_graph.add_edges_from(layout.edges)
+        return nx_graph
 
 
 class GraphExecutionState(BaseModel):
@@ -1979,6 +2138,8 @@ class GraphExecutionState(BaseModel):
     _execution_materializer: Optional[_ExecutionMaterializer] = PrivateAttr(default=None)
     _execution_scheduler: Optional[_ExecutionScheduler] = PrivateAttr(default=None)
     _execution_runtime: Optional[_ExecutionRuntime] = PrivateAttr(default=None)
+    # The executed nodes whose results are still consumed by pending edges, maintained as nodes are executed
+    _pending_result_ids: Optional[set[str]] = PrivateAttr(default=None)
 
     def _type_key(self, node_obj: BaseInvocation) -> str:
         return node_obj.__class__.__name__
@@ -2046,12 +2207,11 @@ class GraphExecutionState(BaseModel):
         self._scheduler().enqueue_if_ready(nid)
 
     def _prepare_until_node_ready(self) -> Optional[BaseInvocation]:
-        base_graph = self.graph.nx_graph_flat()
-        prepared_id = self._materializer().prepare(base_graph)
+        prepared_id = self._materializer().prepare()
         next_node: Optional[BaseInvocation] = None
 
         while prepared_id is not None:
-            prepared_id = self._materializer().prepare(base_graph)
+            prepared_id = self._materializer().prepare()
             if next_node is None:
                 next_node = self._get_next_node()
 
@@ -2069,6 +2229,7 @@ class GraphExecutionState(BaseModel):
         self._execution_materializer = None
         self._execution_scheduler = None
         self._execution_runtime = None
+        self._pending_result_ids = None
 
     def _rehydrate_prepared_exec_metadata(self) -> None:
         registry = self._prepared_registry()
@@ -2107,8 +2268,7 @@ class GraphExecutionState(BaseModel):
             self._resolved_if_exec_branches[exec_node_id] = "true_input" if node.condition else "false_input"
 
     def _rehydrate_ready_queues(self) -> None:
-        execution_graph = self.execution_graph.nx_graph_flat()
-        for exec_node_id in nx.topological_sort(execution_graph):
+        for exec_node_id in nx.topological_sort(self.execution_graph.nx_graph_view()):
             if exec_node_id in self.executed:
                 continue
             if self.indegree.get(exec_node_id) != 0:
@@ -2149,10 +2309,11 @@ class GraphExecutionState(BaseModel):
         return v
 
     def next(self) -> Optional[BaseInvocation]:
-        """Gets the next node ready to execute."""
+        """Gets the next node ready to execute.
 
-        # TODO: enable multiple nodes to execute simultaneously by tracking currently executing nodes
-        #       possibly with a timeout?
+        A node that is returned is no longer ready, so `next()` may be called again before it completes to get the other
+        ready nodes, and run them at the same time. Nodes that depend on it are only prepared once it completes.
+        """
 
         if self.is_waiting_on_workflow_call():
             return None
@@ -2176,6 +2337,14 @@ class GraphExecutionState(BaseModel):
         """Marks a node as complete"""
         self._scheduler().complete(node_id, output)
 
+    def get_iteration_path(self, node_id: str) -> tuple[int, ...]:
+        """Gets the indices of the iterations a prepared node belongs to, outermost first.
+
+        Together with its source node ID, this identifies a prepared node across runs of the same session, unlike the
+        prepared node ID, which is generated when the node is prepared.
+        """
+        return self._get_iteration_path(node_id)
+
     def set_node_error(self, node_id: str, error: str):
         """Marks a node as errored"""
         self.errors[node_id] = error
@@ -2184,13 +2353,53 @@ class GraphExecutionState(BaseModel):
         """Returns true if the graph is complete"""
         if self.is_waiting_on_workflow_call():
             return False
-        node_ids = set(self.graph.nx_graph_flat().nodes)
-        return self.has_error() or all((k in self.executed for k in node_ids))
+        return self.has_error() or all((k in self.executed for k in self.graph.nodes))
 
     def has_error(self) -> bool:
         """Returns true if the graph has any errors"""
         return len(self.errors) > 0
 
+    def get_pending_results(self) -> dict[str, BaseInvocationOutput]:
+        """Gets the results of executed nodes that are still inputs to nodes that have not been executed.
+
+        A result is pending if an edge connects its node to an unexecuted node in the execution graph, or if an edge
+        connects its source node to a source node that has not been fully executed, because iterations of that node may
+        still be prepared.
+        """
+        if self._pending_result_ids is None:
+            self._pending_result_ids = {node_id for node_id in self.results if self._is_result_pending(node_id)}
+        return {node_id: self.results[node_id] for node_id in self._pending_result_ids}
+
+    def _is_result_pending(self, exec_node_id: str) -> bool:
+        if exec_node_id not in self.results:
+            return False
+        exec_edges = self.execution_graph._get_index().output_edges.get(exec_node_id, [])
+        if any(e.destination.node_id not in self.executed for e in exec_edges):
+            return True
+        source_node_id = self.prepared_source_mapping.get(exec_node_id)
+        if source_node_id is None:
+            return False
+        source_edges = self.graph._get_index().output_edges.get(source_node_id, [])
+        return any(e.destination.node_id not in self.executed for e in source_edges)
+
+    def _on_node_executed(self, node_id: str) -> None:
+        """Updates the pending results after a prepared or source node has been executed or skipped.
+
+        Only the node's own result and the results of its inputs can change, so this does not scan the whole graph. A
+        result is never pending again once it is not, because no more iterations of its consumers can be prepared.
+        """
+        pending = self._pending_result_ids
+        if pending is None:
+            return
+        if self._is_result_pending(node_id):
+            pending.add(node_id)
+        input_ids = {e.source.node_id for e in self.execution_graph._get_index().input_edges.get(node_id, [])}
+        for edge in self.graph._get_index().input_edges.get(node_id, []):
+            input_ids.update(self.source_prepared_mapping.get(edge.source.node_id, ()))
+        for input_id in input_ids & pending:
+            if not self._is_result_pending(input_id):
+                pending.discard(input_id)
+
     def get_workflow_call_depth(self) -> int:
         return len(self.workflow_call_stack)
 
@@ -2338,14 +2547,11 @@ class GraphExecutionState(BaseModel):
     def _create_execution_node(self, node_id: str, iteration_node_map: list[tuple[str, str]]) -> list[str]:
         return self._materializer().create_execution_node(node_id, iteration_node_map)
 
-    def _iterator_graph(self, base: Optional[nx.DiGraph] = None) -> nx.DiGraph:
-        return self._materializer().iterator_graph(base)
-
-    def _get_node_iterators(self, node_id: str, it_graph: Optional[nx.DiGraph] = None) -> list[str]:
-        return self._materializer().get_node_iterators(node_id, it_graph)
+    def _get_node_iterators(self, node_id: str) -> list[str]:
+        return self._materializer().get_node_iterators(node_id)
 
-    def _prepare(self, base_g: Optional[nx.DiGraph] = None) -> Optional[str]:
-        return self._materializer().prepare(base_g)
+    def _prepare(self) -> Optional[str]:
+        return self._materializer().prepare()
 
     def _get_iteration_node(
         self,
@@ -12,6 +12,7 @@ from invokeai.app.invocations.fields import MetadataField, WithBoard, WithMetada
 from invokeai.app.services.board_records.board_records_common import BoardRecordOrderBy
 from invokeai.app.services.boards.boards_common import BoardDTO
 from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.events.events_progress import ProgressEventChannel
 from invokeai.app.services.image_records.image_records_common import ImageCategory, ResourceOrigin
 from invokeai.app.services.images.images_common import ImageDTO
 from invokeai.app.services.invocation_services import InvocationServices
@@ -62,6 +63,8 @@ class InvocationContextData:
     """The invocation that is being executed."""
     source_invocation_id: str
     """The ID of the invocation from which the currently executing invocation was prepared."""
+    progress_channel: Optional[ProgressEventChannel] = None
+    """Limits how often the queue item's progress events are emitted. If omitted, every progress event is emitted."""
 
 
 class InvocationContextInterface:
@@ -243,19 +246,16 @@ class ImagesInterface(InvocationContextInterface):
         Returns:
             The image as a PIL Image object.
         """
-        image = self._services.images.get_pil_image(image_name)
-        if mode and mode != image.mode:
-            try:
-                # convert makes a copy!
-                image = image.convert(mode)
-            except ValueError:
-                self._services.logger.warning(
-                    f"Could not convert image from {image.mode} to {mode}. Using original mode instead."
-                )
-        else:
-            # copy the image to prevent the user from modifying the original
-            image = image.copy()
-        return image
+        try:
+            # Decoded and converted images are cached, so repeated reads of the same image are cheap
+            image = self._services.images.get_pil_image(image_name, mode)
+        except ValueError:
+            image = self._services.images.get_pil_image(image_name)
+            self._services.logger.warning(
+                f"Could not convert image from {image.mode} to {mode}. Using original mode instead."
+            )
+        # copy the image to prevent the user from modifying the cached image
+        return image.copy()
 
     def get_metadata(self, image_name: str) -> Optional[MetadataField]:
         """Gets an image's metadata, if it has any.
@@ -712,12 +712,17 @@ class UtilInterface(InvocationContextInterface):
                 original size.
         """
 
+        # Skip progress that would be superseded before the UI could show it, before its image is encoded
+        if self._data.progress_channel is not None and not self._data.progress_channel.accept(message, percentage):
+            return
+
+        as_binary = self._services.configuration.progress_image_transport == "binary"
         self._services.events.emit_invocation_progress(
             queue_item=self._data.queue_item,
             invocation=self._data.invocation,
             message=message,
             percentage=percentage,
-            image=ProgressImage.build(image, image_size) if image else None,
+            image=ProgressImage.build(image, image_size, as_binary) if image else None,
         )
 
 
@@ -25,6 +25,11 @@ class SqliteDatabase:
     - `conn`: A `sqlite3.Connection` object. Note that the connection must never be closed if the database is in-memory.
     - `lock`: A shared re-entrant lock, used to approximate thread safety.
     - `clean()`: Runs the SQL `VACUUM;` command and reports on the freed space.
+    - `transaction()`: A context manager for DB work. See its docstring for read-only transactions.
+
+    All writes go through the single `conn`, serialized by `lock`. Read-only transactions on a database file use a
+    separate read-only connection per thread instead, so they run concurrently with each other and with writes. In WAL
+    mode, each read sees the database as of the last commit before it started.
     """
 
     def __init__(self, db_path: Path | None, logger: Logger, verbose: bool = False) -> None:
@@ -33,6 +38,8 @@ class SqliteDatabase:
         self._db_path = db_path
         self._verbose = verbose
         self._lock = threading.RLock()
+        # Per-thread state: the thread's read-only connection, and how deeply it is nested in transactions
+        self._local = threading.local()
 
         if not self._db_path:
             logger.info("Initializing in-memory database")
@@ -76,12 +83,23 @@ class SqliteDatabase:
             raise
 
     @contextmanager
-    def transaction(self) -> Generator[sqlite3.Cursor, None, None]:
+    def transaction(self, read_only: bool = False) -> Generator[sqlite3.Cursor, None, None]:
         """
         Thread-safe context manager for DB work.
         Acquires the RLock, yields a Cursor, then commits or rolls back.
+
+        If `read_only` is True, the lock is not acquired. Instead, the cursor belongs to a read-only connection owned by
+        the current thread, and all of its queries see the same snapshot of the database. Writing with it raises an
+        error. For in-memory databases, and when the thread is already inside a read-write transaction, the shared
+        connection is used as usual, so uncommitted writes are visible.
         """
+        if read_only and self._db_path and getattr(self._local, "write_depth", 0) == 0:
+            with self._read_transaction() as cursor:
+                yield cursor
+            return
+
         with self._lock:
+            self._local.write_depth = getattr(self._local, "write_depth", 0) + 1
             cursor = self._conn.cursor()
             try:
                 yield cursor
@@ -91,3 +109,35 @@ class SqliteDatabase:
                 raise
             finally:
                 cursor.close()
+                self._local.write_depth -= 1
+
+    @contextmanager
+    def _read_transaction(self) -> Generator[sqlite3.Cursor, None, None]:
+        conn = self._get_read_conn()
+        read_depth: int = getattr(self._local, "read_depth", 0)
+        cursor = conn.cursor()
+        try:
+            # Nested read-only transactions share the outermost transaction's snapshot
+            if read_depth == 0:
+                cursor.execute("BEGIN;")
+            self._local.read_depth = read_depth + 1
+            yield cursor
+        finally:
+            self._local.read_depth = read_depth
+            cursor.close()
+            if read_depth == 0:
+                conn.rollback()
+
+    def _get_read_conn(self) -> sqlite3.Connection:
+        """Gets the current thread's read-only connection, opening it if needed."""
+        conn: sqlite3.Connection | None = getattr(self._local, "read_conn", None)
+        if conn is None:
+            assert self._db_path is not None
+            conn = sqlite3.connect(f"{self._db_path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            if self._verbose:
+                conn.set_trace_callback(self._logger.debug)
+            conn.execute("PRAGMA query_only = ON;")
+            conn.execute("PRAGMA busy_timeout = 5000;")  # 5 seconds
+            self._local.read_conn = conn
+        return conn
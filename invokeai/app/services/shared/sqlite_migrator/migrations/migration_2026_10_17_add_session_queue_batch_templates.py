@@ -0,0 +1,39 @@
+"""Add the session_queue_batch_templates table.
+
+Every session in a batch shares the same graph and workflow, and differs only in the field values that the batch
+substitutes into the graph. Instead of storing a full copy of the session and workflow on each queue item, the batch's
+session and workflow are stored once in ``session_queue_batch_templates``. Queue items store only their field values,
+and their session is built from the template when the item is read.
+
+Queue items created before this migration keep their full session and workflow, and are read as before.
+"""
+
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+
+class AddSessionQueueBatchTemplatesCallback:
+    """Add the session_queue_batch_templates table."""
+
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute(
+            """--sql
+            CREATE TABLE IF NOT EXISTS session_queue_batch_templates (
+                batch_id TEXT NOT NULL PRIMARY KEY,
+                -- the session shared by all queue items in the batch, before field values are substituted
+                session TEXT NOT NULL,
+                -- the workflow shared by all queue items in the batch
+                workflow TEXT,
+                created_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW'))
+            );
+            """
+        )
+
+
+def build_migration() -> Migration:
+    return Migration(
+        id="2026_10_17_add_session_queue_batch_templates",
+        depends_on="2026_10_17_add_session_queue_worker_id",
+        callback=AddSessionQueueBatchTemplatesCallback(),
+    )
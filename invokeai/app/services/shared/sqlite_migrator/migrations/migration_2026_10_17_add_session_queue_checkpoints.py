@@ -0,0 +1,48 @@
+"""Add the session_queue_checkpoints table.
+
+While a queue item runs, its session lives in memory, and is only written to ``session_queue`` when the item finishes or
+waits on a workflow call. Each node that completes is appended to ``session_queue_checkpoints`` with its output, so that
+a queue item interrupted by a restart can resume from its completed nodes instead of being canceled.
+
+Checkpoints are deleted with their queue item, and when the queue item finishes.
+"""
+
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+
+class AddSessionQueueCheckpointsCallback:
+    """Add the session_queue_checkpoints table."""
+
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute(
+            """--sql
+            CREATE TABLE IF NOT EXISTS session_queue_checkpoints (
+                checkpoint_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_id INTEGER NOT NULL,
+                -- the prepared node that completed, and the node in the session's graph it was prepared from
+                node_id TEXT NOT NULL,
+                source_node_id TEXT NOT NULL,
+                -- the indices of the iterations the node belongs to, as a JSON list
+                iteration_path TEXT NOT NULL,
+                output TEXT NOT NULL,
+                created_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
+                FOREIGN KEY (item_id) REFERENCES session_queue (item_id) ON DELETE CASCADE
+            );
+            """
+        )
+        cursor.execute(
+            """--sql
+            CREATE INDEX IF NOT EXISTS idx_session_queue_checkpoints_item_id
+            ON session_queue_checkpoints (item_id, checkpoint_id);
+            """
+        )
+
+
+def build_migration() -> Migration:
+    return Migration(
+        id="2026_10_17_add_session_queue_checkpoints",
+        depends_on="2026_10_17_add_session_queue_batch_templates",
+        callback=AddSessionQueueCheckpointsCallback(),
+    )
@@ -0,0 +1,32 @@
+"""Add the worker_id column to session_queue.
+
+The session processor may run several workers, each on its own device. When a worker dequeues a queue item, it
+claims the item by recording its ID in ``worker_id``, so that events and the queue list can show where each item ran.
+"""
+
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+
+class AddSessionQueueWorkerIdCallback:
+    """Add the worker_id column to session_queue."""
+
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='session_queue';")
+        if cursor.fetchone() is None:
+            return
+
+        cursor.execute("PRAGMA table_info(session_queue);")
+        columns = [row[1] for row in cursor.fetchall()]
+
+        if "worker_id" not in columns:
+            cursor.execute("ALTER TABLE session_queue ADD COLUMN worker_id TEXT;")
+
+
+def build_migration() -> Migration:
+    return Migration(
+        id="2026_10_17_add_session_queue_worker_id",
+        depends_on="2026_07_03_round_robin_indexes",
+        callback=AddSessionQueueWorkerIdCallback(),
+    )
@@ -102,6 +102,11 @@ class Config_Base(ABC, BaseModel):
     """Set of all non-abstract subclasses of Config_Base, for use during model probing. In other words, this is the set
     of all known model config types."""
 
+    PROBE_USES_FILENAME: ClassVar[bool] = False
+    """Whether 'from_model_on_disk' looks at the model's file name, e.g. to tell apart bases or variants with identical
+    weights. Models with the same keys can then match different config classes, so a cached identification result for
+    one model is not reused for another."""
+
     model_config = ConfigDict(
         validate_assignment=True,
         json_schema_serialization_defaults_required=True,
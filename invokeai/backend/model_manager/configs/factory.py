@@ -1,3 +1,5 @@
+import hashlib
+import json
 import logging
 from dataclasses import dataclass
 from pathlib import Path
@@ -5,6 +7,7 @@ from typing import (
     Union,
 )
 
+import torch
 from pydantic import Discriminator, TypeAdapter, ValidationError
 from typing_extensions import Annotated, Any
 
@@ -87,6 +90,7 @@ from invokeai.backend.model_manager.configs.main import (
     Main_GGUF_ZImage_Config,
     MainModelDefaultSettings,
 )
+from invokeai.backend.model_manager.configs.probe_cache import ModelProbeCache
 from invokeai.backend.model_manager.configs.qwen3_encoder import (
     Qwen3Encoder_Checkpoint_Config,
     Qwen3Encoder_GGUF_Config,
@@ -133,6 +137,7 @@ from invokeai.backend.model_manager.taxonomy import (
     ModelType,
     variant_type_adapter,
 )
+from invokeai.backend.quantization.gguf.ggml_tensor import GGMLTensor
 
 logger = logging.getLogger(__name__)
 app_config = get_config()
@@ -160,6 +165,20 @@ _MAX_FILES_IN_MODEL_DIR = 50
 # Maximum depth to search for model files in directories
 _MAX_SEARCH_DEPTH = 2
 
+# The fields set by ModelConfigFactory.build_common_fields() that do not affect which config class matches a model.
+# Cached identification results are only reused when the overrides are limited to these fields.
+_COMMON_FIELDS = {"key", "hash", "path", "file_size", "name", "description", "source", "source_type"}
+
+# The overrides that can rule out config classes, and so are part of a key signature.
+_SIGNATURE_OVERRIDE_FIELDS = ("type", "format", "base", "variant")
+
+# The safetensors metadata that config classes use to tell models with the same keys apart. Config classes that start
+# matching on other metadata must add it here, or models that only differ by it will be identified alike.
+_SIGNATURE_METADATA_KEYS = ("modelspec.sai_model_spec", "modelspec.architecture", "ot_branch", "software")
+
+# File types whose state dicts are loaded from the file header, so their key signature is cheap to compute.
+_SIGNATURE_EXTENSIONS = {".safetensors", ".gguf"}
+
 
 # The types are listed explicitly because IDEs/LSPs can't identify the correct types
 # when AnyModelConfig is constructed dynamically using ModelConfigBase.all_config_classes
@@ -473,12 +492,66 @@ class ModelConfigFactory:
             case _:
                 return 3
 
+    @staticmethod
+    def get_key_signature(mod: ModelOnDisk, override_fields: dict[str, Any] | None = None) -> str | None:
+        """Get a digest of everything that config classes use to tell single-file models apart: the keys, shapes and
+        dtypes of the state dict, the metadata that identifies some formats and the overrides that rule out config
+        classes. Models with the same key signature match the same config class.
+
+        Returns None for directories and for file types whose state dict would have to be loaded in full.
+        """
+        if not mod.path.is_file() or mod.path.suffix not in _SIGNATURE_EXTENSIONS:
+            return None
+        try:
+            state_dict = mod.load_state_dict()
+        except Exception:
+            return None
+
+        keys: list[list[Any]] = []
+        for key, value in state_dict.items():
+            if isinstance(value, GGMLTensor):
+                keys.append([str(key), value._ggml_quantization_type.name, list(value.tensor_shape)])
+            elif isinstance(value, torch.Tensor):
+                keys.append([str(key), str(value.dtype), list(value.shape)])
+            else:
+                keys.append([str(key), type(value).__name__])
+        metadata = mod.metadata()
+        overrides = override_fields or {}
+        signature = {
+            "suffix": mod.path.suffix,
+            "keys": sorted(keys),
+            "metadata": {k: metadata[k] for k in _SIGNATURE_METADATA_KEYS if k in metadata},
+            "overrides": {k: str(overrides[k]) for k in _SIGNATURE_OVERRIDE_FIELDS if overrides.get(k) is not None},
+        }
+        return hashlib.sha256(json.dumps(signature, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def _try_config_class(
+        candidate_class: type[Config_Base], mod: ModelOnDisk, fields: dict[str, Any]
+    ) -> AnyModelConfig | Exception:
+        """Try to build an instance of a model config class. Returns the instance, or the exception that was raised."""
+        try:
+            # Technically, from_model_on_disk returns a Config_Base, but in practice it will always be a member of
+            # the AnyModelConfig union.
+            return candidate_class.from_model_on_disk(mod, fields)  # type: ignore
+        except NotAMatchError as e:
+            # This means the model didn't match this config class. It's not an error, just no match.
+            return e
+        except ValidationError as e:
+            # This means the model matched, but we couldn't create the pydantic model instance for the config.
+            # Maybe invalid overrides were provided?
+            return e
+        except Exception as e:
+            # Some other unexpected error occurred. Store the exception for reporting later.
+            return e
+
     @staticmethod
     def from_model_on_disk(
         mod: str | Path | ModelOnDisk,
         override_fields: dict[str, Any] | None = None,
         hash_algo: HASHING_ALGORITHMS = "blake3_single",
         allow_unknown: bool = True,
+        probe_cache: ModelProbeCache | None = None,
     ) -> ModelClassificationResult:
         """Classify a model on disk and return the best matching model config.
 
@@ -488,6 +561,9 @@ class ModelConfigFactory:
                 over the values extracted from the model on disk, but this cannot force a match if the
                 model on disk doesn't actually match the config class.
             hash_algo: The hashing algorithm to use when computing the model hash if needed.
+            probe_cache: Optional cache of identification results. If the model has not changed since it was cached,
+                the cached result is returned without reading or hashing the model. Otherwise, the config class that
+                matched the last model with the same key signature is tried before all the others.
 
         Returns:
             A ModelClassificationResult containing the best matching model config (or None if no match)
@@ -504,32 +580,51 @@ class ModelConfigFactory:
         # This rejects obviously non-model paths early, saving time
         ModelConfigFactory._validate_path_looks_like_model(mod.path)
 
+        overrides = {k: v for k, v in (override_fields or {}).items() if v is not None}
+        # Cached results can only be reused if the overrides cannot change which config class matches.
+        only_common_overrides = overrides.keys() <= _COMMON_FIELDS
+        cache_entry = probe_cache.get(mod.path) if probe_cache is not None else None
+        if cache_entry is not None and cache_entry.hash_algo == mod.hash_algo and "hash" not in overrides:
+            # Hashing is usually the slowest part of identifying a model.
+            override_fields = {**(override_fields or {}), "hash": cache_entry.hash}
+
         # We will always need these fields to build any model config.
         fields = ModelConfigFactory.build_common_fields(mod, override_fields)
 
+        if cache_entry is not None and only_common_overrides:
+            try:
+                config = ModelConfigFactory.from_dict({**cache_entry.config, **fields})
+                return ModelClassificationResult(config=config, details={config.__class__.__name__: config})
+            except ValidationError:
+                # E.g. the config was cached before a change to its schema.
+                pass
+
         # Store results as a mapping of config class to either an instance of that class or an exception
         # that was raised when trying to build it.
         details: dict[str, AnyModelConfig | Exception] = {}
 
+        # Models with the same key signature match the same config class, so try the class that matched the last such
+        # model first. Only that class is tried if it matches. Classes that look at the file name are skipped, as
+        # models with the same keys but different names may match other classes.
+        signature = ModelConfigFactory.get_key_signature(mod, overrides) if probe_cache is not None else None
+        if probe_cache is not None and signature is not None:
+            class_name = probe_cache.get_config_class(signature)
+            candidate_class = next((c for c in Config_Base.CONFIG_CLASSES if c.__name__ == class_name), None)
+            if (
+                candidate_class is not None
+                and candidate_class is not Unknown_Config
+                and not candidate_class.PROBE_USES_FILENAME
+            ):
+                # Config classes may add to the fields, so they get a copy in case the other classes have to be tried.
+                details[class_name] = ModelConfigFactory._try_config_class(candidate_class, mod, dict(fields))
+
         # Try to build an instance of each model config class that uses the classify API.
         # Each class will either return an instance of itself or raise NotAMatch if it doesn't match.
         # Other exceptions may be raised if something unexpected happens during matching or building.
-        for candidate_class in filter(lambda x: x is not Unknown_Config, Config_Base.CONFIG_CLASSES):
-            candidate_name = candidate_class.__name__
-            try:
-                # Technically, from_model_on_disk returns a Config_Base, but in practice it will always be a member of
-                # the AnyModelConfig union.
-                details[candidate_name] = candidate_class.from_model_on_disk(mod, fields)  # type: ignore
-            except NotAMatchError as e:
-                # This means the model didn't match this config class. It's not an error, just no match.
-                details[candidate_name] = e
-            except ValidationError as e:
-                # This means the model matched, but we couldn't create the pydantic model instance for the config.
-                # Maybe invalid overrides were provided?
-                details[candidate_name] = e
-            except Exception as e:
-                # Some other unexpected error occurred. Store the exception for reporting later.
-                details[candidate_name] = e
+        if not any(isinstance(r, Config_Base) for r in details.values()):
+            details = {}
+            for candidate_class in filter(lambda x: x is not Unknown_Config, Config_Base.CONFIG_CLASSES):
+                details[candidate_class.__name__] = ModelConfigFactory._try_config_class(candidate_class, mod, fields)
 
         # Extract just the successful matches
         matches = [r for r in details.values() if isinstance(r, Config_Base)]
@@ -561,6 +656,13 @@ class ModelConfigFactory:
             case _:
                 pass
 
+        if probe_cache is not None:
+            if signature is not None:
+                probe_cache.put_config_class(signature, config.__class__.__name__)
+            if only_common_overrides and "hash" not in overrides:
+                probed_fields = {k: v for k, v in config.model_dump(mode="json").items() if k not in _COMMON_FIELDS}
+                probe_cache.put(mod.path, mod.hash_algo, config.hash, probed_fields)
+
         return ModelClassificationResult(config=config, details=details)
 
 
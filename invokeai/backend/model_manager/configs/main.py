@@ -1,7 +1,7 @@
 import re
 from abc import ABC
 from pathlib import Path
-from typing import Any, Literal, Self
+from typing import Any, ClassVar, Literal, Self
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -542,6 +542,8 @@ class Main_Checkpoint_FLUX_Config(Checkpoint_Config_Base, Main_Config_Base, Conf
 class Main_Checkpoint_Flux2_Config(Checkpoint_Config_Base, Main_Config_Base, Config_Base):
     """Model config for FLUX.2 checkpoint models (e.g. Klein)."""
 
+    PROBE_USES_FILENAME: ClassVar[bool] = True
+
     format: Literal[ModelFormat.Checkpoint] = Field(default=ModelFormat.Checkpoint)
     base: Literal[BaseModelType.Flux2] = Field(default=BaseModelType.Flux2)
 
@@ -718,6 +720,8 @@ class Main_GGUF_FLUX_Config(Checkpoint_Config_Base, Main_Config_Base, Config_Bas
 class Main_GGUF_Flux2_Config(Checkpoint_Config_Base, Main_Config_Base, Config_Base):
     """Model config for GGUF-quantized FLUX.2 checkpoint models (e.g. Klein)."""
 
+    PROBE_USES_FILENAME: ClassVar[bool] = True
+
     base: Literal[BaseModelType.Flux2] = Field(default=BaseModelType.Flux2)
     format: Literal[ModelFormat.GGUFQuantized] = Field(default=ModelFormat.GGUFQuantized)
 
@@ -835,6 +839,8 @@ class Main_Diffusers_FLUX_Config(Diffusers_Config_Base, Main_Config_Base, Config
 class Main_Diffusers_Flux2_Config(Diffusers_Config_Base, Main_Config_Base, Config_Base):
     """Model config for FLUX.2 models in diffusers format (e.g. FLUX.2 Klein)."""
 
+    PROBE_USES_FILENAME: ClassVar[bool] = True
+
     base: Literal[BaseModelType.Flux2] = Field(BaseModelType.Flux2)
     variant: Flux2VariantType = Field()
 
@@ -1390,6 +1396,8 @@ class Main_Checkpoint_QwenImage_Config(Checkpoint_Config_Base, Main_Config_Base,
     VRAM savings.
     """
 
+    PROBE_USES_FILENAME: ClassVar[bool] = True
+
     base: Literal[BaseModelType.QwenImage] = Field(default=BaseModelType.QwenImage)
     format: Literal[ModelFormat.Checkpoint] = Field(default=ModelFormat.Checkpoint)
     variant: QwenImageVariantType | None = Field(default=None)
@@ -1416,6 +1424,8 @@ class Main_Checkpoint_QwenImage_Config(Checkpoint_Config_Base, Main_Config_Base,
 class Main_GGUF_QwenImage_Config(Checkpoint_Config_Base, Main_Config_Base, Config_Base):
     """Model config for GGUF-quantized Qwen Image transformer models."""
 
+    PROBE_USES_FILENAME: ClassVar[bool] = True
+
     base: Literal[BaseModelType.QwenImage] = Field(default=BaseModelType.QwenImage)
     format: Literal[ModelFormat.GGUFQuantized] = Field(default=ModelFormat.GGUFQuantized)
     variant: QwenImageVariantType | None = Field(default=None)
@@ -0,0 +1,156 @@
+"""A persistent cache of model identification results, so that unchanged models are not read and hashed again."""
+
+import json
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from invokeai.backend.util.logging import InvokeAILogger
+from invokeai.version import __version__
+
+logger = InvokeAILogger.get_logger()
+
+
+@dataclass
+class ProbeCacheEntry:
+    """The identification result of a model, and the size and modification time of its files when it was identified."""
+
+    size: int
+    mtime_ns: int
+    hash_algo: str
+    hash: str
+    config: dict[str, Any]
+    """The identified config, as JSON-compatible values."""
+
+
+def get_model_fingerprint(path: Path) -> tuple[int, int]:
+    """Gets the total size and latest modification time (in ns) of a model file, or of the files in a model directory."""
+    if path.is_file():
+        stat = path.stat()
+        return stat.st_size, stat.st_mtime_ns
+    size = 0
+    mtime_ns = path.stat().st_mtime_ns
+    for file in path.rglob("*"):
+        stat = file.stat()
+        mtime_ns = max(mtime_ns, stat.st_mtime_ns)
+        if file.is_file():
+            size += stat.st_size
+    return size, mtime_ns
+
+
+class ModelProbeCache:
+    """Caches model identification results by model path, and the config classes of models by their key signature.
+
+    Entries are only used while the size and modification time of the model are unchanged. Results from other versions of
+    the app are ignored, as identification may have changed.
+
+    The cache is kept in memory and appended to a JSON lines file, if a path is given. The file is compacted on load.
+    Errors reading or writing the file are logged and otherwise ignored, as the cache only saves time.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, ProbeCacheEntry] = {}
+        self._signatures: dict[str, str] = {}
+        if path is not None:
+            self._load()
+
+    def get(self, model_path: Path) -> Optional[ProbeCacheEntry]:
+        """Gets the cached result for the model at the given path, if the model has not changed since it was cached."""
+        with self._lock:
+            entry = self._entries.get(self._key(model_path))
+        if entry is None:
+            return None
+        try:
+            size, mtime_ns = get_model_fingerprint(model_path)
+        except OSError:
+            return None
+        if (size, mtime_ns) != (entry.size, entry.mtime_ns):
+            return None
+        return entry
+
+    def put(self, model_path: Path, hash_algo: str, hash: str, config: dict[str, Any]) -> None:
+        try:
+            size, mtime_ns = get_model_fingerprint(model_path)
+        except OSError:
+            return
+        entry = ProbeCacheEntry(size=size, mtime_ns=mtime_ns, hash_algo=hash_algo, hash=hash, config=config)
+        key = self._key(model_path)
+        with self._lock:
+            self._entries[key] = entry
+            self._append({"kind": "model", "path": key, **asdict(entry)})
+
+    def get_config_class(self, signature: str) -> Optional[str]:
+        """Gets the name of the config class of the last model identified with the given key signature."""
+        with self._lock:
+            return self._signatures.get(signature)
+
+    def put_config_class(self, signature: str, config_class: str) -> None:
+        with self._lock:
+            if self._signatures.get(signature) == config_class:
+                return
+            self._signatures[signature] = config_class
+            self._append({"kind": "signature", "signature": signature, "config_class": config_class})
+
+    @staticmethod
+    def _key(model_path: Path) -> str:
+        return model_path.resolve().as_posix()
+
+    def _append(self, record: dict[str, Any]) -> None:
+        if self._path is None:
+            return
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._path, "a") as f:
+                f.write(json.dumps({"version": __version__, **record}) + "\n")
+        except OSError as e:
+            logger.warning(f"Unable to write to the model probe cache at {self._path}: {e}")
+
+    def _load(self) -> None:
+        assert self._path is not None
+        if not self._path.exists():
+            return
+        num_lines = 0
+        try:
+            with open(self._path) as f:
+                for line in f:
+                    num_lines += 1
+                    try:
+                        record = json.loads(line)
+                        if record.pop("version", None) != __version__:
+                            continue
+                        kind = record.pop("kind")
+                        if kind == "model":
+                            self._entries[record.pop("path")] = ProbeCacheEntry(**record)
+                        elif kind == "signature":
+                            self._signatures[record["signature"]] = record["config_class"]
+                    except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                        # A line from an interrupted write, or from an incompatible version of the cache
+                        continue
+        except OSError as e:
+            logger.warning(f"Unable to read the model probe cache at {self._path}: {e}")
+            return
+
+        # Drop the models that were identified at a temporary path, e.g. before they were moved into the models
+        # directory, or that have been deleted since
+        self._entries = {key: entry for key, entry in self._entries.items() if Path(key).exists()}
+
+        # Entries are appended when they are replaced, so drop the stale lines once they make up most of the file
+        if num_lines > 2 * (len(self._entries) + len(self._signatures)):
+            self._compact()
+
+    def _compact(self) -> None:
+        assert self._path is not None
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                for key, entry in self._entries.items():
+                    f.write(json.dumps({"version": __version__, "kind": "model", "path": key, **asdict(entry)}) + "\n")
+                for signature, config_class in self._signatures.items():
+                    record = {"version": __version__, "kind": "signature", "signature": signature}
+                    f.write(json.dumps({**record, "config_class": config_class}) + "\n")
+            tmp_path.replace(self._path)
+        except OSError as e:
+            logger.warning(f"Unable to compact the model probe cache at {self._path}: {e}")
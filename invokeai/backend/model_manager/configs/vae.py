@@ -1,5 +1,6 @@
 import re
 from typing import (
+    ClassVar,
     Literal,
     Self,
 )
@@ -74,6 +75,8 @@ def _is_flux2_vae(state_dict: dict[str | int, Any]) -> bool:
 class VAE_Checkpoint_Config_Base(Checkpoint_Config_Base):
     """Model config for standalone VAE models."""
 
+    PROBE_USES_FILENAME: ClassVar[bool] = True
+
     type: Literal[ModelType.VAE] = Field(default=ModelType.VAE)
     format: Literal[ModelFormat.Checkpoint] = Field(default=ModelFormat.Checkpoint)
     cpu_only: bool | None = Field(default=None, description="Whether this model should run on CPU only")
@@ -262,6 +265,8 @@ class VAE_Checkpoint_Anima_Config(Checkpoint_Config_Base, Config_Base):
 class VAE_Diffusers_Config_Base(Diffusers_Config_Base):
     """Model config for standalone VAE models (diffusers version)."""
 
+    PROBE_USES_FILENAME: ClassVar[bool] = True
+
     type: Literal[ModelType.VAE] = Field(default=ModelType.VAE)
     format: Literal[ModelFormat.Diffusers] = Field(default=ModelFormat.Diffusers)
     cpu_only: bool | None = Field(default=None, description="Whether this model should run on CPU only")
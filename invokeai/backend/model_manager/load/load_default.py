@@ -2,10 +2,12 @@
 """Default implementation of model loading in InvokeAI."""
 
 import re
+import time
 from logging import Logger
 from pathlib import Path
 from typing import Optional
 
+import safetensors.torch
 import torch
 
 from invokeai.app.services.config import InvokeAIAppConfig
@@ -21,6 +23,7 @@ from invokeai.backend.model_manager.taxonomy import (
     SubModelType,
 )
 from invokeai.backend.util.devices import TorchDevice
+from invokeai.backend.util.safetensors_mmap import load_safetensors_mmap
 
 # Layer classes that benefit from FP8 storage. Mirrors diffusers'
 # `_GO_LC_SUPPORTED_PYTORCH_LAYERS` so the plain-nn.Module fallback path makes the same
@@ -56,6 +59,11 @@ _FP8_DEFAULT_SKIP_PATTERNS: tuple[str, ...] = (
 class ModelLoader(ModelLoaderBase):
     """Default implementation of ModelLoaderBase."""
 
+    # Set by loaders that load their safetensors weights with `_load_safetensors()`, and that reserve room in the RAM
+    # cache for any weights they convert before converting them. With `mmap_safetensors`, no room is reserved up front
+    # for the files they load, as their mapped weights take no private memory.
+    _maps_safetensors_weights: bool = False
+
     def __init__(
         self,
         app_config: InvokeAIAppConfig,
@@ -130,8 +138,17 @@ class ModelLoader(ModelLoaderBase):
             pass
 
         config.path = str(self._get_model_path(config))
-        self._ram_cache.make_room(self.get_size_fs(config, Path(config.path), submodel_type))
+        if not (
+            self._maps_safetensors_weights
+            and self._app_config.mmap_safetensors
+            and Path(config.path).suffix == ".safetensors"
+        ):
+            # Memory-mapped weights take no private memory until they are converted. `put()` makes room for the
+            # private memory that the loaded model actually uses. Other loaders copy the weights before `put()`.
+            self._ram_cache.make_room(self.get_size_fs(config, Path(config.path), submodel_type))
+        start_time = time.perf_counter()
         loaded_model = self._load_model(config, submodel_type)
+        load_seconds = time.perf_counter() - start_time
 
         # Determine execution device from model config, considering submodel type
         execution_device = self._get_execution_device(config, submodel_type)
@@ -140,10 +157,22 @@ class ModelLoader(ModelLoaderBase):
             get_model_cache_key(config.key, submodel_type),
             model=loaded_model,
             execution_device=execution_device,
+            load_seconds=load_seconds,
         )
 
         return self._ram_cache.get(key=get_model_cache_key(config.key, submodel_type), stats_name=stats_name)
 
+    def _load_safetensors(self, path: Path) -> dict[str, torch.Tensor]:
+        """Load a safetensors file as CPU tensors.
+
+        If `mmap_safetensors` is enabled, the tensors point into a copy-on-write memory mapping of the file instead of
+        private memory (see `load_safetensors_mmap()`).
+        """
+        if self._app_config.mmap_safetensors:
+            state_dict, _metadata = load_safetensors_mmap(path)
+            return state_dict
+        return safetensors.torch.load_file(path, device="cpu")
+
     def get_size_fs(
         self, config: AnyModelConfig, model_path: Path, submodel_type: Optional[SubModelType] = None
     ) -> int:
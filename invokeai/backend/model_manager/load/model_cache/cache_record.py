@@ -22,6 +22,8 @@ class CacheRecord:
     # change (e.g. fp8_storage toggled during an in-flight generation) takes effect on the
     # next load instead of silently being ignored.
     is_stale: bool = False
+    # The estimated time in seconds to load the model again if it is dropped from the cache.
+    reload_seconds: float = 0.0
 
     def lock(self) -> None:
         """Lock this record."""
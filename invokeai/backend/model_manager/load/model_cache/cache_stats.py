@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, Optional
 
 
 @dataclass
@@ -13,3 +13,10 @@ class CacheStats(object):
     cleared: int = 0  # number of models cleared to make space
     cache_size: int = 0  # total size of cache
     loaded_model_sizes: Dict[str, int] = field(default_factory=dict)
+    bytes_loaded: int = 0  # size of the models loaded from disk with a measured load time
+    load_seconds: float = 0.0  # time spent loading those models
+
+    @property
+    def load_throughput(self) -> Optional[float]:
+        """The measured model load throughput in bytes per second, or None if no load was measured."""
+        return self.bytes_loaded / self.load_seconds if self.load_seconds > 0 else None
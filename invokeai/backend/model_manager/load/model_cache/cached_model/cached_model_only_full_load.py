@@ -3,6 +3,7 @@ from typing import Any
 import torch
 
 from invokeai.backend.quantization.gguf.ggml_tensor import GGMLTensor
+from invokeai.backend.util.safetensors_mmap import get_file_backed_bytes
 
 
 class CachedModelOnlyFullLoad:
@@ -12,7 +13,12 @@ class CachedModelOnlyFullLoad:
     """
 
     def __init__(
-        self, model: torch.nn.Module | Any, compute_device: torch.device, total_bytes: int, keep_ram_copy: bool = False
+        self,
+        model: torch.nn.Module | Any,
+        compute_device: torch.device,
+        total_bytes: int,
+        keep_ram_copy: bool = False,
+        file_backed_bytes: int = 0,
     ):
         """Initialize a CachedModelOnlyFullLoad.
         Args:
@@ -22,6 +28,9 @@ class CachedModelOnlyFullLoad:
             keep_ram_copy (bool): Whether to keep a read-only copy of the model's state dict in RAM. Keeping a RAM copy
                 increases RAM usage, but speeds up model offload from VRAM and LoRA patching (assuming there is
                 sufficient RAM).
+            file_backed_bytes (int): The size (in bytes) of the weights that are memory-mapped from the model file, and
+                so are not in private RAM. Without a RAM copy, mapped weights that are moved to VRAM come back as
+                private tensors, so this is updated on every load and unload.
         """
         # model is often a torch.nn.Module, but could be any model type. Throughout this class, we handle both cases.
         self._model = model
@@ -34,6 +43,7 @@ class CachedModelOnlyFullLoad:
             self._cpu_state_dict = model.state_dict()
 
         self._total_bytes = total_bytes
+        self._file_backed_bytes = file_backed_bytes
         self._is_in_vram = False
 
     @property
@@ -49,6 +59,10 @@ class CachedModelOnlyFullLoad:
         """Get the total size (in bytes) of all the weights in the model."""
         return self._total_bytes
 
+    def ram_bytes(self) -> int:
+        """Get the size (in bytes) of the weights in private RAM, i.e. not memory-mapped from the model file."""
+        return max(0, self._total_bytes - self._file_backed_bytes)
+
     def cur_vram_bytes(self) -> int:
         """Get the size (in bytes) of the weights that are currently in VRAM."""
         if self._is_in_vram:
@@ -60,6 +74,12 @@ class CachedModelOnlyFullLoad:
         """Return true if the model is currently in VRAM."""
         return self._is_in_vram
 
+    def _update_file_backed_bytes(self) -> None:
+        """Update the size of the mapped weights that are still on the CPU. With a RAM copy, they stay mapped."""
+        if self._cpu_state_dict is not None or self._file_backed_bytes == 0:
+            return
+        self._file_backed_bytes = get_file_backed_bytes(self._model.state_dict().values())
+
     @property
     def compute_device(self) -> torch.device:
         """Return the compute device for this model."""
@@ -93,6 +113,7 @@ class CachedModelOnlyFullLoad:
         else:
             self._model.to(self._compute_device)
 
+        self._update_file_backed_bytes()
         self._is_in_vram = True
         return self._total_bytes
 
@@ -117,5 +138,6 @@ class CachedModelOnlyFullLoad:
         else:
             self._model.to(self._offload_device)
 
+        self._update_file_backed_bytes()
         self._is_in_vram = False
         return self._total_bytes
@@ -1,10 +1,16 @@
 import torch
 
+from invokeai.backend.model_manager.load.model_cache.cached_model.pipelined_upload import (
+    ModuleUpload,
+    PipelinedWeightUpload,
+    WeightUploadTimings,
+)
 from invokeai.backend.model_manager.load.model_cache.torch_module_autocast.custom_modules.custom_module_mixin import (
     CustomModuleMixin,
 )
 from invokeai.backend.util.calc_tensor_size import calc_tensor_size
 from invokeai.backend.util.logging import InvokeAILogger
+from invokeai.backend.util.safetensors_mmap import get_file_backed_bytes
 
 
 class CachedModelWithPartialLoad:
@@ -14,7 +20,13 @@ class CachedModelWithPartialLoad:
     MPS memory, etc.
     """
 
-    def __init__(self, model: torch.nn.Module, compute_device: torch.device, keep_ram_copy: bool = False):
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        compute_device: torch.device,
+        keep_ram_copy: bool = False,
+        pipelined_upload: bool = False,
+    ):
         self._model = model
         self._compute_device = compute_device
 
@@ -31,6 +43,10 @@ class CachedModelWithPartialLoad:
         self._state_dict_bytes = {k: calc_tensor_size(v) for k, v in model_state_dict.items()}
 
         self._total_bytes = sum(self._state_dict_bytes.values())
+        # The size of the weights that are memory-mapped from the model file, and so are not in private RAM. Without a
+        # RAM copy, mapped weights that are moved to VRAM come back as private tensors, so this is updated on every
+        # load and unload.
+        self._file_backed_bytes = get_file_backed_bytes(model_state_dict.values())
         self._cur_vram_bytes: int | None = None
 
         self._modules_that_support_autocast = self._find_modules_that_support_autocast()
@@ -39,6 +55,15 @@ class CachedModelWithPartialLoad:
         )
         self._state_dict_keys_by_module_prefix = self._group_state_dict_keys_by_module_prefix(model_state_dict)
 
+        # Whether to upload the weights that do not have to be on the compute device in the background, so that
+        # inference can start before they have all arrived. Only CUDA has the async copies to make this worthwhile.
+        self._pipelined_upload = pipelined_upload and compute_device.type == "cuda"
+        self._pending_upload: PipelinedWeightUpload | None = None
+        self._pending_upload_fully_loaded = False
+        self._last_upload_timings: WeightUploadTimings | None = None
+        # The module names in the order they ran in the last pipelined upload, used to order the next upload.
+        self._module_execution_order: dict[str, int] = {}
+
     def _find_modules_that_support_autocast(self) -> dict[str, torch.nn.Module]:
         """Find all modules that support autocasting."""
         return {n: m for n, m in self._model.named_modules() if isinstance(m, CustomModuleMixin)}  # type: ignore
@@ -125,9 +150,14 @@ class CachedModelWithPartialLoad:
         """Get the total size (in bytes) of all the weights in the model."""
         return self._total_bytes
 
+    def ram_bytes(self) -> int:
+        """Get the size (in bytes) of the weights in private RAM, i.e. not memory-mapped from the model file."""
+        return max(0, self._total_bytes - self._file_backed_bytes)
+
     def cur_vram_bytes(self) -> int:
         """Get the size (in bytes) of the weights that are currently in VRAM."""
         if self._cur_vram_bytes is None:
+            self.wait_for_upload()
             cur_state_dict = self._model.state_dict()
             self._cur_vram_bytes = sum(
                 self._state_dict_bytes[k]
@@ -156,6 +186,7 @@ class CachedModelWithPartialLoad:
         This can happen if an interrupted run leaves the model in a partially inconsistent state. Any repaired device
         movement invalidates the cached VRAM accounting.
         """
+        self.wait_for_upload()
         cur_state_dict = self._model.state_dict()
         keys_to_repair = {
             key
@@ -255,6 +286,7 @@ class CachedModelWithPartialLoad:
         """
         # TODO(ryand): Handle the case where an exception is thrown while loading or unloading weights. At the very
         # least, we should reset self._cur_vram_bytes to None.
+        self.wait_for_upload()
 
         vram_bytes_loaded = 0
 
@@ -300,6 +332,13 @@ class CachedModelWithPartialLoad:
             keys_to_load.add(key)
             vram_bytes_loaded += param_size
 
+        # The weights that are required to run the model are loaded up front. The rest can be streamed in while the
+        # model runs, as modules whose weights have not arrived yet wait for them in a forward pre-hook.
+        keys_to_stream: set[str] = set()
+        if self._pipelined_upload:
+            keys_to_stream = keys_to_load - self._keys_in_modules_that_do_not_support_autocast
+            keys_to_load = keys_to_load - keys_to_stream
+
         if len(keys_to_load) > 0:
             # We load the entire state dict, not just the parameters that changed, in case there are modules that
             # override _load_from_state_dict() and do some funky stuff that requires the entire state dict.
@@ -308,8 +347,14 @@ class CachedModelWithPartialLoad:
 
         if self._cur_vram_bytes is not None:
             self._cur_vram_bytes += vram_bytes_loaded
+        self._update_file_backed_bytes(cur_state_dict, keys_to_stream)
 
-        if fully_loaded:
+        if len(keys_to_stream) > 0:
+            # Device autocasting stays enabled until the upload is done, in case a streamed weight is used outside of
+            # the forward pass of its module.
+            self._set_autocast_enabled_in_all_modules(True)
+            self._start_pipelined_upload(cur_state_dict, keys_to_stream, fully_loaded)
+        elif fully_loaded:
             self._set_autocast_enabled_in_all_modules(False)
         else:
             self._set_autocast_enabled_in_all_modules(True)
@@ -330,6 +375,7 @@ class CachedModelWithPartialLoad:
         Returns:
             The number of bytes unloaded from VRAM.
         """
+        self.wait_for_upload()
         vram_bytes_freed = 0
         required_weights_in_vram = 0
 
@@ -358,8 +404,63 @@ class CachedModelWithPartialLoad:
 
         if self._cur_vram_bytes is not None:
             self._cur_vram_bytes -= vram_bytes_freed
+        self._update_file_backed_bytes(cur_state_dict)
 
         # We may have gone from a fully-loaded model to a partially-loaded model, so we need to reapply the custom
         # layers.
         self._set_autocast_enabled_in_all_modules(True)
         return vram_bytes_freed
+
+    def _update_file_backed_bytes(self, state_dict: dict[str, torch.Tensor], moving_keys: set[str] | None = None):
+        """Update the size of the mapped weights that are still on the CPU, excluding `moving_keys`.
+
+        With a RAM copy, mapped weights are restored from the copy when they are unloaded, so they stay mapped.
+        """
+        if self._cpu_state_dict is not None or self._file_backed_bytes == 0:
+            return
+        self._file_backed_bytes = get_file_backed_bytes(
+            v for k, v in state_dict.items() if moving_keys is None or k not in moving_keys
+        )
+
+    def _start_pipelined_upload(self, state_dict: dict[str, torch.Tensor], keys: set[str], fully_loaded: bool):
+        """Start uploading the weights with the given keys in the background, one module at a time, in the order the
+        modules ran in the last upload. Modules that have not run yet are uploaded in registration order, which is
+        usually close to execution order."""
+        uploads: list[ModuleUpload] = []
+        for module_name, module in self._model.named_modules():
+            module_keys = [k for k in self._state_dict_keys_by_module_prefix.get(module_name, []) if k in keys]
+            if len(module_keys) == 0:
+                continue
+            source = self._cpu_state_dict if self._cpu_state_dict is not None else state_dict
+            uploads.append(ModuleUpload(name=module_name, module=module, tensors={k: source[k] for k in module_keys}))
+
+        # sorted() is stable, so modules that have not run keep their registration order after those that have.
+        not_run = len(self._module_execution_order)
+        uploads.sort(key=lambda u: self._module_execution_order.get(u.name, not_run))
+
+        self._pending_upload = PipelinedWeightUpload(self._model, uploads, self._compute_device)
+        self._pending_upload_fully_loaded = fully_loaded
+
+    def wait_for_upload(self) -> None:
+        """Wait for any weights that are being uploaded in the background to arrive on the compute device."""
+        upload = self._pending_upload
+        if upload is None:
+            return
+        self._pending_upload = None
+        try:
+            upload.wait()
+        except Exception:
+            # Some weights may not have been moved, so the VRAM accounting has to be recalculated.
+            self._cur_vram_bytes = None
+            raise
+        finally:
+            self._last_upload_timings = upload.timings
+            if len(upload.execution_order) > 0:
+                self._module_execution_order = {name: i for i, name in enumerate(upload.execution_order)}
+
+        if self._pending_upload_fully_loaded:
+            self._set_autocast_enabled_in_all_modules(False)
+
+    def get_last_upload_timings(self) -> WeightUploadTimings | None:
+        """Get the timings of the last pipelined weight upload, or None if no weights have been uploaded that way."""
+        return self._last_upload_timings
@@ -0,0 +1,196 @@
+"""Uploads the weights of a model to the compute device in the background, one module at a time, so that inference can
+start on the modules that are already loaded while the rest are still being copied."""
+
+import threading
+import time
+import weakref
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import torch
+
+from invokeai.backend.util.calc_tensor_size import calc_tensor_size
+
+
+@dataclass
+class WeightUploadTimings:
+    """Timings of a pipelined weight upload, as `time.perf_counter()` values.
+
+    A module's forward time is when its forward pass started, after waiting for its weights. Comparing it against the
+    ready times of the modules that come after it shows how much of the upload overlapped with inference.
+    """
+
+    started_at: float
+    finished_at: Optional[float] = None
+    bytes_uploaded: int = 0
+    module_ready_at: dict[str, float] = field(default_factory=dict)
+    module_forward_at: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def upload_seconds(self) -> Optional[float]:
+        return None if self.finished_at is None else self.finished_at - self.started_at
+
+    def overlapped_modules(self) -> list[str]:
+        """The modules whose forward pass started before the upload finished."""
+        if self.finished_at is None:
+            return list(self.module_forward_at)
+        return [name for name, t in self.module_forward_at.items() if t < self.finished_at]
+
+
+@dataclass
+class ModuleUpload:
+    """The weights of one module to upload. `tensors` maps the model's state dict keys to the CPU tensors."""
+
+    name: str
+    module: torch.nn.Module
+    tensors: dict[str, torch.Tensor]
+
+
+# The uploads that are still running, by model. Code that modifies weights outside of a forward pass, e.g. LoRA
+# patching, must wait for them with `wait_for_pending_upload()`, either for the whole model or for the modules it
+# modifies.
+_pending_uploads: "weakref.WeakKeyDictionary[torch.nn.Module, PipelinedWeightUpload]" = weakref.WeakKeyDictionary()
+_pending_uploads_lock = threading.Lock()
+
+
+def wait_for_pending_upload(model: torch.nn.Module, module: Optional[torch.nn.Module] = None) -> None:
+    """Waits until the weights of `model` that are being uploaded in the background are on the compute device.
+
+    If `module` is given, only waits for the weights of that submodule of `model` and its children, so the rest of the
+    upload can keep overlapping with inference.
+    """
+    with _pending_uploads_lock:
+        upload = _pending_uploads.get(model)
+    if upload is None:
+        return
+    if module is None:
+        upload.wait()
+    else:
+        upload.wait_for_module(module)
+
+
+class PipelinedWeightUpload:
+    """Copies the weights of a model to the compute device on a background thread, one module at a time.
+
+    Modules are uploaded in the given order, which should be the order they run in. A forward pre-hook on each module
+    blocks until its own weights have arrived, so inference can start as soon as the first modules are loaded rather
+    than after the whole model is.
+
+    On CUDA, weights are staged in pinned memory and copied on a separate stream, so that the copies run concurrently with
+    the kernels of the modules that are already loaded. On other devices, weights are copied with a plain `.to()` on the
+    background thread. `transfer` overrides how a tensor is copied, e.g. to simulate a slow device in tests.
+
+    Call `wait()` before making any other change to the model's weights or devices.
+    """
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        modules: list[ModuleUpload],
+        target_device: torch.device,
+        transfer: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+    ):
+        self._model = model
+        self._modules = modules
+        self._target_device = target_device
+        self._stream: Optional[torch.cuda.Stream] = None
+        if transfer is None:
+            if target_device.type == "cuda":
+                self._stream = torch.cuda.Stream(device=target_device)
+                transfer = self._pinned_transfer
+            else:
+                transfer = self._plain_transfer
+        self._transfer = transfer
+
+        self.timings = WeightUploadTimings(started_at=time.perf_counter())
+        # The names of the hooked modules, in the order their forward passes started.
+        self.execution_order: list[str] = []
+        self._ready = {m.name: threading.Event() for m in modules}
+        self._ready_by_module = {m.module: self._ready[m.name] for m in modules}
+        self._error: Optional[BaseException] = None
+        self._hook_handles = [m.module.register_forward_pre_hook(self._make_forward_pre_hook(m.name)) for m in modules]
+
+        self._thread = threading.Thread(target=self._run, name="PipelinedWeightUpload", daemon=True)
+        with _pending_uploads_lock:
+            _pending_uploads[model] = self
+        self._thread.start()
+
+    def _pinned_transfer(self, tensor: torch.Tensor) -> torch.Tensor:
+        assert self._stream is not None
+        # Copies from pageable memory are synchronous. Pinning costs a CPU copy, but lets the device copy run
+        # asynchronously on the upload stream.
+        source = tensor if tensor.is_pinned() else tensor.pin_memory()
+        result = source.to(self._target_device, non_blocking=True)
+        # The tensor is allocated on the upload stream but used on the default stream. Tell the caching allocator, so
+        # that its memory is not reused while kernels on the default stream may still read it.
+        result.record_stream(torch.cuda.default_stream(self._target_device))
+        return result
+
+    def _plain_transfer(self, tensor: torch.Tensor) -> torch.Tensor:
+        return tensor.to(self._target_device)
+
+    def _make_forward_pre_hook(self, name: str) -> Callable[..., None]:
+        ready = self._ready[name]
+
+        def hook(module: torch.nn.Module, args: object) -> None:
+            if not ready.is_set():
+                ready.wait()
+            if name not in self.timings.module_forward_at:
+                self.timings.module_forward_at[name] = time.perf_counter()
+                self.execution_order.append(name)
+
+        return hook
+
+    @torch.no_grad()
+    def _run(self) -> None:
+        try:
+            stream_context = torch.cuda.stream(self._stream) if self._stream is not None else nullcontext()
+            for module_upload in self._modules:
+                with stream_context:
+                    prefix_len = len(module_upload.name) + 1 if module_upload.name else 0
+                    module_state_dict = {
+                        key[prefix_len:]: self._transfer(tensor) for key, tensor in module_upload.tensors.items()
+                    }
+                if self._stream is not None:
+                    # Wait for this module's copies before its weights can be used, while later copies keep streaming.
+                    self._stream.synchronize()
+
+                # strict=False, because only the weights of this module (not its children) are loaded.
+                incompatible_keys = module_upload.module.load_state_dict(module_state_dict, strict=False, assign=True)
+                assert len(incompatible_keys.unexpected_keys) == 0
+
+                self.timings.bytes_uploaded += sum(calc_tensor_size(t) for t in module_upload.tensors.values())
+                self.timings.module_ready_at[module_upload.name] = time.perf_counter()
+                self._ready[module_upload.name].set()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self.timings.finished_at = time.perf_counter()
+            # Never leave a forward pass waiting for weights that will not arrive. Modules that failed to upload run
+            # with their CPU weights, through device autocasting.
+            for ready in self._ready.values():
+                ready.set()
+
+    def is_done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def wait_for_module(self, module: torch.nn.Module) -> None:
+        """Waits for the weights of `module` and its children, without waiting for the rest of the upload."""
+        for submodule in module.modules():
+            ready = self._ready_by_module.get(submodule)
+            if ready is not None:
+                ready.wait()
+
+    def wait(self) -> None:
+        """Waits for the upload to finish and removes the forward hooks. Re-raises any error from the upload."""
+        self._thread.join()
+        for handle in self._hook_handles:
+            handle.remove()
+        self._hook_handles = []
+        with _pending_uploads_lock:
+            if _pending_uploads.get(self._model) is self:
+                del _pending_uploads[self._model]
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
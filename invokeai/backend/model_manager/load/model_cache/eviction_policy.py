@@ -0,0 +1,128 @@
+"""Policies that choose the order in which the model cache drops models from RAM and offloads them from VRAM."""
+
+from typing import Optional, Sequence
+
+
+class EvictionPolicy:
+    """Chooses which unlocked models the model cache drops first when it needs room.
+
+    The cache tells the policy about every model that is added, used or removed. Policies only order candidates - the
+    cache decides how many of them to drop and never drops locked models. The default orders are least recently used
+    first for RAM and smallest first for VRAM, so policies only override the orders they change.
+    """
+
+    def on_insert(self, key: str, size_bytes: int, reload_seconds: float) -> None:
+        """Called when a model is added to the cache, with its size and the estimated time to load it again."""
+
+    def on_access(self, key: str) -> None:
+        """Called when a model in the cache is used."""
+
+    def on_remove(self, key: str, evicted: bool) -> None:
+        """Called when a model leaves the cache. `evicted` is True if it was dropped to make room."""
+
+    def set_upcoming(self, keys: Sequence[str]) -> None:
+        """Called with the cache keys of the models that queued work will use, soonest first."""
+
+    def eviction_order(self, keys: Sequence[str]) -> list[str]:
+        """Orders the keys of the cached models, given least recently used first, in the order they should be dropped
+        from RAM. The default keeps the least-recently-used-first order."""
+        return list(keys)
+
+    def offload_order(self, keys: Sequence[str]) -> list[str]:
+        """Orders the keys of the cached models, given smallest first, in the order they should be offloaded from
+        VRAM. The default keeps the smallest-first order."""
+        return list(keys)
+
+
+class LRUEvictionPolicy(EvictionPolicy):
+    """Drops the least recently used model first. This is the default order of `EvictionPolicy`."""
+
+
+class GreedyDualEvictionPolicy(EvictionPolicy):
+    """Size-weighted GreedyDual: drops the model with the lowest reload cost per byte, aged by past evictions.
+
+    Each model gets a priority of `L + reload_seconds / size_bytes` when it is added or used, where `L` is the priority
+    of the last evicted model. Models that are slow to load for their size, e.g. single-file checkpoints that are
+    converted on load, are kept over models that load quickly, and models that are not used again eventually age out.
+    """
+
+    def __init__(self) -> None:
+        self._inflation = 0.0
+        self._cost_per_byte: dict[str, float] = {}
+        self._priority: dict[str, float] = {}
+
+    def on_insert(self, key: str, size_bytes: int, reload_seconds: float) -> None:
+        self._cost_per_byte[key] = reload_seconds / max(size_bytes, 1)
+        self._priority[key] = self._inflation + self._cost_per_byte[key]
+
+    def on_access(self, key: str) -> None:
+        if key in self._cost_per_byte:
+            self._priority[key] = self._inflation + self._cost_per_byte[key]
+
+    def on_remove(self, key: str, evicted: bool) -> None:
+        priority = self._priority.pop(key, None)
+        self._cost_per_byte.pop(key, None)
+        if evicted and priority is not None:
+            self._inflation = max(self._inflation, priority)
+
+    def eviction_order(self, keys: Sequence[str]) -> list[str]:
+        # sorted() is stable, so models with the same priority are dropped least recently used first
+        return sorted(keys, key=lambda key: self._priority.get(key, self._inflation))
+
+
+class LookaheadEvictionPolicy(EvictionPolicy):
+    """Drops the models that queued work does not use first, then those that are cheapest to load again by the time
+    they are used.
+
+    Models that are about to be used are ordered by their reload time divided by how many models are used before them,
+    so a large model that is used soon is kept over a small model, or one that is used later. The other models are
+    ordered by the fallback policy. Without known future demand, e.g. when the queue is empty, this is the same as the
+    fallback policy.
+    """
+
+    def __init__(self, fallback: Optional[EvictionPolicy] = None) -> None:
+        self._fallback = fallback or LRUEvictionPolicy()
+        self._next_use: dict[str, int] = {}
+        self._reload_seconds: dict[str, float] = {}
+
+    def on_insert(self, key: str, size_bytes: int, reload_seconds: float) -> None:
+        self._reload_seconds[key] = reload_seconds
+        self._fallback.on_insert(key, size_bytes, reload_seconds)
+
+    def on_access(self, key: str) -> None:
+        self._fallback.on_access(key)
+
+    def on_remove(self, key: str, evicted: bool) -> None:
+        self._reload_seconds.pop(key, None)
+        self._fallback.on_remove(key, evicted)
+
+    def set_upcoming(self, keys: Sequence[str]) -> None:
+        next_use: dict[str, int] = {}
+        for position, key in enumerate(keys):
+            next_use.setdefault(key, position)
+        self._next_use = next_use
+
+    def eviction_order(self, keys: Sequence[str]) -> list[str]:
+        return self._order(self._fallback.eviction_order(keys))
+
+    def offload_order(self, keys: Sequence[str]) -> list[str]:
+        return self._order(self._fallback.offload_order(keys))
+
+    def _order(self, keys: list[str]) -> list[str]:
+        unused = [key for key in keys if key not in self._next_use]
+        upcoming = sorted(
+            (key for key in keys if key in self._next_use),
+            key=lambda key: self._reload_seconds.get(key, 0.0) / (self._next_use[key] + 1),
+        )
+        return unused + upcoming
+
+
+def build_eviction_policy(name: str) -> EvictionPolicy:
+    """Builds the eviction policy with the given name."""
+    if name == "lru":
+        return LRUEvictionPolicy()
+    if name == "greedy_dual":
+        return GreedyDualEvictionPolicy()
+    if name == "lookahead":
+        return LookaheadEvictionPolicy()
+    raise ValueError(f"Unknown model cache eviction policy: {name}")
@@ -0,0 +1,128 @@
+"""Records model cache accesses and replays them against eviction policies, to compare the policies on CPU."""
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+import torch
+
+from invokeai.backend.model_manager.load.model_cache.eviction_policy import EvictionPolicy
+from invokeai.backend.model_manager.load.model_cache.model_cache import GB, CacheEntrySnapshot, ModelCache
+
+
+@dataclass
+class TraceAccess:
+    """A use of a model in a recorded model cache trace."""
+
+    key: str
+    size_bytes: int
+    load_seconds: float
+
+
+@dataclass
+class TraceReplayResult:
+    """The outcome of replaying a trace against an eviction policy."""
+
+    hits: int
+    misses: int
+    bytes_loaded: int
+    load_seconds: float
+
+
+class CacheTraceRecorder:
+    """Records the models used from a model cache, with their sizes and the estimated time to load them again.
+
+    Every use of a model ends with a cache hit - a cache miss is followed by a load and a hit - so the recorder only
+    listens to hits.
+    """
+
+    def __init__(self, cache: ModelCache) -> None:
+        self.accesses: list[TraceAccess] = []
+        self._unsubscribe: Optional[Callable[[], None]] = cache.on_cache_hit(self._on_cache_hit)
+
+    def stop(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def _on_cache_hit(self, model_key: str, cache_snapshot: dict[str, CacheEntrySnapshot]) -> None:
+        entry = cache_snapshot[model_key]
+        self.accesses.append(
+            TraceAccess(key=model_key, size_bytes=entry.total_bytes, load_seconds=entry.reload_seconds)
+        )
+
+
+def save_trace(path: Path, trace: Sequence[TraceAccess]) -> None:
+    """Saves a trace as JSON lines."""
+    with open(path, "w") as f:
+        for access in trace:
+            f.write(json.dumps(asdict(access)) + "\n")
+
+
+def load_trace(path: Path) -> list[TraceAccess]:
+    """Loads a trace saved by `save_trace()`."""
+    with open(path) as f:
+        return [TraceAccess(**json.loads(line)) for line in f if line.strip()]
+
+
+def replay_trace(
+    trace: Sequence[TraceAccess],
+    policy: EvictionPolicy,
+    cache_size_bytes: int,
+    lookahead: int = 0,
+    bytes_per_element: int = 2**20,
+) -> TraceReplayResult:
+    """Replays a trace against a CPU model cache that uses the given policy.
+
+    Models are stood in for by modules with one byte per `bytes_per_element` bytes of the recorded model, so that large
+    traces replay quickly. Misses are charged the recorded load time of the model instead of being measured.
+
+    Args:
+        trace: The model accesses, in order.
+        policy: The eviction policy to replay against. Policies are stateful - pass a new one to each replay.
+        cache_size_bytes: The size of the RAM cache.
+        lookahead: The number of following accesses that the policy is told about before each access, as if they were
+            the models of queued sessions.
+        bytes_per_element: The number of bytes of a recorded model that each byte of its stand-in module represents.
+    """
+    logger = logging.getLogger("ModelCacheTraceReplay")
+    logger.setLevel(logging.WARNING)
+    cache = ModelCache(
+        execution_device_working_mem_gb=0,
+        enable_partial_loading=False,
+        keep_ram_copy_of_weights=True,
+        max_ram_cache_size_gb=cache_size_bytes / bytes_per_element / GB,
+        execution_device="cpu",
+        storage_device="cpu",
+        logger=logger,
+        eviction_policy=policy,
+    )
+    result = TraceReplayResult(hits=0, misses=0, bytes_loaded=0, load_seconds=0.0)
+    try:
+        for position, access in enumerate(trace):
+            if lookahead > 0:
+                cache.set_upcoming_models([a.key for a in trace[position : position + lookahead]])
+            if cache.contains(access.key):
+                result.hits += 1
+            else:
+                result.misses += 1
+                result.bytes_loaded += access.size_bytes
+                result.load_seconds += access.load_seconds
+                cache.put(
+                    access.key,
+                    _stand_in_model(max(1, access.size_bytes // bytes_per_element)),
+                    load_seconds=access.load_seconds,
+                )
+            cache.get(access.key)
+    finally:
+        cache.shutdown()
+    return result
+
+
+def _stand_in_model(num_bytes: int) -> torch.nn.Module:
+    # The cache measures the size of modules, but treats bare tensors as having size 0
+    model = torch.nn.Module()
+    model.register_buffer("weight", torch.empty(num_bytes, dtype=torch.uint8))
+    return model
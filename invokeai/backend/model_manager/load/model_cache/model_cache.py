@@ -2,10 +2,11 @@ import gc
 import logging
 import threading
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from functools import wraps
 from logging import Logger
-from typing import Any, Callable, Dict, List, Optional, Protocol
+from typing import Any, Callable, Collection, Dict, Generator, List, Optional, Protocol, Sequence
 
 import psutil
 import torch
@@ -19,6 +20,7 @@ from invokeai.backend.model_manager.load.model_cache.cached_model.cached_model_o
 from invokeai.backend.model_manager.load.model_cache.cached_model.cached_model_with_partial_load import (
     CachedModelWithPartialLoad,
 )
+from invokeai.backend.model_manager.load.model_cache.eviction_policy import EvictionPolicy, LRUEvictionPolicy
 from invokeai.backend.model_manager.load.model_cache.torch_module_autocast.torch_module_autocast import (
     apply_custom_layers_to_model,
 )
@@ -27,6 +29,7 @@ from invokeai.backend.model_manager.taxonomy import AnyModel, SubModelType
 from invokeai.backend.util.devices import TorchDevice
 from invokeai.backend.util.logging import InvokeAILogger
 from invokeai.backend.util.prefix_logger_adapter import PrefixedLoggerAdapter
+from invokeai.backend.util.safetensors_mmap import get_file_backed_bytes
 
 # Size of a GB in bytes.
 GB = 2**30
@@ -34,6 +37,9 @@ GB = 2**30
 # Size of a MB in bytes.
 MB = 2**20
 
+# The assumed rate at which models are loaded from disk, in bytes per second, until a load has been measured.
+DEFAULT_LOAD_THROUGHPUT = 1 * GB
+
 
 # TODO(ryand): Where should this go? The ModelCache shouldn't be concerned with submodels.
 def get_model_cache_key(model_key: str, submodel_type: Optional[SubModelType] = None) -> str:
@@ -75,6 +81,7 @@ class CacheEntrySnapshot:
     cache_key: str
     total_bytes: int
     current_vram_bytes: int
+    reload_seconds: float = 0.0
 
 
 class CacheMissCallback(Protocol):
@@ -118,12 +125,13 @@ class ModelCache:
     the execution_device.
 
     Models are moved between the storage_device and the execution_device as necessary. Cache size limits are enforced
-    on both the storage_device and the execution_device. The execution_device cache uses a smallest-first offload
-    policy. The storage_device cache uses a least-recently-used (LRU) offload policy.
+    on both the storage_device and the execution_device. The order in which models are dropped or offloaded is chosen
+    by an EvictionPolicy. By default, the execution_device cache uses a smallest-first offload policy and the
+    storage_device cache uses a least-recently-used (LRU) offload policy.
 
-    Note: Neither of these offload policies has really been compared against alternatives. It's likely that different
-    policies would be better, although the optimal policies are likely heavily dependent on usage patterns and HW
-    configuration.
+    Policies can use the estimated time to load a model again, which is the measured load time of the model or, when
+    that is unknown, its size divided by the measured load throughput, and the models that queued work will use (see
+    `set_upcoming_models()`). `scripts/benchmark_model_cache_eviction.py` compares the policies on recorded traces.
 
     The cache returns context manager generators designed to load the model into the execution device (often GPU) within
     the context, and unload outside the context.
@@ -148,6 +156,10 @@ class ModelCache:
         log_memory_usage: bool = False,
         logger: Optional[Logger] = None,
         keep_alive_minutes: float = 0,
+        eviction_policy: Optional[EvictionPolicy] = None,
+        pipelined_weight_upload: bool = False,
+        ram_cache_count: int = 1,
+        vram_cache_count: int = 1,
     ):
         """Initialize the model RAM cache.
 
@@ -168,15 +180,25 @@ class ModelCache:
             behaviour.
         :param logger: InvokeAILogger to use (otherwise creates one)
         :param keep_alive_minutes: How long to keep models in cache after last use (in minutes). 0 means keep indefinitely.
+        :param eviction_policy: The policy that chooses which models are dropped or offloaded first (defaults to LRU).
+        :param pipelined_weight_upload: If True, partially loaded models upload the weights that they do not require up
+            front in the background, while they run.
+        :param ram_cache_count: The number of model caches that share the RAM, e.g. one per session processor worker.
+            Each cache gets an equal share of the RAM cache size.
+        :param vram_cache_count: The number of model caches that share the execution device. Each cache gets an equal
+            share of the device's VRAM, after the working memory of every cache.
         """
         self._enable_partial_loading = enable_partial_loading
         self._keep_ram_copy_of_weights = keep_ram_copy_of_weights
+        self._pipelined_weight_upload = pipelined_weight_upload
         self._execution_device_working_mem_gb = execution_device_working_mem_gb
         self._execution_device: torch.device = torch.device(execution_device)
         self._storage_device: torch.device = torch.device(storage_device)
 
         self._max_ram_cache_size_gb = max_ram_cache_size_gb
         self._max_vram_cache_size_gb = max_vram_cache_size_gb
+        self._ram_cache_count = ram_cache_count
+        self._vram_cache_count = vram_cache_count
 
         self._logger = PrefixedLoggerAdapter(
             logger or InvokeAILogger.get_logger(self.__class__.__name__), "MODEL CACHE"
@@ -186,14 +208,25 @@ class ModelCache:
 
         self._cached_models: Dict[str, CacheRecord] = {}
         self._cache_stack: List[str] = []
+        self._eviction_policy = eviction_policy or LRUEvictionPolicy()
+
+        # Totals of the measured model loads, used to estimate how long it takes to load a model again
+        self._bytes_loaded = 0
+        self._load_seconds = 0.0
 
-        self._ram_cache_size_bytes = self._calc_ram_available_to_model_cache()
+        self._ram_cache_size_bytes = self._calc_ram_available_to_model_cache() // ram_cache_count
+        if ram_cache_count > 1:
+            self._logger.info(
+                f"Model RAM cache is shared by {ram_cache_count} caches: {self._ram_cache_size_bytes / MB:.2f} MB each."
+            )
 
         # A lock applied to all public method calls to make the ModelCache thread-safe.
         # At the time of writing, the ModelCache should only be accessed from two threads:
         # - The graph execution thread
         # - Requests to empty the cache from a separate thread
         self._lock = threading.RLock()
+        # Holds the keys of the models that may not be dropped to make room for the current thread's loads
+        self._thread_local = threading.local()
 
         self._on_cache_hit_callbacks: set[CacheHitCallback] = set()
         self._on_cache_miss_callbacks: set[CacheMissCallback] = set()
@@ -316,7 +349,13 @@ class ModelCache:
 
     @synchronized
     @record_activity
-    def put(self, key: str, model: AnyModel, execution_device: Optional[torch.device] = None) -> None:
+    def put(
+        self,
+        key: str,
+        model: AnyModel,
+        execution_device: Optional[torch.device] = None,
+        load_seconds: Optional[float] = None,
+    ) -> None:
         """Add a model to the cache.
 
         Args:
@@ -324,6 +363,8 @@ class ModelCache:
             model: The model to cache
             execution_device: Optional device to use for this specific model. If None, uses the cache's default
                 execution_device. Use torch.device("cpu") to force a model to run on CPU.
+            load_seconds: Optional time it took to load the model. Used to estimate the cost of dropping it, and the
+                load throughput for models without a measured load time.
         """
         if key in self._cached_models:
             self._logger.debug(
@@ -332,7 +373,11 @@ class ModelCache:
             return
 
         size = calc_model_size_by_data(self._logger, model)
-        self._make_room_internal(size)
+        # Weights that are memory-mapped from the model file are in the OS page cache, not in private memory
+        file_backed_bytes = (
+            get_file_backed_bytes(model.state_dict().values()) if isinstance(model, torch.nn.Module) else 0
+        )
+        self._make_room_internal(size - file_backed_bytes)
 
         # Inject custom modules into the model.
         if isinstance(model, torch.nn.Module):
@@ -347,23 +392,54 @@ class ModelCache:
         #   well.
         running_with_cuda = effective_execution_device.type == "cuda"
 
+        # A model whose weights are all memory-mapped already has a RAM copy that costs no private memory.
+        keep_ram_copy = self._keep_ram_copy_of_weights or (file_backed_bytes > 0 and file_backed_bytes >= size)
+
         # Wrap model.
         if isinstance(model, torch.nn.Module) and running_with_cuda and self._enable_partial_loading:
             wrapped_model = CachedModelWithPartialLoad(
-                model, effective_execution_device, keep_ram_copy=self._keep_ram_copy_of_weights
+                model,
+                effective_execution_device,
+                keep_ram_copy=keep_ram_copy,
+                pipelined_upload=self._pipelined_weight_upload,
             )
         else:
             wrapped_model = CachedModelOnlyFullLoad(
-                model, effective_execution_device, size, keep_ram_copy=self._keep_ram_copy_of_weights
+                model,
+                effective_execution_device,
+                size,
+                keep_ram_copy=keep_ram_copy,
+                file_backed_bytes=file_backed_bytes,
             )
 
-        cache_record = CacheRecord(key=key, cached_model=wrapped_model)
+        if load_seconds is not None and load_seconds > 0:
+            self._bytes_loaded += size
+            self._load_seconds += load_seconds
+            if self.stats:
+                self.stats.bytes_loaded += size
+                self.stats.load_seconds += load_seconds
+            reload_seconds = load_seconds
+        else:
+            reload_seconds = self._estimate_load_seconds(size)
+
+        cache_record = CacheRecord(key=key, cached_model=wrapped_model, reload_seconds=reload_seconds)
         self._cached_models[key] = cache_record
         self._cache_stack.append(key)
+        self._eviction_policy.on_insert(key, wrapped_model.ram_bytes(), reload_seconds)
         self._logger.debug(
-            f"Added model {key} (Type: {model.__class__.__name__}, Wrap mode: {wrapped_model.__class__.__name__}, Model size: {size / MB:.2f}MB)"
+            f"Added model {key} (Type: {model.__class__.__name__}, Wrap mode: {wrapped_model.__class__.__name__}, Model size: {size / MB:.2f}MB, Memory-mapped: {file_backed_bytes / MB:.2f}MB)"
         )
 
+    def _estimate_load_seconds(self, size_bytes: int) -> float:
+        """Estimate the time it takes to load a model of the given size from the measured load throughput."""
+        throughput = self._bytes_loaded / self._load_seconds if self._load_seconds > 0 else DEFAULT_LOAD_THROUGHPUT
+        return size_bytes / throughput
+
+    @synchronized
+    def set_upcoming_models(self, keys: Sequence[str]) -> None:
+        """Tell the eviction policy the cache keys of the models that queued work will use, soonest first."""
+        self._eviction_policy.set_upcoming(keys)
+
     @synchronized
     def _get_cache_snapshot(self) -> dict[str, CacheEntrySnapshot]:
         overview: dict[str, CacheEntrySnapshot] = {}
@@ -374,6 +450,7 @@ class ModelCache:
                 cache_key=cache_key,
                 total_bytes=total_bytes,
                 current_vram_bytes=current_vram_bytes,
+                reload_seconds=cache_entry.reload_seconds,
             )
 
         return overview
@@ -413,6 +490,7 @@ class ModelCache:
         # This moves the entry to the top (right end) of the stack.
         self._cache_stack = [k for k in self._cache_stack if k != key]
         self._cache_stack.append(key)
+        self._eviction_policy.on_access(key)
 
         self._logger.debug(f"Cache hit: {key} (Type: {cache_entry.cached_model.model.__class__.__name__})")
         for cb in self._on_cache_hit_callbacks:
@@ -494,7 +572,7 @@ class ModelCache:
         # was using it), evict now so the next load rebuilds with the new settings rather than
         # silently reusing the pre-change cached module.
         if cache_entry.is_stale and not cache_entry.is_locked and cache_entry.key in self._cached_models:
-            bytes_freed = cache_entry.cached_model.total_bytes()
+            bytes_freed = cache_entry.cached_model.ram_bytes()
             self._delete_cache_entry(cache_entry)
             if self.stats:
                 self.stats.cleared = (self.stats.cleared or 0) + 1
@@ -514,6 +592,9 @@ class ModelCache:
         """Helper function for self.lock(). Loads a locked model into VRAM."""
         start_time = time.time()
 
+        # The VRAM accounting below is only accurate once background weight uploads have finished.
+        self._wait_for_weight_uploads()
+
         # Calculate model_vram_needed, the amount of additional VRAM that will be used if we fully load the model into
         # VRAM.
         model_cur_vram_bytes = cache_entry.cached_model.cur_vram_bytes()
@@ -609,7 +690,7 @@ class ModelCache:
         """
         # If self._max_vram_cache_size_gb is set, then it overrides the default logic.
         if self._max_vram_cache_size_gb is not None:
-            vram_total_available_to_cache = int(self._max_vram_cache_size_gb * GB)
+            vram_total_available_to_cache = int(self._max_vram_cache_size_gb * GB) // self._vram_cache_count
             return vram_total_available_to_cache - self._get_vram_in_use()
 
         working_mem_bytes_default = int(self._execution_device_working_mem_gb * GB)
@@ -631,12 +712,18 @@ class ModelCache:
         else:
             raise ValueError(f"Unsupported execution device: {self._execution_device.type}")
 
-        vram_total_available_to_cache = vram_available_to_process - working_mem_bytes
+        # Every cache on the device keeps its working memory free, and the rest is shared equally between them.
+        vram_total_available_to_cache = (
+            vram_available_to_process - working_mem_bytes * self._vram_cache_count
+        ) // self._vram_cache_count
         vram_cur_available_to_cache = vram_total_available_to_cache - self._get_vram_in_use()
         return vram_cur_available_to_cache
 
     def _get_vram_in_use(self) -> int:
         """Get the amount of VRAM currently in use by the cache."""
+        if self._vram_cache_count > 1:
+            # The device's allocations include the other caches' models, which are counted against their own shares.
+            return sum(ce.cached_model.cur_vram_bytes() for ce in self._cached_models.values())
         if self._execution_device.type == "cuda":
             return torch.cuda.memory_allocated()
         elif self._execution_device.type == "mps":
@@ -710,8 +797,8 @@ class ModelCache:
         return ram_available_to_model_cache
 
     def _get_ram_in_use(self) -> int:
-        """Get the amount of RAM currently in use."""
-        return sum(ce.cached_model.total_bytes() for ce in self._cached_models.values())
+        """Get the amount of private RAM currently in use. Memory-mapped weights are not counted."""
+        return sum(ce.cached_model.ram_bytes() for ce in self._cached_models.values())
 
     def _get_ram_available(self) -> int:
         """Get the amount of RAM available for the cache to use."""
@@ -743,9 +830,14 @@ class ModelCache:
             f"Offloading unlocked models with goal of making room for {vram_bytes_required / MB:.2f}MB of VRAM."
         )
         vram_bytes_freed = 0
-        # TODO(ryand): Give more thought to the offloading policy used here.
-        cache_entries_increasing_size = sorted(self._cached_models.values(), key=lambda x: x.cached_model.total_bytes())
-        for cache_entry in cache_entries_increasing_size:
+        keys_increasing_size = sorted(
+            self._cached_models, key=lambda k: self._cached_models[k].cached_model.total_bytes()
+        )
+        for model_key in self._eviction_policy.offload_order(keys_increasing_size):
+            cache_entry = self._cached_models.get(model_key)
+            if cache_entry is None:
+                # The entry was deleted after failing to offload an earlier model
+                continue
             # We do not fully trust the count of bytes freed, so we check again on each iteration.
             vram_available = self._get_vram_available(working_mem_bytes)
             vram_bytes_to_free = vram_bytes_required - vram_available
@@ -842,6 +934,65 @@ class ModelCache:
         """
         self._make_room_internal(bytes_needed)
 
+    @synchronized
+    def try_make_room(self, bytes_needed: int, keep: Collection[str]) -> bool:
+        """Make enough room in the cache for a new model of indicated size, without dropping locked models or the
+        models with the given keys.
+
+        Used to load models ahead of time, which must not drop a model that is about to be used. Returns False, without
+        dropping any models, if there cannot be enough room.
+        """
+        ram_bytes_to_free = max(0, bytes_needed - self._get_ram_available())
+        to_drop: list[CacheRecord] = []
+        ram_bytes_freed = 0
+        for model_key in self._eviction_policy.eviction_order(self._cache_stack):
+            if ram_bytes_freed >= ram_bytes_to_free:
+                break
+            cache_entry = self._cached_models[model_key]
+            if cache_entry.is_locked or model_key in keep:
+                continue
+            to_drop.append(cache_entry)
+            ram_bytes_freed += cache_entry.cached_model.ram_bytes()
+
+        if ram_bytes_freed < ram_bytes_to_free:
+            return False
+        if to_drop:
+            for cache_entry in to_drop:
+                self._logger.debug(
+                    f"Dropping {cache_entry.key} from RAM cache to free {(cache_entry.cached_model.ram_bytes() / MB):.2f}MB."
+                )
+                self._delete_cache_entry(cache_entry, evicted=True)
+            if self.stats:
+                self.stats.cleared = len(to_drop)
+            for cb in self._on_cache_models_cleared_callbacks:
+                cb(
+                    models_cleared=len(to_drop),
+                    bytes_requested=bytes_needed,
+                    bytes_freed=ram_bytes_freed,
+                    cache_snapshot=self._get_cache_snapshot(),
+                )
+            gc.collect()
+            TorchDevice.empty_cache()
+        return True
+
+    @contextmanager
+    def keep_models(self, keys: Collection[str]) -> Generator[None, None, None]:
+        """Prevents the models with the given keys from being dropped to make room for the current thread's loads.
+
+        Used to load models ahead of time. The whole load is covered, including the room the loader and `put()` make.
+        """
+        previous: frozenset[str] = getattr(self._thread_local, "keep", frozenset())
+        self._thread_local.keep = previous | frozenset(keys)
+        try:
+            yield
+        finally:
+            self._thread_local.keep = previous
+
+    @synchronized
+    def contains(self, key: str) -> bool:
+        """Whether the model with the given key is in the cache. Unlike `get()`, this does not count as a use."""
+        return key in self._cached_models
+
     def _make_room_internal(self, bytes_needed: int) -> None:
         """Internal implementation of make_room(). Assumes the lock is already held."""
         self._logger.debug(f"Making room for {bytes_needed / MB:.2f}MB of RAM.")
@@ -850,23 +1001,22 @@ class ModelCache:
         ram_bytes_available = self._get_ram_available()
         ram_bytes_to_free = max(0, bytes_needed - ram_bytes_available)
 
+        keep: frozenset[str] = getattr(self._thread_local, "keep", frozenset())
         ram_bytes_freed = 0
-        pos = 0
         models_cleared = 0
-        while ram_bytes_freed < ram_bytes_to_free and pos < len(self._cache_stack):
-            model_key = self._cache_stack[pos]
+        for model_key in self._eviction_policy.eviction_order(self._cache_stack):
+            if ram_bytes_freed >= ram_bytes_to_free:
+                break
             cache_entry = self._cached_models[model_key]
-
-            if not cache_entry.is_locked:
-                ram_bytes_freed += cache_entry.cached_model.total_bytes()
-                self._logger.debug(
-                    f"Dropping {model_key} from RAM cache to free {(cache_entry.cached_model.total_bytes() / MB):.2f}MB."
-                )
-                self._delete_cache_entry(cache_entry)
-                del cache_entry
-                models_cleared += 1
-            else:
-                pos += 1
+            if cache_entry.is_locked or model_key in keep:
+                continue
+            ram_bytes_freed += cache_entry.cached_model.ram_bytes()
+            self._logger.debug(
+                f"Dropping {model_key} from RAM cache to free {(cache_entry.cached_model.ram_bytes() / MB):.2f}MB."
+            )
+            self._delete_cache_entry(cache_entry, evicted=True)
+            del cache_entry
+            models_cleared += 1
 
         if models_cleared > 0:
             # There would likely be some 'garbage' to be collected regardless of whether a model was cleared or not, but
@@ -895,10 +1045,21 @@ class ModelCache:
         self._logger.debug(f"Dropped {models_cleared} models to free {ram_bytes_freed / MB:.2f}MB of RAM.")
         self._log_cache_state(title="After dropping models:")
 
-    def _delete_cache_entry(self, cache_entry: CacheRecord) -> None:
-        """Delete cache_entry from the cache if it exists. No exception is thrown if it doesn't exist."""
+    def _wait_for_weight_uploads(self) -> None:
+        for cache_entry in self._cached_models.values():
+            if isinstance(cache_entry.cached_model, CachedModelWithPartialLoad):
+                cache_entry.cached_model.wait_for_upload()
+
+    def _delete_cache_entry(self, cache_entry: CacheRecord, evicted: bool = False) -> None:
+        """Delete cache_entry from the cache if it exists. No exception is thrown if it doesn't exist.
+
+        `evicted` is True if the entry is deleted to make room for another model.
+        """
+        if isinstance(cache_entry.cached_model, CachedModelWithPartialLoad):
+            cache_entry.cached_model.wait_for_upload()
         self._cache_stack = [key for key in self._cache_stack if key != cache_entry.key]
-        self._cached_models.pop(cache_entry.key, None)
+        if self._cached_models.pop(cache_entry.key, None) is not None:
+            self._eviction_policy.on_remove(cache_entry.key, evicted)
 
     @synchronized
     def drop_model(self, model_key: str) -> int:
@@ -924,7 +1085,7 @@ class ModelCache:
             if entry.is_locked:
                 entry.is_stale = True
                 continue
-            bytes_freed += entry.cached_model.total_bytes()
+            bytes_freed += entry.cached_model.ram_bytes()
             self._delete_cache_entry(entry)
             dropped.append(entry)
 
@@ -63,6 +63,8 @@ class AnimaCheckpointModel(ModelLoader):
     the AnimaTransformer model with the correct architecture parameters.
     """
 
+    _maps_safetensors_weights = True
+
     def _load_model(
         self,
         config: AnyModelConfig,
@@ -83,8 +85,6 @@ class AnimaCheckpointModel(ModelLoader):
         self,
         config: AnyModelConfig,
     ) -> AnyModel:
-        from safetensors.torch import load_file
-
         from invokeai.backend.anima.anima_transformer import AnimaTransformer
 
         if not isinstance(config, Main_Checkpoint_Anima_Config):
@@ -95,7 +95,7 @@ class AnimaCheckpointModel(ModelLoader):
         model_path = Path(config.path)
 
         # Load the state dict from safetensors
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
 
         # Strip the transformer-key prefix (`net.` or bundled `model.diffusion_model.`).
         sd = _strip_anima_bundle_prefix(sd)
@@ -189,7 +189,6 @@ class AnimaControlNetLLLiteModel(ModelLoader):
         submodel_type: Optional[SubModelType] = None,
     ) -> AnyModel:
         from safetensors import safe_open
-        from safetensors.torch import load_file
 
         from invokeai.backend.anima.control_net_lllite import AnimaControlNetLLLite
 
@@ -199,7 +198,7 @@ class AnimaControlNetLLLiteModel(ModelLoader):
         # ControlNet type models don't use submodel_type - load the adapter directly
         model_path = Path(config.path)
 
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
         with safe_open(model_path, framework="pt", device="cpu") as f:
             metadata = f.metadata()
 
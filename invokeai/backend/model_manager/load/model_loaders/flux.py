@@ -100,7 +100,7 @@ class FluxVAELoader(ModelLoader):
 
         with accelerate.init_empty_weights():
             model = AutoEncoder(get_flux_ae_params())
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
         model.load_state_dict(sd, assign=True)
         # VAE is broken in float16, which mps defaults to
         if self._torch_dtype == torch.float16:
@@ -164,7 +164,7 @@ class Flux2VAELoader(ModelLoader):
         model_path = Path(config.path)
 
         # Load state dict manually since from_single_file may not support AutoencoderKLFlux2 yet
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
 
         # Convert BFL format to diffusers format if needed
         # BFL format uses: encoder.down., decoder.up., decoder.mid.block_1, decoder.mid.attn_1, decoder.norm_out
@@ -350,6 +350,8 @@ class T5EncoderCheckpointModel(ModelLoader):
 class FluxCheckpointModel(ModelLoader):
     """Class to load main models."""
 
+    _maps_safetensors_weights = True
+
     def _load_model(
         self,
         config: AnyModelConfig,
@@ -378,7 +380,7 @@ class FluxCheckpointModel(ModelLoader):
         with accelerate.init_empty_weights():
             model = Flux(get_flux_transformers_params(config.variant))
 
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
         if "model.diffusion_model.double_blocks.0.img_attn.norm.key_norm.scale" in sd:
             sd = convert_bundle_to_flux_transformer_checkpoint(sd)
         new_sd_size = sum([ten.nelement() * torch.bfloat16.itemsize for ten in sd.values()])
@@ -633,7 +635,7 @@ class Flux2CheckpointModel(ModelLoader):
         model_path = Path(config.path)
 
         # Load state dict
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
 
         # Handle FP8 quantized weights (ComfyUI-style or scaled FP8)
         # These store weights as: layer.weight (FP8) + layer.weight_scale (FP32 scalar)
@@ -973,7 +975,7 @@ class FluxControlnetModel(ModelLoader):
         else:
             raise ValueError(f"Unexpected ControlNet model config type: {type(config)}")
 
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
 
         # Detect the FLUX ControlNet model type from the state dict.
         if is_state_dict_xlabs_controlnet(sd):
@@ -1007,6 +1009,8 @@ class FluxControlnetModel(ModelLoader):
 class FluxIpAdapterModel(ModelLoader):
     """Class to load FLUX IP-Adapter models."""
 
+    _maps_safetensors_weights = True
+
     def _load_model(
         self,
         config: AnyModelConfig,
@@ -1015,7 +1019,7 @@ class FluxIpAdapterModel(ModelLoader):
         if not isinstance(config, IPAdapter_Checkpoint_Config_Base):
             raise ValueError(f"Unexpected model config type: {type(config)}.")
 
-        sd = load_file(Path(config.path))
+        sd = self._load_safetensors(Path(config.path))
 
         params = infer_xlabs_ip_adapter_params_from_state_dict(sd)
 
@@ -1038,7 +1042,7 @@ class FluxReduxModelLoader(ModelLoader):
         if not isinstance(config, FLUXRedux_Checkpoint_Config):
             raise ValueError(f"Unexpected model config type: {type(config)}.")
 
-        sd = load_file(Path(config.path))
+        sd = self._load_safetensors(Path(config.path))
 
         with accelerate.init_empty_weights():
             model = FluxReduxModel()
@@ -6,7 +6,6 @@ from pathlib import Path
 from typing import Optional
 
 import torch
-from safetensors.torch import load_file
 
 from invokeai.app.services.config import InvokeAIAppConfig
 from invokeai.backend.model_manager.configs.factory import AnyModelConfig
@@ -98,7 +97,7 @@ class LoRALoader(ModelLoader):
 
         # Load the state dict from the model file.
         if model_path.suffix == ".safetensors":
-            state_dict = load_file(model_path.absolute().as_posix(), device="cpu")
+            state_dict = self._load_safetensors(model_path)
         else:
             state_dict = torch.load(model_path, map_location="cpu")
 
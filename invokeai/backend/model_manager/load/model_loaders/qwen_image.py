@@ -318,7 +318,6 @@ class QwenImageCheckpointModel(ModelLoader):
 
     def _load_from_singlefile(self, config: AnyModelConfig) -> AnyModel:
         from diffusers import QwenImageTransformer2DModel
-        from safetensors.torch import load_file
 
         from invokeai.backend.util.logging import InvokeAILogger
 
@@ -331,7 +330,7 @@ class QwenImageCheckpointModel(ModelLoader):
         target_device = TorchDevice.choose_torch_device()
         model_dtype = TorchDevice.choose_bfloat16_safe_dtype(target_device)
 
-        sd = load_file(str(model_path))
+        sd = self._load_safetensors(model_path)
         sd = _strip_comfyui_prefix(sd)
 
         dequantized = _dequantize_comfyui_fp8(sd, model_dtype)
@@ -452,7 +451,6 @@ class QwenVLEncoderCheckpointLoader(ModelLoader):
                 ) from e
 
     def _load_text_encoder_from_singlefile(self, config: QwenVLEncoder_Checkpoint_Config) -> AnyModel:
-        from safetensors.torch import load_file
         from transformers import AutoConfig, Qwen2_5_VLForConditionalGeneration
 
         from invokeai.backend.util.logging import InvokeAILogger
@@ -464,7 +462,7 @@ class QwenVLEncoderCheckpointLoader(ModelLoader):
         target_device = TorchDevice.choose_torch_device()
         model_dtype = TorchDevice.choose_bfloat16_safe_dtype(target_device)
 
-        sd = load_file(str(model_path))
+        sd = self._load_safetensors(model_path)
 
         # Dequantize ComfyUI-style fp8 weights, then strip the now-unused quantization
         # metadata (`scale_input` is the activation scale ComfyUI's fp8 matmul kernels
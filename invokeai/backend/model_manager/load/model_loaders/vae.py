@@ -1,6 +1,7 @@
 # Copyright (c) 2024, Lincoln D. Stein and the InvokeAI Development Team
 """Class for VAE model loading in InvokeAI."""
 
+from pathlib import Path
 from typing import Optional
 
 from diffusers.models.autoencoders.autoencoder_kl import AutoencoderKL
@@ -60,9 +61,8 @@ class VAELoader(GenericDiffusersLoader):
         """
         import accelerate
         from diffusers.models.autoencoders.autoencoder_kl_qwenimage import AutoencoderKLQwenImage
-        from safetensors.torch import load_file
 
-        sd = load_file(config.path)
+        sd = self._load_safetensors(Path(config.path))
 
         if self._torch_dtype is not None:
             for k in list(sd.keys()):
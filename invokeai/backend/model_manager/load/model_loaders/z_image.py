@@ -171,6 +171,8 @@ class ZImageDiffusersModel(GenericDiffusersLoader):
 class ZImageCheckpointModel(ModelLoader):
     """Class to load Z-Image transformer models from single-file checkpoints (safetensors, etc)."""
 
+    _maps_safetensors_weights = True
+
     def _load_model(
         self,
         config: AnyModelConfig,
@@ -192,7 +194,6 @@ class ZImageCheckpointModel(ModelLoader):
         config: AnyModelConfig,
     ) -> AnyModel:
         from diffusers import ZImageTransformer2DModel
-        from safetensors.torch import load_file
 
         if not isinstance(config, Main_Checkpoint_ZImage_Config):
             raise TypeError(
@@ -202,7 +203,7 @@ class ZImageCheckpointModel(ModelLoader):
         model_path = Path(config.path)
 
         # Load the state dict from safetensors/checkpoint file
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
 
         # Some Z-Image checkpoint files have keys prefixed with "diffusion_model." or
         # "model.diffusion_model." (ComfyUI-style format). Check if we need to strip this prefix.
@@ -449,15 +450,13 @@ class ZImageControlCheckpointModel(ModelLoader):
         self,
         config: AnyModelConfig,
     ) -> AnyModel:
-        from safetensors.torch import load_file
-
         from invokeai.backend.z_image.z_image_control_adapter import ZImageControlAdapter
 
         assert isinstance(config, ControlNet_Checkpoint_ZImage_Config)
         model_path = Path(config.path)
 
         # Load the safetensors state dict
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
 
         # Determine number of control blocks from state dict
         # Control blocks are named control_layers.0, control_layers.1, etc.
@@ -575,7 +574,6 @@ class Qwen3EncoderCheckpointLoader(ModelLoader):
         self,
         config: AnyModelConfig,
     ) -> AnyModel:
-        from safetensors.torch import load_file
         from transformers import Qwen3Config, Qwen3ForCausalLM
 
         from invokeai.backend.util.logging import InvokeAILogger
@@ -594,7 +592,7 @@ class Qwen3EncoderCheckpointLoader(ModelLoader):
         model_dtype = TorchDevice.choose_bfloat16_safe_dtype(target_device)
 
         # Load the state dict from safetensors file
-        sd = load_file(model_path)
+        sd = self._load_safetensors(model_path)
 
         # Handle ComfyUI quantized checkpoints
         # ComfyUI stores quantized weights with accompanying scale factors:
@@ -1,3 +1,4 @@
+import threading
 from contextlib import contextmanager
 from typing import Any, Generator
 
@@ -8,6 +9,12 @@ def _no_op(*args: Any, **kwargs: Any) -> None:
     pass
 
 
+# The layers are patched while any thread is loading a model, so concurrent loads must not restore them early
+_patch_lock = threading.Lock()
+_patch_count = 0
+_saved_functions: list[Any] = []
+
+
 @contextmanager
 def skip_torch_weight_init() -> Generator[None, None, None]:
     """Monkey patch several of the common torch layers (torch.nn.Linear, torch.nn.Conv1d, etc.) to skip weight initialization.
@@ -16,16 +23,26 @@ def skip_torch_weight_init() -> Generator[None, None, None]:
     distribution) when __init__ is called. This weight initialization step can take a significant amount of time, and is
     completely unnecessary if the intent is to load checkpoint weights from disk for the layer. This context manager
     monkey-patches common torch layers to skip the weight initialization step.
+
+    Models may be loaded on several threads at once, e.g. by the model prefetcher. The layers are patched when the
+    first thread enters and restored when the last thread exits.
     """
+    global _patch_count, _saved_functions
     torch_modules = [torch.nn.Linear, torch.nn.modules.conv._ConvNd, torch.nn.Embedding]
-    saved_functions = [hasattr(m, "reset_parameters") and m.reset_parameters for m in torch_modules]
 
+    with _patch_lock:
+        if _patch_count == 0:
+            _saved_functions = [hasattr(m, "reset_parameters") and m.reset_parameters for m in torch_modules]
+            for torch_module in torch_modules:
+                assert hasattr(torch_module, "reset_parameters")
+                torch_module.reset_parameters = _no_op
+        _patch_count += 1
     try:
-        for torch_module in torch_modules:
-            assert hasattr(torch_module, "reset_parameters")
-            torch_module.reset_parameters = _no_op
         yield None
     finally:
-        for torch_module, saved_function in zip(torch_modules, saved_functions, strict=True):
-            assert hasattr(torch_module, "reset_parameters")
-            torch_module.reset_parameters = saved_function
+        with _patch_lock:
+            _patch_count -= 1
+            if _patch_count == 0:
+                for torch_module, saved_function in zip(torch_modules, _saved_functions, strict=True):
+                    assert hasattr(torch_module, "reset_parameters")
+                    torch_module.reset_parameters = saved_function
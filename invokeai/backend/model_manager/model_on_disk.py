@@ -4,13 +4,13 @@ from typing import Any, Optional, TypeAlias
 import safetensors.torch
 import torch
 from picklescan.scanner import scan_file_path
-from safetensors import safe_open
 
 from invokeai.app.services.config.config_default import get_config
 from invokeai.backend.model_hash.model_hash import HASHING_ALGORITHMS, ModelHash
 from invokeai.backend.model_manager.taxonomy import ModelRepoVariant
-from invokeai.backend.quantization.gguf.loaders import gguf_sd_loader
+from invokeai.backend.quantization.gguf.loaders import gguf_sd_meta_loader
 from invokeai.backend.util.logging import InvokeAILogger
+from invokeai.backend.util.safetensors_mmap import load_safetensors_meta, read_safetensors_header
 from invokeai.backend.util.silence_warnings import SilenceWarnings
 
 StateDict: TypeAlias = dict[str | int, Any]  # When are the keys int?
@@ -19,7 +19,11 @@ logger = InvokeAILogger.get_logger()
 
 
 class ModelOnDisk:
-    """A utility class representing a model stored on disk."""
+    """A utility class representing a model stored on disk.
+
+    Safetensors and GGUF state dicts are loaded from the file headers only, as tensors on the meta device. They have the
+    keys, shapes and dtypes needed to identify a model, but no weights.
+    """
 
     def __init__(self, path: Path, hash_algo: HASHING_ALGORITHMS = "blake3_single"):
         self.path = path
@@ -52,9 +56,9 @@ class ModelOnDisk:
         if path in self._metadata_cache:
             return self._metadata_cache[path]
         try:
-            with safe_open(self.path, framework="pt", device="cpu") as f:
-                metadata = f.metadata()
-                assert isinstance(metadata, dict)
+            header, _ = read_safetensors_header(path)
+            metadata = header.get("__metadata__") or {}
+            assert isinstance(metadata, dict)
         except Exception:
             metadata = {}
 
@@ -111,9 +115,13 @@ class ModelOnDisk:
                 checkpoint = torch.load(path, map_location="cpu")
                 assert isinstance(checkpoint, dict)
             elif path.suffix.endswith(".gguf"):
-                checkpoint = gguf_sd_loader(path, compute_dtype=torch.float32)
+                checkpoint = gguf_sd_meta_loader(path, compute_dtype=torch.float32)
             elif path.suffix.endswith(".safetensors"):
-                checkpoint = safetensors.torch.load_file(path)
+                try:
+                    checkpoint, _ = load_safetensors_meta(path)
+                except ValueError:
+                    # E.g. a dtype that we cannot represent without loading the tensors.
+                    checkpoint = safetensors.torch.load_file(path)
             else:
                 raise ValueError(f"Unrecognized model extension: {path.suffix}")
 
@@ -12,6 +12,7 @@ from diffusers.models.unets.unet_2d_condition import UNet2DConditionModel
 from transformers import CLIPTextModel, CLIPTextModelWithProjection, CLIPTokenizer
 
 from invokeai.app.shared.models import FreeUConfig
+from invokeai.backend.model_manager.load.model_cache.cached_model.pipelined_upload import wait_for_pending_upload
 from invokeai.backend.model_manager.load.optimizations import skip_torch_weight_init
 from invokeai.backend.textual_inversion import TextualInversionManager, TextualInversionModelRaw
 from invokeai.backend.util.devices import TorchDevice
@@ -50,6 +51,9 @@ class ModelPatcher:
             yield tokenizer, TextualInversionManager(tokenizer)
             return
 
+        # Resizing the token embeddings must not race with a background upload of the text encoder's weights.
+        wait_for_pending_upload(text_encoder)
+
         init_tokens_count = None
         new_tokens_added = None
 
@@ -4,6 +4,7 @@ from typing import Dict, Iterable, Optional, Tuple
 
 import torch
 
+from invokeai.backend.model_manager.load.model_cache.cached_model.pipelined_upload import wait_for_pending_upload
 from invokeai.backend.patches.layers.base_layer_patch import BaseLayerPatch
 from invokeai.backend.patches.layers.flux_control_lora_layer import FluxControlLoRALayer
 from invokeai.backend.patches.model_patch_raw import ModelPatchRaw
@@ -30,7 +31,6 @@ class LayerPatcher:
         """Apply 'smart' model patching that chooses whether to use direct patching or a sidecar wrapper for each
         module.
         """
-
         # original_weights are stored for unpatching layers that are directly patched.
         original_weights = OriginalWeightsStorage(cached_weights)
         # original_modules are stored for unpatching layers that are wrapped.
@@ -107,6 +107,11 @@ class LayerPatcher:
                     logger.warning("Failed to find module for LoRA layer key: %s", layer_key)
                 continue
 
+            # Weights that are still being uploaded in the background would overwrite the patch, and the module's device
+            # decides how it is patched. Only this module is waited for, so the rest of the upload keeps overlapping
+            # with inference.
+            wait_for_pending_upload(model, module)
+
             # Decide whether to use direct patching or a sidecar patch.
             # Direct patching is preferred, because it results in better runtime speed.
             # Reasons to use sidecar patching:
@@ -2,6 +2,7 @@ import gc
 from pathlib import Path
 
 import gguf
+import numpy as np
 import torch
 
 from invokeai.backend.quantization.gguf.ggml_tensor import GGMLTensor
@@ -55,3 +56,25 @@ def gguf_sd_loader(path: Path, compute_dtype: torch.dtype) -> dict[str, GGMLTens
                 compute_dtype=compute_dtype,
             )
         return sd
+
+
+def gguf_sd_meta_loader(path: Path, compute_dtype: torch.dtype) -> dict[str, GGMLTensor]:
+    """Like `gguf_sd_loader()`, but the quantized data of each tensor is on the meta device, so only the tensor infos at
+    the start of the file are read. Used to identify models from their keys, shapes and quantization types."""
+    with WrappedGGUFReader(path) as reader:
+        sd: dict[str, GGMLTensor] = {}
+        for tensor in reader.tensors:
+            # `tensor.data` is a view of the memory-mapped file, so getting its shape and dtype reads no tensor data.
+            dtype = torch.from_numpy(np.empty(0, dtype=tensor.data.dtype)).dtype
+            torch_tensor = torch.empty(tensor.data.shape, dtype=dtype, device="meta")
+
+            shape = torch.Size(tuple(int(v) for v in reversed(tensor.shape)))
+            if tensor.tensor_type in TORCH_COMPATIBLE_QTYPES:
+                torch_tensor = torch_tensor.view(*shape)
+            sd[tensor.name] = GGMLTensor(
+                torch_tensor,
+                ggml_quantization_type=tensor.tensor_type,
+                tensor_shape=shape,
+                compute_dtype=compute_dtype,
+            )
+        return sd
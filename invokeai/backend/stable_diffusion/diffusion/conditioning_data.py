@@ -132,9 +132,9 @@ class AnimaConditioningInfo:
 
 @dataclass
 class ConditioningFieldData:
-    # If you change this class, adding more types, you _must_ update the instantiation of ObjectSerializerDisk in
-    # invokeai/app/api/dependencies.py, adding the types to the list of safe globals. If you do not, torch will be
-    # unable to deserialize the object and will raise an error.
+    # If you change this class, adding more types, you _must_ update the conditioning safe globals in
+    # invokeai/app/api/dependencies.py. If you do not, the conditioning serializer will be unable to serialize or
+    # deserialize the object and will raise an error.
     conditionings: (
         List[BasicConditioningInfo]
         | List[SDXLConditioningInfo]
@@ -1,4 +1,6 @@
-from typing import Dict, Literal, Optional, Union
+import threading
+from contextlib import contextmanager
+from typing import Dict, Generator, Literal, Optional, Union
 
 import torch
 from deprecated import deprecated
@@ -46,9 +48,39 @@ class TorchDevice:
     CUDA_DEVICE = torch.device("cuda")
     MPS_DEVICE = torch.device("mps")
 
+    # Holds the device selected for the current thread with `use_device`
+    _thread_local = threading.local()
+
+    @classmethod
+    @contextmanager
+    def use_device(cls, device: Union[str, torch.device]) -> Generator[torch.device, None, None]:
+        """Selects the execution device for the current thread, overriding the configured device.
+
+        Used by session processor workers, which each run on their own device.
+        """
+        device = cls.normalize(device)
+        previous: Optional[torch.device] = getattr(cls._thread_local, "device", None)
+        cls._thread_local.device = device
+        try:
+            if device.type == "cuda":
+                with torch.cuda.device(device):
+                    yield device
+            else:
+                yield device
+        finally:
+            cls._thread_local.device = previous
+
+    @classmethod
+    def get_thread_device(cls) -> Optional[torch.device]:
+        """Returns the execution device selected for the current thread with `use_device`, if any."""
+        return getattr(cls._thread_local, "device", None)
+
     @classmethod
     def choose_torch_device(cls) -> torch.device:
         """Return the torch.device to use for accelerated inference."""
+        thread_device: Optional[torch.device] = getattr(cls._thread_local, "device", None)
+        if thread_device is not None:
+            return thread_device
         app_config = get_config()
         if app_config.device != "auto":
             device = torch.device(app_config.device)
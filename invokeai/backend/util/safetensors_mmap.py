@@ -0,0 +1,184 @@
+"""Utilities for reading safetensors files without copying tensor data into private memory.
+
+`safetensors.torch.load_file` and `safe_open(...).get_tensor` both allocate a new tensor for every entry and copy the
+file contents into it. The functions here instead map the file into memory and create tensors that point directly
+into the mapping, so pages are only read from disk when a tensor is accessed, and processes that map the same file
+share the same physical pages through the OS page cache.
+"""
+
+import json
+import mmap
+import struct
+import threading
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Union
+
+import torch
+
+# See https://github.com/huggingface/safetensors#format
+SAFETENSORS_DTYPES: dict[str, torch.dtype] = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U64": torch.uint64,
+    "U32": torch.uint32,
+    "U16": torch.uint16,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+    "F8_E4M3": torch.float8_e4m3fn,
+    "F8_E5M2": torch.float8_e5m2,
+}
+
+# Guard against reading absurd header sizes from corrupt or non-safetensors files.
+_MAX_HEADER_SIZE = 100 * 2**20
+
+
+@dataclass
+class _MappedRegion:
+    start: int
+    end: int
+    mapping: "weakref.ref[mmap.mmap]"
+
+
+# The address ranges of the live mappings made by `load_safetensors_mmap()`. A mapping is closed when the last tensor
+# that points into it is freed, so regions whose mapping is gone are pruned.
+_mapped_regions: list[_MappedRegion] = []
+_mapped_regions_lock = threading.Lock()
+
+
+def _register_mapping(mapped: mmap.mmap) -> None:
+    start = torch.frombuffer(mapped, dtype=torch.uint8).data_ptr()
+    with _mapped_regions_lock:
+        _mapped_regions[:] = [r for r in _mapped_regions if r.mapping() is not None]
+        _mapped_regions.append(_MappedRegion(start=start, end=start + len(mapped), mapping=weakref.ref(mapped)))
+
+
+def get_file_backed_bytes(tensors: Iterable[torch.Tensor]) -> int:
+    """Gets the number of bytes of the given tensors that point into a file mapped by `load_safetensors_mmap()`.
+
+    These bytes are in the OS page cache, shared with every process that maps the same file, rather than in private
+    memory. Pages that were modified in place have been copied into private memory, but are still counted. Tensors that
+    share memory are counted once.
+    """
+    with _mapped_regions_lock:
+        regions = [(r.start, r.end) for r in _mapped_regions if r.mapping() is not None]
+    if not regions:
+        return 0
+    file_backed_bytes = 0
+    seen: set[int] = set()
+    for tensor in tensors:
+        if type(tensor) not in (torch.Tensor, torch.nn.Parameter) or tensor.device.type != "cpu":
+            continue
+        data_ptr = tensor.data_ptr()
+        if data_ptr in seen:
+            continue
+        seen.add(data_ptr)
+        if any(start <= data_ptr < end for start, end in regions):
+            file_backed_bytes += tensor.nelement() * tensor.element_size()
+    return file_backed_bytes
+
+
+def read_safetensors_header(path: Union[str, Path]) -> tuple[dict[str, Any], int]:
+    """Reads the JSON header of a safetensors file, without reading any tensor data.
+
+    Args:
+        path: Path to the safetensors file.
+
+    Returns:
+        A tuple of the parsed header and the offset of the start of the tensor data in the file. The header maps tensor
+        names to their `dtype`, `shape` and `data_offsets`, and may include a `__metadata__` dict of strings.
+
+    Raises:
+        ValueError: If the file is not a valid safetensors file.
+    """
+    with open(path, "rb") as f:
+        size_bytes = f.read(8)
+        if len(size_bytes) != 8:
+            raise ValueError(f"{path} is not a safetensors file")
+        (header_size,) = struct.unpack("<Q", size_bytes)
+        if header_size > _MAX_HEADER_SIZE:
+            raise ValueError(f"{path} is not a safetensors file")
+        try:
+            header = json.loads(f.read(header_size))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"{path} is not a safetensors file") from e
+    if not isinstance(header, dict):
+        raise ValueError(f"{path} is not a safetensors file")
+    return header, 8 + header_size
+
+
+def _get_dtype(path: Union[str, Path], dtype_name: str) -> torch.dtype:
+    dtype = SAFETENSORS_DTYPES.get(dtype_name)
+    if dtype is None:
+        raise ValueError(f"{path} has a tensor with unsupported dtype {dtype_name}")
+    return dtype
+
+
+def load_safetensors_mmap(path: Union[str, Path]) -> tuple[dict[str, torch.Tensor], dict[str, str]]:
+    """Loads a safetensors file as CPU tensors that are backed by a private, copy-on-write memory mapping of the file.
+
+    The tensors can be read and modified like any other tensor. Modifications are never written back to the file, and
+    only the modified pages are copied into private memory.
+
+    Note that on Windows, the file cannot be deleted while any of the returned tensors are alive.
+
+    Args:
+        path: Path to the safetensors file.
+
+    Returns:
+        A tuple of the tensors, keyed by name, and the file's `__metadata__` dict.
+
+    Raises:
+        ValueError: If the file is not a valid safetensors file, or has a dtype that torch does not support.
+    """
+    header, data_start = read_safetensors_header(path)
+    metadata: dict[str, str] = header.pop("__metadata__", None) or {}
+    tensors: dict[str, torch.Tensor] = {}
+    if not header:
+        return tensors, metadata
+
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    _register_mapping(mapped)
+
+    for name, info in header.items():
+        dtype = _get_dtype(path, info["dtype"])
+        shape: list[int] = info["shape"]
+        start, end = info["data_offsets"]
+        if start == end:
+            tensors[name] = torch.empty(shape, dtype=dtype)
+            continue
+        # The tensors keep a reference to the mapping, so it stays open for as long as any of them are alive
+        tensor = torch.frombuffer(mapped, dtype=torch.uint8, count=end - start, offset=data_start + start)
+        tensors[name] = tensor.view(dtype).reshape(shape)
+    return tensors, metadata
+
+
+def load_safetensors_meta(path: Union[str, Path]) -> tuple[dict[str, torch.Tensor], dict[str, str]]:
+    """Loads the tensors of a safetensors file as tensors on the meta device, reading only the file's header.
+
+    The tensors have the names, shapes and dtypes of the weights in the file, but no data. This is enough to identify a
+    model from its keys and shapes, without reading its weights.
+
+    Args:
+        path: Path to the safetensors file.
+
+    Returns:
+        A tuple of the meta tensors, keyed by name, and the file's `__metadata__` dict.
+
+    Raises:
+        ValueError: If the file is not a valid safetensors file, or has a dtype that torch does not support.
+    """
+    header, _ = read_safetensors_header(path)
+    metadata: dict[str, str] = header.pop("__metadata__", None) or {}
+    tensors: dict[str, torch.Tensor] = {}
+    for name, info in header.items():
+        tensors[name] = torch.empty(info["shape"], dtype=_get_dtype(path, info["dtype"]), device="meta")
+    return tensors, metadata
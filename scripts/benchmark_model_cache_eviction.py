@@ -0,0 +1,58 @@
+"""Replays recorded model cache traces against each eviction policy on CPU and reports the reload cost of each.
+
+Traces are JSON lines files of model accesses, as saved by `invokeai.backend.model_manager.load.model_cache.eviction_trace`
+from a `CacheTraceRecorder` attached to a model cache. Without a trace, a synthetic trace is replayed in which a large
+transformer is reused between one-off post-processing models.
+"""
+
+import argparse
+from pathlib import Path
+
+from invokeai.backend.model_manager.load.model_cache.eviction_policy import build_eviction_policy
+from invokeai.backend.model_manager.load.model_cache.eviction_trace import TraceAccess, load_trace, replay_trace
+
+GB = 2**30
+POLICIES = ["lru", "greedy_dual", "lookahead"]
+
+
+def synthetic_trace(sessions: int = 20) -> list[TraceAccess]:
+    """Sessions that each run a large transformer with its text encoder and VAE, followed by one of several
+    post-processing models."""
+    transformer = TraceAccess(key="transformer", size_bytes=12 * GB, load_seconds=24.0)
+    text_encoder = TraceAccess(key="text_encoder", size_bytes=5 * GB, load_seconds=10.0)
+    vae = TraceAccess(key="vae", size_bytes=GB // 3, load_seconds=0.8)
+    trace: list[TraceAccess] = []
+    for session in range(sessions):
+        postprocessor = TraceAccess(key=f"postprocessor_{session % 5}", size_bytes=2 * GB, load_seconds=1.5)
+        trace.extend([text_encoder, transformer, vae, postprocessor])
+    return trace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("traces", nargs="*", type=Path, help="Trace files to replay.")
+    parser.add_argument("--cache-gb", type=float, default=18.0, help="The size of the RAM cache in GB.")
+    parser.add_argument(
+        "--lookahead", type=int, default=8, help="The number of upcoming accesses the lookahead policy is told about."
+    )
+    args = parser.parse_args()
+
+    traces = {str(path): load_trace(path) for path in args.traces} or {"synthetic": synthetic_trace()}
+    for name, trace in traces.items():
+        print(f"{name}: {len(trace)} accesses, {args.cache_gb:.1f} GB cache")
+        print(f"  {'policy':<12} {'hits':>6} {'misses':>6} {'loaded (GB)':>12} {'load time (s)':>14}")
+        for policy_name in POLICIES:
+            result = replay_trace(
+                trace,
+                build_eviction_policy(policy_name),
+                cache_size_bytes=int(args.cache_gb * GB),
+                lookahead=args.lookahead if policy_name == "lookahead" else 0,
+            )
+            print(
+                f"  {policy_name:<12} {result.hits:>6} {result.misses:>6} {result.bytes_loaded / GB:>12.2f} "
+                f"{result.load_seconds:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
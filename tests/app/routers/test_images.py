@@ -220,3 +220,63 @@ def test_get_bulk_download_image_image_deleted_after_response(
     client.get("/api/v1/images/download/test.zip")
 
     assert not (tmp_path / "test.zip").exists()
+
+
+def prepare_image_file_test(tmp_path: Path, monkeypatch: Any, mock_invoker: Invoker) -> Path:
+    image_file: Path = tmp_path / "test.png"
+    image_file.write_bytes(b"0123456789")
+    mock_deps = MockApiDependencies(mock_invoker)
+    mock_invoker.services.image_moves = MagicMock()
+    mock_invoker.services.image_moves.is_maintenance_active.return_value = False
+    monkeypatch.setattr(mock_invoker.services.images, "get_path", lambda name, thumbnail=False: str(image_file))
+    monkeypatch.setattr("invokeai.app.api.routers.images.ApiDependencies", mock_deps)
+    monkeypatch.setattr("invokeai.app.api.routers.image_move_maintenance.ApiDependencies", mock_deps)
+    return image_file
+
+
+@pytest.mark.parametrize("endpoint", ["full", "thumbnail"])
+def test_get_image_file_is_conditional(
+    tmp_path: Path, monkeypatch: Any, mock_invoker: Invoker, client: TestClient, endpoint: str
+) -> None:
+    prepare_image_file_test(tmp_path, monkeypatch, mock_invoker)
+
+    response = client.get(f"/api/v1/images/i/test.png/{endpoint}")
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = client.get(f"/api/v1/images/i/test.png/{endpoint}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = client.get(f"/api/v1/images/i/test.png/{endpoint}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = client.get(f"/api/v1/images/i/test.png/{endpoint}", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+
+def test_get_image_full_changes_etag_when_file_changes(
+    tmp_path: Path, monkeypatch: Any, mock_invoker: Invoker, client: TestClient
+) -> None:
+    image_file = prepare_image_file_test(tmp_path, monkeypatch, mock_invoker)
+
+    etag = client.get("/api/v1/images/i/test.png/full").headers["etag"]
+    image_file.write_bytes(b"01234567890")
+    response = client.get("/api/v1/images/i/test.png/full", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_get_image_full_supports_range_requests(
+    tmp_path: Path, monkeypatch: Any, mock_invoker: Invoker, client: TestClient
+) -> None:
+    prepare_image_file_test(tmp_path, monkeypatch, mock_invoker)
+
+    response = client.get("/api/v1/images/i/test.png/full", headers={"Range": "bytes=2-5"})
+    assert response.status_code == 206
+    assert response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+    assert response.headers["content-disposition"] == 'inline; filename="test.png"'
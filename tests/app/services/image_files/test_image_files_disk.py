@@ -1,5 +1,6 @@
 import hashlib
 import platform
+import threading
 import zlib
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -7,8 +8,9 @@ from unittest.mock import MagicMock, patch
 import pytest
 from PIL import Image
 
+from invokeai.app.services.image_files.image_files_common import ImageFileSaveException
 from invokeai.app.services.image_files.image_files_disk import DiskImageFileStorage, _should_use_png_rle
-from invokeai.app.util.thumbnails import get_thumbnail_name
+from invokeai.app.util.thumbnails import get_thumbnail_name, make_thumbnail
 
 
 @pytest.fixture
@@ -252,3 +254,135 @@ class TestSaveDeleteRoundTrip:
         assert flat_path.exists()
         assert nested_path.exists()
         assert flat_path.parent != nested_path.parent
+
+
+class TestWriteBehind:
+    """Background image writes with `write_workers` > 0."""
+
+    @pytest.fixture
+    def write_behind_storage(self, tmp_path: Path):
+        storage = DiskImageFileStorage(tmp_path, write_workers=1, write_queue_size=2)
+        mock_invoker = MagicMock()
+        mock_invoker.services.configuration.pil_compress_level = 6
+        storage.start(mock_invoker)
+        yield storage
+        storage.stop(mock_invoker)
+
+    def test_serves_staged_image_until_written(self, write_behind_storage: DiskImageFileStorage):
+        release = threading.Event()
+        real_make_thumbnail = make_thumbnail
+
+        def blocking_make_thumbnail(image: Image.Image, size: int) -> Image.Image:
+            release.wait(timeout=10)
+            return real_make_thumbnail(image, size)
+
+        image = Image.new("RGB", (64, 64), color="red")
+        with patch("invokeai.app.services.image_files.image_files_disk.make_thumbnail", blocking_make_thumbnail):
+            write_behind_storage.save(image=image, image_name="staged.png", metadata='{"foo":"bar"}')
+            # The caller's image is copied, so modifying it does not affect the write
+            image.paste((0, 0, 255), (0, 0, 64, 64))
+
+            staged = write_behind_storage.get("staged.png")
+            assert staged.getpixel((0, 0)) == (255, 0, 0)
+            assert staged.info["invokeai_metadata"] == '{"foo":"bar"}'
+            # Readers get a copy, so they do not share the image that is being written
+            assert write_behind_storage.get("staged.png") is not staged
+            staged.info.clear()
+
+            release.set()
+            # Getting the path waits for the write to finish
+            thumbnail_path = write_behind_storage.get_path("staged.png", thumbnail=True)
+            assert thumbnail_path.exists()
+
+        image_path = write_behind_storage.get_path("staged.png")
+        with Image.open(image_path) as loaded:
+            assert loaded.getpixel((0, 0)) == (255, 0, 0)
+            assert loaded.info["invokeai_metadata"] == '{"foo":"bar"}'
+
+    def test_flush_and_delete(self, write_behind_storage: DiskImageFileStorage):
+        for i in range(5):
+            write_behind_storage.save(image=Image.new("RGB", (32, 32)), image_name=f"{i}.png")
+        write_behind_storage.flush()
+        for i in range(5):
+            assert write_behind_storage.validate_path(write_behind_storage.get_path(f"{i}.png"))
+
+        write_behind_storage.save(image=Image.new("RGB", (32, 32)), image_name="deleted.png")
+        write_behind_storage.delete("deleted.png")
+        assert not write_behind_storage.get_path("deleted.png").exists()
+        assert not write_behind_storage.get_path("deleted.png", thumbnail=True).exists()
+
+    def test_failed_write_is_reported(self, write_behind_storage: DiskImageFileStorage):
+        def failing_make_thumbnail(image: Image.Image, size: int) -> Image.Image:
+            raise OSError("disk full")
+
+        with patch("invokeai.app.services.image_files.image_files_disk.make_thumbnail", failing_make_thumbnail):
+            write_behind_storage.save(image=Image.new("RGB", (32, 32)), image_name="failed.png")
+            with pytest.raises(ImageFileSaveException, match="disk full"):
+                write_behind_storage.wait_for_write("failed.png")
+
+        # The partially-written file is removed, and readers get the error rather than a missing file
+        assert not write_behind_storage.validate_path(write_behind_storage.get_path("failed.png"))
+        with pytest.raises(ImageFileSaveException, match="failed.png"):
+            write_behind_storage.get("failed.png")
+        # The failure is raised by the next flush only
+        with pytest.raises(ImageFileSaveException, match="failed.png"):
+            write_behind_storage.flush()
+        write_behind_storage.flush()
+
+        # Saving the image again clears the failure
+        write_behind_storage.save(image=Image.new("RGB", (32, 32)), image_name="failed.png")
+        write_behind_storage.wait_for_write("failed.png")
+        assert write_behind_storage.get("failed.png").size == (32, 32)
+
+
+class TestImageCache:
+    """Decoded image cache keyed by path and color mode."""
+
+    def test_get_decodes_once_per_mode(self, disk_storage: DiskImageFileStorage):
+        disk_storage.save(image=Image.new("RGB", (16, 16), color="red"), image_name="cached.png")
+        disk_storage.evict_cache_paths([disk_storage.get_path("cached.png")])
+
+        with patch("invokeai.app.services.image_files.image_files_disk.Image.open", wraps=Image.open) as mock_open:
+            original = disk_storage.get("cached.png")
+            assert disk_storage.get("cached.png") is original
+            grayscale = disk_storage.get("cached.png", mode="L")
+            assert grayscale.mode == "L"
+            assert disk_storage.get("cached.png", mode="L") is grayscale
+            assert disk_storage.get("cached.png", mode="RGB") is original
+            assert mock_open.call_count == 1
+
+        stats = disk_storage.get_cache_stats()
+        assert stats.images_cached == 2
+        assert stats.cache_size_bytes == 16 * 16 * 3 + 16 * 16
+
+    def test_cache_respects_byte_budget(self, tmp_path: Path):
+        storage = DiskImageFileStorage(tmp_path, max_cache_bytes=2 * 16 * 16 * 3)
+        mock_invoker = MagicMock()
+        mock_invoker.services.configuration.pil_compress_level = 6
+        storage.start(mock_invoker)
+
+        for name in ["1.png", "2.png", "3.png"]:
+            storage.save(image=Image.new("RGB", (16, 16)), image_name=name)
+        storage.get("2.png")
+        storage.save(image=Image.new("RGB", (16, 16)), image_name="4.png")
+
+        stats = storage.get_cache_stats()
+        assert stats.images_cached == 2
+        assert stats.cache_size_bytes <= stats.max_cache_size_bytes
+        hits = stats.hits
+        # 2.png was used recently, so it was kept
+        storage.get("2.png")
+        assert storage.get_cache_stats().hits == hits + 1
+
+    def test_delete_evicts_all_modes(self, disk_storage: DiskImageFileStorage):
+        disk_storage.save(image=Image.new("RGB", (16, 16)), image_name="deleted.png")
+        disk_storage.get("deleted.png", mode="L")
+        disk_storage.delete("deleted.png")
+        assert disk_storage.get_cache_stats().images_cached == 0
+
+    def test_get_workflow_does_not_decode(self, disk_storage: DiskImageFileStorage):
+        disk_storage.save(image=Image.new("RGB", (16, 16)), image_name="workflow.png", workflow='{"nodes":[]}')
+        disk_storage.evict_cache_paths([disk_storage.get_path("workflow.png")])
+        assert disk_storage.get_workflow("workflow.png") == '{"nodes":[]}'
+        assert disk_storage.get_graph("workflow.png") is None
+        assert disk_storage.get_cache_stats().images_cached == 0
@@ -0,0 +1,135 @@
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+
+from invokeai.app.invocations.model import LoRALoaderInvocation, MainModelLoaderInvocation, ModelIdentifierField
+from invokeai.app.services.config import InvokeAIAppConfig
+from invokeai.app.services.model_load.model_load_default import ModelLoadService
+from invokeai.app.services.model_load.model_prefetch import find_pending_model_identifiers
+from invokeai.app.services.shared.graph import Graph, GraphExecutionState
+from invokeai.backend.model_manager.load.load_base import LoadedModel
+from invokeai.backend.model_manager.load.model_cache.model_cache import ModelCache, get_model_cache_key
+from invokeai.backend.model_manager.taxonomy import BaseModelType, ModelType, SubModelType
+
+# The size of each fake model, a module with a buffer of 256 float32 values
+MODEL_BYTES = 1024
+
+
+class _FakeLoader:
+    """Loads every model as a small tensor."""
+
+    def __init__(self, app_config: InvokeAIAppConfig, logger: logging.Logger, ram_cache: ModelCache) -> None:
+        self._ram_cache = ram_cache
+
+    def get_size_fs(self, config, model_path: Path, submodel_type=None) -> int:
+        return MODEL_BYTES
+
+    def load_model(self, model_config, submodel_type=None) -> LoadedModel:
+        cache_key = get_model_cache_key(model_config.key, submodel_type)
+        if not self._ram_cache.contains(cache_key):
+            # The cache only measures the size of modules, not of bare tensors
+            model = torch.nn.Module()
+            model.register_buffer("weight", torch.zeros(MODEL_BYTES // 4))
+            self._ram_cache.put(cache_key, model)
+        return LoadedModel(config=model_config, cache_record=self._ram_cache.get(cache_key), cache=self._ram_cache)
+
+
+class _FakeRegistry:
+    @classmethod
+    def get_implementation(cls, config, submodel_type):
+        return _FakeLoader, config, submodel_type
+
+
+@pytest.fixture
+def ram_cache():
+    logger = MagicMock()
+    logger.getEffectiveLevel.return_value = logging.INFO
+    cache = ModelCache(
+        execution_device_working_mem_gb=1.0,
+        enable_partial_loading=False,
+        keep_ram_copy_of_weights=True,
+        execution_device="cpu",
+        storage_device="cpu",
+        logger=logger,
+    )
+    yield cache
+    cache.shutdown()
+
+
+@pytest.fixture
+def loader(ram_cache: ModelCache) -> ModelLoadService:
+    return ModelLoadService(app_config=InvokeAIAppConfig(), ram_cache=ram_cache, registry=_FakeRegistry)  # type: ignore
+
+
+def _model_config(tmp_path: Path, key: str, type: ModelType):
+    model_path = tmp_path / f"{key}.safetensors"
+    model_path.touch()
+    return SimpleNamespace(key=key, name=key, type=type, path=model_path.as_posix())
+
+
+def _identifier(key: str, type: ModelType) -> ModelIdentifierField:
+    return ModelIdentifierField(key=key, hash=key, name=key, base=BaseModelType.StableDiffusion1, type=type)
+
+
+def test_find_pending_model_identifiers_skips_executed_nodes():
+    graph = Graph()
+    graph.add_node(MainModelLoaderInvocation(id="main", model=_identifier("main", ModelType.Main)))
+    graph.add_node(LoRALoaderInvocation(id="lora", lora=_identifier("lora", ModelType.LoRA)))
+    session = GraphExecutionState(graph=graph)
+
+    assert [i.key for i in find_pending_model_identifiers(session)] == ["main", "lora"]
+
+    session.source_prepared_mapping["main"] = {"prepared_main"}
+    session.executed.add("prepared_main")
+    assert [i.key for i in find_pending_model_identifiers(session)] == ["lora"]
+
+
+def test_prefetched_models_are_counted_as_hits_or_wasted(tmp_path: Path, ram_cache: ModelCache, loader):
+    main = _model_config(tmp_path, "main", ModelType.Main)
+    lora = _model_config(tmp_path, "lora", ModelType.LoRA)
+    # Main models are prefetched as the submodels they were loaded as before
+    loader.load_model(main, SubModelType.UNet)
+    ram_cache.drop_model("main")
+
+    loader.prefetch_models([(main, None), (lora, None)])
+
+    assert ram_cache.contains("main:unet") and ram_cache.contains("lora")
+    loader.load_model(main, SubModelType.UNet)
+    ram_cache.drop_model("lora")
+    stats = loader.get_prefetch_stats()
+    assert (stats.prefetched, stats.hits, stats.wasted, stats.skipped) == (2, 1, 1, 0)
+
+
+def test_prefetch_does_not_drop_models_that_are_about_to_be_used(tmp_path: Path, ram_cache: ModelCache, loader):
+    first, second, third = (_model_config(tmp_path, key, ModelType.LoRA) for key in ("first", "second", "third"))
+    ram_cache._ram_cache_size_bytes = 2 * MODEL_BYTES
+    loader.load_model(first)
+    loader.load_model(second)
+
+    loader.prefetch_models([(first, None), (second, None), (third, None)])
+
+    assert ram_cache.contains("first") and ram_cache.contains("second")
+    assert not ram_cache.contains("third")
+    assert loader.get_prefetch_stats().skipped == 1
+
+
+def test_prefetch_load_does_not_drop_models_that_are_about_to_be_used(
+    tmp_path: Path, ram_cache: ModelCache, loader, monkeypatch: pytest.MonkeyPatch
+):
+    first, second, third = (_model_config(tmp_path, key, ModelType.LoRA) for key in ("first", "second", "third"))
+    ram_cache._ram_cache_size_bytes = 2 * MODEL_BYTES
+    loader.load_model(first)
+    loader.load_model(second)
+    # The size on disk underestimates the loaded size, so the room reserved for the prefetch is not enough
+    monkeypatch.setattr(_FakeLoader, "get_size_fs", lambda self, config, model_path, submodel_type=None: 0)
+
+    loader.prefetch_models([(first, None), (second, None), (third, None)])
+
+    assert ram_cache.contains("first") and ram_cache.contains("second") and ram_cache.contains("third")
+    # Loads outside of the prefetch may drop the models again
+    ram_cache.make_room(MODEL_BYTES)
+    assert not ram_cache.contains("first")
@@ -0,0 +1,195 @@
+"""Tests for enqueueing batches: chunked inserts, and storing a batch's session and workflow once, in the batch template."""
+
+import asyncio
+
+import pytest
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation
+from invokeai.app.services.events.events_common import BatchEnqueuedEvent, BatchEnqueueProgressEvent
+from invokeai.app.services.invoker import Invoker
+from invokeai.app.services.session_queue.session_queue_common import (
+    FROM_BATCH_TEMPLATE,
+    Batch,
+    BatchDatum,
+    EnqueueBatchResult,
+    create_batch_template,
+)
+from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
+from invokeai.app.services.shared.graph import Graph
+from tests.test_nodes import PromptTestInvocation, TestEventService
+
+
+@pytest.fixture
+def session_queue(mock_invoker: Invoker) -> SqliteSessionQueue:
+    db = mock_invoker.services.board_records._db
+    queue = SqliteSessionQueue(db=db)
+    queue.start(mock_invoker)
+    return queue
+
+
+def _make_batch(
+    batch_id: str | None = None, prompts: tuple[str, ...] = ("Banana", "Grape", "Orange"), car: str = "Toyota"
+) -> Batch:
+    graph = Graph()
+    graph.add_node(PromptTestInvocation(id="1", prompt="Chevy"))
+    graph.add_node(PromptTestInvocation(id="2", prompt=car))
+    batch = Batch(graph=graph, data=[[BatchDatum(node_path="1", field_name="prompt", items=list(prompts))]])
+    if batch_id is not None:
+        batch.batch_id = batch_id
+    return batch
+
+
+def _enqueue(session_queue: SqliteSessionQueue, batch: Batch) -> EnqueueBatchResult:
+    return asyncio.run(session_queue.enqueue_batch("default", batch, prepend=False))
+
+
+def _get_raw_sessions(session_queue: SqliteSessionQueue, batch_id: str) -> list[str]:
+    with session_queue._db.transaction() as cursor:
+        cursor.execute("SELECT session FROM session_queue WHERE batch_id = ? ORDER BY item_id", (batch_id,))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _count_templates(session_queue: SqliteSessionQueue) -> int:
+    with session_queue._db.transaction() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM session_queue_batch_templates")
+        return cursor.fetchone()[0]
+
+
+def _get_prompt(node: BaseInvocation) -> str:
+    assert isinstance(node, PromptTestInvocation)
+    return node.prompt
+
+
+def test_enqueue_batch_stores_session_once(session_queue: SqliteSessionQueue) -> None:
+    batch = _make_batch()
+    result = _enqueue(session_queue, batch)
+
+    assert result.enqueued == 3
+    assert _get_raw_sessions(session_queue, batch.batch_id) == [FROM_BATCH_TEMPLATE] * 3
+    assert _count_templates(session_queue) == 1
+
+
+def test_queue_items_are_materialized_from_batch_template(session_queue: SqliteSessionQueue) -> None:
+    batch = _make_batch()
+    result = _enqueue(session_queue, batch)
+
+    queue_items = [session_queue.get_queue_item(item_id) for item_id in sorted(result.item_ids)]
+    assert [_get_prompt(q.session.graph.get_node("1")) for q in queue_items] == ["Banana", "Grape", "Orange"]
+    assert all(_get_prompt(q.session.graph.get_node("2")) == "Toyota" for q in queue_items)
+    assert all(q.session.id == q.session_id for q in queue_items)
+
+    dequeued = session_queue.dequeue()
+    assert dequeued is not None
+    assert _get_prompt(dequeued.session.graph.get_node("1")) == "Banana"
+    assert dequeued.session.id == dequeued.session_id
+
+    listed = session_queue.list_all_queue_items("default")
+    assert sorted(_get_prompt(q.session.graph.get_node("1")) for q in listed) == ["Banana", "Grape", "Orange"]
+
+
+def test_template_is_deleted_with_its_last_queue_item(session_queue: SqliteSessionQueue) -> None:
+    first = _enqueue(session_queue, _make_batch())
+    second = _enqueue(session_queue, _make_batch())
+    assert _count_templates(session_queue) == 2
+
+    session_queue.delete_queue_items_by_id(first.item_ids[:1])
+    assert _count_templates(session_queue) == 2
+
+    session_queue.delete_queue_items_by_id(first.item_ids[1:])
+    assert _count_templates(session_queue) == 1
+
+    session_queue.clear("default")
+    assert _count_templates(session_queue) == 0
+    assert second.enqueued == 3
+
+
+def test_reused_batch_id_stores_sessions_in_full(session_queue: SqliteSessionQueue) -> None:
+    _enqueue(session_queue, _make_batch(batch_id="reused"))
+    result = _enqueue(session_queue, _make_batch(batch_id="reused", prompts=("Apple",), car="Honda"))
+
+    raw_sessions = _get_raw_sessions(session_queue, "reused")
+    assert raw_sessions[:3] == [FROM_BATCH_TEMPLATE] * 3
+    assert raw_sessions[3] != FROM_BATCH_TEMPLATE
+    assert _count_templates(session_queue) == 1
+
+    queue_item = session_queue.get_queue_item(max(result.item_ids))
+    assert _get_prompt(queue_item.session.graph.get_node("1")) == "Apple"
+    assert _get_prompt(queue_item.session.graph.get_node("2")) == "Honda"
+    assert queue_item.session.id == queue_item.session_id
+    # The existing queue items keep their template
+    first_item = session_queue.get_queue_item(min(result.item_ids) - 3)
+    assert _get_prompt(first_item.session.graph.get_node("2")) == "Toyota"
+
+
+def test_reused_batch_id_with_the_same_template_shares_it(session_queue: SqliteSessionQueue) -> None:
+    _enqueue(session_queue, _make_batch(batch_id="reused"))
+    result = _enqueue(session_queue, _make_batch(batch_id="reused", prompts=("Apple",)))
+
+    assert _get_raw_sessions(session_queue, "reused") == [FROM_BATCH_TEMPLATE] * 4
+    queue_item = session_queue.get_queue_item(max(result.item_ids))
+    assert _get_prompt(queue_item.session.graph.get_node("1")) == "Apple"
+
+
+def test_template_claimed_by_a_concurrent_enqueue_is_not_used(
+    session_queue: SqliteSessionQueue, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Another enqueue of the same batch ID inserts its template between this enqueue's chunks
+    monkeypatch.setattr("invokeai.app.services.session_queue.session_queue_sqlite.ENQUEUE_CHUNK_SIZE", 2)
+    other_template = create_batch_template(_make_batch(car="Honda"))
+    insert_queue_items = session_queue._insert_queue_items
+
+    def insert_after_other_enqueue(values, batch_id, batch_template):
+        with session_queue._db.transaction() as cursor:
+            cursor.execute("DELETE FROM session_queue_batch_templates WHERE batch_id = ?", (batch_id,))
+            cursor.execute(
+                "INSERT INTO session_queue_batch_templates (batch_id, session, workflow) VALUES (?, ?, ?)",
+                (batch_id, *other_template),
+            )
+        return insert_queue_items(values, batch_id, batch_template)
+
+    monkeypatch.setattr(session_queue, "_insert_queue_items", insert_after_other_enqueue)
+    result = _enqueue(session_queue, _make_batch(batch_id="raced"))
+
+    assert FROM_BATCH_TEMPLATE not in _get_raw_sessions(session_queue, "raced")
+    queue_items = [session_queue.get_queue_item(item_id) for item_id in sorted(result.item_ids)]
+    assert [_get_prompt(q.session.graph.get_node("1")) for q in queue_items] == ["Banana", "Grape", "Orange"]
+    assert all(_get_prompt(q.session.graph.get_node("2")) == "Toyota" for q in queue_items)
+
+
+def test_enqueue_batch_inserts_in_chunks(
+    session_queue: SqliteSessionQueue, mock_invoker: Invoker, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("invokeai.app.services.session_queue.session_queue_sqlite.ENQUEUE_CHUNK_SIZE", 2)
+    events = mock_invoker.services.events
+    assert isinstance(events, TestEventService)
+    batch = _make_batch(prompts=("a", "b", "c", "d", "e"))
+
+    result = _enqueue(session_queue, batch)
+
+    assert result.enqueued == 5
+    with session_queue._db.transaction() as cursor:
+        cursor.execute("SELECT item_id FROM session_queue WHERE batch_id = ? ORDER BY item_id DESC", (batch.batch_id,))
+        assert result.item_ids == [row[0] for row in cursor.fetchall()]
+
+    queue_items = [session_queue.get_queue_item(item_id) for item_id in sorted(result.item_ids)]
+    assert [_get_prompt(q.session.graph.get_node("1")) for q in queue_items] == ["a", "b", "c", "d", "e"]
+
+    progress = [e for e in events.events if isinstance(e, BatchEnqueueProgressEvent)]
+    assert [(e.enqueued, e.requested) for e in progress] == [(2, 5), (4, 5)]
+    enqueued = [e for e in events.events if isinstance(e, BatchEnqueuedEvent)]
+    assert len(enqueued) == 1 and enqueued[0].enqueued == 5
+
+
+def test_enqueue_batch_respects_max_queue_size(session_queue: SqliteSessionQueue, mock_invoker: Invoker) -> None:
+    mock_invoker.services.configuration.max_queue_size = 2
+
+    result = _enqueue(session_queue, _make_batch())
+    assert result.requested == 3
+    assert result.enqueued == 2
+    assert len(result.item_ids) == 2
+
+    result = _enqueue(session_queue, _make_batch())
+    assert result.enqueued == 0
+    assert result.item_ids == []
+    # A batch without queue items has no template
+    assert _count_templates(session_queue) == 1
@@ -0,0 +1,137 @@
+import uuid
+from typing import Optional
+
+import pytest
+
+from invokeai.app.services.invoker import Invoker
+from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
+from invokeai.app.services.shared.graph import Graph, GraphExecutionState
+from tests.test_nodes import PromptTestInvocation
+
+
+@pytest.fixture
+def session_queue(mock_invoker: Invoker) -> SqliteSessionQueue:
+    db = mock_invoker.services.board_records._db
+    queue = SqliteSessionQueue(db=db)
+    queue.start(mock_invoker)
+    return queue
+
+
+def _insert_queue_item(session_queue: SqliteSessionQueue, parent_item_id: Optional[int] = None) -> int:
+    graph = Graph()
+    graph.add_node(PromptTestInvocation(id="prompt", prompt="test"))
+    session = GraphExecutionState(graph=graph)
+    with session_queue._db.transaction() as cursor:
+        cursor.execute(
+            """--sql
+            INSERT INTO session_queue (queue_id, session, session_id, batch_id, priority, user_id, parent_item_id)
+            VALUES ('default', ?, ?, ?, 0, 'system', ?)
+            """,
+            (session.model_dump_json(warnings=False, exclude_none=True), session.id, str(uuid.uuid4()), parent_item_id),
+        )
+        return cursor.lastrowid
+
+
+def _add_checkpoint(session_queue: SqliteSessionQueue, item_id: int, node_id: str = "node") -> None:
+    session_queue.add_checkpoint(
+        item_id=item_id,
+        node_id=node_id,
+        source_node_id="prompt",
+        iteration_path=(0, 2),
+        output='{"type": "test_prompt_output", "prompt": "test"}',
+    )
+
+
+def _restart(session_queue: SqliteSessionQueue, mock_invoker: Invoker) -> None:
+    session_queue._pending_index.invalidate()
+    session_queue.start(mock_invoker)
+
+
+def test_checkpoints_are_returned_oldest_first(session_queue: SqliteSessionQueue) -> None:
+    item_id = _insert_queue_item(session_queue)
+    _add_checkpoint(session_queue, item_id, "first")
+    _add_checkpoint(session_queue, item_id, "second")
+
+    checkpoints = session_queue.get_checkpoints(item_id)
+
+    assert [c.node_id for c in checkpoints] == ["first", "second"]
+    assert checkpoints[0].source_node_id == "prompt"
+    assert checkpoints[0].iteration_path == (0, 2)
+    assert session_queue.get_checkpoints(_insert_queue_item(session_queue)) == []
+
+
+def test_checkpoints_are_deleted_when_the_queue_item_finishes(session_queue: SqliteSessionQueue) -> None:
+    item_id = _insert_queue_item(session_queue)
+    session_queue.dequeue()
+    _add_checkpoint(session_queue, item_id)
+
+    session_queue.suspend_queue_item(item_id)
+    assert len(session_queue.get_checkpoints(item_id)) == 1
+
+    session_queue.cancel_queue_item(item_id)
+    assert session_queue.get_checkpoints(item_id) == []
+
+
+def test_startup_resumes_interrupted_item_that_made_progress(
+    session_queue: SqliteSessionQueue, mock_invoker: Invoker
+) -> None:
+    item_id = _insert_queue_item(session_queue)
+    session_queue.dequeue()
+    _add_checkpoint(session_queue, item_id)
+
+    _restart(session_queue, mock_invoker)
+
+    queue_item = session_queue.get_queue_item(item_id)
+    assert queue_item.status == "pending"
+    assert queue_item.worker_id is None
+    assert len(session_queue.get_checkpoints(item_id)) == 1
+    dequeued = session_queue.dequeue()
+    assert dequeued is not None and dequeued.item_id == item_id
+
+
+def test_startup_cancels_interrupted_item_without_progress_since_it_started(
+    session_queue: SqliteSessionQueue, mock_invoker: Invoker
+) -> None:
+    item_id = _insert_queue_item(session_queue)
+    session_queue.dequeue()
+    _add_checkpoint(session_queue, item_id)
+    _restart(session_queue, mock_invoker)
+    # The resumed item is interrupted again before it checkpoints another node, e.g. because that node crashes the app
+    session_queue.dequeue()
+    with session_queue._db.transaction() as cursor:
+        # Make sure the checkpoint predates the restart, even if both happened within the same millisecond
+        cursor.execute("UPDATE session_queue_checkpoints SET created_at = '2026-01-01 00:00:00.000'")
+
+    _restart(session_queue, mock_invoker)
+
+    assert session_queue.get_queue_item(item_id).status == "canceled"
+    assert session_queue.get_checkpoints(item_id) == []
+
+
+def test_startup_cancels_interrupted_item_when_resume_is_disabled(
+    session_queue: SqliteSessionQueue, mock_invoker: Invoker
+) -> None:
+    item_id = _insert_queue_item(session_queue)
+    session_queue.dequeue()
+    _add_checkpoint(session_queue, item_id)
+    mock_invoker.services.configuration.resume_interrupted_sessions = False
+
+    _restart(session_queue, mock_invoker)
+
+    assert session_queue.get_queue_item(item_id).status == "canceled"
+
+
+def test_startup_cancels_interrupted_workflow_call_chain(
+    session_queue: SqliteSessionQueue, mock_invoker: Invoker
+) -> None:
+    parent_item_id = _insert_queue_item(session_queue)
+    session_queue.dequeue()
+    session_queue.suspend_queue_item(parent_item_id)
+    child_item_id = _insert_queue_item(session_queue, parent_item_id=parent_item_id)
+    session_queue.dequeue()
+    _add_checkpoint(session_queue, child_item_id)
+
+    _restart(session_queue, mock_invoker)
+
+    assert session_queue.get_queue_item(parent_item_id).status == "canceled"
+    assert session_queue.get_queue_item(child_item_id).status == "canceled"
@@ -1,6 +1,7 @@
 """Tests for session queue dequeue() ordering: FIFO and round-robin modes."""
 
 import json
+import threading
 import uuid
 from typing import Optional
 
@@ -249,7 +250,7 @@ def test_round_robin_dequeue_does_not_scan_full_history(session_queue_round_robi
         _insert_queue_item(session_queue_round_robin, queue_id, u)
 
     with session_queue_round_robin._db.transaction() as cursor:
-        plan_rows = cursor.execute("EXPLAIN QUERY PLAN " + ROUND_ROBIN_DEQUEUE_QUERY).fetchall()
+        plan_rows = cursor.execute("EXPLAIN QUERY PLAN " + ROUND_ROBIN_DEQUEUE_QUERY, (1,)).fetchall()
     details = [row["detail"] for row in plan_rows]
 
     # No step may scan the session_queue base table — that is the full-history scan we are
@@ -291,3 +292,218 @@ def test_round_robin_ignored_in_single_user_mode(mock_invoker: Invoker) -> None:
     # FIFO order: user_a, user_a, user_b
     user_ids = _dequeue_user_ids(queue, 3)
     assert user_ids == ["user_a", "user_a", "user_b"]
+
+
+# ---------------------------------------------------------------------------
+# Pending index tests
+# ---------------------------------------------------------------------------
+
+
+def test_round_robin_loads_last_served_from_history(session_queue_round_robin: SqliteSessionQueue) -> None:
+    """Pending index: users' last-served times are loaded from the table, so fairness carries over restarts."""
+    queue_id = "default"
+    _seed_completed_history(session_queue_round_robin, queue_id, "user_a", count=2)
+    _seed_completed_history(session_queue_round_robin, queue_id, "user_b", count=1)
+    _insert_queue_item(session_queue_round_robin, queue_id, "user_a")
+    _insert_queue_item(session_queue_round_robin, queue_id, "user_b")
+
+    # user_b was served less recently than user_a
+    assert _dequeue_user_ids(session_queue_round_robin, 3) == ["user_b", "user_a", None]
+
+
+def test_pending_index_is_loaded_even_if_items_were_enqueued_first(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Pending index: items already in the table are dequeued first, even if an item was indexed before the load."""
+    queue_id = "default"
+    _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    _insert_queue_item(session_queue_fifo, queue_id, "user_b")
+    # Items enqueued through the queue are indexed as they are added
+    enqueued = _insert_queue_item(session_queue_fifo, queue_id, "user_c")
+    session_queue_fifo._pending_index.add(enqueued, "user_c", 0)
+
+    assert _dequeue_user_ids(session_queue_fifo, 4) == ["user_a", "user_b", "user_c", None]
+
+
+def test_canceled_item_is_removed_from_pending_index(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Pending index: items canceled after the index was loaded are not dequeued."""
+    queue_id = "default"
+    _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    canceled = _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    remaining = _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    assert session_queue_fifo.dequeue() is not None
+
+    session_queue_fifo.cancel_queue_item(canceled)
+
+    item = session_queue_fifo.dequeue()
+    assert item is not None
+    assert item.item_id == remaining
+    assert session_queue_fifo.dequeue() is None
+
+
+def test_item_changed_outside_the_queue_is_not_claimed(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Pending index: the index is only a hint - items that are no longer pending in the table are skipped."""
+    queue_id = "default"
+    _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    changed = _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    remaining = _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    assert session_queue_fifo.dequeue() is not None
+
+    with session_queue_fifo._db.transaction() as cursor:
+        cursor.execute("UPDATE session_queue SET status = 'canceled' WHERE item_id = ?", (changed,))
+
+    item = session_queue_fifo.dequeue()
+    assert item is not None
+    assert item.item_id == remaining
+    assert session_queue_fifo.get_queue_item(changed).status == "canceled"
+
+
+def test_resumed_item_is_dequeued_again(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Pending index: an item set back to pending is added to the index again."""
+    queue_id = "default"
+    item_id = _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    later = _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    assert session_queue_fifo.dequeue() is not None
+
+    session_queue_fifo.suspend_queue_item(item_id)
+    session_queue_fifo.resume_queue_item(item_id)
+
+    dequeued = [session_queue_fifo.dequeue(), session_queue_fifo.dequeue()]
+    assert [item.item_id if item is not None else None for item in dequeued] == [item_id, later]
+
+
+def test_retried_item_is_dequeued(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Pending index: retried items are picked up by the next dequeue."""
+    queue_id = "default"
+    item_id = _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    session_queue_fifo.cancel_queue_item(item_id)
+
+    session_queue_fifo.retry_items_by_id(queue_id, [item_id])
+
+    dequeued = [session_queue_fifo.dequeue(), session_queue_fifo.dequeue(), session_queue_fifo.dequeue()]
+    assert all(item is not None for item in dequeued[:2])
+    assert dequeued[1] is not None and dequeued[1].retried_from_item_id == item_id
+    assert dequeued[2] is None
+
+
+# ---------------------------------------------------------------------------
+# Prefetch tests
+# ---------------------------------------------------------------------------
+
+
+def test_prefetch_leaves_items_pending(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Prefetch: prepared items are not dequeued, and are dequeued in the usual order."""
+    queue_id = "default"
+    first = _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    second = _insert_queue_item(session_queue_fifo, queue_id, "user_b")
+
+    session_queue_fifo.prefetch(2)
+
+    assert session_queue_fifo.get_queue_item(second).status == "pending"
+    assert _dequeue_user_ids(session_queue_fifo, 3) == ["user_a", "user_b", None]
+    assert session_queue_fifo.get_queue_item(first).status == "in_progress"
+
+
+def test_prefetch_session_is_used_by_dequeue(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Prefetch: dequeue hands out the prefetched session instead of parsing it again."""
+    item_id = _insert_queue_item(session_queue_fifo, "default", "user_a")
+
+    session_queue_fifo.prefetch(1)
+    prefetched_session = session_queue_fifo._parsed_sessions[item_id][1]
+
+    item = session_queue_fifo.dequeue()
+    assert item is not None
+    assert item.item_id == item_id
+    assert item.session is prefetched_session
+    # The prefetched session is only handed out once
+    assert session_queue_fifo.get_queue_item(item_id).session is not prefetched_session
+
+
+def test_prefetch_session_is_not_taken_by_get_queue_item(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Prefetch: reading a prefetched item gives a copy of its session, and leaves the prefetched one for dequeue."""
+    item_id = _insert_queue_item(session_queue_fifo, "default", "user_a")
+
+    session_queue_fifo.prefetch(1)
+    prefetched_session = session_queue_fifo._parsed_sessions[item_id][1]
+
+    assert session_queue_fifo.get_queue_item(item_id).session is not prefetched_session
+    item = session_queue_fifo.dequeue()
+    assert item is not None
+    assert item.session is prefetched_session
+
+
+def test_prefetch_session_is_not_used_if_changed(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Prefetch: a prefetched session is discarded if the queue item's session changed in the meantime."""
+    item_id = _insert_queue_item(session_queue_fifo, "default", "user_a")
+
+    session_queue_fifo.prefetch(1)
+    prefetched_session = session_queue_fifo._parsed_sessions[item_id][1]
+    updated_session = GraphExecutionState(graph=Graph())
+    with session_queue_fifo._db.transaction() as cursor:
+        cursor.execute(
+            "UPDATE session_queue SET session = ? WHERE item_id = ?",
+            (updated_session.model_dump_json(), item_id),
+        )
+
+    item = session_queue_fifo.dequeue()
+    assert item is not None
+    assert item.session is not prefetched_session
+    assert item.session.id == updated_session.id
+
+
+def test_prefetch_canceled_item_is_not_dequeued(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Prefetch: canceling a prefetched item still prevents it from being dequeued."""
+    queue_id = "default"
+    first = _insert_queue_item(session_queue_fifo, queue_id, "user_a")
+    second = _insert_queue_item(session_queue_fifo, queue_id, "user_b")
+
+    session_queue_fifo.prefetch(2)
+    session_queue_fifo.cancel_queue_item(first)
+
+    item = session_queue_fifo.dequeue()
+    assert item is not None
+    assert item.item_id == second
+    assert session_queue_fifo.dequeue() is None
+    assert session_queue_fifo._parsed_sessions == {}
+
+
+# ---------------------------------------------------------------------------
+# Worker tests
+# ---------------------------------------------------------------------------
+
+
+def test_concurrent_dequeue_claims_each_item_once(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Workers: concurrent dequeues never return the same item, and record the worker that claimed it."""
+    item_ids = {_insert_queue_item(session_queue_fifo, "default", "user_a") for _ in range(20)}
+    claimed: dict[str, list[int]] = {"w0": [], "w1": [], "w2": [], "w3": []}
+
+    def work(worker_id: str) -> None:
+        while (item := session_queue_fifo.dequeue(worker_id=worker_id)) is not None:
+            assert item.worker_id == worker_id
+            assert item.status == "in_progress"
+            claimed[worker_id].append(item.item_id)
+
+    threads = [threading.Thread(target=work, args=(worker_id,)) for worker_id in claimed]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_claimed = [item_id for worker_item_ids in claimed.values() for item_id in worker_item_ids]
+    assert sorted(all_claimed) == sorted(item_ids)
+    for item_id in all_claimed:
+        worker_id = next(w for w, worker_item_ids in claimed.items() if item_id in worker_item_ids)
+        assert session_queue_fifo.get_queue_item(item_id).worker_id == worker_id
+
+
+def test_cancel_by_queue_id_cancels_all_in_progress_items(session_queue_fifo: SqliteSessionQueue) -> None:
+    """Workers: canceling the queue cancels the in-progress items of every worker."""
+    first = _insert_queue_item(session_queue_fifo, "default", "user_a")
+    second = _insert_queue_item(session_queue_fifo, "default", "user_b")
+    pending = _insert_queue_item(session_queue_fifo, "default", "user_a")
+    session_queue_fifo.dequeue(worker_id="w0")
+    session_queue_fifo.dequeue(worker_id="w1")
+
+    session_queue_fifo.cancel_by_queue_id("default")
+
+    for item_id in (first, second, pending):
+        assert session_queue_fifo.get_queue_item(item_id).status == "canceled"
@@ -0,0 +1,110 @@
+"""Tests for the in-memory index of pending queue items used by dequeue()."""
+
+from typing import Optional
+
+from invokeai.app.services.session_queue.session_queue_pending_index import PendingItemIndex
+
+
+def _pop_all(index: PendingItemIndex, round_robin: bool) -> list[int]:
+    item_ids: list[int] = []
+    # Every pop is served at the same time, like several dequeues within one millisecond
+    while (item_id := index.pop(round_robin=round_robin, served_at="2026-01-01 00:00:00.000")) is not None:
+        item_ids.append(item_id)
+    return item_ids
+
+
+def _make_index(
+    items: list[tuple[int, str, int]], last_served: Optional[list[tuple[str, str]]] = None
+) -> PendingItemIndex:
+    index = PendingItemIndex()
+    index.load(items, last_served or [])
+    return index
+
+
+def test_fifo_orders_by_priority_then_item_id() -> None:
+    index = _make_index([(1, "a", 0), (2, "b", 0), (3, "a", 10), (4, "b", 10)])
+    assert _pop_all(index, round_robin=False) == [3, 4, 1, 2]
+
+
+def test_round_robin_interleaves_users() -> None:
+    index = _make_index([(1, "a", 0), (2, "a", 0), (3, "b", 0), (4, "c", 0), (5, "c", 0), (6, "a", 0)])
+    assert _pop_all(index, round_robin=True) == [1, 3, 4, 2, 5, 6]
+
+
+def test_round_robin_serves_least_recently_served_user_first() -> None:
+    index = _make_index(
+        [(1, "a", 0), (2, "b", 0), (3, "c", 0)],
+        last_served=[("a", "2026-01-01 00:00:02.000"), ("b", "2026-01-01 00:00:01.000")],
+    )
+    assert index.pop(round_robin=True, served_at="2026-01-01 00:00:03.000") == 3
+    assert index.pop(round_robin=True, served_at="2026-01-01 00:00:04.000") == 2
+    assert index.pop(round_robin=True, served_at="2026-01-01 00:00:05.000") == 1
+
+
+def test_round_robin_respects_priority_within_user() -> None:
+    index = _make_index([(1, "a", 0), (2, "a", 10), (3, "b", 0)])
+    assert _pop_all(index, round_robin=True) == [2, 3, 1]
+
+
+def test_removed_items_are_not_popped() -> None:
+    index = _make_index([(1, "a", 10), (2, "a", 0), (3, "b", 0)])
+    index.remove(1)
+    index.remove(3)
+    assert len(index) == 1
+    assert _pop_all(index, round_robin=True) == [2]
+
+
+def test_removing_best_item_updates_users_place_in_line() -> None:
+    # User a's best item is 3 (highest priority). Once it is removed, a's next best item (1) is older than b's item.
+    index = _make_index([(1, "a", 0), (2, "b", 0), (3, "a", 10)])
+    index.remove(3)
+    assert _pop_all(index, round_robin=True) == [1, 2]
+
+
+def test_add_is_idempotent() -> None:
+    index = _make_index([(1, "a", 0)])
+    index.add(1, "a", 0)
+    index.add(2, "b", 0)
+    index.add(2, "b", 0)
+    assert len(index) == 2
+    assert _pop_all(index, round_robin=False) == [1, 2]
+
+
+def test_removed_item_can_be_added_again() -> None:
+    index = _make_index([(1, "a", 0), (2, "a", 0)])
+    assert index.pop(round_robin=False, served_at="2026-01-01 00:00:00.000") == 1
+    index.add(1, "a", 0)
+    assert _pop_all(index, round_robin=True) == [1, 2]
+
+
+def test_invalidate_keeps_last_served_times() -> None:
+    index = _make_index([(1, "a", 0), (2, "b", 0)])
+    assert index.pop(round_robin=True, served_at="2026-01-01 00:00:01.000") == 1
+
+    index.invalidate()
+    assert len(index) == 0
+    assert index.pop(round_robin=True, served_at="2026-01-01 00:00:02.000") is None
+
+    # The table does not know yet that user a was served, e.g. because its item is still being claimed
+    index.load([(2, "b", 0), (3, "a", 0)], last_served=[])
+    assert _pop_all(index, round_robin=True) == [2, 3]
+
+
+def test_load_keeps_later_last_served_times() -> None:
+    index = _make_index([(1, "a", 0)])
+    assert index.pop(round_robin=True, served_at="2026-01-01 00:00:02.000") == 1
+
+    index.load([(2, "a", 0), (3, "b", 0)], last_served=[("a", "2026-01-01 00:00:01.000")])
+    assert _pop_all(index, round_robin=True) == [3, 2]
+
+
+def test_index_is_only_loaded_by_load() -> None:
+    index = PendingItemIndex()
+    index.add(1, "a", 0)
+    assert not index.is_loaded
+
+    index.load([(2, "b", 0)], [])
+    assert index.is_loaded
+
+    index.invalidate()
+    assert not index.is_loaded
@@ -0,0 +1,84 @@
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> SqliteDatabase:
+    db = SqliteDatabase(db_path=tmp_path / "test.db", logger=logging.getLogger(__name__))
+    with db.transaction() as cursor:
+        cursor.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT);")
+        cursor.execute("INSERT INTO items (name) VALUES ('a');")
+    return db
+
+
+def _get_names(cursor: sqlite3.Cursor) -> list[str]:
+    cursor.execute("SELECT name FROM items ORDER BY id;")
+    return [row["name"] for row in cursor.fetchall()]
+
+
+def test_read_only_transaction_sees_committed_writes(db: SqliteDatabase) -> None:
+    with db.transaction(read_only=True) as cursor:
+        assert _get_names(cursor) == ["a"]
+
+    with db.transaction() as cursor:
+        cursor.execute("INSERT INTO items (name) VALUES ('b');")
+
+    with db.transaction(read_only=True) as cursor:
+        assert _get_names(cursor) == ["a", "b"]
+
+
+def test_read_only_transaction_cannot_write(db: SqliteDatabase) -> None:
+    with pytest.raises(sqlite3.OperationalError):
+        with db.transaction(read_only=True) as cursor:
+            cursor.execute("INSERT INTO items (name) VALUES ('b');")
+
+    with db.transaction(read_only=True) as cursor:
+        assert _get_names(cursor) == ["a"]
+
+
+def test_read_only_transaction_inside_write_sees_uncommitted_writes(db: SqliteDatabase) -> None:
+    with db.transaction() as cursor:
+        cursor.execute("INSERT INTO items (name) VALUES ('b');")
+        with db.transaction(read_only=True) as read_cursor:
+            assert _get_names(read_cursor) == ["a", "b"]
+
+
+def test_read_only_transaction_does_not_wait_for_writer(db: SqliteDatabase) -> None:
+    writer_started = threading.Event()
+    reader_done = threading.Event()
+
+    def write() -> None:
+        with db.transaction() as cursor:
+            cursor.execute("INSERT INTO items (name) VALUES ('b');")
+            writer_started.set()
+            # Hold the write transaction open until the reader has finished
+            assert reader_done.wait(timeout=5)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    assert writer_started.wait(timeout=5)
+
+    # The writer holds the lock and has not committed, so the reader sees the last committed state
+    with db.transaction(read_only=True) as cursor:
+        assert _get_names(cursor) == ["a"]
+    reader_done.set()
+    writer.join()
+
+    with db.transaction(read_only=True) as cursor:
+        assert _get_names(cursor) == ["a", "b"]
+
+
+def test_read_only_transaction_with_in_memory_database() -> None:
+    db = SqliteDatabase(db_path=None, logger=logging.getLogger(__name__))
+    with db.transaction() as cursor:
+        cursor.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT);")
+        cursor.execute("INSERT INTO items (name) VALUES ('a');")
+
+    with db.transaction(read_only=True) as cursor:
+        assert _get_names(cursor) == ["a"]
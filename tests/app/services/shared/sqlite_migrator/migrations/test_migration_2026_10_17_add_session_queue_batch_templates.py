@@ -0,0 +1,47 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.migrations.migration_2026_10_17_add_session_queue_batch_templates import (
+    AddSessionQueueBatchTemplatesCallback,
+    build_migration,
+)
+
+
+def _get_columns(cursor: sqlite3.Cursor, table_name: str) -> set[str]:
+    cursor.execute(f"PRAGMA table_info({table_name});")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def test_creates_batch_templates_table() -> None:
+    db = sqlite3.connect(":memory:")
+    cursor = db.cursor()
+
+    AddSessionQueueBatchTemplatesCallback()(cursor)
+
+    assert _get_columns(cursor, "session_queue_batch_templates") == {"batch_id", "session", "workflow", "created_at"}
+
+    db.close()
+
+
+def test_migration_is_idempotent() -> None:
+    db = sqlite3.connect(":memory:")
+    cursor = db.cursor()
+
+    AddSessionQueueBatchTemplatesCallback()(cursor)
+    cursor.execute(
+        "INSERT INTO session_queue_batch_templates (batch_id, session, workflow) VALUES ('batch', '{}', NULL);"
+    )
+    AddSessionQueueBatchTemplatesCallback()(cursor)
+
+    cursor.execute("SELECT batch_id FROM session_queue_batch_templates;")
+    assert cursor.fetchall() == [("batch",)]
+
+    db.close()
+
+
+def test_build_migration_declares_stable_id_and_dependency() -> None:
+    migration = build_migration()
+
+    assert migration.id == "2026_10_17_add_session_queue_batch_templates"
+    assert migration.depends_on == "2026_10_17_add_session_queue_worker_id"
+    assert migration.from_version is None
+    assert migration.to_version is None
@@ -0,0 +1,91 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.migrations.migration_2026_10_17_add_session_queue_checkpoints import (
+    AddSessionQueueCheckpointsCallback,
+    build_migration,
+)
+
+
+def _get_columns(cursor: sqlite3.Cursor, table_name: str) -> set[str]:
+    cursor.execute(f"PRAGMA table_info({table_name});")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _create_session_queue(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("CREATE TABLE session_queue (item_id INTEGER PRIMARY KEY AUTOINCREMENT);")
+
+
+def _insert_checkpoint(cursor: sqlite3.Cursor, item_id: int) -> None:
+    cursor.execute(
+        """
+        INSERT INTO session_queue_checkpoints (item_id, node_id, source_node_id, iteration_path, output)
+        VALUES (?, 'node', 'source', '[]', '{}');
+        """,
+        (item_id,),
+    )
+
+
+def test_creates_checkpoints_table() -> None:
+    db = sqlite3.connect(":memory:")
+    cursor = db.cursor()
+    _create_session_queue(cursor)
+
+    AddSessionQueueCheckpointsCallback()(cursor)
+
+    assert _get_columns(cursor, "session_queue_checkpoints") == {
+        "checkpoint_id",
+        "item_id",
+        "node_id",
+        "source_node_id",
+        "iteration_path",
+        "output",
+        "created_at",
+    }
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'session_queue_checkpoints';")
+    assert ("idx_session_queue_checkpoints_item_id",) in cursor.fetchall()
+
+    db.close()
+
+
+def test_checkpoints_are_deleted_with_their_queue_item() -> None:
+    db = sqlite3.connect(":memory:")
+    db.execute("PRAGMA foreign_keys = ON;")
+    cursor = db.cursor()
+    _create_session_queue(cursor)
+    AddSessionQueueCheckpointsCallback()(cursor)
+    cursor.execute("INSERT INTO session_queue DEFAULT VALUES;")
+    cursor.execute("INSERT INTO session_queue DEFAULT VALUES;")
+    _insert_checkpoint(cursor, 1)
+    _insert_checkpoint(cursor, 2)
+
+    cursor.execute("DELETE FROM session_queue WHERE item_id = 1;")
+
+    cursor.execute("SELECT item_id FROM session_queue_checkpoints;")
+    assert cursor.fetchall() == [(2,)]
+
+    db.close()
+
+
+def test_migration_is_idempotent() -> None:
+    db = sqlite3.connect(":memory:")
+    cursor = db.cursor()
+    _create_session_queue(cursor)
+
+    AddSessionQueueCheckpointsCallback()(cursor)
+    cursor.execute("INSERT INTO session_queue DEFAULT VALUES;")
+    _insert_checkpoint(cursor, 1)
+    AddSessionQueueCheckpointsCallback()(cursor)
+
+    cursor.execute("SELECT item_id FROM session_queue_checkpoints;")
+    assert cursor.fetchall() == [(1,)]
+
+    db.close()
+
+
+def test_build_migration_declares_stable_id_and_dependency() -> None:
+    migration = build_migration()
+
+    assert migration.id == "2026_10_17_add_session_queue_checkpoints"
+    assert migration.depends_on == "2026_10_17_add_session_queue_batch_templates"
+    assert migration.from_version is None
+    assert migration.to_version is None
@@ -0,0 +1,46 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.migrations.migration_2026_10_17_add_session_queue_worker_id import (
+    AddSessionQueueWorkerIdCallback,
+    build_migration,
+)
+
+
+def _get_columns(cursor: sqlite3.Cursor, table_name: str) -> set[str]:
+    cursor.execute(f"PRAGMA table_info({table_name});")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def test_adds_worker_id_column_to_session_queue() -> None:
+    db = sqlite3.connect(":memory:")
+    cursor = db.cursor()
+    cursor.execute("CREATE TABLE session_queue (item_id INTEGER PRIMARY KEY);")
+
+    AddSessionQueueWorkerIdCallback()(cursor)
+
+    assert "worker_id" in _get_columns(cursor, "session_queue")
+
+    db.close()
+
+
+def test_migration_is_idempotent_and_tolerates_missing_session_queue() -> None:
+    db = sqlite3.connect(":memory:")
+    cursor = db.cursor()
+
+    AddSessionQueueWorkerIdCallback()(cursor)
+    cursor.execute("CREATE TABLE session_queue (item_id INTEGER PRIMARY KEY);")
+    AddSessionQueueWorkerIdCallback()(cursor)
+    AddSessionQueueWorkerIdCallback()(cursor)
+
+    assert "worker_id" in _get_columns(cursor, "session_queue")
+
+    db.close()
+
+
+def test_build_migration_declares_stable_id_and_dependency() -> None:
+    migration = build_migration()
+
+    assert migration.id == "2026_10_17_add_session_queue_worker_id"
+    assert migration.depends_on == "2026_07_03_round_robin_indexes"
+    assert migration.from_version is None
+    assert migration.to_version is None
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from typing import Callable
+
+import pytest
+
+from invokeai.app.services.events import events_fastapievents
+from invokeai.app.services.events.events_common import DownloadProgressEvent, DownloadStartedEvent, EventBase
+from invokeai.app.services.events.events_fastapievents import FastAPIEventService
+
+
+@pytest.fixture
+def dispatched(monkeypatch: pytest.MonkeyPatch) -> list[EventBase]:
+    dispatched: list[EventBase] = []
+    monkeypatch.setattr(events_fastapievents, "dispatch", lambda event, **kwargs: dispatched.append(event))
+    return dispatched
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def _run_until(loop: asyncio.AbstractEventLoop, condition: Callable[[], bool]) -> None:
+    async def wait() -> None:
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    loop.run_until_complete(asyncio.wait_for(wait(), timeout=5))
+
+
+def _started(source: str) -> DownloadStartedEvent:
+    return DownloadStartedEvent(source=source, download_path=f"/downloads/{source}")
+
+
+def _progress(source: str, current_bytes: int) -> DownloadProgressEvent:
+    return DownloadProgressEvent(
+        source=source, download_path=f"/downloads/{source}", current_bytes=current_bytes, total_bytes=100
+    )
+
+
+def test_queued_progress_event_is_replaced_by_later_progress(loop, dispatched):
+    service = FastAPIEventService(0, loop)
+
+    service.dispatch(_started("a"))
+    for current_bytes in (10, 20, 30):
+        service.dispatch(_progress("a", current_bytes))
+    service.dispatch(_progress("b", 50))
+
+    status = service.get_status()
+    assert status.queue_depth == 3
+    assert status.merged == 2
+
+    _run_until(loop, lambda: len(dispatched) == 3)
+    assert isinstance(dispatched[0], DownloadStartedEvent)
+    assert [(e.source, e.current_bytes) for e in dispatched[1:] if isinstance(e, DownloadProgressEvent)] == [
+        ("a", 30),
+        ("b", 50),
+    ]
+    service.stop()
+
+
+def test_progress_events_are_dropped_when_the_queue_is_full(loop, dispatched):
+    service = FastAPIEventService(0, loop, max_queue_size=2)
+
+    service.dispatch(_started("a"))
+    service.dispatch(_started("b"))
+    service.dispatch(_progress("a", 10))
+
+    status = service.get_status()
+    assert status.queue_depth == 2
+    assert status.dropped == 1
+    service.stop()
+
+
+def test_full_queue_makes_emitting_thread_wait_for_room(loop, dispatched):
+    service = FastAPIEventService(0, loop, max_queue_size=1)
+    service.dispatch(_started("a"))
+
+    emitter = threading.Thread(target=service.dispatch, args=(_started("b"),))
+    emitter.start()
+    deadline = time.monotonic() + 5
+    while service.get_status().blocked == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service.get_status().blocked == 1
+    assert service.get_status().queue_depth == 1
+
+    _run_until(loop, lambda: len(dispatched) == 2)
+    emitter.join(timeout=5)
+
+    assert [e.source for e in dispatched if isinstance(e, DownloadStartedEvent)] == ["a", "b"]
+    status = service.get_status()
+    assert status.dispatched == 2
+    assert status.peak_queue_depth == 1
+    assert status.max_latency >= status.average_latency > 0
+    service.stop()
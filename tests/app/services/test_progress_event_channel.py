@@ -0,0 +1,64 @@
+from PIL import Image
+
+from invokeai.app.services.events.events_progress import ProgressEventChannel
+from invokeai.app.services.session_processor.session_processor_common import ProgressImage
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_progress_events_within_the_interval_are_dropped():
+    clock = _FakeClock()
+    channel = ProgressEventChannel(max_per_second=10, clock=clock)
+
+    assert channel.accept("Denoising")
+    clock.now = 0.05
+    assert not channel.accept("Denoising")
+    clock.now = 0.1
+    assert channel.accept("Denoising")
+    assert channel.dropped == 1
+
+
+def test_progress_events_with_a_new_message_are_never_dropped():
+    clock = _FakeClock()
+    channel = ProgressEventChannel(max_per_second=10, clock=clock)
+
+    assert channel.accept("Denoising")
+    assert channel.accept("Running VAE decoder")
+    assert not channel.accept("Running VAE decoder")
+    assert channel.dropped == 1
+
+
+def test_final_progress_events_are_never_dropped():
+    clock = _FakeClock()
+    channel = ProgressEventChannel(max_per_second=10, clock=clock)
+
+    assert channel.accept("Denoising", 0.5)
+    assert not channel.accept("Denoising", 0.9)
+    assert channel.accept("Denoising", 1.0)
+    assert channel.dropped == 1
+
+
+def test_progress_events_are_not_limited_at_zero_per_second():
+    channel = ProgressEventChannel(max_per_second=0, clock=_FakeClock())
+
+    assert all(channel.accept("Denoising") for _ in range(100))
+    assert channel.dropped == 0
+
+
+def test_progress_image_is_built_as_binary_data():
+    image = Image.new("RGB", (64, 32))
+
+    data_url_image = ProgressImage.build(image)
+    binary_image = ProgressImage.build(image, size=(128, 64), as_binary=True)
+
+    assert data_url_image.dataURL.startswith("data:image/")
+    assert data_url_image.binary_data is None
+    assert binary_image.dataURL == ""
+    assert binary_image.binary_data is not None and binary_image.binary_data.startswith(b"\xff\xd8")
+    assert (binary_image.width, binary_image.height) == (128, 64)
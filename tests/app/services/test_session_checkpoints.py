@@ -0,0 +1,138 @@
+from typing import Optional
+from unittest.mock import MagicMock
+
+from invokeai.app.invocations.collections import RangeInvocation
+from invokeai.app.invocations.fields import ImageField, LatentsField
+from invokeai.app.invocations.math import AddInvocation
+from invokeai.app.invocations.primitives import ImageOutput, LatentsOutput
+from invokeai.app.services.session_processor.session_checkpoints import SessionCheckpoints
+from invokeai.app.services.session_queue.session_queue_common import SessionQueueItemCheckpoint
+from invokeai.app.services.shared.graph import CollectInvocation, Graph, GraphExecutionState, IterateInvocation
+from invokeai.app.services.shared.invocation_context import InvocationContext
+from tests.test_nodes import PromptTestInvocation, create_edge
+
+
+def _run_session(
+    session: GraphExecutionState, checkpoints: Optional[SessionCheckpoints] = None
+) -> tuple[list[tuple[str, tuple[int, ...]]], list[SessionQueueItemCheckpoint]]:
+    """Runs a session the way the session runner does, returning the nodes that were invoked and their checkpoints."""
+    mock_context = MagicMock(spec=InvocationContext)
+    invoked: list[tuple[str, tuple[int, ...]]] = []
+    recorded: list[SessionQueueItemCheckpoint] = []
+    invocation = session.next()
+    while invocation is not None:
+        source_node_id = session.prepared_source_mapping[invocation.id]
+        iteration_path = session.get_iteration_path(invocation.id)
+        output = checkpoints.get_output(session, invocation) if checkpoints else None
+        if output is None:
+            output = invocation.invoke(mock_context)
+            invoked.append((source_node_id, iteration_path))
+        session.complete(invocation.id, output)
+        recorded.append(
+            SessionQueueItemCheckpoint(
+                node_id=invocation.id,
+                source_node_id=source_node_id,
+                iteration_path=iteration_path,
+                output=output.model_dump_json(warnings=False),
+                created_at="2026-10-17 00:00:00.000",
+            )
+        )
+        invocation = session.next()
+    return invoked, recorded
+
+
+def _build_iterated_graph() -> Graph:
+    graph = Graph()
+    graph.add_node(RangeInvocation(id="range", start=0, stop=3, step=1))
+    graph.add_node(IterateInvocation(id="iterate"))
+    graph.add_node(AddInvocation(id="add", b=1))
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_edge(create_edge("range", "collection", "iterate", "collection"))
+    graph.add_edge(create_edge("iterate", "item", "add", "a"))
+    graph.add_edge(create_edge("add", "value", "collect", "item"))
+    return graph
+
+
+def test_resumed_session_only_runs_nodes_without_checkpoints() -> None:
+    graph = _build_iterated_graph()
+    _, recorded = _run_session(GraphExecutionState(graph=graph))
+    # The queue item was interrupted before the second iteration of "add" and the collector completed
+    interrupted = [c for c in recorded if (c.source_node_id, c.iteration_path) not in {("add", (1,)), ("collect", ())}]
+
+    session = GraphExecutionState(graph=graph)
+    checkpoints = SessionCheckpoints(session, interrupted)
+    invoked, _ = _run_session(session, checkpoints)
+
+    assert len(checkpoints) == len(interrupted)
+    assert invoked == [("add", (1,)), ("collect", ())]
+    collect_id = next(iter(session.source_prepared_mapping["collect"]))
+    assert sorted(session.results[collect_id].collection) == [1, 2, 3]
+
+
+def test_later_checkpoints_of_a_node_replace_earlier_ones() -> None:
+    graph = Graph()
+    graph.add_node(PromptTestInvocation(id="prompt", prompt="current"))
+    _, recorded = _run_session(GraphExecutionState(graph=graph))
+    stale = recorded[0].model_copy(update={"output": recorded[0].output.replace("current", "stale")})
+
+    session = GraphExecutionState(graph=graph)
+    invoked, _ = _run_session(session, SessionCheckpoints(session, [stale, recorded[0]]))
+
+    assert invoked == []
+    prompt_id = next(iter(session.source_prepared_mapping["prompt"]))
+    assert session.results[prompt_id].prompt == "current"
+
+
+def _latents_checkpoint(source_node_id: str) -> SessionQueueItemCheckpoint:
+    output = LatentsOutput(latents=LatentsField(latents_name="latents"), width=64, height=64)
+    return SessionQueueItemCheckpoint(
+        node_id="prepared",
+        source_node_id=source_node_id,
+        iteration_path=(),
+        output=output.model_dump_json(warnings=False),
+        created_at="2026-10-17 00:00:00.000",
+    )
+
+
+def test_tensor_outputs_are_only_reused_if_their_consumers_are_reused() -> None:
+    graph = Graph()
+    graph.add_node(PromptTestInvocation(id="producer"))
+    graph.add_node(PromptTestInvocation(id="consumer"))
+    graph.add_edge(create_edge("producer", "prompt", "consumer", "prompt"))
+    consumer_checkpoint = SessionQueueItemCheckpoint(
+        node_id="prepared",
+        source_node_id="consumer",
+        iteration_path=(),
+        output='{"type": "test_prompt_output", "prompt": ""}',
+        created_at="2026-10-17 00:00:00.000",
+    )
+
+    session = GraphExecutionState(graph=graph)
+    producer = session.next()
+    assert producer is not None
+    # The consumer must run again, and the tensor the producer output was lost in the restart
+    assert SessionCheckpoints(session, [_latents_checkpoint("producer")]).get_output(session, producer) is None
+    reused = SessionCheckpoints(session, [_latents_checkpoint("producer"), consumer_checkpoint])
+    assert isinstance(reused.get_output(session, producer), LatentsOutput)
+
+
+def test_image_outputs_are_not_reused_if_their_files_are_missing() -> None:
+    graph = Graph()
+    graph.add_node(PromptTestInvocation(id="producer"))
+    output = ImageOutput(image=ImageField(image_name="unwritten.png"), width=64, height=64)
+    checkpoint = SessionQueueItemCheckpoint(
+        node_id="prepared",
+        source_node_id="producer",
+        iteration_path=(),
+        output=output.model_dump_json(warnings=False),
+        created_at="2026-10-17 00:00:00.000",
+    )
+
+    session = GraphExecutionState(graph=graph)
+    producer = session.next()
+    assert producer is not None
+    # The image was still waiting to be written when the queue item was interrupted
+    missing = SessionCheckpoints(session, [checkpoint], image_exists=lambda image_name: False)
+    assert missing.get_output(session, producer) is None
+    written = SessionCheckpoints(session, [checkpoint], image_exists=lambda image_name: image_name == "unwritten.png")
+    assert isinstance(written.get_output(session, producer), ImageOutput)
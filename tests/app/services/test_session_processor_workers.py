@@ -0,0 +1,110 @@
+import logging
+import threading
+from types import SimpleNamespace
+from typing import Optional
+from unittest.mock import MagicMock
+
+import torch
+
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.session_processor.session_processor_default import (
+    DefaultSessionProcessor,
+    SessionProcessorWorker,
+)
+from invokeai.backend.util.devices import TorchDevice
+
+
+class _FakeSessionQueue:
+    def __init__(self, item_ids: list[int]) -> None:
+        self._item_ids = item_ids
+        self._lock = threading.Lock()
+        self.dequeued_by: dict[int, Optional[str]] = {}
+
+    def dequeue(self, worker_id: Optional[str] = None):
+        with self._lock:
+            if not self._item_ids:
+                return None
+            item_id = self._item_ids.pop(0)
+            self.dequeued_by[item_id] = worker_id
+        return SimpleNamespace(item_id=item_id, session_id=f"session-{item_id}", worker_id=worker_id)
+
+    def prefetch(self, count: int) -> list:
+        return []
+
+
+class _BarrierRunner:
+    """Runs each queue item by waiting at a barrier, so that the items only complete if they run concurrently."""
+
+    def __init__(self, barrier: threading.Barrier) -> None:
+        self._barrier = barrier
+        self.workflow_call_queue_lifecycle = self
+        self.services = None
+        self.ran: list[tuple[int, torch.device]] = []
+        self.done = threading.Event()
+
+    def start(self, services, cancel_event, profiler=None) -> None:
+        self.services = services
+
+    def run_queue_item(self, queue_item) -> None:
+        self.ran.append((queue_item.item_id, TorchDevice.choose_torch_device()))
+        self._barrier.wait(timeout=5)
+        self.done.set()
+
+
+def _start_processor(workers: list[SessionProcessorWorker], session_queue: _FakeSessionQueue):
+    services = SimpleNamespace(
+        configuration=InvokeAIAppConfig(queue_prefetch_depth=0),
+        session_queue=session_queue,
+        image_moves=None,
+        logger=logging.getLogger("test_session_processor_workers"),
+        model_manager="app-model-manager",
+    )
+    processor = DefaultSessionProcessor(workers=workers, polling_interval=1)
+    processor.start(SimpleNamespace(services=services))
+    return processor
+
+
+def test_workers_run_queue_items_concurrently() -> None:
+    barrier = threading.Barrier(2)
+    runners = [_BarrierRunner(barrier), _BarrierRunner(barrier)]
+    worker_model_manager = MagicMock()
+    workers = [
+        SessionProcessorWorker(session_runner=runners[0], worker_id="cpu/0", device=torch.device("cpu")),
+        SessionProcessorWorker(
+            session_runner=runners[1],
+            worker_id="cpu/1",
+            device=torch.device("cpu"),
+            model_manager=worker_model_manager,
+        ),
+    ]
+    session_queue = _FakeSessionQueue([1, 2])
+    processor = _start_processor(workers, session_queue)
+    try:
+        assert all(runner.done.wait(timeout=10) for runner in runners)
+    finally:
+        processor.stop()
+
+    # Each item was claimed by exactly one worker, and both workers ran an item at the same time
+    assert sorted(session_queue.dequeued_by) == [1, 2]
+    assert sorted(session_queue.dequeued_by.values()) == ["cpu/0", "cpu/1"]
+    assert [device for runner in runners for _, device in runner.ran] == [torch.device("cpu"), torch.device("cpu")]
+
+    # The first worker uses the app's model manager, the second its own
+    assert runners[0].services.model_manager == "app-model-manager"
+    assert runners[1].services.model_manager is worker_model_manager
+    worker_model_manager.load.start.assert_called_once()
+    worker_model_manager.load.ram_cache.shutdown.assert_called_once()
+
+
+def test_processor_status_reflects_all_workers() -> None:
+    processor = DefaultSessionProcessor(
+        workers=[
+            SessionProcessorWorker(session_runner=MagicMock(), worker_id="a"),
+            SessionProcessorWorker(session_runner=MagicMock(), worker_id="b"),
+        ]
+    )
+    processor._resume_event = threading.Event()
+
+    assert processor.get_status().is_processing is False
+    processor._workers[1].queue_item = SimpleNamespace(item_id=1)
+    assert processor.get_status().is_processing is True
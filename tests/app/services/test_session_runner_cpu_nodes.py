@@ -0,0 +1,153 @@
+import logging
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+
+from invokeai.app.invocations.baseinvocation import Bottleneck
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.session_processor.session_processor_default import DefaultSessionRunner
+from invokeai.app.services.shared.graph import Graph, GraphExecutionState
+from invokeai.backend.util.devices import TorchDevice
+from tests.test_nodes import (
+    AnyTypeTestInvocation,
+    AnyTypeTestInvocationOutput,
+    PromptTestInvocation,
+    PromptTestInvocationOutput,
+    create_edge,
+)
+
+
+class _Stats:
+    @contextmanager
+    def collect_stats(self, invocation, graph_execution_state_id):
+        yield
+
+    def log_stats(self, graph_execution_state_id):
+        pass
+
+    def reset_stats(self, graph_execution_state_id):
+        pass
+
+
+def _run_session(monkeypatch: pytest.MonkeyPatch, session: GraphExecutionState) -> SimpleNamespace:
+    monkeypatch.setattr(
+        "invokeai.app.services.session_processor.session_processor_default.build_invocation_context",
+        lambda data, services, is_canceled: None,
+    )
+    # In these tests, AnyTypeTestInvocation is the CPU-bound node and PromptTestInvocation the device-bound one
+    monkeypatch.setattr(AnyTypeTestInvocation, "bottleneck", Bottleneck.CPU)
+    session.set_ready_order([AnyTypeTestInvocation, PromptTestInvocation])
+
+    runner = DefaultSessionRunner()
+    runner.start(
+        services=SimpleNamespace(
+            configuration=InvokeAIAppConfig(cpu_node_threads=2, node_cache_size=0, resume_interrupted_sessions=False),
+            performance_statistics=_Stats(),
+            events=MagicMock(),
+            logger=logging.getLogger("test_session_runner_cpu_nodes"),
+            session_queue=MagicMock(),
+        ),
+        cancel_event=threading.Event(),
+    )
+    queue_item = SimpleNamespace(item_id=1, session_id=session.id, session=session, status="in_progress")
+    runner.run(queue_item)
+    return queue_item
+
+
+def test_cpu_bound_nodes_run_while_device_bound_nodes_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Both nodes wait for each other, so the session only completes if they run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    threads: dict[str, str] = {}
+
+    def invoke_cpu_node(self, context):
+        threads[self.id] = threading.current_thread().name
+        barrier.wait()
+        return AnyTypeTestInvocationOutput(value=self.value)
+
+    def invoke_device_node(self, context):
+        threads[self.id] = threading.current_thread().name
+        barrier.wait()
+        return PromptTestInvocationOutput(prompt=self.prompt)
+
+    monkeypatch.setattr(AnyTypeTestInvocation, "invoke", invoke_cpu_node)
+    monkeypatch.setattr(PromptTestInvocation, "invoke", invoke_device_node)
+    graph = Graph()
+    graph.add_node(AnyTypeTestInvocation(id="cpu", value="infill"))
+    graph.add_node(PromptTestInvocation(id="device", prompt="denoise"))
+    session = GraphExecutionState(graph=graph)
+
+    _run_session(monkeypatch, session)
+
+    assert session.is_complete() and not session.has_error()
+    cpu_id = next(iter(session.source_prepared_mapping["cpu"]))
+    device_id = next(iter(session.source_prepared_mapping["device"]))
+    assert threads[cpu_id].startswith("session-cpu-node")
+    assert threads[device_id] == threading.current_thread().name
+
+
+def test_cpu_bound_node_outputs_are_recorded_in_the_order_the_nodes_started(monkeypatch: pytest.MonkeyPatch) -> None:
+    # The first node finishes after the second, but its output is recorded first, so its consumer runs first
+    second_done = threading.Event()
+
+    def invoke_cpu_node(self, context):
+        if self.value == "first":
+            assert second_done.wait(timeout=5)
+        else:
+            second_done.set()
+        return AnyTypeTestInvocationOutput(value=self.value)
+
+    monkeypatch.setattr(AnyTypeTestInvocation, "invoke", invoke_cpu_node)
+    graph = Graph()
+    graph.add_node(AnyTypeTestInvocation(id="first", value="first"))
+    graph.add_node(AnyTypeTestInvocation(id="second", value="second"))
+    graph.add_node(PromptTestInvocation(id="after_first"))
+    graph.add_node(PromptTestInvocation(id="after_second"))
+    graph.add_edge(create_edge("first", "value", "after_first", "prompt"))
+    graph.add_edge(create_edge("second", "value", "after_second", "prompt"))
+    session = GraphExecutionState(graph=graph)
+
+    _run_session(monkeypatch, session)
+
+    assert session.is_complete() and not session.has_error()
+    assert session.executed_history == ["first", "after_first", "second", "after_second"]
+
+
+def test_cpu_bound_node_error_fails_the_session(monkeypatch: pytest.MonkeyPatch) -> None:
+    def invoke_cpu_node(self, context):
+        raise ValueError("infill failed")
+
+    monkeypatch.setattr(AnyTypeTestInvocation, "invoke", invoke_cpu_node)
+    graph = Graph()
+    graph.add_node(AnyTypeTestInvocation(id="cpu"))
+    graph.add_node(PromptTestInvocation(id="after"))
+    graph.add_edge(create_edge("cpu", "value", "after", "prompt"))
+    session = GraphExecutionState(graph=graph)
+
+    _run_session(monkeypatch, session)
+
+    assert session.has_error()
+    assert "after" not in session.executed
+
+
+def test_cpu_bound_nodes_run_on_the_worker_device(monkeypatch: pytest.MonkeyPatch) -> None:
+    devices: dict[str, object] = {}
+
+    def invoke_cpu_node(self, context):
+        devices[self.id] = TorchDevice.get_thread_device()
+        return AnyTypeTestInvocationOutput(value=self.value)
+
+    monkeypatch.setattr(AnyTypeTestInvocation, "invoke", invoke_cpu_node)
+    graph = Graph()
+    graph.add_node(AnyTypeTestInvocation(id="cpu"))
+    session = GraphExecutionState(graph=graph)
+
+    # Workers with their own device run their sessions in this context
+    with TorchDevice.use_device("cpu"):
+        _run_session(monkeypatch, session)
+
+    assert session.is_complete() and not session.has_error()
+    assert devices == {next(iter(session.source_prepared_mapping["cpu"])): torch.device("cpu")}
@@ -0,0 +1,79 @@
+import logging
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.image_files.image_files_common import ImageFileSaveException
+from invokeai.app.services.session_processor.session_processor_default import DefaultSessionRunner
+from invokeai.app.services.shared.graph import Graph, GraphExecutionState
+from tests.test_nodes import TextToImageTestInvocation
+
+
+class _Stats:
+    @contextmanager
+    def collect_stats(self, invocation, graph_execution_state_id):
+        yield
+
+    def log_stats(self, graph_execution_state_id):
+        pass
+
+    def reset_stats(self, graph_execution_state_id):
+        pass
+
+
+def _image_session() -> GraphExecutionState:
+    graph = Graph()
+    graph.add_node(TextToImageTestInvocation(id="image"))
+    return GraphExecutionState(graph=graph)
+
+
+def _run_session(monkeypatch: pytest.MonkeyPatch, images: MagicMock, session: GraphExecutionState) -> MagicMock:
+    monkeypatch.setattr(
+        "invokeai.app.services.session_processor.session_processor_default.build_invocation_context",
+        lambda data, services, is_canceled: None,
+    )
+    queue_item = SimpleNamespace(item_id=1, session_id=session.id, session=session, status="in_progress")
+    session_queue = MagicMock()
+    session_queue.set_queue_item_session.return_value = queue_item
+
+    runner = DefaultSessionRunner()
+    runner.start(
+        services=SimpleNamespace(
+            configuration=InvokeAIAppConfig(cpu_node_threads=0, node_cache_size=0, resume_interrupted_sessions=False),
+            performance_statistics=_Stats(),
+            events=MagicMock(),
+            images=images,
+            logger=logging.getLogger("test_session_runner_image_writes"),
+            session_queue=session_queue,
+        ),
+        cancel_event=threading.Event(),
+    )
+    runner.run(queue_item)
+    return session_queue
+
+
+def test_queue_item_completes_once_its_images_are_written(monkeypatch: pytest.MonkeyPatch) -> None:
+    images = MagicMock()
+    session = _image_session()
+
+    session_queue = _run_session(monkeypatch, images, session)
+
+    # The test node names its image after its own id
+    images.wait_for_write.assert_called_once_with(next(iter(session.source_prepared_mapping["image"])))
+    session_queue.complete_queue_item.assert_called_once_with(1)
+    session_queue.fail_queue_item.assert_not_called()
+
+
+def test_queue_item_fails_if_an_image_could_not_be_written(monkeypatch: pytest.MonkeyPatch) -> None:
+    images = MagicMock()
+    images.wait_for_write.side_effect = ImageFileSaveException("disk full")
+
+    session_queue = _run_session(monkeypatch, images, _image_session())
+
+    session_queue.complete_queue_item.assert_not_called()
+    session_queue.fail_queue_item.assert_called_once()
+    assert session_queue.fail_queue_item.call_args.args[:3] == (1, "ImageFileSaveException", "disk full")
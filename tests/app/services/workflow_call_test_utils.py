@@ -96,6 +96,9 @@ class _DummyConfig:
     node_cache_size = 0
     multiuser = False
     max_queue_size = 1000
+    resume_interrupted_sessions = False
+    cpu_node_threads = 0
+    progress_events_per_second = 0
 
 
 class _DummyWorkflowRecords:
@@ -801,6 +804,9 @@ class _DummyImages:
     def get_dto(self, image_name: str):
         return SimpleNamespace(image_name=image_name, width=64, height=64)
 
+    def wait_for_write(self, image_name: str) -> None:
+        pass
+
 
 def _build_runner(monkeypatch: pytest.MonkeyPatch) -> DefaultSessionRunner:
     monkeypatch.setattr(
@@ -1198,6 +1204,9 @@ def test_run_node_does_not_swallow_sigint_in_subprocess() -> None:
 
         class DummyConfig:
             node_cache_size = 0
+            resume_interrupted_sessions = False
+            cpu_node_threads = 0
+            progress_events_per_second = 0
 
         session_processor_default.build_invocation_context = lambda data, services, is_canceled: None
 
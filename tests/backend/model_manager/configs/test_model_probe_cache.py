@@ -0,0 +1,87 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+import torch
+from safetensors.torch import save_file
+
+from invokeai.backend.model_manager.configs.factory import ModelConfigFactory
+from invokeai.backend.model_manager.configs.probe_cache import ModelProbeCache
+from invokeai.backend.model_manager.configs.textual_inversion import TI_File_SD1_Config
+from invokeai.backend.model_manager.model_on_disk import ModelOnDisk
+
+
+@pytest.fixture
+def embedding_file(tmp_path: Path) -> Path:
+    path = tmp_path / "embedding.safetensors"
+    save_file({"emb_params": torch.randn(2, 768)}, path, metadata={"format": "pt"})
+    return path
+
+
+def test_model_on_disk_loads_safetensors_header_only(embedding_file: Path):
+    mod = ModelOnDisk(embedding_file)
+    state_dict = mod.load_state_dict()
+
+    assert list(state_dict.keys()) == ["emb_params"]
+    assert state_dict["emb_params"].device.type == "meta"
+    assert state_dict["emb_params"].shape == (2, 768)
+    assert state_dict["emb_params"].dtype == torch.float32
+    assert mod.metadata() == {"format": "pt"}
+
+
+def test_probe_cache_skips_unchanged_models(embedding_file: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    cache_path = tmp_path / "probe_cache.jsonl"
+    first = ModelConfigFactory.from_model_on_disk(embedding_file, probe_cache=ModelProbeCache(cache_path))
+    assert isinstance(first.config, TI_File_SD1_Config)
+
+    # A new cache instance reads the results from the file. The model is neither read nor hashed again.
+    def fail(*args, **kwargs):
+        raise AssertionError("the model should not be read")
+
+    with monkeypatch.context() as m:
+        m.setattr(ModelOnDisk, "load_state_dict", fail)
+        m.setattr(ModelOnDisk, "hash", fail)
+        second = ModelConfigFactory.from_model_on_disk(embedding_file, probe_cache=ModelProbeCache(cache_path))
+    assert isinstance(second.config, TI_File_SD1_Config)
+    assert second.config.hash == first.config.hash
+    assert second.config.key != first.config.key
+
+    # A modified model is identified again.
+    stat = embedding_file.stat()
+    os.utime(embedding_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert ModelProbeCache(cache_path).get(embedding_file) is None
+
+
+def test_probe_cache_dispatches_on_key_signature(embedding_file: Path, tmp_path: Path):
+    probe_cache = ModelProbeCache()
+    first = ModelConfigFactory.from_model_on_disk(embedding_file, probe_cache=probe_cache)
+    assert len(first.details) > 1
+
+    # A model with the same keys and shapes only tries the config class that matched the first model.
+    copy = tmp_path / "other_embedding.safetensors"
+    shutil.copy(embedding_file, copy)
+    second = ModelConfigFactory.from_model_on_disk(copy, probe_cache=probe_cache)
+    assert isinstance(second.config, TI_File_SD1_Config)
+    assert list(second.details.keys()) == [TI_File_SD1_Config.__name__]
+
+    # Overrides that can rule out config classes are part of the signature.
+    mod = ModelOnDisk(copy)
+    assert ModelConfigFactory.get_key_signature(mod) == ModelConfigFactory.get_key_signature(
+        ModelOnDisk(embedding_file)
+    )
+    assert ModelConfigFactory.get_key_signature(mod) != ModelConfigFactory.get_key_signature(mod, {"base": "sdxl"})
+
+
+def test_probe_cache_tries_all_classes_when_the_probe_uses_the_filename(
+    embedding_file: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(TI_File_SD1_Config, "PROBE_USES_FILENAME", True)
+    probe_cache = ModelProbeCache()
+    first = ModelConfigFactory.from_model_on_disk(embedding_file, probe_cache=probe_cache)
+
+    copy = tmp_path / "other_embedding.safetensors"
+    shutil.copy(embedding_file, copy)
+    second = ModelConfigFactory.from_model_on_disk(copy, probe_cache=probe_cache)
+    assert isinstance(second.config, TI_File_SD1_Config)
+    assert second.details.keys() == first.details.keys()
@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+import torch
+
+from invokeai.backend.model_manager.load.model_cache.cached_model.cached_model_with_partial_load import (
+    CachedModelWithPartialLoad,
+)
+from invokeai.backend.model_manager.load.model_cache.cached_model.pipelined_upload import (
+    ModuleUpload,
+    PipelinedWeightUpload,
+    wait_for_pending_upload,
+)
+from invokeai.backend.model_manager.load.model_cache.torch_module_autocast.torch_module_autocast import (
+    apply_custom_layers_to_model,
+)
+from invokeai.backend.patches.layer_patcher import LayerPatcher
+from invokeai.backend.patches.layers.lora_layer import LoRALayer
+from invokeai.backend.patches.model_patch_raw import ModelPatchRaw
+
+
+def _blocks(num_blocks: int = 6) -> torch.nn.Sequential:
+    return torch.nn.Sequential(*[torch.nn.Linear(16, 16) for _ in range(num_blocks)])
+
+
+def _module_uploads(model: torch.nn.Sequential) -> list[ModuleUpload]:
+    uploads: list[ModuleUpload] = []
+    for name, module in model.named_children():
+        tensors = {f"{name}.{k}": v.clone() for k, v in module.state_dict().items()}
+        # Start from zeroed weights, so that a module that runs before its weights arrive gives a different result.
+        for param in module.parameters():
+            param.data.zero_()
+        uploads.append(ModuleUpload(name=name, module=module, tensors=tensors))
+    return uploads
+
+
+def _slow_transfer(tensor: torch.Tensor) -> torch.Tensor:
+    time.sleep(0.02)
+    return tensor.clone()
+
+
+def test_pipelined_upload_overlaps_with_inference():
+    model = _blocks()
+    x = torch.randn(2, 16)
+    expected = model(x)
+    uploads = _module_uploads(model)
+
+    upload = PipelinedWeightUpload(model, uploads, torch.device("cpu"), transfer=_slow_transfer)
+    # Run the model right away. Each block waits for its own weights only.
+    with torch.no_grad():
+        output = model(x)
+    upload.wait()
+
+    assert torch.allclose(output, expected)
+    timings = upload.timings
+    names = [u.name for u in uploads]
+    assert list(timings.module_ready_at) == names
+    assert upload.execution_order == names
+    assert timings.finished_at is not None
+    assert timings.bytes_uploaded == sum(p.numel() * 4 for p in model.parameters())
+    # The first block ran while later blocks were still being uploaded.
+    assert timings.module_forward_at[names[0]] < timings.module_ready_at[names[-1]]
+    assert names[0] in timings.overlapped_modules()
+    # Blocks never run before their weights arrive.
+    for name in names:
+        assert timings.module_forward_at[name] >= timings.module_ready_at[name]
+
+
+def test_pipelined_upload_wait_removes_hooks_and_reraises_errors():
+    model = _blocks(2)
+    uploads = _module_uploads(model)
+
+    def failing_transfer(tensor: torch.Tensor) -> torch.Tensor:
+        raise RuntimeError("copy failed")
+
+    upload = PipelinedWeightUpload(model, uploads, torch.device("cpu"), transfer=failing_transfer)
+    with pytest.raises(RuntimeError, match="copy failed"):
+        wait_for_pending_upload(model)
+    assert upload.is_done()
+    assert all(len(m._forward_pre_hooks) == 0 for m in model)
+    # Waiting again is a no-op.
+    upload.wait()
+    wait_for_pending_upload(model)
+
+
+def test_layer_patcher_only_waits_for_patched_modules():
+    model = _blocks(3)
+    apply_custom_layers_to_model(model)
+    uploads = _module_uploads(model)
+    release = threading.Event()
+    num_transfers = 0
+
+    def gated_transfer(tensor: torch.Tensor) -> torch.Tensor:
+        # The weights of the first block arrive right away, the others wait for the release.
+        nonlocal num_transfers
+        num_transfers += 1
+        if num_transfers > 2:
+            release.wait(timeout=10)
+        return tensor.clone()
+
+    upload = PipelinedWeightUpload(model, uploads, torch.device("cpu"), transfer=gated_transfer)
+    try:
+        # Entering the patcher without patches does not wait for the upload.
+        with LayerPatcher.apply_smart_model_patches(model=model, patches=[], prefix="", dtype=torch.float32):
+            assert not upload.is_done()
+
+        # Patching the first block only waits for its weights.
+        lora = ModelPatchRaw(
+            {
+                "0": LoRALayer.from_state_dict_values(
+                    values={"lora_down.weight": torch.ones(2, 16), "lora_up.weight": torch.ones(16, 2)}
+                )
+            }
+        )
+        with LayerPatcher.apply_smart_model_patches(model=model, patches=[(lora, 0.5)], prefix="", dtype=torch.float32):
+            assert model[0].get_num_patches() == 1
+            assert not upload.is_done()
+    finally:
+        release.set()
+        upload.wait()
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA is not available.")
+def test_cached_model_pipelined_partial_load():
+    model = _blocks()
+    apply_custom_layers_to_model(model)
+    x = torch.randn(2, 16)
+    expected = model(x)
+
+    cached_model = CachedModelWithPartialLoad(
+        model=model, compute_device=torch.device("cuda"), keep_ram_copy=True, pipelined_upload=True
+    )
+    loaded_bytes = cached_model.partial_load_to_vram(cached_model.total_bytes())
+    assert loaded_bytes == cached_model.total_bytes()
+    with torch.no_grad():
+        output = model(x.to("cuda"))
+    cached_model.wait_for_upload()
+
+    assert torch.allclose(output.cpu(), expected, atol=1e-5)
+    assert all(p.device.type == "cuda" for p in model.parameters())
+    timings = cached_model.get_last_upload_timings()
+    assert timings is not None
+    assert timings.bytes_uploaded == cached_model.total_bytes()
+    assert cached_model.cur_vram_bytes() == cached_model.total_bytes()
+
+    cached_model.full_unload_from_vram()
+    assert all(p.device.type == "cpu" for p in model.parameters())
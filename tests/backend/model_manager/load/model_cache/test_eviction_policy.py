@@ -0,0 +1,52 @@
+from invokeai.backend.model_manager.load.model_cache.eviction_policy import (
+    GreedyDualEvictionPolicy,
+    LookaheadEvictionPolicy,
+    LRUEvictionPolicy,
+)
+from invokeai.backend.model_manager.load.model_cache.eviction_trace import TraceAccess, replay_trace
+
+GB = 2**30
+
+
+def test_greedy_dual_drops_models_that_are_cheap_to_reload_first():
+    policy = GreedyDualEvictionPolicy()
+    policy.on_insert("checkpoint", size_bytes=GB, reload_seconds=10.0)
+    policy.on_insert("diffusers", size_bytes=GB, reload_seconds=1.0)
+
+    assert policy.eviction_order(["checkpoint", "diffusers"]) == ["diffusers", "checkpoint"]
+
+    # Evictions raise the priority of the models that are added or used after them, so a model that is slow to reload
+    # is dropped eventually if it is not used again
+    policy.on_remove("diffusers", evicted=True)
+    policy.on_insert("other", size_bytes=GB, reload_seconds=1.0)
+    for _ in range(10):
+        policy.on_remove("other", evicted=True)
+        policy.on_insert("other", size_bytes=GB, reload_seconds=1.0)
+    assert policy.eviction_order(["checkpoint", "other"]) == ["checkpoint", "other"]
+
+
+def test_lookahead_keeps_models_that_are_about_to_be_used():
+    policy = LookaheadEvictionPolicy()
+    for key, size_bytes, reload_seconds in [("transformer", 12 * GB, 24.0), ("vae", GB, 1.0), ("detector", GB, 1.0)]:
+        policy.on_insert(key, size_bytes, reload_seconds)
+    keys = ["transformer", "vae", "detector"]
+
+    # Without future demand, the fallback order is used
+    assert policy.eviction_order(keys) == LRUEvictionPolicy().eviction_order(keys)
+
+    policy.set_upcoming(["vae", "transformer"])
+    assert policy.eviction_order(keys) == ["detector", "vae", "transformer"]
+
+
+def test_lookahead_replay_reloads_less_than_lru():
+    trace: list[TraceAccess] = []
+    for session in range(10):
+        trace.append(TraceAccess(key="text_encoder", size_bytes=5 * GB, load_seconds=10.0))
+        trace.append(TraceAccess(key="transformer", size_bytes=12 * GB, load_seconds=24.0))
+        trace.append(TraceAccess(key=f"postprocessor_{session % 5}", size_bytes=2 * GB, load_seconds=1.5))
+
+    lru = replay_trace(trace, LRUEvictionPolicy(), cache_size_bytes=18 * GB)
+    lookahead = replay_trace(trace, LookaheadEvictionPolicy(), cache_size_bytes=18 * GB, lookahead=6)
+
+    assert lru.hits + lru.misses == lookahead.hits + lookahead.misses == len(trace)
+    assert lookahead.load_seconds < lru.load_seconds
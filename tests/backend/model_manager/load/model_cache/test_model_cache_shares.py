@@ -0,0 +1,35 @@
+"""Tests for model caches that share the RAM and the execution device, e.g. one cache per session processor worker."""
+
+import logging
+from unittest.mock import MagicMock
+
+from invokeai.backend.model_manager.load.model_cache.model_cache import GB, ModelCache
+
+
+def _make_cache(ram_cache_count: int = 1, vram_cache_count: int = 1) -> ModelCache:
+    logger = MagicMock()
+    logger.getEffectiveLevel.return_value = logging.INFO
+    return ModelCache(
+        execution_device_working_mem_gb=1.0,
+        enable_partial_loading=False,
+        keep_ram_copy_of_weights=True,
+        max_ram_cache_size_gb=8.0,
+        max_vram_cache_size_gb=6.0,
+        execution_device="cuda",
+        storage_device="cpu",
+        logger=logger,
+        ram_cache_count=ram_cache_count,
+        vram_cache_count=vram_cache_count,
+    )
+
+
+def test_ram_is_split_between_caches():
+    assert _make_cache()._get_ram_available() == 8 * GB
+    assert _make_cache(ram_cache_count=4)._get_ram_available() == 2 * GB
+
+
+def test_vram_is_split_between_caches_on_the_same_device():
+    cache = _make_cache(ram_cache_count=3, vram_cache_count=2)
+
+    assert cache._get_ram_available() == int(8 * GB) // 3
+    assert cache._get_vram_available(None) == 3 * GB
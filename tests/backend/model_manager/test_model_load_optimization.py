@@ -71,3 +71,20 @@ def test_skip_torch_weight_init_restores_base_class_behavior():
     torch.nn.modules.conv._ConvNd.reset_parameters = saved_fn
 
     assert called_monkey_patched_fn
+
+
+def test_skip_torch_weight_init_overlapping_loads_restore_behavior_after_the_last_exits():
+    """Test that when models are loaded concurrently, the first load to finish does not restore the original behavior
+    while the other load still relies on `skip_torch_weight_init()`, and the last load to finish restores it.
+    """
+    saved_fn = torch.nn.Linear.reset_parameters
+    first_load = skip_torch_weight_init()
+    second_load = skip_torch_weight_init()
+
+    first_load.__enter__()
+    second_load.__enter__()
+    first_load.__exit__(None, None, None)
+    assert torch.nn.Linear.reset_parameters is _no_op
+
+    second_load.__exit__(None, None, None)
+    assert torch.nn.Linear.reset_parameters is saved_fn
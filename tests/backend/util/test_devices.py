@@ -2,6 +2,7 @@
 Test abstract device class.
 """
 
+import threading
 from unittest.mock import patch
 
 import pytest
@@ -169,3 +170,19 @@ def test_choose_anima_inference_dtype_auto_delegates_to_safe_dtype():
         result = TorchDevice.choose_anima_inference_dtype(device)
     assert result is sentinel
     mock_safe.assert_called_once_with(device)
+
+
+def test_use_device_overrides_device_for_current_thread():
+    config = get_config()
+    config.device = "cpu"
+    other_thread_devices: list[torch.device] = []
+
+    with TorchDevice.use_device("mps") as device:
+        assert device == torch.device("mps")
+        assert TorchDevice.choose_torch_device() == torch.device("mps")
+        thread = threading.Thread(target=lambda: other_thread_devices.append(TorchDevice.choose_torch_device()))
+        thread.start()
+        thread.join()
+
+    assert other_thread_devices == [torch.device("cpu")]
+    assert TorchDevice.choose_torch_device() == torch.device("cpu")
@@ -0,0 +1,118 @@
+import json
+import logging
+import struct
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+from safetensors.torch import save_file
+
+from invokeai.backend.model_manager.load.model_cache.cached_model.cached_model_only_full_load import (
+    CachedModelOnlyFullLoad,
+)
+from invokeai.backend.model_manager.load.model_cache.cached_model.cached_model_with_partial_load import (
+    CachedModelWithPartialLoad,
+)
+from invokeai.backend.model_manager.load.model_cache.model_cache import ModelCache
+from invokeai.backend.model_manager.load.model_cache.torch_module_autocast.torch_module_autocast import (
+    apply_custom_layers_to_model,
+)
+from invokeai.backend.util.safetensors_mmap import (
+    get_file_backed_bytes,
+    load_safetensors_meta,
+    load_safetensors_mmap,
+)
+
+
+def _save_weights(tmp_path: Path) -> Path:
+    path = tmp_path / "model.safetensors"
+    save_file({"weight": torch.ones(64, 32), "bias": torch.zeros(64)}, path)
+    return path
+
+
+def test_mmap_tensors_are_file_backed(tmp_path: Path):
+    tensors, _ = load_safetensors_mmap(_save_weights(tmp_path))
+    weight, bias = tensors["weight"], tensors["bias"]
+
+    assert get_file_backed_bytes([weight, bias]) == weight.nbytes + bias.nbytes
+    # Tensors that share memory are counted once
+    assert get_file_backed_bytes([weight, weight]) == weight.nbytes
+    # Converted tensors are copies in private memory
+    assert get_file_backed_bytes([weight.to(torch.float16), torch.ones(4)]) == 0
+
+
+@pytest.mark.parametrize("dtype", [torch.uint16, torch.uint32, torch.uint64])
+def test_mmap_loads_unsigned_integer_tensors(tmp_path: Path, dtype: torch.dtype):
+    path = tmp_path / "model.safetensors"
+    save_file({"weight": torch.arange(6, dtype=dtype).reshape(2, 3)}, path)
+
+    tensors, _ = load_safetensors_mmap(path)
+
+    assert tensors["weight"].dtype == dtype
+    assert tensors["weight"].reshape(-1).tolist() == list(range(6))
+
+
+@pytest.mark.parametrize("load", [load_safetensors_mmap, load_safetensors_meta])
+def test_unsupported_dtype_raises(tmp_path: Path, load):
+    path = tmp_path / "model.safetensors"
+    header = json.dumps({"weight": {"dtype": "C64", "shape": [1], "data_offsets": [0, 8]}}).encode()
+    path.write_bytes(struct.pack("<Q", len(header)) + header + bytes(8))
+
+    with pytest.raises(ValueError, match="unsupported dtype C64"):
+        load(path)
+
+
+def test_model_cache_does_not_count_mmap_weights(tmp_path: Path):
+    logger = MagicMock()
+    logger.getEffectiveLevel.return_value = logging.INFO
+    cache = ModelCache(
+        execution_device_working_mem_gb=1.0,
+        enable_partial_loading=False,
+        keep_ram_copy_of_weights=False,
+        execution_device="cpu",
+        storage_device="cpu",
+        logger=logger,
+    )
+    mmap_model = torch.nn.Linear(32, 64)
+    state_dict, _ = load_safetensors_mmap(_save_weights(tmp_path))
+    mmap_model.load_state_dict(state_dict, assign=True)
+    private_model = torch.nn.Linear(32, 64)
+
+    cache.put("mmap", mmap_model)
+    assert cache._get_ram_in_use() == 0
+    # The memory-mapped weights serve as the RAM copy, as they take no private memory
+    assert cache.get("mmap").cached_model.get_cpu_state_dict() is not None
+
+    cache.put("private", private_model)
+    assert cache._get_ram_in_use() == (32 * 64 + 64) * 4
+    cache.shutdown()
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA is not available.")
+@pytest.mark.parametrize("partial_load", [True, False])
+def test_cached_model_counts_unloaded_mmap_weights(tmp_path: Path, partial_load: bool):
+    model = torch.nn.Sequential(torch.nn.Linear(32, 64), torch.nn.Linear(64, 64))
+    # Only the first layer is memory-mapped
+    state_dict, _ = load_safetensors_mmap(_save_weights(tmp_path))
+    model[0].load_state_dict(state_dict, assign=True)
+    apply_custom_layers_to_model(model)
+    total_bytes = sum(p.nbytes for p in model.parameters())
+    mapped_bytes = (32 * 64 + 64) * 4
+
+    if partial_load:
+        cached_model = CachedModelWithPartialLoad(model, torch.device("cuda"))
+    else:
+        cached_model = CachedModelOnlyFullLoad(
+            model,
+            torch.device("cuda"),
+            total_bytes,
+            file_backed_bytes=get_file_backed_bytes(model.state_dict().values()),
+        )
+    assert cached_model.ram_bytes() == total_bytes - mapped_bytes
+
+    # Without a RAM copy, the mapped weights come back from VRAM as private tensors
+    cached_model.full_load_to_vram()
+    cached_model.full_unload_from_vram()
+    assert get_file_backed_bytes(model.state_dict().values()) == 0
+    assert cached_model.ram_bytes() == total_bytes
@@ -126,6 +126,51 @@ def test_graph_is_not_complete(simple_graph: Graph):
     assert not g.is_complete()
 
 
+def test_graph_pending_results(simple_graph: Graph):
+    g = GraphExecutionState(graph=simple_graph)
+    assert g.get_pending_results() == {}
+
+    n1, o1 = invoke_next(g)
+    assert n1 is not None
+    # The prompt is still consumed by node 2
+    assert g.get_pending_results() == {n1.id: o1}
+
+    _ = invoke_next(g)
+    assert g.get_pending_results() == {}
+
+
+def test_graph_pending_results_match_full_scan_with_iterators():
+    graph = Graph()
+    graph.add_node(PromptCollectionTestInvocation(id="1", collection=["Banana sushi", "Cat sushi", "Dog sushi"]))
+    graph.add_node(IterateInvocation(id="2"))
+    graph.add_node(PromptTestInvocation(id="3"))
+    graph.add_node(TextToImageTestInvocation(id="4"))
+    graph.add_node(CollectInvocation(id="5"))
+    graph.add_edge(create_edge("1", "collection", "2", "collection"))
+    graph.add_edge(create_edge("2", "item", "3", "prompt"))
+    graph.add_edge(create_edge("3", "prompt", "4", "prompt"))
+    graph.add_edge(create_edge("3", "prompt", "5", "item"))
+
+    def full_scan(g: GraphExecutionState) -> set[str]:
+        pending_exec_sources = {
+            e.source.node_id for e in g.execution_graph.edges if e.destination.node_id not in g.executed
+        }
+        pending_sources = {e.source.node_id for e in g.graph.edges if e.destination.node_id not in g.executed}
+        return {
+            node_id
+            for node_id in g.results
+            if node_id in pending_exec_sources or g.prepared_source_mapping.get(node_id) in pending_sources
+        }
+
+    g = GraphExecutionState(graph=graph)
+    # The pending results are tracked as nodes complete, and must match a scan of every edge
+    assert g.get_pending_results() == {}
+    while invoke_next(g)[0] is not None:
+        assert set(g.get_pending_results()) == full_scan(g)
+    assert g.is_complete()
+    assert g.get_pending_results() == {}
+
+
 def test_graph_waiting_on_workflow_call_blocks_other_ready_nodes():
     graph = Graph()
     graph.add_node(PromptTestInvocation(id="prompt_a", prompt="a"))
@@ -0,0 +1,147 @@
+# pyright: reportPrivateUsage=false
+import time
+from typing import Any, Callable
+
+import pytest
+from pydantic import BaseModel, ConfigDict
+
+from invokeai.app.invocations.collections import RangeInvocation
+from invokeai.app.invocations.fields import ImageField
+from invokeai.app.invocations.math import AddInvocation
+from invokeai.app.invocations.primitives import ImageCollectionOutput
+from invokeai.app.services.shared.graph import (
+    CollectInvocation,
+    Graph,
+    GraphExecutionState,
+    InvalidEdgeError,
+    IterateInvocation,
+    _GraphIndex,
+    copydeep,
+)
+from tests.test_nodes import create_edge, run_session_with_mock_context
+
+# The graph has about 5,000 source nodes, which are prepared as about 5,500 execution nodes
+CHAIN_LENGTH = 4_900
+ITERATED_CHAIN_LENGTH = 50
+ITERATIONS = 10
+
+# Generous, so that the test only fails if something in validation or preparation scales quadratically again
+TIME_BUDGET_SECONDS = 60
+
+
+def _build_large_graph(chain_length: int = CHAIN_LENGTH) -> Graph:
+    """Builds a long chain of nodes, followed by a shorter chain that runs for each item of a range."""
+    graph = Graph()
+    graph.add_node(AddInvocation(id="chain_0", a=0, b=1))
+    for i in range(1, chain_length):
+        graph.add_node(AddInvocation(id=f"chain_{i}", b=1))
+        graph.add_edge(create_edge(f"chain_{i - 1}", "value", f"chain_{i}", "a"))
+
+    graph.add_node(RangeInvocation(id="range", start=0, stop=ITERATIONS, step=1))
+    graph.add_node(IterateInvocation(id="iterate"))
+    graph.add_edge(create_edge("range", "collection", "iterate", "collection"))
+    graph.add_node(AddInvocation(id="iterated_0"))
+    graph.add_edge(create_edge("iterate", "item", "iterated_0", "a"))
+    graph.add_edge(create_edge(f"chain_{chain_length - 1}", "value", "iterated_0", "b"))
+    for i in range(1, ITERATED_CHAIN_LENGTH):
+        graph.add_node(AddInvocation(id=f"iterated_{i}", b=1))
+        graph.add_edge(create_edge(f"iterated_{i - 1}", "value", f"iterated_{i}", "a"))
+
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_edge(create_edge(f"iterated_{ITERATED_CHAIN_LENGTH - 1}", "value", "collect", "item"))
+    return graph
+
+
+def _validate_and_run(graph: Graph) -> GraphExecutionState:
+    graph.validate_self()
+    with pytest.raises(InvalidEdgeError):
+        graph.add_edge(create_edge(f"iterated_{ITERATED_CHAIN_LENGTH - 1}", "value", "chain_0", "a"))
+    session = GraphExecutionState(graph=graph)
+    run_session_with_mock_context(session)
+    assert session.is_complete() and not session.has_error()
+    return session
+
+
+def test_graph_index_is_not_rebuilt_per_node(monkeypatch: pytest.MonkeyPatch):
+    # The layout index is kept up to date as nodes and edges are added, so building, validating and running a graph
+    # builds the same number of indexes however many nodes it has
+    builds: list[int] = []
+    original_init = _GraphIndex.__init__
+
+    def counting_init(self: _GraphIndex, *args: Any, **kwargs: Any) -> None:
+        builds.append(1)
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(_GraphIndex, "__init__", counting_init)
+
+    build_counts: list[int] = []
+    for chain_length in (10, 40):
+        builds.clear()
+        _validate_and_run(_build_large_graph(chain_length))
+        build_counts.append(len(builds))
+
+    assert build_counts[0] == build_counts[1]
+
+
+@pytest.mark.slow
+@pytest.mark.timeout(timeout=TIME_BUDGET_SECONDS * 2)
+def test_large_graph_is_validated_and_prepared_within_time_budget():
+    start = time.perf_counter()
+
+    session = _validate_and_run(_build_large_graph())
+
+    elapsed = time.perf_counter() - start
+    collect_id = next(iter(session.source_prepared_mapping["collect"]))
+    chain_total = CHAIN_LENGTH + ITERATED_CHAIN_LENGTH - 1
+    assert sorted(session.results[collect_id].collection) == [chain_total + i for i in range(ITERATIONS)]
+    assert elapsed < TIME_BUDGET_SECONDS, f"Validating and running the graph took {elapsed:.1f}s"
+
+
+def _best_time(copy_value: Callable[[], Any], runs: int = 5, repeat: int = 20) -> float:
+    times: list[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            copy_value()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+class _FrozenField(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+
+
+def test_passing_an_image_collection_shares_immutable_values_only():
+    # Iterate/collect workflows pass collections of hundreds of image references from node to node
+    output = ImageCollectionOutput(collection=[ImageField(image_name=f"{i}.png") for i in range(500)])
+
+    copied = copydeep(output)
+
+    assert copied == output
+    assert copied.collection is not output.collection
+    for copied_image, image in zip(copied.collection, output.collection, strict=True):
+        # Image fields can be changed, so each is copied, but the immutable image name is shared
+        assert copied_image is not image
+        assert copied_image.image_name is image.image_name
+    # Frozen models whose values are all immutable cannot be changed, so they are shared
+    frozen = _FrozenField(name="foo")
+    assert copydeep(frozen) is frozen
+    assert copydeep([frozen])[0] is frozen
+
+    # Changing the copy does not change the original
+    copied.collection.append(ImageField(image_name="new.png"))
+    copied.collection[0].image_name = "changed.png"
+    assert len(output.collection) == 500
+    assert output.collection[0].image_name == "0.png"
+
+
+@pytest.mark.slow
+def test_passing_an_image_collection_is_faster_than_deep_copying_it():
+    output = ImageCollectionOutput(collection=[ImageField(image_name=f"{i}.png") for i in range(500)])
+
+    copy_time = _best_time(lambda: copydeep(output))
+    deep_copy_time = _best_time(lambda: output.model_copy(deep=True))
+
+    assert copy_time < deep_copy_time, f"copydeep took {copy_time:.4f}s, a deep copy took {deep_copy_time:.4f}s"
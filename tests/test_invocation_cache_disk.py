@@ -0,0 +1,229 @@
+# pyright: reportPrivateUsage=false
+import logging
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import torch
+
+from invokeai.app.invocations.fields import ImageField, LatentsField
+from invokeai.app.invocations.primitives import ConditioningOutput, ImageOutput, LatentsOutput
+from invokeai.app.services.invocation_cache.invocation_cache_disk import DiskInvocationCache
+from invokeai.app.services.object_serializer.object_serializer_disk import ObjectSerializerDisk
+from invokeai.app.services.object_serializer.object_serializer_forward_cache import ObjectSerializerForwardCache
+from tests.test_nodes import PromptTestInvocation
+
+logger = logging.getLogger(__name__)
+
+
+def _make_cache(tmp_path: Path, max_cache_size: int = 5, max_cache_bytes: int = 0) -> DiskInvocationCache:
+    cache = DiskInvocationCache(
+        tmp_path / "node_cache", logger=logger, max_cache_size=max_cache_size, max_cache_bytes=max_cache_bytes
+    )
+    cache._invoker = MagicMock()
+    return cache
+
+
+def _make_started_cache(tmp_path: Path, max_cache_size: int = 5) -> DiskInvocationCache:
+    """Makes a cache with real tensor and conditioning services. They are ephemeral, like in the app, so each call
+    simulates a fresh process."""
+    cache = DiskInvocationCache(tmp_path / "node_cache", logger=logger, max_cache_size=max_cache_size)
+    invoker = MagicMock()
+    invoker.services.tensors = ObjectSerializerForwardCache(
+        ObjectSerializerDisk[torch.Tensor](tmp_path / "tensors", safe_globals=[], ephemeral=True)
+    )
+    invoker.services.conditioning = ObjectSerializerForwardCache(
+        ObjectSerializerDisk[torch.Tensor](tmp_path / "conditioning", safe_globals=[], ephemeral=True)
+    )
+    cache.start(invoker)
+    return cache
+
+
+def _latents_output(latents_name: str) -> LatentsOutput:
+    return LatentsOutput(latents=LatentsField(latents_name=latents_name), width=64, height=64)
+
+
+def test_invocation_cache_disk_max_cache_size(tmp_path: Path):
+    cache = _make_cache(tmp_path, max_cache_size=0)
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    cache.save("1", output_1)
+    assert cache.get("1") is None
+    assert cache.get_status().size == 0
+
+
+def test_invocation_cache_disk_creates_stable_keys(tmp_path: Path):
+    cache = _make_cache(tmp_path)
+    hash1 = cache.create_key(PromptTestInvocation(prompt="foo"))
+    hash2 = cache.create_key(PromptTestInvocation(prompt="foo"))
+    hash3 = cache.create_key(PromptTestInvocation(prompt="bar"))
+
+    assert hash1 == hash2
+    assert hash1 != hash3
+    # The key must not depend on the process, so it can be used after a restart
+    assert hash1 == _make_cache(tmp_path).create_key(PromptTestInvocation(prompt="foo"))
+
+
+def test_invocation_cache_disk_adds_invocation(tmp_path: Path):
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ImageOutput(image=ImageField(image_name="bar"), width=512, height=512)
+    cache = _make_cache(tmp_path)
+    cache.save("1", output_1)
+    cache.save("2", output_2)
+    assert cache.get("1") == output_1
+    assert cache.get("2") == output_2
+
+
+def test_invocation_cache_disk_persists(tmp_path: Path):
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    cache = _make_cache(tmp_path)
+    cache.save("1", output_1)
+
+    restarted_cache = _make_cache(tmp_path)
+    assert restarted_cache.get("1") == output_1
+    assert restarted_cache.get_status().size == 1
+
+
+def test_invocation_cache_disk_is_lru(tmp_path: Path):
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ImageOutput(image=ImageField(image_name="bar"), width=512, height=512)
+    output_3 = ImageOutput(image=ImageField(image_name="baz"), width=512, height=512)
+    cache = _make_cache(tmp_path, max_cache_size=2)
+    cache.save("1", output_1)
+    cache.save("2", output_2)
+    cache.get("1")
+    cache.save("3", output_3)
+    assert cache.get("1") == output_1
+    assert cache.get("2") is None
+    assert cache.get("3") == output_3
+    assert cache.get_status().size == 2
+
+
+def test_invocation_cache_disk_respects_byte_budget(tmp_path: Path):
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ImageOutput(image=ImageField(image_name="bar"), width=512, height=512)
+    entry_size = len(output_1.model_dump_json(warnings=False))
+    cache = _make_cache(tmp_path, max_cache_bytes=entry_size + 1)
+    cache.save("1", output_1)
+    cache.save("2", output_2)
+    assert cache.get("1") is None
+    assert cache.get("2") == output_2
+
+
+def test_invocation_cache_disk_deletes_by_image_name(tmp_path: Path):
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ImageOutput(image=ImageField(image_name="bar"), width=512, height=512)
+    cache = _make_cache(tmp_path)
+    cache.save("1", output_1)
+    cache.save("2", output_2)
+    cache._delete_by_image_names(["bar"])
+    assert cache.get("1") == output_1
+    assert cache.get("2") is None
+    # shouldn't raise when nothing matches
+    cache._delete_by_image_names(["bar"])
+
+
+def test_invocation_cache_disk_clears(tmp_path: Path):
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    cache = _make_cache(tmp_path)
+    cache.save("1", output_1)
+    cache.get("1")
+    cache.get("2")  # miss
+    cache.clear()
+    status = cache.get_status()
+    assert status.size == 0
+    assert status.hits == 0
+    assert status.misses == 0
+    assert cache.get("1") is None
+
+
+def test_invocation_cache_disk_disables_and_enables(tmp_path: Path):
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    cache = _make_cache(tmp_path)
+    cache.disable()
+    cache.save("1", output_1)
+    assert cache.get("1") is None
+    assert not cache.get_status().enabled
+    cache.enable()
+    cache.save("1", output_1)
+    assert cache.get("1") == output_1
+    assert cache.get_status().enabled
+
+
+def test_invocation_cache_disk_stores_objects_as_blobs(tmp_path: Path):
+    cache = _make_started_cache(tmp_path)
+    tensors = cache._invoker.services.tensors
+    latents = torch.ones(1, 4, 8, 8)
+    cache.save("1", _latents_output(tensors.save(latents)))
+    # The same content under another name is stored once
+    cache.save("2", _latents_output(tensors.save(latents.clone())))
+
+    with cache._db.transaction() as cursor:
+        cursor.execute("SELECT digest, size FROM blobs;")
+        blobs = cursor.fetchall()
+    assert len(blobs) == 1
+    digest, blob_size = blobs[0]
+    assert torch.equal(torch.load(cache._get_blob_path(digest)), latents)
+    assert cache.get_status().bytes_used > blob_size
+
+    cache.delete("1")
+    assert cache._get_blob_path(digest).exists()
+    cache.delete("2")
+    assert not cache._get_blob_path(digest).exists()
+
+
+def test_invocation_cache_disk_restores_objects_after_restart(tmp_path: Path):
+    cache = _make_started_cache(tmp_path)
+    latents = torch.rand(1, 4, 8, 8)
+    conditioning = torch.rand(1, 77, 768)
+    latents_output = _latents_output(cache._invoker.services.tensors.save(latents))
+    conditioning_output = ConditioningOutput.build(cache._invoker.services.conditioning.save(conditioning))
+    cache.save("1", latents_output)
+    cache.save("2", conditioning_output)
+
+    restarted_cache = _make_started_cache(tmp_path)
+    restored_latents_output = restarted_cache.get("1")
+    restored_conditioning_output = restarted_cache.get("2")
+    assert isinstance(restored_latents_output, LatentsOutput)
+    assert isinstance(restored_conditioning_output, ConditioningOutput)
+    restored_latents_name = restored_latents_output.latents.latents_name
+    restored_conditioning_name = restored_conditioning_output.conditioning.conditioning_name
+    assert restored_latents_name != latents_output.latents.latents_name
+    assert restored_conditioning_name != conditioning_output.conditioning.conditioning_name
+    assert torch.equal(restarted_cache._invoker.services.tensors.load(restored_latents_name), latents)
+    assert torch.equal(restarted_cache._invoker.services.conditioning.load(restored_conditioning_name), conditioning)
+
+
+def test_invocation_cache_disk_rewrites_live_object_names(tmp_path: Path):
+    cache = _make_started_cache(tmp_path)
+    tensors = cache._invoker.services.tensors
+    latents = torch.rand(1, 4, 8, 8)
+    latents_name = tensors.save(latents)
+    cache.save("1", _latents_output(latents_name))
+    # While the object is alive, the output is returned as it was saved
+    assert cache.get("1") == _latents_output(latents_name)
+
+    # Deleting the object only forgets its name - the next hit re-saves it from the blob
+    tensors.delete(latents_name)
+    output = cache.get("1")
+    assert isinstance(output, LatentsOutput)
+    new_latents_name = output.latents.latents_name
+    assert new_latents_name != latents_name
+    assert torch.equal(tensors.load(new_latents_name), latents)
+    # The re-saved object is reused by later hits
+    assert cache.get("1") == _latents_output(new_latents_name)
+
+
+def test_invocation_cache_disk_invalidates_on_deleted_images(tmp_path: Path):
+    cache = _make_started_cache(tmp_path)
+    images = cache._invoker.services.images
+    images.on_deleted_many.assert_called_once_with(cache._delete_by_image_names)
+    images.on_deleted.assert_not_called()
+    cache.save("1", ImageOutput(image=ImageField(image_name="foo"), width=512, height=512))
+    cache.save("2", ImageOutput(image=ImageField(image_name="bar"), width=512, height=512))
+    cache.save("3", ImageOutput(image=ImageField(image_name="baz"), width=512, height=512))
+
+    # Deleting a batch of images invalidates every entry that references any of them
+    cache._delete_by_image_names(["foo", "bar"])
+    assert cache.get("1") is None
+    assert cache.get("2") is None
+    assert cache.get("3") is not None
+    assert cache.get_status().size == 1
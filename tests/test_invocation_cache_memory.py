@@ -1,10 +1,11 @@
 # pyright: reportPrivateUsage=false
 from contextlib import suppress
+from unittest.mock import MagicMock
 
 from invokeai.app.invocations.fields import ImageField
 from invokeai.app.invocations.primitives import ImageOutput
-from invokeai.app.services.invocation_cache.invocation_cache_memory import MemoryInvocationCache
-from tests.test_nodes import PromptTestInvocation
+from invokeai.app.services.invocation_cache.invocation_cache_memory import MemoryInvocationCache, get_retained_size
+from tests.test_nodes import ListPassThroughInvocationOutput, PromptTestInvocation
 
 
 def test_invocation_cache_memory_max_cache_size():
@@ -119,6 +120,33 @@ def test_invocation_cache_memory_deletes_by_match():
         cache._delete_by_match("foo")
 
 
+def test_invocation_cache_memory_deletes_by_matches():
+    cache = MemoryInvocationCache(max_cache_size=5)
+    cache._invoker = MagicMock()
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ListPassThroughInvocationOutput(collection=[ImageField(image_name="bar"), ImageField(image_name="baz")])
+    output_3 = ImageOutput(image=ImageField(image_name="qux"), width=512, height=512)
+    cache.save(1, output_1)
+    cache.save(2, output_2)
+    cache.save(3, output_3)
+    assert cache._keys_by_object_name["baz"] == {2}
+    cache._delete_by_matches(["foo", "baz"])
+    assert list(cache._cache.keys()) == [3]
+    # the reverse index must not retain names of deleted outputs
+    assert set(cache._keys_by_object_name.keys()) == {"qux"}
+
+
+def test_invocation_cache_memory_eviction_updates_index():
+    cache = MemoryInvocationCache(max_cache_size=1)
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ImageOutput(image=ImageField(image_name="bar"), width=512, height=512)
+    cache.save(1, output_1)
+    cache.save(2, output_2)
+    assert set(cache._keys_by_object_name.keys()) == {"bar"}
+    cache.clear()
+    assert len(cache._keys_by_object_name) == 0
+
+
 def test_invocation_cache_memory_clears():
     cache = MemoryInvocationCache(max_cache_size=5)
     output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
@@ -181,3 +209,65 @@ def test_invocation_cache_memory_status():
     assert status.hits == 0
     assert status.misses == 0
     assert status.max_size == 0
+
+
+def test_invocation_cache_memory_byte_budget_prefers_expensive_outputs():
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ImageOutput(image=ImageField(image_name="bar"), width=512, height=512)
+    output_3 = ImageOutput(image=ImageField(image_name="baz"), width=512, height=512)
+    entry_size = get_retained_size(output_1)
+    cache = MemoryInvocationCache(max_cache_size=5, max_cache_bytes=entry_size * 2)
+    cache.save(1, output_1, invocation_type="expensive", compute_time=10.0)
+    cache.save(2, output_2, invocation_type="cheap", compute_time=0.1)
+    assert cache.get_status().bytes_used == entry_size * 2
+    # Saving a third output must evict the cheapest output, even though it was used more recently
+    cache.save(3, output_3, invocation_type="cheap", compute_time=0.2)
+    assert cache.get(1) == output_1
+    assert cache.get(2) is None
+    assert cache.get(3) == output_3
+    assert cache.get_status().bytes_used == entry_size * 2
+
+
+def test_invocation_cache_memory_byte_budget_skips_oversized_outputs():
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    cache = MemoryInvocationCache(max_cache_size=5, max_cache_bytes=1)
+    cache.save(1, output_1)
+    assert cache.get(1) is None
+    assert cache.get_status().bytes_used == 0
+
+
+def test_invocation_cache_memory_byte_budget_heap_stays_bounded():
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ImageOutput(image=ImageField(image_name="bar"), width=512, height=512)
+    entry_size = get_retained_size(output_1)
+    cache = MemoryInvocationCache(max_cache_size=5, max_cache_bytes=entry_size * 4)
+    cache.save(1, output_1, compute_time=10.0)
+    cache.save(2, output_2, compute_time=0.1)
+    for _ in range(1000):
+        assert cache.get(1) == output_1
+        assert cache.get(2) == output_2
+    # Each hit refreshes the priority of its output, but stale heap entries are dropped while under budget
+    assert len(cache._priority_heap) <= 2 * len(cache._cache) + 1
+    # Eviction still uses the refreshed priorities
+    output_3 = ImageOutput(image=ImageField(image_name="baz"), width=512, height=512)
+    cache._max_cache_bytes = entry_size * 2
+    cache.save(3, output_3, compute_time=1.0)
+    assert cache.get(1) == output_1
+    assert cache.get(2) is None
+    assert cache.get(3) == output_3
+
+
+def test_invocation_cache_memory_status_by_invocation_type():
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    cache = MemoryInvocationCache(max_cache_size=5)
+    cache.get(1, invocation_type="test_prompt")  # miss
+    cache.save(1, output_1, invocation_type="test_prompt", compute_time=2.0)
+    cache.get(1, invocation_type="test_prompt")  # hit
+    cache.get(1, invocation_type="test_prompt")  # hit
+    status = cache.get_status()
+    assert status.time_saved == 4.0
+    type_status = status.invocation_types["test_prompt"]
+    assert type_status.hits == 2
+    assert type_status.misses == 1
+    assert type_status.hit_ratio == 2 / 3
+    assert type_status.time_saved == 4.0
@@ -9,11 +9,13 @@ from invokeai.app.invocations.baseinvocation import (
     invocation,
     invocation_output,
 )
+from invokeai.app.invocations.fields import ImageField
 from invokeai.app.invocations.math import AddInvocation
 from invokeai.app.invocations.primitives import (
     ColorInvocation,
     FloatCollectionInvocation,
     FloatInvocation,
+    ImageCollectionOutput,
     IntegerInvocation,
     StringInvocation,
 )
@@ -30,6 +32,7 @@ from invokeai.app.services.shared.graph import (
     NodeAlreadyInGraphError,
     NodeNotFoundError,
     are_connections_compatible,
+    copydeep,
 )
 from tests.test_nodes import (
     AnyTypeTestInvocation,
@@ -215,6 +218,26 @@ def test_graph_fails_to_add_edge_with_long_cycle():
         g.add_edge(e3)
 
 
+def test_graph_nodes_stay_connected_until_their_last_edge_is_deleted():
+    g = Graph()
+    g.add_node(AddInvocation(id="1"))
+    g.add_node(AddInvocation(id="2"))
+    e1 = create_edge("1", "value", "2", "a")
+    e2 = create_edge("1", "value", "2", "b")
+    g.add_edge(e1)
+    g.add_edge(e2)
+
+    g.delete_edge(e1)
+    assert ("1", "2") in g.nx_graph().edges
+    with pytest.raises(InvalidEdgeError):
+        g.add_edge(create_edge("2", "value", "1", "a"))
+
+    g.delete_edge(e2)
+    assert ("1", "2") not in g.nx_graph().edges
+    g.add_edge(create_edge("2", "value", "1", "a"))
+    assert g._get_input_edges("1") == [create_edge("2", "value", "1", "a")]
+
+
 def test_graph_fails_to_add_edge_with_missing_node_id():
     g = Graph()
     n1 = TextToImageTestInvocation(id="1", prompt="Banana sushi")
@@ -1077,3 +1100,24 @@ def test_iterator_collector_iterator_chain_with_empty_collection():
     # Verify only the source collection node executed
     assert n1.id in session.source_prepared_mapping
     assert len(session.source_prepared_mapping[n1.id]) == 1
+
+
+def test_copydeep_shares_immutable_values_and_copies_everything_else():
+    images = [ImageField(image_name=f"{i}.png") for i in range(3)]
+    output = ImageCollectionOutput(collection=images)
+
+    copied = copydeep(output)
+
+    assert copied == output
+    assert copied.model_fields_set == output.model_fields_set
+    assert copied.collection is not output.collection
+    assert all(c is not i and c.image_name is i.image_name for c, i in zip(copied.collection, images, strict=True))
+    copied.collection[0].image_name = "changed.png"
+    copied.collection.append(ImageField(image_name="added.png"))
+    assert output.collection == [ImageField(image_name=f"{i}.png") for i in range(3)]
+
+    nested = {"names": ["a", "b"], "pair": (1, [2])}
+    copied_nested = copydeep(nested)
+    assert copied_nested == nested
+    assert copied_nested["names"] is not nested["names"]
+    assert copied_nested["pair"][1] is not nested["pair"][1]
@@ -170,8 +170,69 @@ def test_obj_serializer_fwd_cache_respects_cache_size(fwd_cache: ObjectSerialize
     assert obj_1_name not in fwd_cache._cache
     assert obj_2_name in fwd_cache._cache
     assert obj_3_name in fwd_cache._cache
-    # apparently qsize is "not reliable"?
-    assert fwd_cache._cache_ids.qsize() == 2
+    assert len(fwd_cache._cache) == 2
+
+
+def test_obj_serializer_fwd_cache_is_lru(fwd_cache: ObjectSerializerForwardCache[MockDataclass]):
+    obj_1_name = fwd_cache.save(MockDataclass(foo="bar"))
+    obj_2_name = fwd_cache.save(MockDataclass(foo="baz"))
+    fwd_cache.load(obj_1_name)
+    obj_3_name = fwd_cache.save(MockDataclass(foo="qux"))
+    assert obj_1_name in fwd_cache._cache
+    assert obj_2_name not in fwd_cache._cache
+    assert obj_3_name in fwd_cache._cache
+
+
+def test_obj_serializer_fwd_cache_respects_byte_budget(tmp_path: Path):
+    fwd_cache = ObjectSerializerForwardCache(
+        ObjectSerializerDisk[torch.Tensor](tmp_path, safe_globals=[torch.Tensor]),
+        max_cache_size=None,
+        max_cache_bytes=1000,
+    )
+    small_names = [fwd_cache.save(torch.zeros(10, dtype=torch.uint8)) for _ in range(50)]
+    assert all(name in fwd_cache._cache for name in small_names)
+    assert fwd_cache._bytes_used == 500
+
+    large_name = fwd_cache.save(torch.zeros(150, dtype=torch.float32))
+    assert large_name in fwd_cache._cache
+    assert fwd_cache._bytes_used <= 1000
+    # The oldest objects were evicted to make room
+    assert small_names[0] not in fwd_cache._cache
+    assert small_names[-1] in fwd_cache._cache
+
+    # Objects larger than the budget are not cached, but can still be loaded
+    too_large_name = fwd_cache.save(torch.zeros(1000, dtype=torch.float32))
+    assert too_large_name not in fwd_cache._cache
+    assert torch.equal(fwd_cache.load(too_large_name), torch.zeros(1000, dtype=torch.float32))
+
+
+def test_obj_serializer_fwd_cache_keeps_pinned_objects(fwd_cache: ObjectSerializerForwardCache[MockDataclass]):
+    obj_1_name = fwd_cache.save(MockDataclass(foo="bar"))
+    fwd_cache.pin("session", [obj_1_name])
+    obj_2_name = fwd_cache.save(MockDataclass(foo="baz"))
+    obj_3_name = fwd_cache.save(MockDataclass(foo="qux"))
+    assert obj_1_name in fwd_cache._cache
+    assert obj_2_name not in fwd_cache._cache
+    assert obj_3_name in fwd_cache._cache
+
+
+def test_obj_serializer_fwd_cache_drops_unpinned_objects(fwd_cache: ObjectSerializerForwardCache[MockDataclass]):
+    obj_1_name = fwd_cache.save(MockDataclass(foo="bar"))
+    obj_2_name = fwd_cache.save(MockDataclass(foo="baz"))
+    fwd_cache.pin("session_1", [obj_1_name, obj_2_name])
+    fwd_cache.pin("session_2", [obj_2_name])
+
+    # No longer needed by session_1 - dropped from memory, but still available from the underlying storage
+    fwd_cache.pin("session_1", [obj_2_name])
+    assert obj_1_name not in fwd_cache._cache
+    assert fwd_cache.load(obj_1_name).foo == "bar"
+
+    # Still pinned by session_2
+    fwd_cache.unpin("session_1")
+    assert obj_2_name in fwd_cache._cache
+    fwd_cache.unpin("session_2")
+    assert obj_2_name not in fwd_cache._cache
+    assert not fwd_cache._pin_counts
 
 
 def test_obj_serializer_fwd_cache_calls_delete_callback(fwd_cache: ObjectSerializerForwardCache[MockDataclass]):
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import pytest
+import torch
+
+from invokeai.app.services.object_serializer.object_serializer_common import ObjectNotFoundError
+from invokeai.app.services.object_serializer.object_serializer_safetensors import ObjectSerializerSafetensors
+
+
+@dataclass
+class MockInfo:
+    embeds: torch.Tensor
+    pooled: Optional[torch.Tensor] = None
+
+
+@dataclass
+class MockConditioning:
+    conditionings: list[MockInfo]
+    label: str
+
+
+@pytest.fixture(params=[True, False], ids=["mmap", "no_mmap"])
+def obj_serializer(tmp_path: Path, request: pytest.FixtureRequest):
+    return ObjectSerializerSafetensors[MockConditioning](
+        tmp_path, safe_globals=[MockConditioning, MockInfo], mmap=request.param
+    )
+
+
+def test_obj_serializer_safetensors_saves_and_loads(obj_serializer: ObjectSerializerSafetensors[MockConditioning]):
+    embeds = torch.randn(2, 3)
+    pooled = torch.randn(4, dtype=torch.float16)
+    obj = MockConditioning(conditionings=[MockInfo(embeds=embeds, pooled=pooled), MockInfo(embeds=embeds)], label="foo")
+    obj_name = obj_serializer.save(obj)
+    assert Path(obj_serializer._output_dir, obj_name).exists()
+    assert obj_name.startswith("MockConditioning_")
+
+    loaded = obj_serializer.load(obj_name)
+    assert isinstance(loaded, MockConditioning)
+    assert loaded.label == "foo"
+    assert len(loaded.conditionings) == 2
+    assert torch.equal(loaded.conditionings[0].embeds, embeds)
+    assert loaded.conditionings[0].pooled is not None
+    assert loaded.conditionings[0].pooled.dtype == torch.float16
+    assert torch.equal(loaded.conditionings[0].pooled, pooled)
+    assert torch.equal(loaded.conditionings[1].embeds, embeds)
+    assert loaded.conditionings[1].pooled is None
+
+
+def test_obj_serializer_safetensors_loaded_tensors_are_writable(
+    obj_serializer: ObjectSerializerSafetensors[MockConditioning],
+):
+    obj_name = obj_serializer.save(MockConditioning(conditionings=[MockInfo(embeds=torch.zeros(2, 2))], label="foo"))
+    loaded = obj_serializer.load(obj_name)
+    loaded.conditionings[0].embeds += 1
+    # Modifying a loaded object must not modify the stored object
+    assert torch.equal(obj_serializer.load(obj_name).conditionings[0].embeds, torch.zeros(2, 2))
+
+
+def test_obj_serializer_safetensors_tensor(tmp_path: Path):
+    obj_serializer = ObjectSerializerSafetensors[torch.Tensor](tmp_path, safe_globals=[torch.Tensor])
+    tensor = torch.arange(24, dtype=torch.int64).reshape(2, 3, 4)
+    obj_name = obj_serializer.save(tensor[:, 1])
+    assert obj_name.startswith("Tensor_")
+    assert torch.equal(obj_serializer.load(obj_name), tensor[:, 1])
+
+
+def test_obj_serializer_safetensors_rejects_unregistered_dataclass(tmp_path: Path):
+    obj_serializer = ObjectSerializerSafetensors[MockConditioning](tmp_path, safe_globals=[MockConditioning])
+    with pytest.raises(TypeError):
+        obj_serializer.save(MockConditioning(conditionings=[MockInfo(embeds=torch.zeros(1))], label="foo"))
+
+
+def test_obj_serializer_safetensors_deletes(obj_serializer: ObjectSerializerSafetensors[MockConditioning]):
+    obj_name = obj_serializer.save(MockConditioning(conditionings=[], label="foo"))
+    obj_serializer.delete(obj_name)
+    assert not Path(obj_serializer._output_dir, obj_name).exists()
+    with pytest.raises(ObjectNotFoundError):
+        obj_serializer.load(obj_name)
+
+
+def test_obj_serializer_safetensors_ephemeral_deletes_tempdir_on_stop(tmp_path: Path):
+    obj_serializer = ObjectSerializerSafetensors[torch.Tensor](tmp_path, safe_globals=[torch.Tensor], ephemeral=True)
+    tempdir_path = obj_serializer._output_dir
+    assert tempdir_path != tmp_path
+    obj_serializer.stop(None)  # pyright: ignore [reportArgumentType]
+    assert not tempdir_path.exists()
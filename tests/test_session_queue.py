@@ -4,12 +4,15 @@ import pytest
 from pydantic import TypeAdapter, ValidationError
 
 from invokeai.app.services.session_queue.session_queue_common import (
+    FROM_BATCH_TEMPLATE,
     Batch,
     BatchDataCollection,
     BatchDatum,
     NodeFieldValue,
     calc_session_count,
+    create_batch_template,
     create_session_nfv_tuples,
+    materialize_session,
     prepare_values_to_insert,
 )
 from invokeai.app.services.shared.graph import Graph, GraphExecutionState
@@ -136,7 +139,9 @@ def test_calc_session_count_does_not_materialize_cartesian_product(
 
 def test_prepare_values_to_insert(batch_data_collection, batch_graph):
     b = Batch(graph=batch_graph, data=batch_data_collection, runs=2)
-    values = prepare_values_to_insert(queue_id="default", batch=b, priority=0, max_new_queue_items=1000)
+    values = prepare_values_to_insert(
+        queue_id="default", batch=b, priority=0, max_new_queue_items=1000, use_batch_template=False
+    )
     assert len(values) == 8
 
     GraphExecutionStateValidator = TypeAdapter(GraphExecutionState)
@@ -166,6 +171,35 @@ def test_prepare_values_to_insert(batch_data_collection, batch_graph):
     assert all(v[5] == 0 for v in values)
 
 
+def test_prepare_values_to_insert_with_batch_template(batch_data_collection, batch_graph):
+    b = Batch(graph=batch_graph, data=batch_data_collection, runs=2)
+    values = prepare_values_to_insert(queue_id="default", batch=b, priority=0, max_new_queue_items=1000)
+    assert len(values) == 8
+
+    # the session is not stored per row
+    assert all(v[1] == FROM_BATCH_TEMPLATE for v in values)
+
+    # the session is materialized from the batch template and the row's field values
+    session_template, _ = create_batch_template(b)
+    sessions = [materialize_session(session_template, v[2], v[4]) for v in values]
+    assert sessions[0].graph.get_node("1").prompt == "Banana sushi"
+    assert sessions[0].graph.get_node("2").prompt == "Strawberry sushi"
+    assert sessions[0].graph.get_node("3").prompt == "Orange sushi"
+    assert sessions[0].graph.get_node("4").prompt == "Nissan"
+    assert sessions[3].graph.get_node("1").prompt == "Grape sushi"
+    assert sessions[3].graph.get_node("3").prompt == "Apple sushi"
+
+    # session ids should match the rows, and be unique
+    assert [v[2] for v in values] == [s.id for s in sessions]
+    assert len({s.id for s in sessions}) == len(sessions)
+
+    # materialized sessions should match the fully-serialized sessions
+    GraphExecutionStateValidator = TypeAdapter(GraphExecutionState)
+    for (_, session_json, _), session in zip(create_session_nfv_tuples(batch=b, maximum=1000), sessions, strict=True):
+        expected = GraphExecutionStateValidator.validate_json(session_json)
+        assert session.graph.model_dump() == expected.graph.model_dump()
+
+
 def test_prepare_values_to_insert_with_priority(batch_data_collection, batch_graph):
     b = Batch(graph=batch_graph, data=batch_data_collection, runs=2)
     values = prepare_values_to_insert(queue_id="default", batch=b, priority=1, max_new_queue_items=1000)